@@ -65,16 +65,10 @@ __author__ = "Matthew Zipay <mattz@ninthtest.info>"
 # and https://semver.org/)
 __version__ = "3.0.0.post1"
 
-from inspect import ismodule
 import logging
 import os
 import sys
-
-import autologging
-if not os.getenv("AGLYPH_TRACED"):
-    autologging.install_traced_noop()
-
-from autologging import traced
+import types
 
 __all__ = [
     "AglyphError",
@@ -90,9 +84,13 @@ _log = logging.getLogger(__name__)
 if not _log.handlers:
     _log.addHandler(logging.NullHandler())
 
+from aglyph._compat import is_string, name_of, traced
+
 # log the Aglyph and Python versions, the platform, and compatibility details
-from aglyph._compat import is_string, name_of, platform_detail
-_log.info("Aglyph %s on %s", __version__, platform_detail)
+# (only determined if they will be logged - see aglyph._compat)
+if _log.isEnabledFor(logging.INFO):
+    from aglyph._compat import platform_detail
+    _log.info("Aglyph %s on %s", __version__, platform_detail)
 
 
 class AglyphDeprecationWarning(DeprecationWarning):
@@ -166,7 +164,7 @@ def format_dotted_name(obj):
     if not _importable(obj):
         raise AglyphError("%r does not have an importable dotted name" % obj)
 
-    if not ismodule(obj):
+    if not isinstance(obj, types.ModuleType):
         return "%s.%s" % (obj.__module__, name_of(obj))
     else:
         return obj.__name__
@@ -187,7 +185,7 @@ def _importable(obj):
     True
 
     """
-    if ismodule(obj):
+    if isinstance(obj, types.ModuleType):
         return True
     elif hasattr(obj, "__module__") and hasattr(obj, "__name__"):
         return obj.__name__ in sys.modules[obj.__module__].__dict__
@@ -249,3 +247,84 @@ def _identify(spec):
     """
     return spec if is_string(spec) else format_dotted_name(spec)
 
+
+@traced
+def _write_atomically(filename, *chunks):
+    """Write the encoded bytes *chunks* to *filename* so that concurrent
+    readers see either the previous file or the complete new file,
+    never a partially-written one.
+
+    :arg str filename: the destination file name
+    :arg chunks:
+       the encoded bytes (or other contiguous buffer-protocol objects)
+       to write, in order
+
+    The data are first written to a temporary file in the same directory
+    as *filename*, which is then renamed over *filename*.
+
+    """
+    # only needed (and so only imported) when writing caches or modules
+    import tempfile
+
+    (fd, temp_filename) = tempfile.mkstemp(
+        prefix=".aglyph-", dir=os.path.dirname(filename) or os.curdir)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for data in chunks:
+                f.write(data)
+        #PYVER: os.replace is not available in Python < 3.3
+        getattr(os, "replace", os.rename)(temp_filename, filename)
+    except:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+        raise
+
+
+def _check_private(path, exclusive=True):
+    """Verify that *path* belongs to the current user.
+
+    :arg str path: a file or directory name
+    :keyword bool exclusive:
+       whether *path* must also be inaccessible to other users (the
+       default); otherwise, it must only not be writable by them
+    :raise aglyph.AglyphError:
+       if *path* is owned by another user, or if other users may access
+       (or, if not *exclusive*, write to) it
+
+    Files that Aglyph unpickles (or memory-maps) from a shared location
+    must be checked before they are read, because another user could
+    otherwise plant them there.
+
+    """
+    #PYVER: os.getuid is not available on Windows, where ownership is not
+    # checked
+    getuid = getattr(os, "getuid", None)
+    if getuid is None:
+        return
+    stat = os.stat(path)
+    if stat.st_uid != getuid():
+        raise AglyphError("%s is not owned by the current user" % path)
+    if stat.st_mode & (0o077 if exclusive else 0o022):
+        raise AglyphError(
+            "%s is accessible by other users (mode %o)" %
+                (path, stat.st_mode & 0o777))
+
+
+def _make_private_dir(directory):
+    """Create *directory* (readable and writable only by the current
+    user) if it does not already exist.
+
+    :arg str directory: the directory to create
+    :raise aglyph.AglyphError:
+       if *directory* already exists but is not private to the current
+       user (see :func:`_check_private`)
+
+    """
+    if not os.path.isdir(directory):
+        try:
+            os.makedirs(directory, 0o700)
+        except OSError:
+            # another process may have created it first
+            if not os.path.isdir(directory):
+                raise
+    _check_private(directory)
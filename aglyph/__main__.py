@@ -0,0 +1,121 @@
+# -*- coding: UTF-8 -*-
+
+# Copyright (c) 2006, 2011, 2013-2018 Matthew Zipay.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use,
+# copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following
+# conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+# OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+
+"""The Aglyph command-line interface.
+
+Usage::
+
+   python -m aglyph compile SOURCE [-o OUTPUT] [--default-encoding ENC]
+
+*SOURCE* is either the filename of an XML context document, or the
+dotted name of a :class:`aglyph.context.Context` object (or of a
+callable that returns one). The compiled module is written to *OUTPUT*,
+or to standard output if *OUTPUT* is not specified.
+
+.. versionadded:: 3.1.0
+
+"""
+
+__author__ = "Matthew Zipay <mattz@ninthtest.info>"
+
+import argparse
+import os
+import sys
+
+from aglyph import AglyphError, resolve_dotted_name, _write_atomically
+from aglyph.compiler import compile_context
+from aglyph.context import Context, XMLContext
+
+__all__ = ["main"]
+
+
+def main(argv=None):
+    """Run the Aglyph command-line interface.
+
+    :keyword list argv:
+       the command-line arguments (by default, ``sys.argv[1:]``)
+    :return:
+       the process exit status
+    :rtype:
+       :obj:`int`
+
+    """
+    parser = argparse.ArgumentParser(prog="python -m aglyph")
+    subparsers = parser.add_subparsers(dest="command")
+    compile_parser = subparsers.add_parser(
+        "compile", help="compile a context into a Python module")
+    compile_parser.add_argument(
+        "source",
+        help="an XML context filename, or the dotted name of a Context")
+    compile_parser.add_argument(
+        "-o", "--output",
+        help="the generated module filename (default: standard output)")
+    compile_parser.add_argument(
+        "--default-encoding", default=sys.getdefaultencoding(),
+        help="the default encoding of an XML context (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    if args.command != "compile":
+        parser.print_usage(sys.stderr)
+        return 2
+
+    try:
+        source = compile_context(
+            _load_context(args.source, args.default_encoding))
+    except (AglyphError, ImportError, AttributeError) as e:
+        sys.stderr.write("%s: error: %s\n" % (parser.prog, e))
+        return 1
+
+    if args.output:
+        _write_atomically(args.output, source.encode("utf-8"))
+    else:
+        sys.stdout.write(source)
+    return 0
+
+
+def _load_context(source, default_encoding):
+    """Return the context identified by *source*.
+
+    :arg str source:
+       an XML context filename, or the dotted name of a context object
+       (or of a callable that returns a context object)
+    :arg str default_encoding:
+       the default encoding of an XML context
+
+    """
+    if os.path.isfile(source):
+        return XMLContext(source, default_encoding=default_encoding)
+
+    context = resolve_dotted_name(source)
+    if callable(context) and not isinstance(context, Context):
+        context = context()
+    if not isinstance(context, Context):
+        raise AglyphError("%s does not identify a context" % source)
+    return context
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -40,18 +40,14 @@ easier to maintain (and easier to remove later).
 
 __author__ = "Matthew Zipay <mattz@ninthtest.info>"
 
-from inspect import getmodule
 import logging
 import os
-import platform
 import sys
+import time
 import types
-import xml.etree.ElementTree as ET
 
 from aglyph import __version__
 
-from autologging import logged, traced
-
 __all__ = [
     "is_python_2",
     "is_python_3",
@@ -66,6 +62,9 @@ __all__ = [
     "is_string",
     "new_instance",
     "name_of",
+    "perf_counter",
+    "logged",
+    "traced",
     "DoctypeTreeBuilder",
     "CLRXMLParser",
     "AglyphDefaultXMLParser",
@@ -79,62 +78,7 @@ is_python_2 = (sys.version_info[0] == 2)
 #: True if the Python MAJOR version is 3.
 is_python_3 = (sys.version_info[0] == 3)
 
-_sys_version = ' '.join(sys.version.split())
-
-try:
-    _py_impl = platform.python_implementation()
-except:
-    _py_impl = "Python"
-
-#: True if the runtime Python implementation is PyPy.
-is_pypy = \
-    _py_impl == "PyPy" and getattr(sys, "pypy_version_info", None) is not None
-
-try:
-    import stackless
-except:
-    _has_stackless = False
-else:
-    _py_impl = "Stackless Python"
-    _has_stackless = True
-
-#: True if the runtime Python implementation is Stackless Python.
-is_stackless = \
-    (not is_pypy) and _has_stackless and ("Stackless" in sys.version)
-
-#: True if the runtime Python implementation is Jython.
-is_jython = \
-    _py_impl == "Jython" and getattr(sys, "JYTHON_JAR", None) is not None
-
-try:
-    import clr
-    clr.AddReference("System")
-    has_clr = True
-except:
-    has_clr = False
-
-#: True if the runtime Python implementation is IronPython.
-is_ironpython = _py_impl == "IronPython" and has_clr
-
-_platform = None
-try:
-    # preferred (most detail, but not universally available/supported)
-    _platform = platform.platform()
-except:
-    _platform = getattr(os, "name", "unknown")
-
-if hasattr(sys, "getwindowsversion"):
-    try:
-        _platform = "%s %s" % (_platform, sys.getwindowsversion())
-    except:
-        pass
-
-#: The python implementation, version, and platform information.
-platform_detail = "%s %s %s" % (_py_impl, _sys_version, _platform)
-if "APPENGINE_RUNTIME" in os.environ:
-    platform_detail = "%s [GAE]" % platform_detail
-
-_builtins = getmodule(hex).__dict__
+_builtins = sys.modules[hex.__module__].__dict__
 
 #: The type of Unicode text strings.
 TextType = _builtins["str"] if is_python_3 else _builtins["unicode"]
@@ -144,6 +88,9 @@ DataType = _builtins["bytes"] if is_python_3 else _builtins["str"]
 
 _StringTypes = (TextType, DataType)
 
+#PYVER: "old-style" classes are instances of types.ClassType in Python 2
+_ClassTypes = (type, getattr(types, "ClassType", type))
+
 
 def is_string(obj):
     """Return ``True`` if *obj* is Unicode text or encoded bytes data.
@@ -187,235 +134,214 @@ def name_of(obj):
     return getattr(obj, "__qualname__", obj.__name__)
 
 
-class DoctypeTreeBuilder(ET.TreeBuilder):
-    """An :mod:`xml.etree.ElementTree.TreeBuilder` that avoids
-    deprecation warnings for
-    :meth:`xml.etree.ElementTree.XMLParser.doctype`.
+#PYVER: time.perf_counter is not available in Python < 3.3
+#: The highest-resolution clock available for measuring elapsed time.
+perf_counter = getattr(time, "perf_counter", time.time)
 
-    .. seealso::
-       `Issue14007 <http://bugs.python.org/issue14007>`_
-          xml.etree.ElementTree - XMLParser and TreeBuilder's doctype()
-          method missing
 
-    """
+if os.getenv("AGLYPH_TRACED"):
+    from autologging import logged, traced
+else:
+    # Autologging (and the inspect module that it depends on) is only
+    # loaded when tracing has been requested; otherwise these stand-ins
+    # attach the same loggers and turn @traced into a no-op
 
-    def __init__(self, *args, **keywords):
-        """
-        :arg tuple *args: the positional initialization arguments
-        :arg dict **keywords: the keyword initialization arguments
+    def logged(obj):
+        """Add a logger member to a decorated class or function.
+
+        :arg obj: the class or function object being decorated
+        :return: *obj*
+
+        The logger names (and the ``__log``/``_log`` member names) are
+        the same as those used by :func:`autologging.logged`.
+
+        .. versionadded:: 3.1.0
 
         """
-        #PYVER: arguments to super() are implicit under Python 3
-        super(DoctypeTreeBuilder, self).__init__(*args, **keywords)
-        self._doctype_name = None
-        self._doctype_pubid = None
-        self._doctype_system = None
-
-    @property
-    def doctype_name(self):
-        """The document type name *(read-only)*."""
-        return self._doctype_name
-
-    @property
-    def doctype_pubid(self):
-        """The document type public identifier *(read-only)*."""
-        return self._doctype_pubid
-
-    @property
-    def doctype_system(self):
-        """The document type system identifier *(read-only)*."""
-        return self._doctype_system
-
-    def doctype(self, name, pubid, system):
-        """Report the parsed DOCTYPE declaration.
-
-        :arg str name: the document type name
-        :arg str pubid: the document type public identifier
-        :arg str system: the document type system identifier
+        if isinstance(obj, _ClassTypes):
+            setattr(
+                obj, "_%s__log" % obj.__name__.lstrip('_'),
+                logging.getLogger("%s.%s" % (obj.__module__, name_of(obj))))
+        else:
+            obj._log = logging.getLogger(obj.__module__)
+        return obj
+
+    def traced(*args):
+        """Return the decorated class or function unmodified.
+
+        :arg tuple *args:
+           the class or function being decorated, or the logger and/or
+           method names given to a parameterized ``@traced(...)``
+
+        This is the equivalent of the :func:`autologging.traced` no-op
+        that Autologging installs when tracing is deactivated.
+
+        .. versionadded:: 3.1.0
 
         """
-        self._doctype_name = name
-        self._doctype_pubid = pubid
-        self._doctype_system = system
+        obj = args[0] if args else None
+        if obj is None:
+            return traced
+        elif isinstance(obj, _ClassTypes) or callable(obj):
+            return obj
+        else:
+            return lambda class_or_fn: class_or_fn
+
+
+def _detect_platform():
+    """Return the runtime Python implementation flags and the
+    :attr:`platform_detail` string.
 
+    :rtype: dict
 
-if is_ironpython:
-    clr.AddReference("System.IO")
-    clr.AddReference("System.Xml")
+    These values require the :mod:`platform` module and import probes
+    for Stackless and the .NET CLR, so they are not determined until
+    they are first accessed.
 
-    _log.info("loaded System.IO and System.Xml CLR namespaces")
+    """
+    import platform
+
+    try:
+        py_impl = platform.python_implementation()
+    except:
+        py_impl = "Python"
+
+    is_pypy = (
+        py_impl == "PyPy" and
+        getattr(sys, "pypy_version_info", None) is not None)
+
+    try:
+        import stackless
+    except:
+        has_stackless = False
+    else:
+        py_impl = "Stackless Python"
+        has_stackless = True
+
+    is_stackless = \
+        (not is_pypy) and has_stackless and ("Stackless" in sys.version)
 
-    from System.IO import StringReader
-    from System.Xml import (
-        DtdProcessing,
-        ValidationType,
-        XmlNodeType,
-        XmlReader,
-        XmlReaderSettings
+    is_jython = \
+        py_impl == "Jython" and getattr(sys, "JYTHON_JAR", None) is not None
+
+    try:
+        import clr
+        clr.AddReference("System")
+        has_clr = True
+    except:
+        has_clr = False
+
+    is_ironpython = py_impl == "IronPython" and has_clr
+
+    try:
+        # preferred (most detail, but not universally available/supported)
+        platform_ = platform.platform()
+    except:
+        platform_ = getattr(os, "name", "unknown")
+
+    if hasattr(sys, "getwindowsversion"):
+        try:
+            platform_ = "%s %s" % (platform_, sys.getwindowsversion())
+        except:
+            pass
+
+    platform_detail = "%s %s %s" % (
+        py_impl, ' '.join(sys.version.split()), platform_)
+    if "APPENGINE_RUNTIME" in os.environ:
+        platform_detail = "%s [GAE]" % platform_detail
+
+    _log.debug(
+        "compatibility details:\n"
+            "  is_python_2? %r\n"
+            "  is_python_3? %r\n"
+            "  is_pypy? %r\n"
+            "  is_stackless? %r\n"
+            "  is_jython? %r\n"
+            "  is_ironpython? %r (has_clr? %r)\n"
+            "  TextType is %r\n"
+            "  DataType is %r\n"
+            "  _instance_type is %r\n"
+            "  __qualname__ supported? %r",
+        is_python_2,
+        is_python_3,
+        is_pypy,
+        is_stackless,
+        is_jython,
+        is_ironpython, has_clr,
+        TextType,
+        DataType,
+        _instance_type,
+        hasattr(_detect_platform, "__qualname__")
     )
 
+    return {
+        "is_pypy": is_pypy,
+        "is_stackless": is_stackless,
+        "is_jython": is_jython,
+        "has_clr": has_clr,
+        "is_ironpython": is_ironpython,
+        "platform_detail": platform_detail,
+    }
 
-    @traced
-    @logged
-    class CLRXMLParser(ET.XMLParser):
-        """An :class:`xml.etree.ElementTree.XMLParser` that delegates
-        parsing to the .NET CLR `System.Xml.XmlReader
-        <http://msdn.microsoft.com/en-us/library/system.xml.xmlreader>`_
-        parser.
 
-        .. note::
-           `IronPython <http://ironpython.net/>`_ is not able to load
-           CPython's :mod:`xml.parsers.expat` module by default, and so
-           the default parser used by ElementTree does not exist.
+def _load_xml_support():
+    """Return the XML parsing support classes.
 
-        """
+    :rtype: dict
 
-        def __init__(self, target=DoctypeTreeBuilder(), validating=False):
-            """
-            :keyword xml.etree.ElementTree.TreeBuilder target:
-               the target object (optional; defaults to
-               :class:`aglyph._compat.DoctypeTreeBuilder`)
-            :keyword bool validating:
-               specify ``True`` to use a validating parser
-
-            """
-            settings = XmlReaderSettings()
-            settings.IgnoreComments = True
-            settings.IgnoreProcessingInstructions = True
-            settings.IgnoreWhitespace = True
-            if not validating:
-                settings.DtdProcessing = DtdProcessing.Ignore
-                settings.ValidationType = getattr(ValidationType, "None")
-            else:
-                settings.DtdProcessing = DtdProcessing.Parse
-                settings.ValidationType = ValidationType.DTD
-            self.settings = settings
-            self.version = platform.python_compiler()
-            self.__log.debug("ET parser version is %s", self.version)
-            self._target = target
-            self._buffer = []
-
-        def feed(self, data):
-            """Add more XML data to be parsed.
-
-            :arg str data: raw XML read from a stream
-
-            .. note::
-               All *data* across calls to this method are buffered
-               internally; the parser itself is not actually created
-               until the :meth:`close` method is called.
-
-            """
-            self._buffer.append(data)
-
-        def close(self):
-            """Parse the XML from the internal buffer to build an
-            element tree.
-
-            :return:
-                the root element of the XML document
-            :rtype:
-                :class:`xml.etree.ElementTree.ElementTree`
-
-            """
-            xml_string = "".join(self._buffer)
-            self._buffer = None
-
-            reader = XmlReader.Create(StringReader(xml_string), self.settings)
-
-            # figure out which encoding to use
-            next = reader.Read()
-            document_encoding = (
-                reader.GetAttribute("encoding")
-                if next and reader.NodeType == XmlNodeType.XmlDeclaration
-                else None)
-            if document_encoding:
-                self.__log.info(
-                    "parsed document encoding %r from XML declaration",
-                    document_encoding)
-            else:
-                document_encoding = "UTF-8"
-                self.__log.warn(
-                    "document encoding is missing! assuming default %r",
-                    document_encoding)
-
-            while next:
-                if reader.IsStartElement():
-                    self._start_element(reader)
-                elif reader.NodeType in [XmlNodeType.Text, XmlNodeType.CDATA]:
-                    # decode the value first to work around IronPython quirk
-                    self._target.data(reader.Value.decode(document_encoding))
-                elif reader.NodeType == XmlNodeType.EndElement:
-                    self._target.end(reader.LocalName)
-
-                next = reader.Read()
-
-            return self._target.close()
-
-        def _start_element(self, reader):
-            """Notify the tree builder that a start element has been
-            encountered.
-
-            :arg reader:
-               a .NET `System.Xml.XmlReader
-               <http://msdn.microsoft.com/en-us/library/system.xml.xmlreader>`_
-
-            If the element is an empty element (e.g. ``<name />``), the
-            tree builder is also notified that the element has been
-            closed.
-
-            """
-            name = reader.LocalName
-            attributes = {}
-            while reader.MoveToNextAttribute():
-                attributes[reader.Name] = reader.Value
-            reader.MoveToElement()
-            self._target.start(name, attributes)
-            if reader.IsEmptyElement:
-                self._target.end(name)
+    The classes are defined in :mod:`aglyph._xmlcompat` so that
+    :mod:`xml.etree.ElementTree` is not imported until they are first
+    accessed.
 
+    """
+    from aglyph import _xmlcompat
+    return dict(
+        (name, getattr(_xmlcompat, name)) for name in _xmlcompat.__all__)
+
+
+_lazy_loaders = {
+    #: True if the runtime Python implementation is PyPy.
+    "is_pypy": _detect_platform,
+    #: True if the runtime Python implementation is Stackless Python.
+    "is_stackless": _detect_platform,
+    #: True if the runtime Python implementation is Jython.
+    "is_jython": _detect_platform,
+    #: True if the .NET CLR is available.
+    "has_clr": _detect_platform,
+    #: True if the runtime Python implementation is IronPython.
+    "is_ironpython": _detect_platform,
+    #: The python implementation, version, and platform information.
+    "platform_detail": _detect_platform,
+    "DoctypeTreeBuilder": _load_xml_support,
+    "CLRXMLParser": _load_xml_support,
+    "AglyphDefaultXMLParser": _load_xml_support,
+}
+
+
+def __getattr__(name):
+    """Determine a lazily-loaded module attribute on first access.
+
+    :arg str name: the attribute name
+    :raise AttributeError: if *name* is not a lazily-loaded attribute
+
+    .. versionadded:: 3.1.0
 
-else:
-    class CLRXMLParser(ET.XMLParser):
-        """A dummy class that will raise :class:`RuntimeError` if
-        instantiated.
+    .. seealso::
+       :pep:`562` - Module __getattr__ and __dir__
+
+    """
+    loader = _lazy_loaders.get(name)
+    if loader is None:
+        raise AttributeError(
+            "module %r has no attribute %r" % (__name__, name))
+    attributes = loader()
+    globals().update(attributes)
+    return attributes[name]
 
-        """
 
-        def __new__(self, *args, **keywords):
-            raise RuntimeError(".NET CLR is not available")
-
-
-#: The default XML parser used by :class:`aglyph.context.XMLContext`.
-AglyphDefaultXMLParser = ET.XMLParser if not is_ironpython else CLRXMLParser
-
-
-# log compatibility details
-_log.debug(
-    "compatibility details:\n"
-        "  is_python_2? %r\n"
-        "  is_python_3? %r\n"
-        "  is_pypy? %r\n"
-        "  is_stackless? %r\n"
-        "  is_jython? %r\n"
-        "  is_ironpython? %r (has_clr? %r)\n"
-        "  TextType is %r\n"
-        "  DataType is %r\n"
-        "  _instance_type is %r\n"
-        "  __qualname__ supported? %r\n"
-        "  AglyphDefaultXMLParser is %r",
-    is_python_2,
-    is_python_3,
-    is_pypy,
-    is_stackless,
-    is_jython,
-    is_ironpython, has_clr,
-    TextType,
-    DataType,
-    _instance_type,
-    hasattr(DoctypeTreeBuilder, "__qualname__"),
-    AglyphDefaultXMLParser
-)
-
-del _sys_version, _py_impl, _has_stackless, _platform, _builtins
+#PYVER: module __getattr__ (PEP 562) is not supported in Python < 3.7
+if sys.version_info < (3, 7):
+    globals().update(_detect_platform())
+    globals().update(_load_xml_support())
 
+del _builtins
@@ -0,0 +1,257 @@
+# -*- coding: UTF-8 -*-
+
+# Copyright (c) 2006, 2011, 2013-2018 Matthew Zipay.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use,
+# copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following
+# conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+# OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+"""The XML parsing support classes used by :mod:`aglyph.context`.
+
+These classes are exposed through (and documented as members of)
+:mod:`aglyph._compat`. They are kept in this separate module so that
+:mod:`xml.etree.ElementTree` is not imported until XML support is
+actually needed.
+
+"""
+
+__author__ = "Matthew Zipay <mattz@ninthtest.info>"
+
+import logging
+import xml.etree.ElementTree as ET
+
+from aglyph import __version__
+from aglyph._compat import is_ironpython, logged, traced
+
+__all__ = [
+    "DoctypeTreeBuilder",
+    "CLRXMLParser",
+    "AglyphDefaultXMLParser",
+]
+
+_log = logging.getLogger(__name__)
+
+
+class DoctypeTreeBuilder(ET.TreeBuilder):
+    """An :mod:`xml.etree.ElementTree.TreeBuilder` that avoids
+    deprecation warnings for
+    :meth:`xml.etree.ElementTree.XMLParser.doctype`.
+
+    .. seealso::
+       `Issue14007 <http://bugs.python.org/issue14007>`_
+          xml.etree.ElementTree - XMLParser and TreeBuilder's doctype()
+          method missing
+
+    """
+
+    def __init__(self, *args, **keywords):
+        """
+        :arg tuple *args: the positional initialization arguments
+        :arg dict **keywords: the keyword initialization arguments
+
+        """
+        #PYVER: arguments to super() are implicit under Python 3
+        super(DoctypeTreeBuilder, self).__init__(*args, **keywords)
+        self._doctype_name = None
+        self._doctype_pubid = None
+        self._doctype_system = None
+
+    @property
+    def doctype_name(self):
+        """The document type name *(read-only)*."""
+        return self._doctype_name
+
+    @property
+    def doctype_pubid(self):
+        """The document type public identifier *(read-only)*."""
+        return self._doctype_pubid
+
+    @property
+    def doctype_system(self):
+        """The document type system identifier *(read-only)*."""
+        return self._doctype_system
+
+    def doctype(self, name, pubid, system):
+        """Report the parsed DOCTYPE declaration.
+
+        :arg str name: the document type name
+        :arg str pubid: the document type public identifier
+        :arg str system: the document type system identifier
+
+        """
+        self._doctype_name = name
+        self._doctype_pubid = pubid
+        self._doctype_system = system
+
+
+if is_ironpython:
+    import clr
+    import platform
+    clr.AddReference("System.IO")
+    clr.AddReference("System.Xml")
+
+    _log.info("loaded System.IO and System.Xml CLR namespaces")
+
+    from System.IO import StringReader
+    from System.Xml import (
+        DtdProcessing,
+        ValidationType,
+        XmlNodeType,
+        XmlReader,
+        XmlReaderSettings
+    )
+
+
+    @traced
+    @logged
+    class CLRXMLParser(ET.XMLParser):
+        """An :class:`xml.etree.ElementTree.XMLParser` that delegates
+        parsing to the .NET CLR `System.Xml.XmlReader
+        <http://msdn.microsoft.com/en-us/library/system.xml.xmlreader>`_
+        parser.
+
+        .. note::
+           `IronPython <http://ironpython.net/>`_ is not able to load
+           CPython's :mod:`xml.parsers.expat` module by default, and so
+           the default parser used by ElementTree does not exist.
+
+        """
+
+        def __init__(self, target=DoctypeTreeBuilder(), validating=False):
+            """
+            :keyword xml.etree.ElementTree.TreeBuilder target:
+               the target object (optional; defaults to
+               :class:`aglyph._compat.DoctypeTreeBuilder`)
+            :keyword bool validating:
+               specify ``True`` to use a validating parser
+
+            """
+            settings = XmlReaderSettings()
+            settings.IgnoreComments = True
+            settings.IgnoreProcessingInstructions = True
+            settings.IgnoreWhitespace = True
+            if not validating:
+                settings.DtdProcessing = DtdProcessing.Ignore
+                settings.ValidationType = getattr(ValidationType, "None")
+            else:
+                settings.DtdProcessing = DtdProcessing.Parse
+                settings.ValidationType = ValidationType.DTD
+            self.settings = settings
+            self.version = platform.python_compiler()
+            self.__log.debug("ET parser version is %s", self.version)
+            self._target = target
+            self._buffer = []
+
+        def feed(self, data):
+            """Add more XML data to be parsed.
+
+            :arg str data: raw XML read from a stream
+
+            .. note::
+               All *data* across calls to this method are buffered
+               internally; the parser itself is not actually created
+               until the :meth:`close` method is called.
+
+            """
+            self._buffer.append(data)
+
+        def close(self):
+            """Parse the XML from the internal buffer to build an
+            element tree.
+
+            :return:
+                the root element of the XML document
+            :rtype:
+                :class:`xml.etree.ElementTree.ElementTree`
+
+            """
+            xml_string = "".join(self._buffer)
+            self._buffer = None
+
+            reader = XmlReader.Create(StringReader(xml_string), self.settings)
+
+            # figure out which encoding to use
+            next = reader.Read()
+            document_encoding = (
+                reader.GetAttribute("encoding")
+                if next and reader.NodeType == XmlNodeType.XmlDeclaration
+                else None)
+            if document_encoding:
+                self.__log.info(
+                    "parsed document encoding %r from XML declaration",
+                    document_encoding)
+            else:
+                document_encoding = "UTF-8"
+                self.__log.warn(
+                    "document encoding is missing! assuming default %r",
+                    document_encoding)
+
+            while next:
+                if reader.IsStartElement():
+                    self._start_element(reader)
+                elif reader.NodeType in [XmlNodeType.Text, XmlNodeType.CDATA]:
+                    # decode the value first to work around IronPython quirk
+                    self._target.data(reader.Value.decode(document_encoding))
+                elif reader.NodeType == XmlNodeType.EndElement:
+                    self._target.end(reader.LocalName)
+
+                next = reader.Read()
+
+            return self._target.close()
+
+        def _start_element(self, reader):
+            """Notify the tree builder that a start element has been
+            encountered.
+
+            :arg reader:
+               a .NET `System.Xml.XmlReader
+               <http://msdn.microsoft.com/en-us/library/system.xml.xmlreader>`_
+
+            If the element is an empty element (e.g. ``<name />``), the
+            tree builder is also notified that the element has been
+            closed.
+
+            """
+            name = reader.LocalName
+            attributes = {}
+            while reader.MoveToNextAttribute():
+                attributes[reader.Name] = reader.Value
+            reader.MoveToElement()
+            self._target.start(name, attributes)
+            if reader.IsEmptyElement:
+                self._target.end(name)
+
+
+else:
+    class CLRXMLParser(ET.XMLParser):
+        """A dummy class that will raise :class:`RuntimeError` if
+        instantiated.
+
+        """
+
+        def __new__(self, *args, **keywords):
+            raise RuntimeError(".NET CLR is not available")
+
+
+#: The default XML parser used by :class:`aglyph.context.XMLContext`.
+AglyphDefaultXMLParser = ET.XMLParser if not is_ironpython else CLRXMLParser
+
+
+_log.debug("AglyphDefaultXMLParser is %r", AglyphDefaultXMLParser)
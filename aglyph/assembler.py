@@ -34,49 +34,1605 @@ assembler.
 
 An assembler provides thread-safe caching of **singleton** component
 instances, **borg** component shared-states (i.e. instance ``__dict__``
-references), and **weakref** component instance weak references.
+references), **weakref** component instance weak references, and
+**shared** component memory-mapped data.
+
+.. versionadded:: 3.1.0
+   Assemblers are fork-aware. An application may :meth:`Assembler.warm_up`
+   an assembler in a parent process and then fork worker processes that
+   share the cached objects copy-on-write; in each child, the assembler
+   reinitializes its locks and calls the "after_fork" lifecycle methods
+   of its cached objects (see :meth:`Assembler.after_fork`).
 
 """
 
 __author__ = "Matthew Zipay <mattz@ninthtest.info>"
 
-from collections import OrderedDict
+import atexit
+from collections import deque, OrderedDict
+from contextlib import contextmanager
+import copy
+import errno
 from functools import partial
-from inspect import isclass
+import gc
+from itertools import count, repeat
 import logging
+import mmap
+import os
+import random
+import sys
+import time
+import traceback
 import warnings
 import weakref
 
 try:
     import threading
     threading_ = threading
+    _has_threading = True
 except ImportError:
     import dummy_threading
     threading_ = dummy_threading
+    _has_threading = False
     warnings.warn(
         "threading module is not available; aglyph.assembler.Assembler "
             "operations will NOT be thread-safe!",
         RuntimeWarning)
 
-from autologging import logged, traced
+try:
+    import concurrent.futures as futures_
+except ImportError:
+    #PYVER: concurrent.futures is not available in Python 2 (without the
+    # "futures" backport); references are then assembled sequentially
+    futures_ = None
 
 from aglyph import (
     AglyphError,
     format_dotted_name,
+    _check_private,
     _identify,
+    _make_private_dir,
     resolve_dotted_name,
+    _write_atomically,
     __version__,
 )
-from aglyph._compat import is_string, name_of, new_instance
+from aglyph._compat import (
+    is_python_3,
+    is_string,
+    logged,
+    name_of,
+    new_instance,
+    perf_counter,
+    TextType,
+    traced,
+)
 from aglyph.component import Evaluator, Reference
 
-__all__ = ["Assembler"]
+__all__ = [
+    "Assembler",
+    "ContextVarAssemblyState",
+    "GreenletAssemblyState",
+    "set_assembly_state",
+    "ThreadLocalAssemblyState",
+]
 
 _log = logging.getLogger(__name__)
 _log.debug("using %r", threading_)
 
-# thread-local storage for assembly
-_assembly = threading_.local()
+
+class _Assembly(object):
+    """The assembly state of one flow of execution (thread, task, or
+    greenlet).
+
+    .. versionadded:: 3.1.0
+
+    """
+
+    __slots__ = [
+        "component_stack", "_members", "deadline", "pooled", "graph"]
+
+    def __init__(
+            self, component_stack=(), deadline=None, pooled=False,
+            graph=None):
+        """
+        :keyword component_stack:
+           the IDs of the components being assembled, outermost first
+        :keyword float deadline:
+           the :func:`aglyph._compat.perf_counter` time at which waits
+           for creation locks expire (see :meth:`Assembler.assemble`)
+        :keyword bool pooled:
+           whether or not the flow of execution is a thread of the pool
+           that assembles references concurrently
+        :keyword graph:
+           the "graph" component objects of the outermost assembly,
+           mapped by ``(assembler, component ID)`` (by default, the
+           cache is created when it is first needed)
+        :type graph: :class:`_ReentrantMutexCache`
+
+        """
+        self.component_stack = list(component_stack)
+        # for O(1) circular dependency detection
+        self._members = set(self.component_stack)
+        self.deadline = deadline
+        self.pooled = pooled
+        self.graph = graph
+
+    def push(self, component_id):
+        """Push *component_id* onto the assembly stack.
+
+        :raise aglyph.AglyphError:
+           if *component_id* is already being assembled
+
+        """
+        # issues/3: check for circular dependency
+        if component_id in self._members:
+            raise AglyphError(
+                "circular dependency detected: %s" %
+                    " > ".join(self.component_stack + [component_id]))
+        self.component_stack.append(component_id)
+        self._members.add(component_id)
+
+    def pop(self):
+        """Pop the innermost component ID from the assembly stack.
+
+        When the outermost assembly completes, its "graph" component
+        objects are discarded.
+
+        """
+        self._members.discard(self.component_stack.pop())
+        if not self.component_stack:
+            self.graph = None
+
+    @property
+    def idle(self):
+        """Whether or not this state is the same as no state at all."""
+        return not (
+            self.component_stack or self.deadline is not None or
+            self.pooled)
+
+
+class ThreadLocalAssemblyState(object):
+    """Holds the assembly state of each thread.
+
+    Every asyncio task (and every greenlet) that runs on a thread shares
+    the thread's state, so assemblies that are interleaved on one thread
+    may be mistaken for circular dependencies.
+
+    .. versionadded:: 3.1.0
+
+    .. seealso:: :func:`set_assembly_state`
+
+    """
+
+    def __init__(self):
+        #PYVER: arguments to super() are implicit in Python 3
+        super(ThreadLocalAssemblyState, self).__init__()
+        self._local = threading_.local()
+
+    def get(self):
+        """Return the assembly state of the current thread (or
+        ``None``).
+
+        """
+        return getattr(self._local, "assembly", None)
+
+    def set(self, assembly):
+        """Replace the assembly state of the current thread."""
+        self._local.assembly = assembly
+
+
+class ContextVarAssemblyState(object):
+    """Holds the assembly state of each :mod:`contextvars` context.
+
+    Each asyncio task runs in its own context, so tasks that assemble
+    components concurrently on one thread do not share state. (Every
+    thread also starts in its own context.)
+
+    This is the default assembly state (where :mod:`contextvars` is
+    available).
+
+    .. versionadded:: 3.1.0
+
+    .. seealso:: :func:`set_assembly_state`
+
+    """
+
+    def __init__(self):
+        """
+        :raise ImportError:
+           if :mod:`contextvars` is not available (Python < 3.7)
+
+        """
+        #PYVER: arguments to super() are implicit in Python 3
+        super(ContextVarAssemblyState, self).__init__()
+        #PYVER: contextvars is not available in Python < 3.7
+        import contextvars
+        self._var = contextvars.ContextVar("aglyph_assembly", default=None)
+
+    def get(self):
+        """Return the assembly state of the current context (or
+        ``None``).
+
+        """
+        return self._var.get()
+
+    def set(self, assembly):
+        """Replace the assembly state of the current context."""
+        self._var.set(assembly)
+
+
+class GreenletAssemblyState(object):
+    """Holds the assembly state of each greenlet (e.g. under gevent or
+    eventlet).
+
+    .. versionadded:: 3.1.0
+
+    .. seealso:: :func:`set_assembly_state`
+
+    """
+
+    def __init__(self):
+        """
+        :raise ImportError:
+           if the :mod:`greenlet` package is not installed
+
+        """
+        #PYVER: arguments to super() are implicit in Python 3
+        super(GreenletAssemblyState, self).__init__()
+        from greenlet import getcurrent
+        self._getcurrent = getcurrent
+        # a finished greenlet's state is discarded along with the greenlet
+        self._assemblies = weakref.WeakKeyDictionary()
+
+    def get(self):
+        """Return the assembly state of the current greenlet (or
+        ``None``).
+
+        """
+        return self._assemblies.get(self._getcurrent())
+
+    def set(self, assembly):
+        """Replace the assembly state of the current greenlet."""
+        if assembly is None:
+            self._assemblies.pop(self._getcurrent(), None)
+        else:
+            self._assemblies[self._getcurrent()] = assembly
+
+
+try:
+    _assembly_state = ContextVarAssemblyState()
+except ImportError:
+    #PYVER: contextvars is not available in Python < 3.7
+    _assembly_state = ThreadLocalAssemblyState()
+
+
+def set_assembly_state(state):
+    """Hold the assembly state of every assembler in *state*.
+
+    :arg state:
+       a :class:`ContextVarAssemblyState`,
+       :class:`ThreadLocalAssemblyState`,
+       :class:`GreenletAssemblyState`, or any object that provides the
+       same ``get()`` and ``set(assembly)`` methods
+    :return: the assembly state that was replaced
+
+    .. versionadded:: 3.1.0
+
+    The assembly state of a flow of execution (a thread, an asyncio
+    task, or a greenlet) is the stack of components that it is
+    assembling (used to detect circular dependencies), the deadline of
+    its :meth:`Assembler.assemble` *timeout*, and the "graph" component
+    objects of its outermost assembly. Flows of execution that
+    share a state must not assemble components concurrently; under
+    gevent or eventlet, for example, use a
+    :class:`GreenletAssemblyState`::
+
+       set_assembly_state(GreenletAssemblyState())
+
+    The assembly state should be replaced while no components are being
+    assembled (e.g. when the application starts).
+
+    """
+    global _assembly_state
+    replaced = _assembly_state
+    _assembly_state = state
+    _log.info("assembly state is now held in %r", state)
+    return replaced
+
+
+def _current_assembly():
+    """Return the assembly state of the current flow of execution,
+    creating it if necessary.
+
+    """
+    state = _assembly_state
+    assembly = state.get()
+    if assembly is None:
+        assembly = _Assembly()
+        state.set(assembly)
+    return assembly
+
+
+def _release_assembly(assembly):
+    """Discard *assembly* if it is no longer needed.
+
+    An idle assembly state is discarded (instead of being reused) so that
+    a task or greenlet started by a component initializer never shares
+    the state of the flow of execution that started it.
+
+    """
+    if assembly.idle:
+        _assembly_state.set(None)
+
+
+def _push_assembly(component_id):
+    """Push *component_id* onto the assembly stack of the current flow
+    of execution.
+
+    :return:
+       the assembly state that must be passed to :func:`_pop_assembly`
+    :raise aglyph.AglyphError:
+       if *component_id* is already being assembled
+
+    """
+    assembly = _current_assembly()
+    assembly.push(component_id)
+    return assembly
+
+
+def _pop_assembly(assembly):
+    """Pop the innermost component ID from the stack of *assembly*."""
+    assembly.pop()
+    _release_assembly(assembly)
+
+
+def _assembling():
+    """Return ``True`` if a component is being assembled in the current
+    flow of execution.
+
+    """
+    assembly = _assembly_state.get()
+    return assembly is not None and bool(assembly.component_stack)
+
+
+def _graph_scope():
+    """Return the "graph" component objects of the outermost assembly
+    of the current flow of execution.
+
+    :return:
+       a :class:`_ReentrantMutexCache` mapping ``(assembler, component
+       ID)`` to graph objects (an empty cache that is not retained if no
+       component is being assembled)
+
+    The creation of each graph object is guarded by the cache's lock for
+    its key, because the threads that assemble references concurrently
+    share the cache (see :func:`_resolve_concurrently`).
+
+    """
+    assembly = _assembly_state.get()
+    if assembly is None or not assembly.component_stack:
+        return _ReentrantMutexCache()
+    graph = assembly.graph
+    if graph is None:
+        graph = assembly.graph = _ReentrantMutexCache()
+    return graph
+
+# all live assemblers, which are reinitialized in a forked child process
+_assemblers = weakref.WeakSet()
+
+#PYVER: os.register_at_fork is not available in Python < 3.7 (or on Windows);
+# assemblers fall back to comparing process IDs on each assembly
+_at_fork_registered = hasattr(os, "register_at_fork")
+
+
+def _after_fork_in_child():
+    """Reinitialize every live assembler in a forked child process."""
+    for assembler in list(_assemblers):
+        assembler.after_fork()
+
+
+if _at_fork_registered:
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+#: Identifies (and versions) the format of published "shared" data files.
+_SHARED_MAGIC = b"AGLYPH-SHARED-2\n"
+
+#: Published "shared" data begins at a multiple of this many bytes.
+_SHARED_ALIGNMENT = 64
+
+
+#: {file name: ((st_dev, st_ino), publishing process ID)} of the data
+#: files published by this process.
+_published_files = {}
+
+
+def _component_filename(directory, context_id, component_id, extension):
+    """Return the name of a file in *directory* that belongs to the
+    component *component_id* of the context *context_id*.
+
+    :arg str directory: the directory of the file
+    :arg str context_id: the context identifier
+    :arg str component_id: the component unique ID
+    :arg str extension: the file name extension (e.g. ".shared")
+    :rtype: :obj:`str`
+
+    """
+    import hashlib
+
+    digest = hashlib.sha256(
+        ("%s\0%s" % (context_id, component_id)).encode("utf-8"))
+    return os.path.join(directory, digest.hexdigest() + extension)
+
+
+def _current_user():
+    """Return the identity (user ID, or user name where there are no
+    user IDs) of the user running this process.
+
+    :rtype: :obj:`str`
+
+    """
+    #PYVER: os.getuid is not available on Windows
+    getuid = getattr(os, "getuid", None)
+    if getuid is not None:
+        return "%d" % getuid()
+    import getpass
+    return getpass.getuser()
+
+
+def _shared_data_filename(shared_dir, context_id, component_id, definition):
+    """Return the name of the file to which the data of a "shared"
+    component is published.
+
+    :arg str shared_dir:
+       the directory of published data files (or ``None`` to use an
+       *aglyph-shared-<user>* directory in the system temporary
+       directory)
+    :arg str context_id: the context identifier
+    :arg str component_id: the component unique ID
+    :arg str definition:
+       the digest of the component definition (see
+       :meth:`Assembler._describe_snapshot`)
+    :rtype: :obj:`str`
+
+    The name is derived from the current user and the component
+    definition, so that data is never attached by another user, or
+    after the definition has changed.
+
+    """
+    import hashlib
+
+    user = _current_user()
+    if shared_dir is None:
+        import tempfile
+        shared_dir = os.path.join(
+            tempfile.gettempdir(), "aglyph-shared-%s" % user)
+    digest = hashlib.sha256("\0".join(
+        [user, context_id, component_id, definition]).encode("utf-8"))
+    return os.path.join(shared_dir, digest.hexdigest() + ".shared")
+
+
+def _is_running(pid):
+    """Tell whether or not the process *pid* is still running.
+
+    :arg int pid: a process ID
+    :rtype: :obj:`bool`
+
+    """
+    # on Windows, os.kill would terminate the process
+    if os.name != "posix":
+        return True
+    try:
+        os.kill(pid, 0)
+    except OSError as e:
+        return e.errno != errno.ESRCH
+    return True
+
+
+def _publish_shared_data(filename, data, component_id):
+    """Publish the buffer-protocol *data* of a "shared" component to
+    *filename*.
+
+    :arg str filename: the published data file name
+    :arg data: the buffer-protocol object created for the component
+    :arg str component_id: the component unique ID
+    :return:
+       the ``(st_dev, st_ino)`` identity of the published file
+    :raise aglyph.AglyphError:
+       if *data* does not support the buffer protocol
+
+    The file contains a short header (the ID of the publishing process,
+    and the format and shape of *data*) followed by the raw data,
+    aligned to :data:`_SHARED_ALIGNMENT` bytes.
+
+    The file is removed when the publishing process exits (see
+    :func:`_unpublish_at_exit`); if the process dies first, the file is
+    discarded by the next process that would attach it.
+
+    """
+    try:
+        view = memoryview(data)
+    except TypeError as e:
+        raise AglyphError(
+            "object of shared component %r does not support the buffer "
+                "protocol" % component_id, e)
+
+    header = b"".join([
+        _SHARED_MAGIC,
+        ("%d\n" % os.getpid()).encode("ascii"),
+        view.format.encode("ascii"), b"\n",
+        ",".join(str(n) for n in view.shape).encode("ascii"), b"\n",
+    ])
+    header += b"\0" * (-len(header) % _SHARED_ALIGNMENT)
+    #PYVER: memoryview.c_contiguous is not available in Python < 3.3
+    payload = (
+        view if getattr(view, "c_contiguous", True) else view.tobytes())
+
+    _make_private_dir(os.path.dirname(filename))
+    _write_atomically(filename, header, payload)
+    stat = os.stat(filename)
+    identity = (stat.st_dev, stat.st_ino)
+    _published_files[filename] = (identity, os.getpid())
+    return identity
+
+
+def _attach_shared_data(filename):
+    """Memory-map the published data of a "shared" component.
+
+    :arg str filename: the published data file name
+    :return:
+       a read-only :obj:`memoryview` of the published data (cast to its
+       original format and shape where possible), or ``None`` if
+       *filename* has not been published (or was published by a process
+       that is no longer running)
+    :raise aglyph.AglyphError:
+       if *filename* is not a published data file, or if it (or its
+       directory) is not private to the current user
+
+    """
+    try:
+        f = open(filename, "rb")
+    except (IOError, OSError):
+        return None
+    with f:
+        # another user must not be able to plant the data
+        _check_private(os.path.dirname(filename))
+        _check_private(filename, exclusive=False)
+        stat = os.fstat(f.fileno())
+        # the mapping remains valid after the file is closed (or removed)
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    start = len(_SHARED_MAGIC)
+    if mapped[:start] != _SHARED_MAGIC:
+        raise AglyphError("%s is not a published data file" % filename)
+    pid_end = mapped.find(b"\n", start)
+    publisher = int(mapped[start:pid_end])
+    if not _is_running(publisher):
+        _log.info(
+            "discarding %s (its publisher, process %d, is not running)",
+            filename, publisher)
+        mapped.close()
+        _unpublish_shared_data(filename, (stat.st_dev, stat.st_ino))
+        return None
+    start = pid_end + 1
+    format_end = mapped.find(b"\n", start)
+    shape_end = mapped.find(b"\n", format_end + 1)
+    data_format = mapped[start:format_end].decode("ascii")
+    shape = tuple(
+        int(n) for n in mapped[format_end + 1:shape_end].split(b",") if n)
+    offset = shape_end + 1
+    offset += -offset % _SHARED_ALIGNMENT
+
+    data = memoryview(mapped)[offset:]
+    #PYVER: memoryview.cast is not available in Python 2
+    if hasattr(data, "cast") and (data_format, shape) != ("B", (len(data),)):
+        try:
+            data = data.cast(data_format, shape)
+        except (TypeError, ValueError) as e:
+            _log.warning(
+                "using unsigned bytes view of %s (cannot cast to %r %r: %s)",
+                filename, data_format, shape, e)
+    return data
+
+
+def _unpublish_shared_data(filename, identity):
+    """Remove the published data file *filename*, but only if it is
+    still the file that was published by this process.
+
+    :arg str filename: the published data file name
+    :arg tuple identity: the ``(st_dev, st_ino)`` of the published file
+
+    """
+    published = _published_files.get(filename)
+    if published is not None and published[0] == identity:
+        _published_files.pop(filename, None)
+    try:
+        stat = os.stat(filename)
+        if (stat.st_dev, stat.st_ino) == identity:
+            os.remove(filename)
+    except OSError as e:
+        _log.warning("unable to remove published data %s: %s", filename, e)
+
+
+def _unpublish_at_exit():
+    """Remove the data files published by this process (which no other
+    process can attach once this process exits).
+
+    """
+    pid = os.getpid()
+    for (filename, (identity, publisher)) in list(_published_files.items()):
+        # a forked child does not own the data published by its parent
+        if publisher == pid:
+            _unpublish_shared_data(filename, identity)
+
+
+atexit.register(_unpublish_at_exit)
+
+#: Identifies (and versions) the format of snapshot files.
+_SNAPSHOT_MAGIC = b"AGLYPH-SNAPSHOT-1\n"
+
+
+def _describe_value(value_spec):
+    """Return a stable text description of an argument, keyword or
+    attribute value of a component definition.
+
+    :arg value_spec: the value as it appears in the definition
+
+    :class:`aglyph.component.Reference`, :class:`aglyph.component.Evaluator`
+    and :func:`functools.partial` values are described without being
+    resolved, so that a snapshot can be validated without assembling
+    any dependencies.
+
+    """
+    if isinstance(value_spec, Reference):
+        return "Reference(%r)" % TextType(value_spec)
+    elif isinstance(value_spec, (Evaluator, partial)):
+        (factory, args, keywords) = (
+            (value_spec.factory, value_spec.args, value_spec.keywords)
+            if isinstance(value_spec, Evaluator) else
+            (value_spec.func, value_spec.args, value_spec.keywords or {}))
+        try:
+            factory = format_dotted_name(factory)
+        except Exception:
+            factory = repr(factory)
+        return "%s(%s, %s, %s)" % (
+            name_of(value_spec.__class__), factory, _describe_value(args),
+            _describe_value(keywords))
+    elif isinstance(value_spec, (list, tuple)):
+        return "%s[%s]" % (
+            name_of(value_spec.__class__),
+            ", ".join(_describe_value(value) for value in value_spec))
+    elif isinstance(value_spec, dict):
+        return "%s{%s}" % (
+            name_of(value_spec.__class__),
+            ", ".join(sorted(
+                "%r: %s" % (key, _describe_value(value))
+                for (key, value) in value_spec.items())))
+    else:
+        return repr(value_spec)
+
+
+def _iter_references(value_spec):
+    """Yield the :class:`aglyph.component.Reference` objects in (or
+    nested in) an argument, keyword or attribute value of a component
+    definition.
+
+    :arg value_spec: the value as it appears in the definition
+
+    """
+    if isinstance(value_spec, Reference):
+        yield value_spec
+    elif isinstance(value_spec, (Evaluator, partial)):
+        for value in value_spec.args:
+            for reference in _iter_references(value):
+                yield reference
+        for value in (value_spec.keywords or {}).values():
+            for reference in _iter_references(value):
+                yield reference
+    elif isinstance(value_spec, (list, tuple, set, frozenset)):
+        for value in value_spec:
+            for reference in _iter_references(value):
+                yield reference
+    elif isinstance(value_spec, dict):
+        for item in value_spec.items():
+            for reference in _iter_references(item):
+                yield reference
+
+
+def _describe_definition(definition):
+    """Return a text description of a :class:`aglyph.component.Template`
+    or :class:`aglyph.component.Component` that differs whenever any
+    part of the definition differs.
+
+    :arg definition: a component or template definition
+
+    """
+    return "\0".join([
+        repr(definition),
+        _describe_value(list(definition.args)),
+        _describe_value(dict(definition.keywords)),
+        _describe_value(list(definition.attributes.items())),
+    ])
+
+
+def _diff_contexts(old_context, new_context):
+    """Return the unique IDs of the definitions that differ between
+    *old_context* and *new_context*.
+
+    :arg aglyph.context.Context old_context: the replaced context
+    :arg aglyph.context.Context new_context: the replacement context
+    :return:
+       the :obj:`set` of added, removed, and changed unique IDs, or
+       ``None`` if the contexts' lifecycle method names differ (in which
+       case every definition is affected)
+
+    """
+    for lifecycle_state in ["after_inject", "before_clear", "after_fork"]:
+        if (getattr(old_context, lifecycle_state) !=
+                getattr(new_context, lifecycle_state)):
+            return None
+    old_definitions = dict(
+        (definition.unique_id, definition)
+        for definition in _iter_definitions(old_context))
+    new_definitions = dict(
+        (definition.unique_id, definition)
+        for definition in _iter_definitions(new_context))
+    return set(
+        unique_id
+        for unique_id in set(old_definitions) | set(new_definitions)
+        if unique_id not in old_definitions or
+            unique_id not in new_definitions or
+            _describe_definition(old_definitions[unique_id]) !=
+                _describe_definition(new_definitions[unique_id]))
+
+
+def _iter_definitions(context):
+    """Yield all component **and** template definitions of *context*
+    (including those inherited by an :class:`aglyph.context.ChildContext`).
+
+    :arg aglyph.context.Context context: a context
+
+    """
+    for unique_id in _iter_unique_ids(context):
+        definition = context.get(unique_id)
+        if definition is not None:
+            yield definition
+
+
+def _iter_unique_ids(context):
+    """Yield the unique IDs of all definitions of *context*."""
+    seen = set()
+    while context is not None:
+        for unique_id in list(context.keys()):
+            if unique_id not in seen:
+                seen.add(unique_id)
+                yield unique_id
+        context = getattr(context, "parent", None)
+
+
+def _reverse_dependencies(contexts):
+    """Return the reverse-dependency index of *contexts*.
+
+    :arg list contexts: the contexts whose dependency graphs are indexed
+    :return:
+       a mapping of unique ID to the :obj:`set` of unique IDs of the
+       definitions that **directly** depend on it
+    :rtype: :obj:`dict`
+
+    """
+    dependents = {}
+    for context in contexts:
+        for definition in _iter_definitions(context):
+            for dependency_id in _iter_dependency_ids(definition):
+                dependents.setdefault(dependency_id, set()).add(
+                    definition.unique_id)
+    return dependents
+
+
+def _context_revisions(context):
+    """Return the revisions of *context* and of each of its ancestor
+    contexts (see :attr:`aglyph.context.Context.revision`).
+
+    """
+    revisions = []
+    while context is not None:
+        revisions.append(context.revision)
+        context = getattr(context, "parent", None)
+    return tuple(revisions)
+
+
+def _eviction_order(unique_ids, dependents):
+    """Return *unique_ids* and the unique IDs of all definitions that
+    depend on them (directly or transitively), ordered so that every
+    dependent comes **before** the definitions on which it depends.
+
+    :arg unique_ids: the unique IDs of the evicted (or changed) definitions
+    :arg dict dependents:
+       the reverse-dependency index (see :func:`_reverse_dependencies`)
+    :rtype: :obj:`list`
+
+    """
+    ordered_ids = []
+    visited = set()
+    for unique_id in sorted(unique_ids):
+        # an iterative post-order walk of the reverse-dependency graph
+        if unique_id in visited:
+            continue
+        visited.add(unique_id)
+        stack = [(unique_id, iter(sorted(dependents.get(unique_id, ()))))]
+        while stack:
+            (current_id, pending) = stack[-1]
+            for dependent_id in pending:
+                if dependent_id not in visited:
+                    visited.add(dependent_id)
+                    stack.append((
+                        dependent_id,
+                        iter(sorted(dependents.get(dependent_id, ())))))
+                    break
+            else:
+                stack.pop()
+                ordered_ids.append(current_id)
+    return ordered_ids
+
+
+@traced
+def _evict_objects(assembler, evictions, context=None):
+    """Evict cached objects from the caches of *assembler*.
+
+    :arg assembler:
+       an :class:`Assembler` or
+       :class:`aglyph.compiler.CompiledAssembler`
+    :arg list evictions:
+       ``(component ID, strategy)`` pairs, in eviction order
+    :keyword aglyph.context.Context context:
+       if specified, replaces the context of *assembler* before the
+       caches are released
+    :return: the IDs of the evicted objects
+    :rtype: :obj:`list`
+
+    The creation lock of every evicted component is held so that an
+    object that is being created concurrently cannot be cached, with a
+    stale dependency, after the eviction. The "before_clear" lifecycle
+    method is called on each evicted object.
+
+    Assembly holds creation locks (and the weakref cache lock, which is
+    the creation lock of every "weakref" component) while dependencies
+    are assembled, so the creation locks are acquired without waiting
+    for any one of them while holding another (see
+    :func:`_acquire_all`). The other cache locks are only held while an
+    entry is removed, as they are by assembly.
+
+    """
+    caches = assembler._caches
+    locks = []
+    for (component_id, strategy) in evictions:
+        cache = caches[strategy]
+        lock = (
+            cache.lock if strategy == "weakref"
+            else cache.lock_for(component_id))
+        if lock not in locks:
+            locks.append(lock)
+    _acquire_all(locks)
+    try:
+        evicted_ids = []
+        for (component_id, strategy) in evictions:
+            with caches[strategy] as cache:
+                obj = cache.pop(component_id, None)
+            if strategy == "weakref" and obj is not None:
+                obj = obj()
+            if obj is None:
+                continue
+            if strategy == "shared":
+                published = assembler._shared_published.pop(
+                    component_id, None)
+                if published is not None:
+                    _unpublish_shared_data(*published)
+            else:
+                assembler._call_lifecycle_method(
+                    "before_clear", obj, component_id)
+            obj = None
+            evicted_ids.append(component_id)
+        if context is not None:
+            assembler._context = context
+        return evicted_ids
+    finally:
+        for lock in reversed(locks):
+            lock.release()
+
+
+def _acquire_all(locks):
+    """Acquire every one of *locks*, never waiting for one while holding
+    any of the others.
+
+    :arg list locks: reentrant locks
+
+    A thread that holds some of *locks* while it waits for another could
+    deadlock with a thread that is assembling a component (which holds
+    creation locks in dependency order). Instead, if any lock is busy,
+    the locks already acquired are released, the busy lock is awaited,
+    and acquisition starts over.
+
+    """
+    while True:
+        for (index, lock) in enumerate(locks):
+            if not lock.acquire(False):
+                break
+        else:
+            return
+        for held in reversed(locks[:index]):
+            held.release()
+        lock.acquire()
+        lock.release()
+
+
+def _iter_dependency_ids(definition):
+    """Yield the unique IDs on which *definition* directly depends (its
+    parent ID and the referents of its references).
+
+    :arg definition: a component or template definition
+
+    """
+    if definition.parent_id is not None:
+        yield definition.parent_id
+    for value in (
+            list(definition.args) + list(definition.keywords.values()) +
+            list(definition.attributes.values())):
+        for reference in _iter_references(value):
+            yield TextType(reference)
+
+
+def _snapshot_key(definition, dotted_name):
+    """Return the key that validates a snapshot.
+
+    :arg str definition:
+       the digest of the component definition (see
+       :meth:`Assembler._describe_snapshot`)
+    :arg str dotted_name: the dotted name of the component
+    :rtype: :obj:`bytes`
+
+    The key changes whenever the definition, the source file of the
+    module that defines the component's factory, or the Python or Aglyph
+    version changes.
+
+    """
+    import hashlib
+    import inspect
+
+    key = hashlib.sha256()
+    for part in [__version__, sys.version, definition]:
+        key.update(part.encode("utf-8"))
+    module = inspect.getmodule(resolve_dotted_name(dotted_name))
+    filename = getattr(module, "__file__", None)
+    if filename is not None:
+        #PYVER: Python 2 module.__file__ may name the compiled file
+        if filename.endswith((".pyc", ".pyo")):
+            filename = filename[:-1]
+        try:
+            with open(filename, "rb") as f:
+                key.update(f.read())
+        except (IOError, OSError):
+            key.update(filename.encode("utf-8"))
+    return key.hexdigest().encode("ascii")
+
+
+def _read_snapshot(filename, key):
+    """Return the object restored from the snapshot *filename*, or
+    ``None`` if there is no valid snapshot.
+
+    :arg str filename: the snapshot file name
+    :arg bytes key: the key of a valid snapshot (see :func:`_snapshot_key`)
+
+    A snapshot with a different key is ignored (it is replaced when a
+    new snapshot is written). A snapshot that cannot be unpickled is
+    removed.
+
+    """
+    import pickle
+
+    try:
+        f = open(filename, "rb")
+    except (IOError, OSError):
+        return None
+    with f:
+        if f.readline() != _SNAPSHOT_MAGIC or f.readline() != key + b"\n":
+            _log.info("ignoring stale snapshot %s", filename)
+            return None
+        try:
+            return pickle.load(f)
+        except Exception as e:
+            _log.warning("removing unusable snapshot %s: %s", filename, e)
+    try:
+        os.remove(filename)
+    except OSError:
+        pass
+    return None
+
+
+def _write_snapshot(filename, key, obj, component_id):
+    """Pickle *obj* to the snapshot *filename*.
+
+    :arg str filename: the snapshot file name
+    :arg bytes key: the key of the snapshot (see :func:`_snapshot_key`)
+    :arg obj: the assembled object of the component
+    :arg str component_id: the component unique ID
+    :return: ``True`` if the snapshot was written, else ``False``
+
+    A failure to pickle or write the snapshot issues a
+    :class:`RuntimeWarning`, but does not affect assembly.
+
+    """
+    import pickle
+
+    try:
+        payload = pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+        _make_private_dir(os.path.dirname(filename))
+        _write_atomically(filename, _SNAPSHOT_MAGIC, key + b"\n", payload)
+    except Exception as e:
+        msg = "unable to snapshot component %r: %s"
+        _log.warning(msg, component_id, e)
+        warnings.warn(msg % (component_id, e), RuntimeWarning)
+        return False
+    return True
+
+
+#: Returned by :meth:`_Prefetcher.take` when no object is ready.
+_EMPTY = object()
+
+
+def _prefetch_statistics(prefetchers):
+    """Return the prefetch statistics of *prefetchers*.
+
+    :arg dict prefetchers: a mapping of component ID to
+       :class:`_Prefetcher`
+    :return:
+       a mapping of each prefetch statistic name (see
+       :attr:`Assembler.statistics`) to a mapping of component ID to
+       value
+    :rtype: :obj:`dict`
+
+    """
+    statistics = {
+        "prefetch_hits": {},
+        "prefetch_misses": {},
+        "prefetch_refills": {},
+        "prefetch_refill_seconds": {},
+    }
+    for (component_id, prefetcher) in prefetchers.items():
+        for (name, value) in prefetcher.counters().items():
+            statistics["prefetch_%s" % name][component_id] = value
+    return statistics
+
+
+def _memory_usage():
+    """Return the memory currently used by this process.
+
+    :return:
+       the memory usage in bytes, or ``None`` if it cannot be measured
+    :rtype: :obj:`int`
+
+    The resident set size is read from */proc/self/statm* where it is
+    available. Otherwise, if :mod:`tracemalloc` is tracing, the total
+    size of the traced memory blocks is returned.
+
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * mmap.PAGESIZE
+    except (EnvironmentError, ValueError, IndexError):
+        pass
+    #PYVER: tracemalloc is not available in Python < 3.4
+    tracemalloc = sys.modules.get("tracemalloc")
+    if tracemalloc is not None and tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[0]
+    return None
+
+
+def _measure_soft(assembler):
+    """Return the memory usage before a soft object of *assembler* is
+    created, or ``None`` if *assembler* has no memory budget.
+
+    :arg assembler:
+       an :class:`Assembler` or
+       :class:`aglyph.compiler.CompiledAssembler`
+
+    """
+    if assembler._memory_budget is None:
+        return None
+    return _memory_usage()
+
+
+def _cache_soft(assembler, component_id, obj, usage):
+    """Cache the soft object *obj* of *component_id*, and then evict
+    other soft objects if *assembler* is over its memory budget.
+
+    :arg assembler:
+       an :class:`Assembler` or
+       :class:`aglyph.compiler.CompiledAssembler`
+    :arg str component_id: the component unique ID
+    :arg obj: the newly created soft object
+    :arg int usage:
+       the memory usage measured by :func:`_measure_soft` before *obj*
+       was created
+
+    The growth in memory usage while *obj* was created is recorded as
+    the (estimated) number of bytes that evicting *obj* will release.
+
+    .. note::
+       The caller holds the creation lock of *component_id*.
+
+    """
+    cost = 0
+    if usage is not None:
+        cost = max((_memory_usage() or usage) - usage, 0)
+    cache = assembler._caches["soft"]
+    with cache:
+        cache[component_id] = obj
+        assembler._soft_costs[component_id] = cost
+    assembler._soft_used[component_id] = next(assembler._soft_clock)
+    _trim_soft(assembler, keep=component_id)
+
+
+def _trim_soft(assembler, keep=None):
+    """Evict the least recently used soft objects of *assembler* until
+    its memory usage is (estimated to be) within its memory budget.
+
+    :arg assembler:
+       an :class:`Assembler` or
+       :class:`aglyph.compiler.CompiledAssembler`
+    :keyword str keep:
+       the ID of a soft component whose object must not be evicted
+    :return: the IDs of the evicted soft objects
+    :rtype: :obj:`list`
+
+    Soft objects are evicted (and their "before_clear" lifecycle
+    methods called) until the sum of their recorded costs covers the
+    excess memory usage. A soft object whose creation lock is held by
+    another thread is skipped instead of waited for, because the caller
+    may itself hold the creation locks of the components being
+    assembled.
+
+    """
+    budget = assembler._memory_budget
+    if budget is None:
+        return []
+    usage = _memory_usage()
+    if usage is None or usage <= budget:
+        return []
+    excess = usage - budget
+    cache = assembler._caches["soft"]
+    used = assembler._soft_used
+    with cache:
+        candidates = sorted(
+            (component_id for component_id in cache if component_id != keep),
+            key=lambda component_id: used.get(component_id, -1))
+    evicted_ids = []
+    for component_id in candidates:
+        if excess <= 0:
+            break
+        lock = cache.lock_for(component_id)
+        if not lock.acquire(False):
+            continue
+        try:
+            with cache:
+                obj = cache.pop(component_id, None)
+                cost = assembler._soft_costs.pop(component_id, 0)
+                if obj is not None:
+                    evictions = assembler._soft_evictions
+                    evictions[component_id] = (
+                        evictions.get(component_id, 0) + 1)
+            if obj is None:
+                continue
+            assembler._call_lifecycle_method(
+                "before_clear", obj, component_id)
+            obj = None
+        finally:
+            lock.release()
+        excess -= cost
+        evicted_ids.append(component_id)
+    _log.info(
+        "memory usage %d exceeds budget %d; evicted soft objects %r",
+        usage, budget, evicted_ids)
+    return evicted_ids
+
+
+def _soft_statistics(assembler):
+    """Return the memory budget statistics of *assembler*.
+
+    :arg assembler:
+       an :class:`Assembler` or
+       :class:`aglyph.compiler.CompiledAssembler`
+    :return:
+       a mapping of each memory budget statistic name (see
+       :attr:`Assembler.statistics`) to its value
+    :rtype: :obj:`dict`
+
+    """
+    with assembler._caches["soft"]:
+        soft_evictions = dict(assembler._soft_evictions)
+    return {
+        "memory_budget": assembler._memory_budget,
+        "memory_usage": _memory_usage(),
+        "soft_evictions": soft_evictions,
+    }
+
+
+def _wait_timeout(timeout):
+    """Return the number of seconds that the current thread may wait
+    for a creation lock.
+
+    :arg float timeout:
+       the component's own timeout (see
+       :attr:`aglyph.component.Component.timeout`), or ``None``
+    :return:
+       the lesser of *timeout* and the time remaining until the
+       deadline of the current assembly (see :meth:`Assembler.assemble`),
+       or ``None`` if neither applies
+    :rtype: :obj:`float`
+
+    """
+    assembly = _assembly_state.get()
+    deadline = assembly.deadline if assembly is not None else None
+    if deadline is None:
+        return timeout
+    remaining = max(deadline - perf_counter(), 0.0)
+    return remaining if timeout is None else min(remaining, timeout)
+
+
+def _acquire(lock, timeout):
+    """Acquire *lock*, waiting at most *timeout* seconds.
+
+    :arg lock: a :func:`threading.Lock` or :func:`threading.RLock`
+    :arg float timeout: the maximum number of seconds to wait
+    :return: whether or not *lock* was acquired
+    :rtype: :obj:`bool`
+
+    """
+    #PYVER: Lock.acquire does not accept a timeout in Python 2
+    if is_python_3:
+        return lock.acquire(timeout=timeout)
+    deadline = perf_counter() + timeout
+    delay = 0.0005
+    while not lock.acquire(False):
+        remaining = deadline - perf_counter()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, 0.05)
+    return True
+
+
+@contextmanager
+def _creating(assembler, lock, component_id, timeout):
+    """Hold the creation *lock* of *component_id* for the body of the
+    ``with`` statement, recording the current thread as the owner of
+    the construction.
+
+    :arg assembler:
+       an :class:`Assembler` or
+       :class:`aglyph.compiler.CompiledAssembler`
+    :arg lock: the lock that guards the creation of *component_id*
+    :arg str component_id: the component unique ID
+    :arg float timeout:
+       the component's own timeout (see
+       :attr:`aglyph.component.Component.timeout`), or ``None``
+    :raise aglyph.AglyphError:
+       if *lock* cannot be acquired before the timeout (or the deadline
+       of the current assembly) expires, or if waiting for it would
+       deadlock
+
+    """
+    if not lock.acquire(False):
+        _wait_for_creation(
+            assembler, lock, component_id, _wait_timeout(timeout))
+    constructing = assembler._constructing
+    owned = component_id not in constructing
+    if owned:
+        current = threading_.current_thread()
+        constructing[component_id] = (
+            lock, current.name, current.ident, perf_counter())
+    try:
+        yield
+    finally:
+        if owned:
+            constructing.pop(component_id, None)
+        lock.release()
+
+
+#: The number of seconds between checks for a deadlock while a thread
+#: waits for a creation lock.
+_DEADLOCK_CHECK_INTERVAL = 0.05
+
+
+def _wait_for_creation(assembler, lock, component_id, timeout):
+    """Acquire the creation *lock* of *component_id*, which is held by
+    another thread.
+
+    :arg assembler:
+       an :class:`Assembler` or
+       :class:`aglyph.compiler.CompiledAssembler`
+    :arg lock: the lock that guards the creation of *component_id*
+    :arg str component_id: the component unique ID
+    :arg float timeout:
+       the maximum number of seconds to wait, or ``None`` to wait for
+       as long as the lock is held
+    :raise aglyph.AglyphError:
+       if waiting for *lock* would deadlock, or if it cannot be acquired
+       before *timeout* expires
+
+    Each creation lock is held while the dependencies of its component
+    are assembled. If two threads begin assembling different members of
+    the same circular dependency, each would wait forever for the lock
+    held by the other; the wait is therefore checked (repeatedly, since
+    the other threads are still running) for a cycle of waiting threads,
+    which is reported as a circular dependency.
+
+    """
+    ident = threading_.current_thread().ident
+    waiting = assembler._waiting
+    waiting[ident] = (lock, component_id)
+    try:
+        deadline = None if timeout is None else perf_counter() + timeout
+        while True:
+            cycle = _find_wait_cycle(assembler, lock, ident)
+            if cycle is not None:
+                raise AglyphError(
+                    "circular dependency detected: %s (assembled by "
+                        "several threads)" % " > ".join(cycle[-1:] + cycle))
+            interval = _DEADLOCK_CHECK_INTERVAL
+            if deadline is not None:
+                remaining = deadline - perf_counter()
+                if remaining <= 0:
+                    raise AglyphError(_describe_wait(
+                        assembler._constructing, lock, component_id,
+                        timeout))
+                interval = min(interval, remaining)
+            if _acquire(lock, interval):
+                return
+    finally:
+        waiting.pop(ident, None)
+
+
+def _find_wait_cycle(assembler, lock, ident):
+    """Return the IDs of the components whose creation locks form a
+    cycle of threads that wait for one another, beginning with the
+    owner of *lock*.
+
+    :arg assembler:
+       an :class:`Assembler` or
+       :class:`aglyph.compiler.CompiledAssembler`
+    :arg lock: the creation lock that the current thread waits for
+    :arg ident: the ID of the current thread
+    :return:
+       the component IDs, or ``None`` if waiting for *lock* cannot
+       deadlock
+    :rtype: :obj:`list`
+
+    """
+    constructing = list(assembler._constructing.items())
+    waiting = assembler._waiting
+    cycle = []
+    visited = set()
+    while True:
+        owner = None
+        for (owner_id, (owner_lock, _, owner_ident, _)) in constructing:
+            if owner_lock is lock:
+                owner = owner_ident
+                cycle.append(owner_id)
+                break
+        if owner is None or owner in visited:
+            return None
+        if owner == ident:
+            return cycle
+        visited.add(owner)
+        owner_wait = waiting.get(owner)
+        if owner_wait is None:
+            return None
+        lock = owner_wait[0]
+
+
+def _assemble_within(timeout, assemble, component_id):
+    """Call *assemble* for *component_id*, bounding every wait for a
+    creation lock to (at most) *timeout* seconds from now.
+
+    :arg float timeout: the maximum number of seconds to wait
+    :arg assemble: a callable that assembles *component_id*
+    :arg str component_id: the component unique ID
+    :return: the assembled object
+
+    The deadline applies to the nested assembly of dependencies, too. An
+    enclosing assembly's (earlier) deadline is never extended.
+
+    """
+    assembly = _current_assembly()
+    outer = assembly.deadline
+    deadline = perf_counter() + timeout
+    if outer is not None and outer < deadline:
+        deadline = outer
+    assembly.deadline = deadline
+    try:
+        return assemble(component_id)
+    finally:
+        assembly.deadline = outer
+        _release_assembly(assembly)
+
+
+def _describe_wait(constructing, lock, component_id, timeout):
+    """Return the message of the error raised when a creation lock of
+    *component_id* could not be acquired.
+
+    :arg dict constructing: the constructions in progress
+    :arg lock: the lock that could not be acquired
+    :arg str component_id: the component unique ID
+    :arg float timeout: the number of seconds waited
+
+    """
+    for (owner_id, construction) in list(constructing.items()):
+        (owner_lock, thread_name, _, started) = construction
+        if owner_lock is lock:
+            return (
+                "timed out after %.3fs waiting to assemble component %r "
+                    "(thread %r has been constructing component %r for "
+                    "%.3fs)" % (
+                        timeout, component_id, thread_name, owner_id,
+                        perf_counter() - started))
+    return (
+        "timed out after %.3fs waiting to assemble component %r (the "
+            "lock is not held by a construction)" % (timeout, component_id))
+
+
+def _dump_constructions(constructing):
+    """Return a report of the constructions in progress.
+
+    :arg dict constructing: the constructions in progress
+    :rtype: :obj:`str`
+
+    """
+    frames = sys._current_frames()
+    now = perf_counter()
+    lines = []
+    for (component_id, construction) in sorted(
+            list(constructing.items()), key=lambda item: item[1][3]):
+        (_, thread_name, ident, started) = construction
+        lines.append(
+            "component %r: constructed by thread %r for %.3fs" %
+                (component_id, thread_name, now - started))
+        frame = frames.get(ident)
+        if frame is not None:
+            lines.extend(
+                "    " + line
+                for entry in traceback.format_stack(frame)
+                for line in entry.rstrip().split("\n"))
+    return "\n".join(lines)
+
+
+def _executor(assembler):
+    """Return the thread pool that assembles references concurrently
+    for *assembler* (creating it when first needed).
+
+    :arg assembler:
+       an :class:`Assembler` or
+       :class:`aglyph.compiler.CompiledAssembler`
+    :return:
+       a :class:`concurrent.futures.ThreadPoolExecutor`, or ``None`` if
+       threads (or :mod:`concurrent.futures`) are not available
+
+    """
+    executor = assembler._executor
+    if executor is None and futures_ is not None and _has_threading:
+        with assembler._executor_lock:
+            executor = assembler._executor
+            if executor is None:
+                try:
+                    executor = futures_.ThreadPoolExecutor(
+                        assembler._max_workers,
+                        thread_name_prefix="aglyph-parallel")
+                except TypeError:
+                    #PYVER: thread_name_prefix is not accepted in Python < 3.6
+                    executor = futures_.ThreadPoolExecutor(
+                        assembler._max_workers)
+                assembler._executor = executor
+    return executor
+
+
+def _holds_weakref_lock(assembler):
+    """Tell whether or not the current thread is constructing a
+    "weakref" component object of *assembler*.
+
+    The weakref cache lock guards the construction of **every** weakref
+    object, so the threads of the pool could not assemble a weakref
+    reference while the current thread holds it.
+
+    """
+    lock = assembler._caches["weakref"].lock
+    ident = threading_.current_thread().ident
+    return any(
+        owner_lock is lock and owner_ident == ident
+        for (owner_lock, _, owner_ident, _) in list(
+            assembler._constructing.values()))
+
+
+def _resolve_pooled(resolve, component_stack, deadline, graph):
+    """Call *resolve* in a thread of the pool, on behalf of a thread
+    whose assembly stack is *component_stack*, whose assembly deadline
+    is *deadline*, and whose "graph" component objects are *graph*.
+
+    """
+    _assembly_state.set(
+        _Assembly(
+            component_stack, deadline=deadline, pooled=True, graph=graph))
+    try:
+        return resolve()
+    finally:
+        _assembly_state.set(None)
+
+
+def _outcome(resolve):
+    """Call *resolve* and return the 2-tuple ``(value, error)``."""
+    try:
+        return (resolve(), None)
+    except Exception as e:
+        return (None, e)
+
+
+def _resolve_concurrently(assembler, resolvers):
+    """Call each of *resolvers* concurrently and return their results.
+
+    :arg assembler:
+       an :class:`Assembler` or
+       :class:`aglyph.compiler.CompiledAssembler`
+    :arg list resolvers:
+       the callables (taking no arguments) that assemble each reference
+    :return:
+       the results of *resolvers*, in the same order
+    :rtype:
+       :obj:`list`
+
+    Every resolver is called with the assembly stack (so that circular
+    dependencies are still detected), the :meth:`Assembler.assemble`
+    deadline, and the "graph" component objects of the calling thread.
+    The first resolver is called by the calling thread itself, as is
+    any other resolver that no thread of the pool has started by the
+    time the calling thread gets to it, so assembly always makes
+    progress even when the pool is busy.
+
+    The resolvers are called one at a time, in order, by the calling
+    thread if it is itself a thread of the pool (nested fan-out could
+    exhaust the pool), if it is constructing a "weakref" object, or if
+    no thread pool is available.
+
+    Every resolver has finished when this function returns or raises.
+    If any resolver raises an exception, the exception of the first
+    one (in order) is raised.
+
+    """
+    assembly = _assembly_state.get()
+    if assembly is None:
+        assembly = _Assembly()
+    executor = None
+    if (len(resolvers) > 1 and not assembly.pooled and
+            not _holds_weakref_lock(assembler)):
+        executor = _executor(assembler)
+    if executor is None:
+        return [resolve() for resolve in resolvers]
+
+    component_stack = list(assembly.component_stack)
+    deadline = assembly.deadline
+    # shared (not copied) so that every thread sees the same graph objects
+    graph = assembly.graph
+    if graph is None:
+        graph = assembly.graph = _ReentrantMutexCache()
+    futures = [
+        executor.submit(
+            _resolve_pooled, resolve, component_stack, deadline, graph)
+        for resolve in resolvers[1:]]
+    outcomes = [_outcome(resolvers[0])]
+    for (resolve, future) in zip(resolvers[1:], futures):
+        # a resolver that has not started yet is called right here
+        outcomes.append(
+            _outcome(resolve if future.cancel() else future.result))
+    for (_, error) in outcomes:
+        if error is not None:
+            raise error
+    return [value for (value, _) in outcomes]
 
 
 @traced
@@ -87,37 +1643,306 @@ class Assembler(object):
 
     """
 
-    def __init__(self, context):
+    def __init__(
+            self, context, shared_dir=None, snapshot_dir=None, parent=None,
+            memory_budget=None, parallel=False, max_workers=None):
         """
         :arg aglyph.context.Context context:
            a context object mapping unique IDs to component and template
            definitions
+        :keyword str shared_dir:
+           the directory to which the data of "shared" components is
+           published (by default, an *aglyph-shared-<user>* directory
+           in the system temporary directory); it must be private to the
+           current user, and is created that way if it does not exist
+        :keyword str snapshot_dir:
+           the directory in which the objects of snapshot components
+           are persisted (by default, snapshots are disabled)
+        :keyword aglyph.assembler.Assembler parent:
+           the assembler for the parent of *context*, which must be an
+           :class:`aglyph.context.ChildContext`
+        :keyword int memory_budget:
+           the process memory usage, in bytes, above which cached
+           "soft" component objects are evicted (by default, soft
+           objects are never evicted for memory pressure)
+        :keyword bool parallel:
+           whether the referenced initialization arguments of **every**
+           component are assembled concurrently (by default, only those
+           of :attr:`aglyph.component.Component.parallel` components)
+        :keyword int max_workers:
+           the maximum number of threads that assemble references
+           concurrently (by default, the
+           :class:`concurrent.futures.ThreadPoolExecutor` default)
+        :raise aglyph.AglyphError:
+           if *parent* is not the assembler for the parent of *context*
+        :raise ValueError:
+           if *memory_budget* or *max_workers* is not a positive number
+
+        .. versionadded:: 3.1.0
+           the *shared_dir*, *snapshot_dir*, *parent*, *memory_budget*,
+           *parallel*, and *max_workers* keywords
+
+        An assembler with a *parent* delegates the assembly of an
+        inherited component (one that is not overridden by *context*)
+        to the *parent* assembler, **unless** the component depends
+        (directly or transitively) on a definition that *context*
+        overrides. Singleton, borg, and weakref objects of inherited
+        components are therefore shared by all child assemblers of the
+        same parent, while the objects of overridden components (and of
+        the components that depend on them) are cached by each child::
+
+           base_assembler = Assembler(base)
+           tenant_assembler = Assembler(
+               ChildContext("tenant-a", base), parent=base_assembler)
+
+        Whether a component is delegated is determined once and then
+        memoized.
+
+        Memory usage is the resident set size of the process (read from
+        */proc/self/statm*), or, where that is not available, the size
+        of the memory traced by :mod:`tracemalloc` (if tracing has been
+        started). If memory usage cannot be measured, *memory_budget*
+        is not enforced.
+
+        References are assembled concurrently by a thread pool that is
+        created when first needed. If :mod:`concurrent.futures` is not
+        available, references are always assembled sequentially.
+
+        .. note::
+           Processes share the data of a "shared" component only if
+           their assemblers use the same *shared_dir* and contexts with
+           the same :attr:`aglyph.context.Context.context_id`.
 
         """
         #PYVER: arguments to super() are implicit in Python 3
         super(Assembler, self).__init__()
+        if parent is not None and getattr(
+                context, "parent", None) is not parent._context:
+            raise AglyphError(
+                "%s is not the assembler for the parent of %s" %
+                    (parent, context))
+        if memory_budget is not None and memory_budget <= 0:
+            raise ValueError(
+                "memory budget must be positive (not %r)" % memory_budget)
+        if max_workers is not None and max_workers <= 0:
+            raise ValueError(
+                "max workers must be positive (not %r)" % max_workers)
         self._context = context
+        self._shared_dir = shared_dir
+        self._snapshot_dir = snapshot_dir
+        self._parent = parent
+        # {component ID: whether assembly is delegated to the parent}
+        self._delegated = {}
+        # the child assemblers that delegate to this assembler (so that
+        # evict can cascade into them)
+        self._children = weakref.WeakSet()
+        if parent is not None:
+            parent._children.add(self)
+        # (context revisions, reverse-dependency index) (built when first
+        # needed by evict, and rebuilt when the context changes)
+        self._dependents = None
+        # {component ID: _Prefetcher} (replaced, never modified, so that
+        # assemble can read it without locking)
+        self._prefetchers = {}
         self._caches = {
             "singleton": _ReentrantMutexCache(),
             "borg": _ReentrantMutexCache(),
             "weakref": _ReentrantMutexCache(),
+            "shared": _ReentrantMutexCache(),
+            "clone": _ReentrantMutexCache(),
+            "soft": _ReentrantMutexCache(),
         }
+        # {component ID: (filename, identity)} of data published here
+        self._shared_published = {}
+        self._memory_budget = memory_budget
+        # {component ID: estimated bytes released by evicting the object}
+        self._soft_costs = {}
+        # {component ID: tick of the last assembly} (for LRU eviction)
+        self._soft_used = {}
+        self._soft_clock = count()
+        # {component ID: number of evictions due to memory pressure}
+        self._soft_evictions = {}
+        # {component ID: [construction count, total construction seconds]}
+        self._constructions = _StripedCounters()
+        # {component ID: [snapshot hits, snapshot misses]}
+        self._snapshots = {}
+        self._snapshots_lock = threading_.Lock()
+        self._failures = _FailureCache()
+        # {component ID: (lock, thread name, thread ID, start time)} of the
+        # constructions in progress
+        self._constructing = {}
+        # {thread ID: (lock, component ID)} of the threads waiting for
+        # creation locks (see _wait_for_creation)
+        self._waiting = {}
+        self._parallel = bool(parallel)
+        self._max_workers = max_workers
+        # the thread pool that assembles references concurrently (created
+        # when first needed)
+        self._executor = None
+        self._executor_lock = threading_.Lock()
+        self._pid = os.getpid()
+        _assemblers.add(self)
+        if memory_budget is not None and _memory_usage() is None:
+            self.__log.warning(
+                "memory usage cannot be measured; memory budget of %s "
+                    "will NOT be enforced", self)
+        if parallel and futures_ is None:
+            self.__log.warning(
+                "concurrent.futures is not available; %s will assemble "
+                    "references sequentially", self)
         self.__log.info("initialized %s", self)
 
-    def assemble(self, component_spec):
+    @property
+    def memory_budget(self):
+        """The process memory usage, in bytes, above which cached
+        "soft" component objects are evicted *(read-only)*.
+
+        .. versionadded:: 3.1.0
+
+        """
+        return self._memory_budget
+
+    @property
+    def parallel(self):
+        """Whether or not the referenced initialization arguments of
+        every component are assembled concurrently *(read-only)*.
+
+        .. versionadded:: 3.1.0
+
+        .. seealso:: :attr:`aglyph.component.Component.parallel`
+
+        """
+        return self._parallel
+
+    @property
+    def statistics(self):
+        """A snapshot of the assembly statistics *(read-only)*.
+
+        :rtype: :obj:`dict`
+
+        The statistics are:
+
+        constructions
+           a mapping of component ID to the number of objects that have
+           been constructed (i.e. initialized, as opposed to retrieved
+           from cache) for the component
+        construction_seconds
+           a mapping of component ID to the total time spent calling the
+           component's initializer (which does **not** include the time
+           spent assembling its dependencies)
+        cache_sizes
+           a mapping of "singleton", "borg", "weakref", "shared",
+           "clone", and "soft" to the number of objects (or clone
+           masters) currently cached for that strategy
+        snapshot_hits
+           a mapping of component ID to the number of times the
+           component's object was restored from a snapshot
+        snapshot_misses
+           a mapping of component ID to the number of times the
+           component had no valid snapshot (and so was created)
+        prefetch_hits
+           a mapping of component ID to the number of objects that were
+           taken from the component's prefetch queue
+        prefetch_misses
+           a mapping of component ID to the number of times the
+           component's prefetch queue was empty (and so an object was
+           created by the caller)
+        prefetch_refills
+           a mapping of component ID to the number of objects that
+           have been created by the component's prefetch thread
+        prefetch_refill_seconds
+           a mapping of component ID to the total time the component's
+           prefetch thread has spent creating objects
+        memory_budget
+           the assembler's *memory_budget* (or ``None``)
+        memory_usage
+           the current memory usage of the process in bytes (or
+           ``None`` if it cannot be measured)
+        soft_evictions
+           a mapping of component ID to the number of times the
+           component's soft object was evicted because memory usage
+           exceeded the memory budget
+        backoff_states
+           a mapping of the ID of each component that has failed to
+           initialize (see :attr:`aglyph.component.Component.backoff`)
+           to "open" (assembly fails fast), "half-open" (the backoff
+           has expired and the next assembly will try again), or
+           "closed" (the component has since initialized successfully)
+        backoff_failures
+           a mapping of component ID to the number of times the
+           component's initializer failed
+        backoff_rejections
+           a mapping of component ID to the number of assemblies that
+           failed fast during a backoff
+
+        .. versionadded:: 3.1.0
+
+        """
+        totals = self._constructions.totals()
+        constructions = dict(
+            (component_id, stats[0])
+            for (component_id, stats) in totals.items())
+        construction_seconds = dict(
+            (component_id, stats[1])
+            for (component_id, stats) in totals.items())
+        with self._snapshots_lock:
+            snapshot_hits = dict(
+                (component_id, stats[0])
+                for (component_id, stats) in self._snapshots.items())
+            snapshot_misses = dict(
+                (component_id, stats[1])
+                for (component_id, stats) in self._snapshots.items())
+        statistics = {
+            "constructions": constructions,
+            "construction_seconds": construction_seconds,
+            "snapshot_hits": snapshot_hits,
+            "snapshot_misses": snapshot_misses,
+            "cache_sizes": dict(
+                (strategy, len(cache))
+                for (strategy, cache) in self._caches.items()),
+        }
+        statistics.update(_prefetch_statistics(self._prefetchers))
+        statistics.update(_soft_statistics(self))
+        statistics.update(self._failures.statistics())
+        return statistics
+
+    def dump_constructions(self):
+        """Return a report of the component objects that are currently
+        being constructed, e.g. to diagnose a construction that hangs.
+
+        :rtype: :obj:`str`
+
+        .. versionadded:: 3.1.0
+
+        The report lists, oldest first, each component whose object is
+        being created (while its creation lock is held), the name of the
+        thread that is creating it, how long it has been doing so, and
+        that thread's current stack. The report is empty if no object is
+        being constructed.
+
+        """
+        return _dump_constructions(self._constructing)
+
+    def assemble(self, component_spec, timeout=None):
         """Create an object identified by *component_spec* and inject
         its dependencies.
 
         :arg component_spec:
            a unique component ID, or an object whose dotted name is a
            unique component ID
+        :keyword float timeout:
+           the maximum number of seconds to wait for objects (of
+           *component_spec* or of any of its dependencies) that are
+           being constructed by other threads
         :return:
            a complete object with all of its resolved dependencies
         :raise KeyError:
            if *component_spec* does not identify a component in this
            assembler's context
         :raise aglyph.AglyphError:
-           if *component_spec* causes a circular dependency
+           if *component_spec* causes a circular dependency, or if
+           *timeout* (or a component's
+           :attr:`aglyph.component.Component.timeout`) expires
 
         If *component_spec* is a string, it is assumed to be a unique
         component ID and is used as-is. Otherwise,
@@ -199,6 +2024,66 @@ class Assembler(object):
               Please refer to the :mod:`weakref` module for a detailed
               explanation of weak reference behavior.
 
+        .. versionadded:: 3.1.0
+           support for the "shared" assembly strategy
+
+        **"shared"**
+           If the component has been assembled already in this process
+           (and there has been no intervening call to
+           :meth:`clear_singletons`), the cached view is returned.
+
+           Otherwise, if another process has already published the
+           component's data, the published data is memory-mapped and a
+           read-only :obj:`memoryview` of it is cached and returned.
+
+           Otherwise, a new object (which must support the buffer
+           protocol) is created, initialized, and wired; it is published
+           for other processes; and a read-only view of the published
+           data is cached and returned.
+
+        .. versionadded:: 3.1.0
+           support for the "clone" assembly strategy
+
+        **"clone"**
+           If the component's master object has not been assembled
+           already (or there has been an intervening call to
+           :meth:`clear_clones`), a new master object is created,
+           initialized, wired, and cached.
+
+           A new copy of the master object is then made (by
+           :func:`copy.copy`, or by :func:`copy.deepcopy` if the
+           component's :attr:`aglyph.component.Component.deep_clone` is
+           true), its "after_clone" method is called, and the copy is
+           returned.
+
+        .. versionadded:: 3.1.0
+           support for the "soft" assembly strategy
+
+        **"soft"**
+           A "singleton" whose cached object may be evicted when the
+           process uses more memory than the assembler's
+           *memory_budget*.
+
+           If the component's object is cached, it is returned (and
+           becomes the most recently used soft object). Otherwise, a new
+           object is created, initialized, wired, and cached; then, if
+           memory usage exceeds the budget, the least recently used
+           soft objects are evicted (see :meth:`enforce_memory_budget`).
+
+        .. versionadded:: 3.1.0
+           support for the "graph" assembly strategy
+
+        **"graph"**
+           A "prototype" that is shared within one assembly.
+
+           If the component has been assembled already during the
+           outermost :meth:`assemble` call of the current thread (or
+           task), that same object is returned. Otherwise, a new object
+           is created, initialized, and wired, and it is returned for
+           every other reference to the component until the outermost
+           assembly completes. Graph objects are never cached beyond
+           that.
+
         .. versionadded:: 2.0.0
            **Either** :attr:`aglyph.component.Component.factory_name`
            **or** :attr:`aglyph.component.Component.member_name` may be
@@ -206,34 +2091,264 @@ class Assembler(object):
            is created and initialized. Refer to the linked documentation
            for details.
 
+        .. versionadded:: 3.1.0
+           If prefetching is enabled for a "prototype" component (see
+           :meth:`enable_prefetch`), a pre-assembled object is taken
+           from the component's prefetch queue if one is ready (but
+           only by an outermost :meth:`assemble` call, because the
+           prefetched object's own references were resolved in a
+           different assembly).
+
+        .. versionadded:: 3.1.0
+           the *timeout* keyword
+
+        A cached component whose object is being constructed by another
+        thread cannot be assembled until that construction completes.
+        If *timeout* is specified, the whole assembly (including any
+        nested assembly of dependencies) waits for such constructions
+        until *timeout* seconds from now, at most; a component's own
+        :attr:`aglyph.component.Component.timeout` bounds each wait for
+        that component. When a wait expires, an
+        :exc:`aglyph.AglyphError` naming the component, and the thread
+        that owns the construction, is raised (see also
+        :meth:`dump_constructions`). Constructions by the calling thread
+        itself are never interrupted.
+
         .. note::
            This method is called recursively to assemble any dependency
            of *component_spec* that is defined as a
            :class:`aglyph.component.Reference`.
 
         """
+        if not _at_fork_registered and self._pid != os.getpid():
+            self.after_fork()
         component_id = _identify(component_spec)
+        # a prefetched object was assembled (with its own graph objects)
+        # outside of any assembly in progress
+        if self._prefetchers and not _assembling():
+            prefetcher = self._prefetchers.get(component_id)
+            if prefetcher is not None:
+                obj = prefetcher.take()
+                if obj is not _EMPTY:
+                    self.__log.info("assembled %r (prefetched)", component_id)
+                    return obj
+        if timeout is not None:
+            return _assemble_within(timeout, self._assemble, component_id)
+        return self._assemble(component_id)
+
+    def _assemble(self, component_id):
+        """Create an object of *component_id* and inject its
+        dependencies, bypassing any prefetch queue.
+
+        :arg str component_id: a component unique ID
+
+        .. seealso:: :meth:`assemble`
+
+        """
+        if self._parent is not None and self._delegates(component_id):
+            return self._parent.assemble(component_id)
         component = self._context.get_component(component_id)
         if component is None:
             raise KeyError(
                 "component %r is not defined in %s" %
                     (component_id, self._context))
-        # issues/3: check for circular dependency
-        if not hasattr(_assembly, "component_stack"):
-            _assembly.component_stack = []
-        if (component_id in _assembly.component_stack):
-            raise AglyphError(
-                "circular dependency detected: %s" %
-                    " > ".join(_assembly.component_stack + [component_id]))
-        _assembly.component_stack.append(component_id)
+        assembly = _push_assembly(component_id)
         self.__log.debug(
-            "current assembly stack: %r", _assembly.component_stack)
+            "current assembly stack: %r", assembly.component_stack)
         try:
             obj = self._create(component)
             self.__log.info("assembled %r", component_id)
             return obj
         finally:
-            _assembly.component_stack.pop()
+            _pop_assembly(assembly)
+
+    def assemble_many(self, component_spec, count):
+        """Create *count* objects identified by *component_spec*.
+
+        :arg component_spec:
+           a unique component ID, or an object whose dotted name is a
+           unique component ID
+        :arg int count:
+           the number of objects to create
+        :return:
+           the *count* assembled objects
+        :rtype:
+           :obj:`list`
+        :raise KeyError:
+           if *component_spec* does not identify a component in this
+           assembler's context
+        :raise aglyph.AglyphError:
+           if *component_spec* causes a circular dependency
+
+        This is equivalent to (but, for a "prototype" component, faster
+        than) calling :meth:`assemble` *count* times.
+
+        .. versionadded:: 3.1.0
+
+        .. seealso:: :meth:`iter_assemble`
+
+        """
+        return list(self.iter_assemble(component_spec, count))
+
+    def iter_assemble(self, component_spec, count=None):
+        """Return an iterator over objects identified by
+        *component_spec*.
+
+        :arg component_spec:
+           a unique component ID, or an object whose dotted name is a
+           unique component ID
+        :keyword int count:
+           the number of objects to create (by default, objects are
+           created for as long as the iterator is advanced)
+        :return:
+           an iterator that assembles an object each time it is advanced
+        :raise KeyError:
+           if *component_spec* does not identify a component in this
+           assembler's context
+        :raise aglyph.AglyphError:
+           if *component_spec* causes a circular dependency
+
+        For a "prototype" component, the assembly plan is resolved once
+        when this method is called: the component's initializer is
+        resolved, the arguments, keywords, and attributes of its parent
+        chain are collected, and any references to "singleton" or
+        "shared" components are assembled. Each object is then created
+        from the plan, so that only the component's prototype
+        dependencies, :class:`aglyph.component.Evaluator` values, and
+        :func:`functools.partial` values are assembled per object.
+
+        Objects of any other component are assembled by
+        :meth:`assemble`.
+
+        .. versionadded:: 3.1.0
+
+        .. note::
+           Because singleton dependencies are resolved once, objects
+           created after an intervening :meth:`clear_singletons` (or
+           :meth:`evict`) still receive the singleton objects that were
+           cached when the plan was resolved.
+
+           The construction :attr:`statistics` for the component are
+           updated when the iterator is exhausted or closed.
+
+        """
+        if not _at_fork_registered and self._pid != os.getpid():
+            self.after_fork()
+        return self._plan(_identify(component_spec)).iterate(count)
+
+    def assemble_all(self, component_specs):
+        """Create one object for each of *component_specs*.
+
+        :arg component_specs:
+           an iterable of unique component IDs (or objects whose dotted
+           names are unique component IDs)
+        :return:
+           the assembled objects, in the order of *component_specs*
+        :rtype:
+           :obj:`list`
+        :raise KeyError:
+           if any of *component_specs* does not identify a component in
+           this assembler's context
+        :raise aglyph.AglyphError:
+           if any of *component_specs* causes a circular dependency
+
+        The assembly plan of each distinct component is resolved once
+        (as described for :meth:`iter_assemble`), no matter how many
+        times the component appears in *component_specs*.
+
+        .. versionadded:: 3.1.0
+
+        """
+        if not _at_fork_registered and self._pid != os.getpid():
+            self.after_fork()
+        plans = {}
+        objs = []
+        try:
+            for component_spec in component_specs:
+                component_id = _identify(component_spec)
+                plan = plans.get(component_id)
+                if plan is None:
+                    plan = plans[component_id] = self._plan(component_id)
+                objs.append(plan.create())
+        finally:
+            for plan in plans.values():
+                plan.record()
+        return objs
+
+    def _plan(self, component_id):
+        """Return the assembly plan for *component_id*.
+
+        :arg str component_id: a component unique ID
+        :rtype: :class:`_AssemblyPlan`
+        :raise KeyError:
+           if *component_id* is not defined in this assembler's context
+
+        .. versionadded:: 3.1.0
+
+        """
+        if self._parent is not None and self._delegates(component_id):
+            return self._parent._plan(component_id)
+        component = self._context.get_component(component_id)
+        if component is None:
+            raise KeyError(
+                "component %r is not defined in %s" %
+                    (component_id, self._context))
+        return _AssemblyPlan(self, component)
+
+    def _delegates(self, component_id):
+        """Return ``True`` if the assembly of *component_id* is
+        delegated to the parent assembler.
+
+        :arg str component_id: a component unique ID
+
+        .. versionadded:: 3.1.0
+
+        """
+        delegates = self._delegated.get(component_id)
+        if delegates is None:
+            delegates = self._delegated[component_id] = (
+                component_id in self._parent._context and
+                not self._depends_on_override(component_id, set()))
+        return delegates
+
+    def _depends_on_override(self, unique_id, visited):
+        """Return ``True`` if the definition for *unique_id* is
+        overridden by this assembler's context, or depends on a
+        definition that is.
+
+        :arg str unique_id: a component or template unique ID
+        :arg set visited: the unique IDs that have already been checked
+
+        """
+        if self._context.defines(unique_id):
+            return True
+        visited.add(unique_id)
+        definition = self._context.get(unique_id)
+        if definition is None:
+            return False
+        return any(
+            self._depends_on_override(dependency_id, visited)
+            for dependency_id in _iter_dependency_ids(definition)
+            if dependency_id not in visited)
+
+    def _creating(self, lock, component):
+        """Return a context manager that holds the creation *lock* of
+        *component*.
+
+        :arg lock:
+           the key lock (or, for a "weakref" component, the cache lock)
+           that guards the creation of *component*
+        :arg aglyph.component.Component component:
+           a component definition
+        :raise aglyph.AglyphError:
+           if *lock* cannot be acquired before the component's
+           :attr:`aglyph.component.Component.timeout` (or the *timeout*
+           of the current :meth:`assemble` call) expires
+
+        .. versionadded:: 3.1.0
+
+        """
+        return _creating(self, lock, component.unique_id, component.timeout)
 
     def _create(self, component):
         """Create an object of *component*.
@@ -281,6 +2396,29 @@ class Assembler(object):
     # referenced in sys.modules)
     _create__imported = _create_prototype
 
+    def _create_graph(self, component):
+        """Create and initialize the graph object for *component*, or
+        return the one already created during the outermost assembly.
+
+        :arg aglyph.component.Component component:
+           a component definition having strategy="graph"
+        :return:
+           the graph object of the outermost assembly
+
+        """
+        graph = _graph_scope()
+        key = (self, component.unique_id)
+        obj = graph.get(key, _EMPTY)
+        if obj is _EMPTY:
+            # a concurrent reference may be creating it
+            with graph.lock_for(key):
+                obj = graph.get(key, _EMPTY)
+                if obj is _EMPTY:
+                    obj = graph[key] = self._create_prototype(component)
+                    return obj
+        self.__log.debug("using graph object %r", key)
+        return obj
+
     def _create_singleton(self, component):
         """Return the singleton object for *component*.
 
@@ -293,25 +2431,212 @@ class Assembler(object):
         is returned. Otherwise, a new object is created, initialized,
         wired, cached, and then returned.
 
-        .. note::
-           Assembly of singleton components is a thread-safe operation.
+        .. versionadded:: 3.1.0
+           If *component* is a :attr:`snapshot
+           <aglyph.component.Component.snapshot>` component and this
+           assembler has a *snapshot_dir*, a valid snapshot is restored
+           (and cached) instead of creating a new object; a newly
+           created object is persisted to a new snapshot.
+
+        .. note::
+           Assembly of singleton components is a thread-safe operation.
+
+           A cached singleton is returned without locking. While a
+           singleton is being created, only other threads assembling
+           **the same** singleton are blocked.
+
+        """
+        cache = self._caches["singleton"]
+        obj = cache.get(component.unique_id)
+        if obj is None:
+            with self._creating(
+                    cache.lock_for(component.unique_id), component):
+                obj = cache.get(component.unique_id)
+                if obj is None:
+                    obj = self._load_snapshot(component)
+                    if obj is None:
+                        # singletons are initialized and wired once, then
+                        # cached
+                        obj = self._initialize(component)
+                        self._wire(obj, component)
+                        self._call_lifecycle_method(
+                            "after_inject", obj, component.unique_id)
+                        self._save_snapshot(component, obj)
+                    with cache:
+                        cache[component.unique_id] = obj
+                    self.__log.info(
+                        "created and cached %r @ %x", component, id(obj))
+                    return obj
+        self.__log.info("retrieved %r @ %x from cache", component, id(obj))
+        return obj
+
+    def _create_clone(self, component):
+        """Return a new copy of the master object for *component*.
+
+        :arg aglyph.component.Component component:
+           a component definition having strategy="clone"
+        :return:
+           a copy of the master object
+
+        If *component* has previously been assembled, the cached master
+        object is copied. Otherwise, a new master object is created,
+        initialized, wired, and cached, and then copied.
+
+        .. versionadded:: 3.1.0
+
+        .. note::
+           Assembly of clone components is a thread-safe operation.
+           (Copying is not synchronized, so a master object must not be
+           modified after it is cached.)
+
+        """
+        master = self._clone_master(component)
+        if component.deep_clone:
+            obj = copy.deepcopy(master)
+        else:
+            obj = copy.copy(master)
+        if component.after_clone is not None:
+            self._call_lifecycle_method(
+                "after_clone", obj, component.unique_id)
+        self.__log.info(
+            "cloned %r @ %x from master @ %x", component, id(obj), id(master))
+        return obj
+
+    def _clone_master(self, component):
+        """Return the cached master object for *component*, creating
+        (and caching) it first if necessary.
+
+        :arg aglyph.component.Component component:
+           a component definition having strategy="clone"
+        :return:
+           the master object
+
+        """
+        cache = self._caches["clone"]
+        master = cache.get(component.unique_id)
+        if master is None:
+            with self._creating(
+                    cache.lock_for(component.unique_id), component):
+                master = cache.get(component.unique_id)
+                if master is None:
+                    master = self._initialize(component)
+                    self._wire(master, component)
+                    self._call_lifecycle_method(
+                        "after_inject", master, component.unique_id)
+                    with cache:
+                        cache[component.unique_id] = master
+                    self.__log.info(
+                        "created and cached master %r @ %x", component,
+                        id(master))
+        return master
+
+    def _create_soft(self, component):
+        """Return the soft object for *component*.
+
+        :arg aglyph.component.Component component:
+           a component definition having strategy="soft"
+        :return:
+           the soft object with all its dependencies resolved
+
+        If *component* has previously been assembled (and its object
+        has not been evicted), the cached object is returned. Otherwise,
+        a new object is created, initialized, wired, and cached, and
+        then the memory budget is enforced.
+
+        .. versionadded:: 3.1.0
+
+        .. note::
+           Assembly of soft components is a thread-safe operation.
+
+        """
+        cache = self._caches["soft"]
+        obj = cache.get(component.unique_id)
+        if obj is None:
+            with self._creating(
+                    cache.lock_for(component.unique_id), component):
+                obj = cache.get(component.unique_id)
+                if obj is None:
+                    usage = _measure_soft(self)
+                    obj = self._initialize(component)
+                    self._wire(obj, component)
+                    self._call_lifecycle_method(
+                        "after_inject", obj, component.unique_id)
+                    self.__log.info(
+                        "created and cached %r @ %x", component, id(obj))
+                    _cache_soft(self, component.unique_id, obj, usage)
+                    return obj
+        self._soft_used[component.unique_id] = next(self._soft_clock)
+        self.__log.info("retrieved %r @ %x from cache", component, id(obj))
+        return obj
+
+    def _load_snapshot(self, component):
+        """Return the object restored from a valid snapshot of
+        *component*, or ``None``.
+
+        :arg aglyph.component.Component component:
+           a component definition having strategy="singleton"
+
+        .. versionadded:: 3.1.0
+
+        """
+        if self._snapshot_dir is None or not component.snapshot:
+            return None
+        obj = _read_snapshot(
+            self._snapshot_filename(component.unique_id),
+            self._snapshot_key(component))
+        with self._snapshots_lock:
+            stats = self._snapshots.setdefault(component.unique_id, [0, 0])
+            stats[0 if obj is not None else 1] += 1
+        if obj is not None:
+            self.__log.info("restored %r from snapshot", component)
+        return obj
+
+    def _save_snapshot(self, component, obj):
+        """Persist *obj* to a new snapshot of *component*.
+
+        :arg aglyph.component.Component component:
+           a component definition having strategy="singleton"
+        :arg obj: the newly-created object of *component*
+
+        .. versionadded:: 3.1.0
+
+        """
+        if self._snapshot_dir is not None and component.snapshot:
+            _write_snapshot(
+                self._snapshot_filename(component.unique_id),
+                self._snapshot_key(component), obj, component.unique_id)
+
+    def _snapshot_filename(self, component_id):
+        """Return the name of the snapshot file for *component_id*."""
+        return _component_filename(
+            self._snapshot_dir, self._context.context_id, component_id,
+            ".snapshot")
+
+    def _snapshot_key(self, component):
+        """Return the key that validates a snapshot of *component*."""
+        return _snapshot_key(
+            self._describe_snapshot(component), component.dotted_name)
+
+    def _describe_snapshot(self, component):
+        """Return a digest of the definition of *component* (including
+        any arguments, keywords and attributes that it inherits).
+
+        :arg aglyph.component.Component component:
+           a component definition
+
+        .. versionadded:: 3.1.0
 
         """
-        with self._caches["singleton"] as cache:
-            obj = cache.get(component.unique_id)
-            if obj is None:
-                # singletons are initialized and wired once, then cached
-                obj = self._initialize(component)
-                self._wire(obj, component)
-                self._call_lifecycle_method(
-                    "after_inject", obj, component.unique_id)
-                cache[component.unique_id] = obj
-                self.__log.info(
-                    "created and cached %r @ %x", component, id(obj))
-            else:
-                self.__log.info(
-                    "retrieved %r @ %x from cache", component, id(obj))
-        return obj
+        import hashlib
+
+        description = "\0".join([
+            component.dotted_name,
+            repr(component.factory_name),
+            _describe_value(self._collect_args(component)),
+            _describe_value(dict(self._collect_keywords(component))),
+            _describe_value(list(self._collect_attributes(component).items())),
+        ])
+        return hashlib.sha256(description.encode("utf-8")).hexdigest()
 
     def _create_borg(self, component):
         """Create and initialize a borg object for *component*.
@@ -330,6 +2655,10 @@ class Assembler(object):
         .. note::
            Assembly of borg components is a thread-safe operation.
 
+           A cached shared-state is used without locking. While a
+           shared-state is being created, only other threads assembling
+           **the same** borg are blocked.
+
         .. warning::
            The borg assembly strategy is **only** supported for
            components whose objects have an instance ``__dict__``.
@@ -340,34 +2669,113 @@ class Assembler(object):
            components.
 
         """
-        with self._caches["borg"] as cache:
-            cached_obj = cache.get(component.unique_id)
-            if cached_obj is None:
-                # borgs are initialized and wired, then the state is cached
-                # (an object of the borg is actually cached, but this is just
-                # an implementation detail... it's just as effective a
-                # container as anything else, and it makes the implementation
-                # of clear_borgs() far less expensive - if we only cached the
-                # new_obj.__dict__, we'd need to actually assemble each borg in
-                # clear_borgs() in order to call any before_clear lifecycle
-                # methods)
-                new_obj = self._initialize(component)
-                self._wire(new_obj, component)
-                self._call_lifecycle_method(
-                    "after_inject", new_obj, component.unique_id)
-                cache[component.unique_id] = new_obj
-                self.__log.info(
-                    "created and cached shared-state for %r", component)
-            else:
-                self.__log.info(
-                    "retrieved shared-state for %r from cache", component)
-                cls = self._resolve_initializer(component)
-                new_obj = (
-                    new_instance(cls) if (component.member_name is None)
-                    else cls)
-                new_obj.__dict__ = cached_obj.__dict__
+        cache = self._caches["borg"]
+        cached_obj = cache.get(component.unique_id)
+        if cached_obj is None:
+            with self._creating(
+                    cache.lock_for(component.unique_id), component):
+                cached_obj = cache.get(component.unique_id)
+                if cached_obj is None:
+                    # borgs are initialized and wired, then the state is
+                    # cached (an object of the borg is actually cached, but
+                    # this is just an implementation detail... it's just as
+                    # effective a container as anything else, and it makes
+                    # the implementation of clear_borgs() far less expensive
+                    # - if we only cached the new_obj.__dict__, we'd need to
+                    # actually assemble each borg in clear_borgs() in order
+                    # to call any before_clear lifecycle methods)
+                    new_obj = self._initialize(component)
+                    self._wire(new_obj, component)
+                    self._call_lifecycle_method(
+                        "after_inject", new_obj, component.unique_id)
+                    with cache:
+                        cache[component.unique_id] = new_obj
+                    self.__log.info(
+                        "created and cached shared-state for %r", component)
+                    return new_obj
+        self.__log.info("retrieved shared-state for %r from cache", component)
+        cls = self._resolve_initializer(component)
+        new_obj = (
+            new_instance(cls) if (component.member_name is None) else cls)
+        new_obj.__dict__ = cached_obj.__dict__
         return new_obj
 
+    def _create_shared(self, component):
+        """Return a read-only view of the shared data for *component*.
+
+        :arg aglyph.component.Component component:
+           a component definition having strategy="shared"
+        :return:
+           a read-only :obj:`memoryview` of the published data
+
+        .. versionadded:: 3.1.0
+
+        .. note::
+           Assembly of shared components is a thread-safe operation.
+           Concurrent *processes* that assemble the same unpublished
+           component may each create and publish its data; every
+           process nevertheless ends up with a complete, consistent
+           view.
+
+        """
+        cache = self._caches["shared"]
+        obj = cache.get(component.unique_id)
+        if obj is None:
+            with self._creating(
+                    cache.lock_for(component.unique_id), component):
+                obj = cache.get(component.unique_id)
+                if obj is None:
+                    obj = self._attach_shared(component.unique_id)
+                    if obj is None:
+                        data = self._initialize(component)
+                        self._wire(data, component)
+                        self._call_lifecycle_method(
+                            "after_inject", data, component.unique_id)
+                        obj = self._publish_shared(component.unique_id, data)
+                        data = None
+                    with cache:
+                        cache[component.unique_id] = obj
+                    self.__log.info(
+                        "attached and cached shared data for %r", component)
+                    return obj
+        self.__log.info("retrieved shared data for %r from cache", component)
+        return obj
+
+    def _attach_shared(self, component_id):
+        """Return a view of the data published for *component_id*, or
+        ``None`` if no data has been published.
+
+        :arg str component_id: the unique ID of a "shared" component
+
+        """
+        return _attach_shared_data(self._shared_filename(component_id))
+
+    def _publish_shared(self, component_id, data):
+        """Publish *data* for *component_id*, and return a view of the
+        published data.
+
+        :arg str component_id: the unique ID of a "shared" component
+        :arg data: the buffer-protocol object created for the component
+
+        """
+        filename = self._shared_filename(component_id)
+        identity = _publish_shared_data(filename, data, component_id)
+        self._shared_published[component_id] = (filename, identity)
+        self.__log.info("published %r to %s", component_id, filename)
+        return _attach_shared_data(filename)
+
+    def _shared_filename(self, component_id):
+        """Return the name of the file to which the data of
+        *component_id* is published.
+
+        :arg str component_id: the unique ID of a "shared" component
+
+        """
+        return _shared_data_filename(
+            self._shared_dir, self._context.context_id, component_id,
+            self._describe_snapshot(
+                self._context.get_component(component_id)))
+
     def _create_weakref(self, component):
         """Return a weakref object for *component*.
 
@@ -406,8 +2814,20 @@ class Assembler(object):
         Please refer to the :mod:`weakref` module for a detailed
         explanation of weak reference behavior.
 
+        .. versionchanged:: 3.1.0
+           A live cached referent is returned without acquiring the
+           cache lock.
+
         """
-        with self._caches["weakref"] as cache:
+        cache = self._caches["weakref"]
+        ref = cache.get(component.unique_id)
+        obj = ref() if ref is not None else None
+        if obj is not None:
+            self.__log.info(
+                "retrieved %r @ %x from cached weak reference",
+                component, id(obj))
+            return obj
+        with self._creating(cache.lock, component):
             ref = cache.get(component.unique_id)
             if ref is not None:
                 obj = ref()
@@ -459,18 +2879,34 @@ class Assembler(object):
            or :attr:`Component.keywords`, then a :class:`RuntimeWarning`
            is issued.
 
+        .. versionadded:: 3.1.0
+           If *component* specifies a :attr:`Component.backoff`, an
+           initializer failure is remembered, and a later call during the
+           backoff raises :exc:`aglyph.AglyphError` immediately (before
+           any dependency is assembled).
+
         """
+        backoff = component.backoff
+        if backoff is not None:
+            self._failures.check(component.unique_id)
         initializer = self._resolve_initializer(component)
         if component.member_name is None:
             (args, keywords) = self._resolve_args_and_keywords(component)
+            started = perf_counter()
             try:
                 # issues/2: always use the __call__ protocol to initialize
                 obj = initializer(*args, **keywords)
             except Exception as e:
+                if backoff is not None:
+                    self._failures.failed(component.unique_id, backoff, e)
                 raise AglyphError(
                     "failed to initialize object of component %r" %
                         component.unique_id,
                     e)
+            elapsed = perf_counter() - started
+            if backoff is not None:
+                self._failures.succeeded(component.unique_id)
+            self._constructions.add(component.unique_id, 1, elapsed)
         else:
             obj = initializer
             if component.args or component.keywords:
@@ -534,15 +2970,59 @@ class Assembler(object):
            "official" arguments and keywords that should be passed to
            the initializer.
 
+        .. versionadded:: 3.1.0
+           If *component* is :attr:`parallel
+           <aglyph.component.Component.parallel>` (or this assembler
+           was created with *parallel=True*), the arguments and keywords
+           that are references are assembled concurrently **first**
+           (see :meth:`_assemble_concurrently`); the remaining values are
+           then resolved in order.
+
         """
         resolve = self._resolve_value
-        args = tuple([resolve(arg) for arg in self._collect_args(component)])
+        collected_args = self._collect_args(component)
         collected_keywords = self._collect_keywords(component)
+        if self._parallel or component.parallel:
+            resolve = self._assemble_concurrently(
+                list(collected_args) + list(collected_keywords.values()))
+        args = tuple([resolve(arg) for arg in collected_args])
         keywords = dict(
             [(name, resolve(value))
             for (name, value) in collected_keywords.items()])
         return (args, keywords)
 
+    def _assemble_concurrently(self, values):
+        """Assemble the references among *values* concurrently.
+
+        :arg list values:
+           the argument and keyword value specifications of a component,
+           in resolution order
+        :return:
+           a function that returns the runtime value of each of *values*
+           (which must be passed to it in the same order)
+
+        .. versionadded:: 3.1.0
+
+        Each reference is assembled by a separate call to
+        :meth:`assemble` (so, for example, two references to the same
+        "prototype" component still produce two objects), and every
+        reference has been assembled when this method returns.
+
+        """
+        references = [
+            value for value in values if isinstance(value, Reference)]
+        assembled = iter(_resolve_concurrently(
+            self, [partial(self.assemble, reference)
+                for reference in references]))
+        resolve_value = self._resolve_value
+
+        def resolve(value_spec):
+            if isinstance(value_spec, Reference):
+                return next(assembled)
+            return resolve_value(value_spec)
+
+        return resolve
+
     def _collect_args(self, component):
         """Return the positional arguments used to initialize objects of
         *component*.
@@ -688,9 +3168,15 @@ class Assembler(object):
            the object on which to call the lifecycle method
         :arg str component_id:
            the component unique ID for *obj*
+        :return:
+           ``False`` if the lifecycle method raised an exception, else
+           ``True``
+        :rtype:
+           :obj:`bool`
 
         """
         component = self._context[component_id]
+        succeeded = True
 
         lifecycle_method_names = self._get_lifecycle_method_names(
             lifecycle_state, component)
@@ -724,6 +3210,7 @@ class Assembler(object):
                     try:
                         obj_lifecycle_method()
                     except Exception as e:
+                        succeeded = False
                         msg = "ignoring %s raised from %r"
                         self.__log.exception(
                             msg, e.__class__.__name__, obj_lifecycle_method)
@@ -753,6 +3240,8 @@ class Assembler(object):
                 "no %s lifecycle methods specified for %s %r",
                 lifecycle_state, obj, component_id)
 
+        return succeeded
+
     def _get_lifecycle_method_names(self, lifecycle_state, component):
         """Determine the preferred-order list of all lifecycle method
         names that may be applicable for an object of *component*.
@@ -771,9 +3260,10 @@ class Assembler(object):
             lifecycle_method_names.append(method_name)
 
         # (2) parent Template/Component.<lifecycle_state>
+        # ("after_clone" is only defined by Component)
         parent = self._context.get(component.parent_id)
         while parent is not None:
-            method_name = getattr(parent, lifecycle_state)
+            method_name = getattr(parent, lifecycle_state, None)
             if method_name is not None:
                 lifecycle_method_names.append(method_name)
 
@@ -781,7 +3271,7 @@ class Assembler(object):
             parent = self._context.get(parent.parent_id)
 
         # (4) Context.<lifecycle_state>
-        method_name = getattr(self._context, lifecycle_state)
+        method_name = getattr(self._context, lifecycle_state, None)
         if method_name is not None:
             lifecycle_method_names.append(method_name)
 
@@ -809,19 +3299,29 @@ class Assembler(object):
            objects will be initialized by this method.
 
            Initialization of singleton component objects is a
-           thread-safe operation.
+           thread-safe operation. A singleton whose object is being
+           constructed by another thread is waited for exactly as by
+           :meth:`assemble` (bounded by the component's
+           :attr:`aglyph.component.Component.timeout`).
 
         """
         return self._init_cache("singleton")
 
     def clear_singletons(self):
-        """Evict all cached singleton component objects.
+        """Evict all cached singleton (and shared) component objects.
 
         :return:
-           the evicted singleton component IDs
+           the evicted singleton (and shared) component IDs
         :rtype:
            :obj:`list`
 
+        .. versionadded:: 3.1.0
+           Cached views of "shared" component data are evicted as well,
+           and any data that was *published* by this assembler is
+           removed so that it will be created again by the next process
+           to assemble it. (Other processes that have already mapped the
+           data may continue to use it.)
+
         Aglyph makes the following guarantees:
 
         #. All cached singleton objects' "before_clear" lifecycle
@@ -838,7 +3338,7 @@ class Assembler(object):
            thread-safe operation.
 
         """
-        return self._clear_cache("singleton")
+        return self._clear_cache("singleton") + self._clear_shared()
 
     def init_borgs(self):
         """Assemble and cache the shared-states for all borg component
@@ -893,6 +3393,95 @@ class Assembler(object):
         """
         return self._clear_cache("borg")
 
+    def clear_clones(self):
+        """Evict all cached clone component master objects.
+
+        :return:
+           the evicted clone component IDs
+        :rtype:
+           :obj:`list`
+
+        .. versionadded:: 3.1.0
+
+        Aglyph makes the following guarantees:
+
+        #. All cached master objects' "before_clear" lifecycle methods
+           are called (if specified) when they are evicted from cache.
+        #. The clone cache will be empty when this method terminates.
+
+        Copies that have already been assembled are not affected.
+
+        .. note::
+           Any exception raised by a "before_clear" lifecycle method is
+           caught, logged, and issued as a :class:`RuntimeWarning`.
+
+           Eviction of cached clone master objects is a thread-safe
+           operation.
+
+        """
+        return self._clear_cache("clone")
+
+    def clear_softs(self):
+        """Evict all cached soft component objects.
+
+        :return:
+           the evicted soft component IDs
+        :rtype:
+           :obj:`list`
+
+        .. versionadded:: 3.1.0
+
+        Aglyph makes the following guarantees:
+
+        #. All cached soft objects' "before_clear" lifecycle methods are
+           called (if specified) when they are evicted from cache.
+        #. The soft cache will be empty when this method terminates.
+
+        .. note::
+           Any exception raised by a "before_clear" lifecycle method is
+           caught, logged, and issued as a :class:`RuntimeWarning`.
+
+           Eviction of cached soft component objects is a thread-safe
+           operation.
+
+        """
+        return self._clear_cache("soft")
+
+    def enforce_memory_budget(self):
+        """Evict the least recently used soft component objects until
+        memory usage is (estimated to be) within the memory budget.
+
+        :return:
+           the evicted soft component IDs
+        :rtype:
+           :obj:`list`
+
+        .. versionadded:: 3.1.0
+
+        The budget is enforced automatically whenever a soft object is
+        created. Call this method (e.g. periodically, or after a large
+        allocation elsewhere in the application) to also release soft
+        objects when memory usage grows for other reasons.
+
+        The memory that evicting an object will release is estimated as
+        the growth in memory usage while the object was created, so
+        objects continue to be evicted (in least recently used order)
+        until their estimated sizes cover the excess. Memory is only
+        returned to the system if the application holds no other
+        references to an evicted object (and even then, it may be
+        retained by the allocator).
+
+        .. note::
+           The "before_clear" lifecycle method (if specified) is called
+           on each evicted object. Any exception it raises is caught,
+           logged, and issued as a :class:`RuntimeWarning`.
+
+           A soft object that is concurrently being created or evicted
+           by another thread is skipped.
+
+        """
+        return _trim_soft(self)
+
     def clear_weakrefs(self):
         """Evict all cached weakref component objects.
 
@@ -916,82 +3505,556 @@ class Assembler(object):
            Eviction of cached weakref component objects is a thread-safe
            operation.
 
-        .. warning::
-           While eviction of weakref components is a thread-safe
-           operation with respect to *explicit* modification of the
-           weakref cache (i.e. any other thread attempting to
-           :meth:`assemble` a weakref component or to
-           ``clear_weakrefs()`` will be blocked until this method
-           returns), the nature of weak references means that entries
-           may still "disappear" from the cache *even while the cache
-           lock is held.*
+        .. warning::
+           While eviction of weakref components is a thread-safe
+           operation with respect to *explicit* modification of the
+           weakref cache (i.e. any other thread attempting to
+           :meth:`assemble` a weakref component or to
+           ``clear_weakrefs()`` will be blocked until this method
+           returns), the nature of weak references means that entries
+           may still "disappear" from the cache *even while the cache
+           lock is held.*
+
+           With respect to cache-clearing, this means that referent
+           component objects may no longer be available even *after* the
+           cache lock has been acquired and the weakref component IDs
+           (keys) are retrieved from the cache. Practically speaking,
+           this means that callers must be aware of two things:
+
+           #. Aglyph **cannot** guarantee that "before_clear" lifecycle
+              methods are called on weakref component objects, because
+              there is no guarantee that a cached weak references is
+              "live." (This is the nature of weak references.)
+           #. Aglyph will only return the component IDs of weakref
+              component objects that were "live" at the moment they were
+              cleared.
+
+        Please refer to the :mod:`weakref` module for a detailed
+        explanation of weak reference behavior.
+
+        """
+        with self._caches["weakref"] as cache:
+            eligible_weakref_ids = list(cache.keys())
+            cleared_weakref_ids = []
+            try:
+                for weakref_id in eligible_weakref_ids:
+                    ref = cache.pop(weakref_id)
+                    obj = ref()
+                    if obj is not None:
+                        self._call_lifecycle_method(
+                            "before_clear", obj, weakref_id)
+                        cleared_weakref_ids.append(weakref_id)
+                        obj = None
+                    else:
+                        self.__log.info(
+                            "weak reference to object of component %r is "
+                                "already dead; any before_clear method "
+                                "for this component will NOT be called",
+                            weakref_id)
+                    ref = None
+            finally:
+                cache.clear()
+        return cleared_weakref_ids
+
+    def reload(self, context, rebuild=False):
+        """Replace this assembler's context with *context*, evicting
+        only the cached objects that are affected by the changes.
+
+        :arg aglyph.context.Context context:
+           the new context (e.g. a new
+           :class:`aglyph.context.XMLContext` parsed from the changed
+           document)
+        :keyword bool rebuild:
+           if ``True``, assemble (and cache) the evicted singleton,
+           borg, and shared components again from *context*
+        :return:
+           the evicted component IDs
+        :rtype:
+           :obj:`list`
+
+        .. versionadded:: 3.1.0
+
+        A definition is *changed* if it was added, removed, or differs
+        in any way between the current context and *context*. A cached
+        object is *affected* if its component definition is changed, or
+        if its component depends (directly or transitively, through
+        references or parent templates/components) on a changed
+        definition. If any context-level lifecycle method name changed,
+        **all** cached objects are affected.
+
+        The "before_clear" lifecycle method (as defined by the current
+        context) is called on exactly the affected objects as they are
+        evicted (and the backoff of any affected component that recently
+        failed to initialize is reset); all other cached objects remain
+        cached::
+
+           assembler.reload(XMLContext("app-context.xml"))
+
+        .. note::
+           Reloading is a thread-safe operation with respect to the
+           caches, but an assembly that is already in progress when
+           ``reload`` is called may complete using the replaced
+           definitions.
+
+        """
+        old_context = self._context
+        changed_ids = _diff_contexts(old_context, context)
+        self.__log.info(
+            "reloading %s as %s (changed %r)",
+            old_context, context, changed_ids)
+        if changed_ids is None:
+            changed_ids = _iter_unique_ids(old_context)
+        affected_ids = _eviction_order(
+            changed_ids, _reverse_dependencies([old_context, context]))
+
+        # the caches are held until the context is replaced, so that no
+        # object is cached from either context while the affected objects
+        # are evicted
+        evicted_ids = _evict_objects(
+            self, self._cached_strategies(affected_ids), context=context)
+        self._delegated = {}
+        self._dependents = None
+        for component_id in affected_ids:
+            if component_id in self._prefetchers:
+                component = context.get_component(component_id)
+                if component is None or component.strategy != "prototype":
+                    self._replace_prefetcher(component_id, None)
+        self._drain_prefetched(affected_ids)
+        self._failures.forget(affected_ids)
+
+        if rebuild:
+            for component_id in evicted_ids:
+                component = context.get_component(component_id)
+                if component is not None and component.strategy in [
+                        "singleton", "borg", "shared"]:
+                    self.assemble(component_id)
+        return evicted_ids
+
+    def evict(self, component_spec, cascade=True):
+        """Evict the cached object of a single component and (by
+        default) the cached objects of all components that depend on it.
+
+        :arg component_spec:
+           a unique component ID, or an object whose dotted name is a
+           unique component ID
+        :keyword bool cascade:
+           if ``True`` (the default), also evict the cached objects of
+           all components that depend (directly or transitively) on
+           *component_spec*
+        :return:
+           the evicted component IDs, in eviction order
+        :rtype:
+           :obj:`list`
+        :raise KeyError:
+           if *component_spec* does not identify a component in this
+           assembler's context
+
+        .. versionadded:: 3.1.0
+
+        Dependents are evicted **before** the components on which they
+        depend, and the "before_clear" lifecycle method is called on
+        each evicted object. This makes it possible to replace one
+        cached object (for example, a singleton holding a credential
+        that must be rotated) without discarding every other cached
+        object, and without leaving a stale reference to the replaced
+        object inside any of its cached dependents::
+
+           assembler.evict("db-credentials")
+           # the next assembly creates new credentials (and dependents)
+
+        The reverse-dependency index used to find the dependents is
+        built from the context when it is first needed, and is rebuilt
+        whenever a definition has since been added to, replaced in, or
+        removed from the context (or any of its parent contexts).
+
+        The :attr:`backoff <aglyph.component.Component.backoff>` of each
+        evicted component is also reset, so that its next assembly
+        calls its initializer even if a recent initialization failed.
+
+        A cascading eviction also reaches every child assembler (see the
+        *parent* keyword of :class:`Assembler`): the cached objects of
+        child components that depend on an evicted (and not overridden)
+        parent component are evicted from the child assembler, too.
+        Only the component IDs evicted by **this** assembler are
+        returned.
+
+        .. note::
+           Eviction is a thread-safe operation. A concurrent assembly of
+           any evicted component either completes before the eviction
+           (and its object is evicted) or begins after it (and creates a
+           new object).
+
+        """
+        component_id = _identify(component_spec)
+        if self._context.get_component(component_id) is None:
+            raise KeyError(
+                "component %r is not defined in %s" %
+                    (component_id, self._context))
+        if cascade:
+            component_ids = _eviction_order(
+                [component_id], self._reverse_dependencies())
+        else:
+            component_ids = [component_id]
+        evicted_ids = self._evict(component_ids)
+        self.__log.info("evicted %r", evicted_ids)
+        if cascade:
+            for child in list(self._children):
+                child._evict_inherited(component_ids)
+        return evicted_ids
+
+    def _evict(self, component_ids):
+        """Evict the cached objects of *component_ids* (in order).
+
+        :arg list component_ids: the component IDs, in eviction order
+        :return: the evicted component IDs
+        :rtype: :obj:`list`
+
+        """
+        evicted_ids = _evict_objects(
+            self, self._cached_strategies(component_ids))
+        self._drain_prefetched(component_ids)
+        self._failures.forget(component_ids)
+        return evicted_ids
+
+    def _evict_inherited(self, unique_ids):
+        """Evict the cached objects of this child assembler's components
+        that depend on the components evicted by the parent assembler.
+
+        :arg list unique_ids:
+           the unique IDs of the components evicted by the parent
+           assembler (and of their dependents in the parent context)
+
+        """
+        component_ids = _eviction_order(
+            [unique_id for unique_id in unique_ids
+                if self._delegates(unique_id)],
+            self._reverse_dependencies())
+        evicted_ids = self._evict(component_ids)
+        self.__log.info(
+            "evicted %r (inherited from %s)", evicted_ids, self._parent)
+        for child in list(self._children):
+            child._evict_inherited(component_ids)
+
+    def _reverse_dependencies(self):
+        """Return the reverse-dependency index of this assembler's
+        context, rebuilding it if any definition has been added,
+        replaced, or removed since it was built.
+
+        """
+        revisions = _context_revisions(self._context)
+        dependents = self._dependents
+        if dependents is None or dependents[0] != revisions:
+            # (replaced, never modified, so that it can be read without
+            # locking)
+            dependents = self._dependents = (
+                revisions, _reverse_dependencies([self._context]))
+        return dependents[1]
+
+    def _cached_strategies(self, component_ids):
+        """Return the ``(component ID, strategy)`` pairs of the
+        components in *component_ids* whose objects may be cached.
+
+        """
+        cached_strategies = []
+        for component_id in component_ids:
+            component = self._context.get_component(component_id)
+            if component is not None and component.strategy in self._caches:
+                cached_strategies.append((component_id, component.strategy))
+        return cached_strategies
+
+    def enable_prefetch(self, component_spec, depth, idle_seconds=None):
+        """Keep a queue of pre-assembled objects of a "prototype"
+        component, refilled by a background thread.
+
+        :arg component_spec:
+           a unique component ID, or an object whose dotted name is a
+           unique component ID
+        :arg int depth:
+           the number of objects to keep ready
+        :keyword float idle_seconds:
+           if specified, the number of seconds after which the
+           background thread discards its queue and exits if no object
+           has been taken
+        :raise KeyError:
+           if *component_spec* does not identify a component in this
+           assembler's context
+        :raise aglyph.AglyphError:
+           if the component is not a "prototype" component, or if the
+           :mod:`threading` module is not available
+        :raise ValueError:
+           if *depth* is less than 1
+
+        .. versionadded:: 3.1.0
+
+        Once prefetching is enabled, :meth:`assemble` takes a ready
+        object from the queue (a *hit*) and signals the background
+        thread to create a replacement. If the queue is empty (a
+        *miss*), the caller creates the object itself, exactly as it
+        would without prefetching, so that callers never wait for the
+        background thread.
+
+        The queue never holds more than *depth* objects; the background
+        thread waits whenever the queue is full. It is started when
+        prefetching is enabled and (after an idle cutoff) when an
+        object is next requested. If the thread fails to create an
+        object, it stops, and is not restarted until prefetching is
+        enabled again; objects are then assembled by the callers.
+
+        The hits, misses, refills, and refill time are reported in
+        :attr:`statistics`; a growing number of misses means that the
+        background thread is not keeping up with demand.
+
+        .. note::
+           Prefetched objects are created in advance, so a change to
+           one of their dependencies is not seen by objects that are
+           already queued. :meth:`evict` and :meth:`reload` discard the
+           queued objects of every component that they affect.
+
+        """
+        if not _has_threading:
+            raise AglyphError("prefetching requires the threading module")
+        component_id = _identify(component_spec)
+        component = self._context.get_component(component_id)
+        if component is None:
+            raise KeyError(
+                "component %r is not defined in %s" %
+                    (component_id, self._context))
+        if component.strategy != "prototype":
+            raise AglyphError(
+                "cannot prefetch %s component %r (only prototype "
+                    "components may be prefetched)" %
+                    (component.strategy, component_id))
+        if depth < 1:
+            raise ValueError("prefetch depth must be at least 1")
+        prefetcher = _Prefetcher(
+            component_id, partial(self._assemble, component_id), depth,
+            idle_seconds)
+        self._replace_prefetcher(component_id, prefetcher)
+        prefetcher.start()
+        self.__log.info(
+            "enabled prefetch of %r (depth=%d, idle_seconds=%r)",
+            component_id, depth, idle_seconds)
+
+    def disable_prefetch(self, component_spec):
+        """Stop prefetching objects of a component.
+
+        :arg component_spec:
+           a unique component ID, or an object whose dotted name is a
+           unique component ID
+
+        .. versionadded:: 3.1.0
+
+        Any queued objects are discarded. If prefetching is not enabled
+        for the component, this method does nothing.
+
+        """
+        component_id = _identify(component_spec)
+        self._replace_prefetcher(component_id, None)
+
+    def _replace_prefetcher(self, component_id, prefetcher):
+        """Replace (and stop) the prefetcher of *component_id*.
+
+        :arg str component_id: a component unique ID
+        :arg _Prefetcher prefetcher:
+           the new prefetcher, or ``None`` to disable prefetching
+
+        """
+        prefetchers = dict(self._prefetchers)
+        if prefetcher is None:
+            old_prefetcher = prefetchers.pop(component_id, None)
+        else:
+            old_prefetcher = prefetchers.get(component_id)
+            prefetchers[component_id] = prefetcher
+        self._prefetchers = prefetchers
+        if old_prefetcher is not None:
+            old_prefetcher.stop()
+
+    def _drain_prefetched(self, component_ids):
+        """Discard the queued objects of the prefetched components in
+        *component_ids*.
+
+        """
+        prefetchers = self._prefetchers
+        for component_id in component_ids:
+            prefetcher = prefetchers.get(component_id)
+            if prefetcher is not None:
+                prefetcher.drain()
+
+    def warm_up(self, freeze=False):
+        """Assemble and cache all singleton component objects, borg
+        component shared-states, shared component data, and clone
+        component master objects, e.g. in a parent process before
+        worker processes are forked.
+
+        :keyword bool freeze:
+           whether or not to move all objects tracked by the garbage
+           collector into its permanent generation after warm-up (see
+           :func:`gc.freeze`)
+        :return:
+           the initialized singleton, borg, shared, and clone component
+           IDs
+        :rtype:
+           :obj:`list`
+
+        .. versionadded:: 3.1.0
+
+        Only the master object of a clone component is created; no copy
+        of it is made (and no "after_clone" method is called).
+
+        Freezing the warmed-up objects keeps the garbage collector from
+        writing to (and so un-sharing) the memory pages that hold them
+        in forked child processes.
+
+        .. note::
+           :func:`gc.freeze` is not available in Python < 3.7. If
+           *freeze* is ``True`` in those versions, a WARNING-level log
+           record is emitted and no objects are frozen.
+
+        """
+        component_ids = (
+            self.init_singletons() + self.init_borgs() +
+            self._init_cache("shared") + self._init_cache("clone"))
+        if freeze:
+            #PYVER: gc.freeze is not available in Python < 3.7
+            if hasattr(gc, "freeze"):
+                # collect first so that garbage is not frozen as well
+                gc.collect()
+                gc.freeze()
+                self.__log.info(
+                    "froze %d objects after warm-up", gc.get_freeze_count())
+            else:
+                self.__log.warning(
+                    "gc.freeze() is not available; objects NOT frozen")
+        return component_ids
+
+    def after_fork(self):
+        """Reinitialize this assembler in a forked child process.
 
-           With respect to cache-clearing, this means that referent
-           component objects may no longer be available even *after* the
-           cache lock has been acquired and the weakref component IDs
-           (keys) are retrieved from the cache. Practically speaking,
-           this means that callers must be aware of two things:
+        :return:
+           the IDs of the cached components that were evicted because
+           their "after_fork" lifecycle methods raised an exception
+        :rtype:
+           :obj:`list`
 
-           #. Aglyph **cannot** guarantee that "before_clear" lifecycle
-              methods are called on weakref component objects, because
-              there is no guarantee that a cached weak references is
-              "live." (This is the nature of weak references.)
-           #. Aglyph will only return the component IDs of weakref
-              component objects that were "live" at the moment they were
-              cleared.
+        .. versionadded:: 3.1.0
+
+        This method is called automatically in the child process for
+        every live assembler (using :func:`os.register_at_fork`, or
+        under Python < 3.7, when a component is first assembled in a
+        process whose ID differs from that of the process in which the
+        assembler was created).
+
+        #. All cache locks are replaced (a lock held by some other
+           thread of the parent process at the moment of the fork would
+           otherwise never be released in the child).
+        #. Prefetch queues (see :meth:`enable_prefetch`) are emptied;
+           their background threads are restarted when an object is
+           next requested.
+        #. The "after_fork" lifecycle method of each cached singleton
+           object, borg shared-state, clone master object, soft object,
+           and live weakref object is called
+           (if specified). Cached objects that do not specify an
+           "after_fork" method are assumed to be fork-safe and remain
+           cached (shared copy-on-write with the parent).
+        #. If an "after_fork" method raises an exception, the object is
+           evicted from cache so that a new object will be created the
+           next time the component is assembled.
 
-        Please refer to the :mod:`weakref` module for a detailed
-        explanation of weak reference behavior.
+        .. note::
+           Any exception raised by an "after_fork" lifecycle method is
+           caught, logged, and issued as a :class:`RuntimeWarning`.
 
         """
-        with self._caches["weakref"] as cache:
-            eligible_weakref_ids = list(cache.keys())
-            cleared_weakref_ids = []
-            try:
-                for weakref_id in eligible_weakref_ids:
-                    ref = cache.pop(weakref_id)
-                    obj = ref()
-                    if obj is not None:
-                        self._call_lifecycle_method(
-                            "before_clear", obj, weakref_id)
-                        cleared_weakref_ids.append(weakref_id)
-                        obj = None
-                    else:
-                        self.__log.info(
-                            "weak reference to object of component %r is "
-                                "already dead; any before_clear method "
-                                "for this component will NOT be called",
-                            weakref_id)
-                    ref = None
-            finally:
-                cache.clear()
-        return cleared_weakref_ids
+        self._pid = os.getpid()
+        self._constructions.after_fork()
+        self._snapshots_lock = threading_.Lock()
+        for cache in self._caches.values():
+            cache.reset_locks()
+        # prefetch threads do not survive the fork
+        for prefetcher in self._prefetchers.values():
+            prefetcher.after_fork()
+        self._failures.after_fork()
+        # the threads that were constructing objects do not survive the fork
+        self._constructing = {}
+        self._waiting = {}
+        # nor do the threads of the pool that assembles references
+        self._executor = None
+        self._executor_lock = threading_.Lock()
+        # the child may use, but does not own, the parent's published data
+        self._shared_published = {}
+
+        evicted_ids = []
+        for strategy in ["singleton", "borg", "weakref", "clone", "soft"]:
+            with self._caches[strategy] as cache:
+                for component_id in list(cache.keys()):
+                    obj = cache[component_id]
+                    if strategy == "weakref":
+                        obj = obj()
+                        if obj is None:
+                            cache.pop(component_id)
+                            continue
+                    if not self._call_lifecycle_method(
+                            "after_fork", obj, component_id):
+                        cache.pop(component_id)
+                        evicted_ids.append(component_id)
+                    obj = None
+        self.__log.info(
+            "reinitialized %s in process %d (evicted %r)",
+            self, self._pid, evicted_ids)
+        return evicted_ids
 
     def _init_cache(self, strategy):
         """Prime the cache for *strategy* objects.
 
         :arg str strategy:
-           "singleton" or "borg"
+           "singleton", "borg", "shared", or "clone"
 
         .. note::
            The "weakref" strategy is not explicitly supported here
            because priming a weak reference cache is nonsensical.
 
         """
-        with self._caches[strategy] as cache:
-            component_ids = []
-            for component in self._context.iter_components(strategy):
+        cache = self._caches[strategy]
+        component_ids = []
+        for component in self._context.iter_components(strategy):
+            if (self._parent is not None and
+                    self._delegates(component.unique_id)):
+                # cached by (and primed through) the parent assembler
+                continue
+            # lock each component (not the whole cache) so that assembly of
+            # other components is not blocked while the cache is primed
+            # (and wait for it as assembly would; see _creating)
+            with self._creating(
+                    cache.lock_for(component.unique_id), component):
                 if component.unique_id not in cache:
-                    self.assemble(component.unique_id)
+                    self._prime(component)
                     component_ids.append(component.unique_id)
         return component_ids
 
+    def _prime(self, component):
+        """Create and cache the object of *component* (or, for a "clone"
+        component, only its master object; no copy is made).
+
+        :arg aglyph.component.Component component:
+           a "singleton", "borg", "shared", or "clone" component
+           definition
+
+        """
+        if component.strategy != "clone":
+            self.assemble(component.unique_id)
+            return
+        assembly = _push_assembly(component.unique_id)
+        try:
+            self._clone_master(component)
+        finally:
+            _pop_assembly(assembly)
+
     def _clear_cache(self, strategy):
         """Evict all objects from the cache for *strategy* objects,
         calling the "before_clear" lifecycle method for each object.
 
         :arg str strategy:
-           "singleton", "borg", or "weakref"
+           "singleton", "borg", "weakref", "clone", or "soft"
 
         """
         with self._caches[strategy] as cache:
@@ -1006,6 +4069,20 @@ class Assembler(object):
                 cache.clear()
         return component_ids
 
+    def _clear_shared(self):
+        """Evict all cached views of shared component data, and remove
+        the data published by this assembler.
+
+        """
+        with self._caches["shared"] as cache:
+            component_ids = list(cache.keys())
+            cache.clear()
+            published = self._shared_published
+            self._shared_published = {}
+        for (filename, identity) in published.values():
+            _unpublish_shared_data(filename, identity)
+        return component_ids
+
     def __contains__(self, component_spec):
         """Tell whether or not the component identified by
         *component_spec* is defined in this assembler's context.
@@ -1033,6 +4110,27 @@ class Assembler(object):
         else:
             return self._context.get_component(component_id) is not None
 
+    def __reduce__(self):
+        """Return the pickled form of this assembler.
+
+        .. versionadded:: 3.1.0
+
+        An assembler is pickled as its context (and its *shared_dir*,
+        *snapshot_dir*, *parent*, *memory_budget*, *parallel*, and
+        *max_workers*) **only**; the unpickled
+        assembler starts with empty caches (cached objects, locks, and
+        statistics are never shipped to another process). This allows
+        an assembler to be passed to process pool workers through the
+        pool initializer without the context being parsed again in each
+        worker (see :meth:`aglyph.context.Context.__reduce__`).
+
+        """
+        return (
+            self.__class__,
+            (self._context, self._shared_dir, self._snapshot_dir,
+                self._parent, self._memory_budget, self._parallel,
+                self._max_workers))
+
     def __str__(self):
         return "<%s @%08x %s>" % (
             name_of(self.__class__), id(self), self._context)
@@ -1073,6 +4171,60 @@ class _ReentrantMutexCache(dict):
         #PYVER: arguments to super() are implicit under Python 3
         super(_ReentrantMutexCache, self).__init__()
         self.__lock = threading_.RLock()
+        self.__key_locks = {}
+
+    def lock_for(self, key):
+        """Return the reentrant lock that guards the creation of the
+        entry for *key*.
+
+        :arg key: a cache key
+        :rtype: :func:`threading.RLock`
+
+        Holding the lock for one key does not block other threads from
+        acquiring the locks for other keys, or from acquiring the cache
+        lock itself.
+
+        .. versionadded:: 3.1.0
+
+        .. note::
+           A thread that is assembling a component holds the key lock
+           while the component's dependencies are assembled. If two
+           threads concurrently begin assembling **different** members
+           of the same circular dependency, the circular dependency is
+           detected while they wait for each other's key locks (see
+           :func:`_wait_for_creation`).
+
+        """
+        key_lock = self.__key_locks.get(key)
+        if key_lock is None:
+            with self.__lock:
+                key_lock = self.__key_locks.setdefault(
+                    key, threading_.RLock())
+        return key_lock
+
+    @property
+    def lock(self):
+        """The cache lock *(read-only)*.
+
+        .. versionadded:: 3.1.0
+
+        """
+        return self.__lock
+
+    def reset_locks(self):
+        """Replace the cache lock and all key locks with new (unheld)
+        locks.
+
+        .. versionadded:: 3.1.0
+
+        .. warning::
+           This method is only safe to call in a forked child process
+           before any other thread has been started (see
+           :meth:`Assembler.after_fork`).
+
+        """
+        self.__lock = threading_.RLock()
+        self.__key_locks = {}
 
     def __enter__(self):
         """Acquire the cache lock."""
@@ -1109,3 +4261,625 @@ class _ReentrantMutexCache(dict):
         return "%s.%s()" % (
             self.__class__.__module__, name_of(self.__class__))
 
+
+
+@traced
+@logged
+class _AssemblyPlan(object):
+    """The resolved assembly plan of a component, from which objects
+    are created in bulk.
+
+    For a "prototype" component, the initializer, the collected
+    arguments, keywords, and attributes, and the objects of any
+    "singleton" or "shared" references are resolved once, when the plan
+    is created. Only the remaining (*dynamic*) values are resolved for
+    each created object.
+
+    For any other component (including a prototype that specifies a
+    :attr:`aglyph.component.Component.backoff`, or whose references are
+    assembled concurrently), each object is assembled by
+    :meth:`Assembler.assemble`.
+
+    .. versionadded:: 3.1.0
+
+    .. warning::
+       A plan is not thread-safe; it is intended to be used by a single
+       call to :meth:`Assembler.iter_assemble` or
+       :meth:`Assembler.assemble_all`.
+
+    """
+
+    #: The strategies of the references that are resolved only once.
+    _resolved_once = ["singleton", "shared"]
+
+    def __init__(self, assembler, component):
+        """
+        :arg aglyph.assembler.Assembler assembler:
+           the assembler that creates objects of *component*
+        :arg aglyph.component.Component component:
+           a component definition
+
+        """
+        #PYVER: arguments to super() are implicit in Python 3
+        super(_AssemblyPlan, self).__init__()
+        self._assembler = assembler
+        self._component_id = component.unique_id
+        # [objects constructed, total construction seconds] not yet recorded
+        self._constructions = [0, 0.0]
+        if (component.strategy != "prototype" or
+                component.member_name is not None or
+                component.backoff is not None or
+                component.parallel or assembler._parallel):
+            self.create = partial(assembler.assemble, component.unique_id)
+            return
+
+        self._dynamic = False
+        assembly = _push_assembly(self._component_id)
+        try:
+            self._initializer = assembler._resolve_initializer(component)
+            self._args = []
+            self._dynamic_args = []
+            for (index, arg) in enumerate(
+                    assembler._collect_args(component)):
+                (value, dynamic) = self._resolve_once(arg)
+                self._args.append(value)
+                if dynamic:
+                    self._dynamic_args.append((index, arg))
+            self._keywords = {}
+            self._dynamic_keywords = []
+            for (name, keyword) in assembler._collect_keywords(
+                    component).items():
+                (value, dynamic) = self._resolve_once(keyword)
+                self._keywords[name] = value
+                if dynamic:
+                    self._dynamic_keywords.append((name, keyword))
+            self._attributes = [
+                (name,) + self._resolve_once(attribute)
+                for (name, attribute) in assembler._collect_attributes(
+                    component).items()]
+        finally:
+            _pop_assembly(assembly)
+        self._args = tuple(self._args)
+        self._after_inject = bool(
+            assembler._get_lifecycle_method_names("after_inject", component))
+        self.create = self._create
+        self.__log.info(
+            "resolved %s plan for %r", "dynamic" if self._dynamic else "static",
+            self._component_id)
+
+    def iterate(self, count=None):
+        """Create objects from this plan.
+
+        :keyword int count:
+           the number of objects to create (by default, objects are
+           created for as long as the iterator is advanced)
+        :return:
+           an iterator over the created objects
+
+        """
+        create = self.create
+        try:
+            if count is None:
+                while True:
+                    yield create()
+            else:
+                for _ in repeat(None, count):
+                    yield create()
+        finally:
+            self.record()
+
+    def record(self):
+        """Add the objects constructed from this plan to the assembler
+        :attr:`Assembler.statistics`.
+
+        """
+        (count, seconds) = self._constructions
+        if count:
+            self._assembler._constructions.add(
+                self._component_id, count, seconds)
+            self._constructions = [0, 0.0]
+
+    def _resolve_once(self, value_spec):
+        """Resolve *value_spec* if its value is the same for every
+        object created from this plan.
+
+        :arg value_spec:
+           an argument, keyword, or attribute value specification
+        :return:
+           ``(value, False)`` if *value_spec* was resolved, else
+           ``(value_spec, True)``
+        :rtype:
+           :obj:`tuple`
+
+        """
+        #PYVER: Python 2.7 type(value_spec) would just give <type 'instance'>
+        if isinstance(value_spec, Reference):
+            component = self._assembler._context.get_component(value_spec)
+            if (component is not None and
+                    component.strategy in self._resolved_once):
+                return (self._assembler.assemble(value_spec), False)
+        elif not isinstance(value_spec, (Evaluator, partial)):
+            return (value_spec, False)
+        self._dynamic = True
+        return (value_spec, True)
+
+    def _create(self):
+        """Create, initialize, and wire a new object from this plan.
+
+        :return: the new object
+
+        """
+        if self._dynamic:
+            assembly = _push_assembly(self._component_id)
+            try:
+                return self._build()
+            finally:
+                _pop_assembly(assembly)
+        return self._build()
+
+    def _build(self):
+        """Create, initialize, and wire a new object from this plan,
+        resolving the dynamic values.
+
+        :return: the new object
+
+        """
+        resolve = self._assembler._resolve_value
+        args = self._args
+        if self._dynamic_args:
+            args = list(args)
+            for (index, arg) in self._dynamic_args:
+                args[index] = resolve(arg)
+        keywords = self._keywords
+        if self._dynamic_keywords:
+            keywords = dict(keywords)
+            for (name, keyword) in self._dynamic_keywords:
+                keywords[name] = resolve(keyword)
+        started = perf_counter()
+        try:
+            # issues/2: always use the __call__ protocol to initialize
+            obj = self._initializer(*args, **keywords)
+        except Exception as e:
+            raise AglyphError(
+                "failed to initialize object of component %r" %
+                    self._component_id,
+                e)
+        constructions = self._constructions
+        constructions[0] += 1
+        constructions[1] += perf_counter() - started
+        for (attr_name, attr_value, dynamic) in self._attributes:
+            # see Assembler._wire
+            obj_attr = getattr(obj, attr_name, None)
+            if dynamic:
+                attr_value = resolve(attr_value)
+            if callable(obj_attr):
+                obj_attr(attr_value)
+            else:
+                setattr(obj, attr_name, attr_value)
+        if self._after_inject:
+            self._assembler._call_lifecycle_method(
+                "after_inject", obj, self._component_id)
+        return obj
+
+    def __str__(self):
+        return "<%s %r @%08x>" % (
+            name_of(self.__class__), self._component_id, id(self))
+
+    def __repr__(self):
+        return "%s.%s(%r, %r)" % (
+            self.__class__.__module__, name_of(self.__class__),
+            self._assembler, self._component_id)
+
+
+@traced
+@logged
+class _Prefetcher(object):
+    """A bounded queue of pre-assembled objects of one component, kept
+    topped up by a background thread.
+
+    .. versionadded:: 3.1.0
+
+    """
+
+    def __init__(self, component_id, create, depth, idle_seconds=None):
+        """
+        :arg str component_id: the prefetched component's unique ID
+        :arg create: a no-argument callable that creates an object
+        :arg int depth: the maximum number of queued objects
+        :keyword float idle_seconds:
+           the number of seconds without a :meth:`take` after which the
+           background thread discards the queue and exits
+
+        """
+        #PYVER: arguments to super() are implicit in Python 3
+        super(_Prefetcher, self).__init__()
+        self._component_id = component_id
+        self._create = create
+        self._depth = depth
+        self._idle_seconds = idle_seconds
+        self._queue = deque()
+        self._condition = threading_.Condition(threading_.Lock())
+        self._thread = None
+        self._stopped = False
+        # set when a creation fails; the thread is then not restarted (a
+        # component that keeps failing would otherwise be created, and its
+        # failure logged, once more for every miss)
+        self._failed = False
+        # incremented by drain() so that an object created from stale
+        # dependencies while the queue was drained is discarded
+        self._generation = 0
+        self._last_take = perf_counter()
+        self._hits = 0
+        self._misses = 0
+        self._refills = 0
+        self._refill_seconds = 0.0
+
+    def start(self):
+        """Start the background thread (if it is not running)."""
+        with self._condition:
+            self._start()
+
+    def _start(self):
+        """Start the background thread (if it is not running).
+
+        .. note::
+           The caller must hold the condition lock.
+
+        """
+        if self._thread is None and not (self._stopped or self._failed):
+            self._thread = threading_.Thread(
+                target=self._run,
+                name="aglyph-prefetch-%s" % self._component_id)
+            self._thread.daemon = True
+            self._thread.start()
+
+    def take(self):
+        """Return a queued object, or :data:`_EMPTY` if none is ready.
+
+        The background thread is signalled to create a replacement (and
+        started if it has exited, unless it exited because a creation
+        failed).
+
+        """
+        with self._condition:
+            self._last_take = perf_counter()
+            if self._queue:
+                obj = self._queue.popleft()
+                self._hits += 1
+            else:
+                obj = _EMPTY
+                self._misses += 1
+            self._start()
+            self._condition.notify()
+        return obj
+
+    def drain(self):
+        """Discard all queued objects."""
+        with self._condition:
+            self._queue.clear()
+            self._generation += 1
+            self._condition.notify()
+
+    def stop(self):
+        """Discard all queued objects and stop the background thread."""
+        with self._condition:
+            self._stopped = True
+            self._queue.clear()
+            self._generation += 1
+            self._condition.notify()
+
+    def after_fork(self):
+        """Reinitialize this prefetcher in a forked child process."""
+        self._condition = threading_.Condition(threading_.Lock())
+        self._thread = None
+        self._queue.clear()
+        self._generation += 1
+
+    def counters(self):
+        """Return the hit, miss, and refill counters.
+
+        :rtype: :obj:`dict`
+
+        """
+        with self._condition:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "refills": self._refills,
+                "refill_seconds": self._refill_seconds,
+            }
+
+    def _run(self):
+        """Keep the queue topped up until stopped or idle."""
+        condition = self._condition
+        while True:
+            with condition:
+                while not self._stopped and len(self._queue) >= self._depth:
+                    if self._idle():
+                        break
+                    condition.wait(self._idle_remaining())
+                if self._stopped or self._idle():
+                    self._queue.clear()
+                    self._thread = None
+                    self.__log.info(
+                        "stopped prefetching %r", self._component_id)
+                    return
+                generation = self._generation
+
+            started = perf_counter()
+            try:
+                obj = self._create()
+            except Exception as e:
+                msg = (
+                    "prefetch of %r failed; stopped prefetching until it "
+                        "is enabled again (%s: %s)")
+                self.__log.exception(
+                    msg, self._component_id, e.__class__.__name__, e)
+                with condition:
+                    self._failed = True
+                    self._thread = None
+                # the caller that next misses will see the exception
+                return
+            elapsed = perf_counter() - started
+
+            with condition:
+                self._refills += 1
+                self._refill_seconds += elapsed
+                if generation == self._generation and not self._stopped:
+                    self._queue.append(obj)
+            obj = None
+
+    def _idle(self):
+        """Tell whether no object has been taken for longer than the
+        idle cutoff.
+
+        """
+        return (
+            self._idle_seconds is not None and
+            perf_counter() - self._last_take >= self._idle_seconds)
+
+    def _idle_remaining(self):
+        """Return the seconds until the idle cutoff, or ``None``."""
+        if self._idle_seconds is None:
+            return None
+        return max(
+            self._idle_seconds - (perf_counter() - self._last_take), 0.001)
+
+    def __str__(self):
+        return "<%s %r @%08x>" % (
+            name_of(self.__class__), self._component_id, id(self))
+
+    def __repr__(self):
+        return "%s.%s(%r, %r, %r, idle_seconds=%r)" % (
+            self.__class__.__module__, name_of(self.__class__),
+            self._component_id, self._create, self._depth,
+            self._idle_seconds)
+
+
+@traced
+@logged
+class _StripedCounters(object):
+    """Per-key ``[count, total]`` accumulators that many threads can
+    update without contending for one lock.
+
+    Each thread adds to one of several *stripes* (each with its own
+    lock), and the stripes are summed when the totals are read. Without
+    a global interpreter lock (free-threaded CPython), threads that
+    record constructions on different cores then rarely wait for one
+    another.
+
+    .. versionadded:: 3.1.0
+
+    """
+
+    def __init__(self, stripes=16):
+        """
+        :keyword int stripes: the number of stripes
+
+        """
+        #PYVER: arguments to super() are implicit in Python 3
+        super(_StripedCounters, self).__init__()
+        self._stripes = [(threading_.Lock(), {}) for _ in range(stripes)]
+        # threads are assigned stripes round-robin (an occasional duplicate
+        # number from a concurrent next() only unbalances the stripes)
+        self._next_stripe = count()
+        self._local = threading_.local()
+
+    def add(self, key, count_, total):
+        """Add *count_* and *total* to the accumulators of *key*.
+
+        :arg key: a dictionary key (e.g. a component ID)
+        :arg int count_: the number to add to the count
+        :arg float total: the amount to add to the total
+
+        """
+        stripe = getattr(self._local, "stripe", None)
+        if stripe is None:
+            stripe = self._local.stripe = self._stripes[
+                next(self._next_stripe) % len(self._stripes)]
+        (lock, counters) = stripe
+        with lock:
+            counter = counters.get(key)
+            if counter is None:
+                counter = counters[key] = [0, 0.0]
+            counter[0] += count_
+            counter[1] += total
+
+    def totals(self):
+        """Return the sums of the stripes.
+
+        :rtype: :obj:`dict` of key to ``[count, total]``
+
+        """
+        totals = {}
+        for (lock, counters) in self._stripes:
+            with lock:
+                for (key, (count_, total)) in counters.items():
+                    summed = totals.get(key)
+                    if summed is None:
+                        totals[key] = [count_, total]
+                    else:
+                        summed[0] += count_
+                        summed[1] += total
+        return totals
+
+    def after_fork(self):
+        """Replace the stripe locks with new (unheld) locks.
+
+        .. warning::
+           This method is only safe to call in a forked child process
+           before any other thread has been started.
+
+        """
+        self._stripes = [
+            (threading_.Lock(), counters)
+            for (_, counters) in self._stripes]
+        self._local = threading_.local()
+
+    def __str__(self):
+        return "<%s @%08x>" % (name_of(self.__class__), id(self))
+
+    def __repr__(self):
+        return "%s.%s(%d)" % (
+            self.__class__.__module__, name_of(self.__class__),
+            len(self._stripes))
+
+
+#: The backoff of a failing component doubles after each consecutive
+#: failure, up to this multiple of :attr:`Component.backoff`.
+_MAX_BACKOFF_FACTOR = 64
+
+
+@traced
+@logged
+class _FailureCache(object):
+    """Remembers the initialization failures of components that specify
+    a :attr:`aglyph.component.Component.backoff`, so that assembly of
+    such a component fails fast until its backoff expires.
+
+    .. versionadded:: 3.1.0
+
+    """
+
+    def __init__(self):
+        #PYVER: arguments to super() are implicit in Python 3
+        super(_FailureCache, self).__init__()
+        self._lock = threading_.Lock()
+        # {component ID: (consecutive failures, retry time, cause)}
+        self._failures = {}
+        # {component ID: [failures, rejections]} (never reset)
+        self._counters = {}
+
+    def check(self, component_id):
+        """Raise :exc:`aglyph.AglyphError` if *component_id* is backing
+        off after a failed initialization.
+
+        :arg str component_id: a component unique ID
+
+        Once the backoff has expired, the next initialization is
+        allowed (and decides whether the backoff is reset or extended).
+
+        """
+        failure = self._failures.get(component_id)
+        if failure is None:
+            return
+        (failures, retry_at, cause) = failure
+        remaining = retry_at - perf_counter()
+        if remaining <= 0:
+            return
+        with self._lock:
+            self._counters[component_id][1] += 1
+        raise AglyphError(
+            "component %r is backing off for %.3fs after %d consecutive "
+                "initialization failure(s) (%s: %s)" % (
+                    component_id, remaining, failures,
+                    cause.__class__.__name__, cause),
+            cause)
+
+    def failed(self, component_id, backoff, cause):
+        """Remember that the initializer of *component_id* raised
+        *cause*, and begin (or extend) its backoff.
+
+        :arg str component_id: a component unique ID
+        :arg float backoff: the component's initial backoff in seconds
+        :arg Exception cause: the exception raised by the initializer
+
+        """
+        with self._lock:
+            failure = self._failures.get(component_id)
+            failures = failure[0] + 1 if failure is not None else 1
+            # "equal jitter": wait at least half of the exponential backoff
+            delay = min(
+                backoff * 2 ** (failures - 1),
+                backoff * _MAX_BACKOFF_FACTOR) * random.uniform(0.5, 1.0)
+            self._failures[component_id] = (
+                failures, perf_counter() + delay, cause)
+            self._counters.setdefault(component_id, [0, 0])[0] += 1
+        self.__log.warning(
+            "initialization of %r failed %d consecutive time(s); backing off "
+                "for %.3fs", component_id, failures, delay)
+
+    def succeeded(self, component_id):
+        """Reset the backoff of *component_id* after a successful
+        initialization.
+
+        :arg str component_id: a component unique ID
+
+        """
+        if component_id in self._failures:
+            with self._lock:
+                self._failures.pop(component_id, None)
+            self.__log.info("initialized %r; backoff reset", component_id)
+
+    def forget(self, component_ids):
+        """Reset the backoff of each component in *component_ids*, so
+        that its next assembly calls its initializer.
+
+        :arg component_ids: an iterable of component unique IDs
+
+        """
+        with self._lock:
+            for component_id in component_ids:
+                self._failures.pop(component_id, None)
+
+    def after_fork(self):
+        """Reinitialize this failure cache in a forked child process."""
+        self._lock = threading_.Lock()
+
+    def statistics(self):
+        """Return the backoff statistics.
+
+        :return:
+           a mapping of each backoff statistic name (see
+           :attr:`Assembler.statistics`) to a mapping of component ID to
+           value
+        :rtype: :obj:`dict`
+
+        """
+        now = perf_counter()
+        with self._lock:
+            states = {}
+            for component_id in self._counters:
+                failure = self._failures.get(component_id)
+                if failure is None:
+                    states[component_id] = "closed"
+                elif failure[1] > now:
+                    states[component_id] = "open"
+                else:
+                    states[component_id] = "half-open"
+            return {
+                "backoff_states": states,
+                "backoff_failures": dict(
+                    (component_id, counters[0])
+                    for (component_id, counters) in self._counters.items()),
+                "backoff_rejections": dict(
+                    (component_id, counters[1])
+                    for (component_id, counters) in self._counters.items()),
+            }
+
+    def __str__(self):
+        return "<%s @%08x>" % (name_of(self.__class__), id(self))
+
+    def __repr__(self):
+        return "%s.%s()" % (
+            self.__class__.__module__, name_of(self.__class__))
@@ -0,0 +1,1880 @@
+# -*- coding: UTF-8 -*-
+
+# Copyright (c) 2006, 2011, 2013-2018 Matthew Zipay.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use,
+# copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following
+# conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+# OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+"""The Aglyph compiler translates a :class:`aglyph.context.Context` into
+the source code of a Python module.
+
+The generated module defines an ``Assembler`` class (a subclass of
+:class:`CompiledAssembler`) that has one straight-line factory method
+per component. Each factory method imports its initializer, resolves
+its arguments and attributes, and calls its lifecycle methods directly,
+with any singleton, borg, or weakref caching written inline. No
+component definitions are consulted at runtime.
+
+A compiled assembler is a drop-in replacement for an
+:class:`aglyph.assembler.Assembler` of the same context::
+
+   $ python -m aglyph compile my-context.xml -o my_wiring.py
+
+   >>> from my_wiring import Assembler
+   >>> assembler = Assembler()
+   >>> app = assembler.assemble("my-app")
+
+.. versionadded:: 3.1.0
+
+"""
+
+__author__ = "Matthew Zipay <mattz@ninthtest.info>"
+
+from functools import partial
+import gc
+from itertools import count, repeat
+import keyword
+import logging
+import math
+import os
+import warnings
+
+from aglyph import (
+    AglyphError,
+    format_dotted_name,
+    _identify,
+    __version__,
+)
+from aglyph._compat import (
+    is_python_3,
+    is_string,
+    logged,
+    name_of,
+    TextType,
+    traced,
+)
+from aglyph.assembler import (
+    Assembler,
+    _assemblers,
+    _at_fork_registered,
+    _assemble_within,
+    _assembling,
+    _attach_shared_data,
+    _cache_soft,
+    _component_filename,
+    _creating,
+    _dump_constructions,
+    _EMPTY,
+    _evict_objects,
+    _eviction_order,
+    _FailureCache,
+    futures_,
+    _graph_scope,
+    _has_threading,
+    _measure_soft,
+    _memory_usage,
+    _pop_assembly,
+    _prefetch_statistics,
+    _Prefetcher,
+    _publish_shared_data,
+    _push_assembly,
+    _read_snapshot,
+    _ReentrantMutexCache,
+    _resolve_concurrently,
+    _reverse_dependencies,
+    _shared_data_filename,
+    _snapshot_key,
+    _soft_statistics,
+    threading_,
+    _trim_soft,
+    _unpublish_shared_data,
+    _write_snapshot,
+)
+from aglyph.component import Evaluator, Reference, Strategy
+
+__all__ = ["compile_context", "CompiledAssembler"]
+
+_log = logging.getLogger(__name__)
+
+#PYVER: the builtins module is named __builtin__ in Python 2
+_builtins = __import__("builtins" if is_python_3 else "__builtin__")
+
+#: Scalar types whose :func:`repr` is a Python literal.
+_LITERAL_TYPES = tuple(
+    set([bool, int, float, complex, type(None), TextType, bytes, str]) |
+    set([getattr(_builtins, "long", int), getattr(_builtins, "unicode", str)]))
+
+#: Returned by :meth:`_ContextCompiler._find_cycle` when assembly would
+#: fail with a :class:`KeyError` before any circular dependency is found.
+_UNDEFINED = object()
+
+
+def _call_in_graph(factory, component_id, assembler):
+    """Call *factory* for *component_id* as an outermost assembly, so
+    that every reference it makes to a "graph" component resolves to
+    the same object.
+
+    :arg factory: a generated factory method of *assembler*
+    :arg str component_id: the unique ID of the component to assemble
+    :arg aglyph.compiler.CompiledAssembler assembler:
+       the assembler of *factory*
+
+    """
+    assembly = _push_assembly(component_id)
+    try:
+        return factory(assembler)
+    finally:
+        _pop_assembly(assembly)
+
+
+@traced
+@logged
+class CompiledAssembler(object):
+    """The base class for the ``Assembler`` class of a compiled context
+    module.
+
+    A ``CompiledAssembler`` provides the same public interface as
+    :class:`aglyph.assembler.Assembler`, but its components are
+    assembled by factory methods that are generated by
+    :func:`compile_context`.
+
+    .. versionadded:: 3.1.0
+
+    .. note::
+       Circular dependencies are detected when the context is compiled.
+       Assembling a component that has a circular dependency raises the
+       same :class:`aglyph.AglyphError` as the interpreted assembler,
+       but no other components are assembled first.
+
+    """
+
+    #: The ID of the compiled context (set by the generated subclass).
+    context_id = None
+
+    # the following are set by the generated subclass
+    _factories = {}
+    _masters = {}
+    _component_ids = {}
+    _before_clear = {}
+    _after_fork = {}
+    _snapshot_definitions = {}
+    _shared_definitions = {}
+    _dependents = {}
+    _timeouts = {}
+
+    def __init__(
+            self, shared_dir=None, snapshot_dir=None, memory_budget=None,
+            parallel=False, max_workers=None):
+        """
+        :keyword str shared_dir:
+           the directory to which the data of "shared" components is
+           published
+        :keyword str snapshot_dir:
+           the directory in which the objects of snapshot components
+           are persisted
+        :keyword int memory_budget:
+           the process memory usage, in bytes, above which cached
+           "soft" component objects are evicted
+        :keyword bool parallel:
+           whether the referenced initialization arguments of every
+           component are assembled concurrently
+        :keyword int max_workers:
+           the maximum number of threads that assemble references
+           concurrently
+        :raise ValueError:
+           if *memory_budget* or *max_workers* is not a positive number
+
+        .. seealso:: :class:`aglyph.assembler.Assembler`
+
+        """
+        #PYVER: arguments to super() are implicit in Python 3
+        super(CompiledAssembler, self).__init__()
+        if memory_budget is not None and memory_budget <= 0:
+            raise ValueError(
+                "memory budget must be positive (not %r)" % memory_budget)
+        if max_workers is not None and max_workers <= 0:
+            raise ValueError(
+                "max workers must be positive (not %r)" % max_workers)
+        self._shared_dir = shared_dir
+        self._snapshot_dir = snapshot_dir
+        self._caches = {
+            "singleton": _ReentrantMutexCache(),
+            "borg": _ReentrantMutexCache(),
+            "weakref": _ReentrantMutexCache(),
+            "shared": _ReentrantMutexCache(),
+            "clone": _ReentrantMutexCache(),
+            "soft": _ReentrantMutexCache(),
+        }
+        # shortcuts for the generated factory methods
+        self._singletons = self._caches["singleton"]
+        self._borgs = self._caches["borg"]
+        self._weakrefs = self._caches["weakref"]
+        self._shared = self._caches["shared"]
+        self._clones = self._caches["clone"]
+        self._softs = self._caches["soft"]
+        self._shared_published = {}
+        self._memory_budget = memory_budget
+        self._soft_costs = {}
+        self._soft_used = {}
+        self._soft_clock = count()
+        self._soft_evictions = {}
+        # {component ID: strategy} of the components whose objects are cached
+        self._cached_strategies = dict(
+            (component_id, strategy)
+            for (strategy, component_ids) in self._component_ids.items()
+            if strategy not in ["prototype", "graph"]
+            for component_id in component_ids)
+        # graph objects are only shared while a top-level factory runs
+        self._graph_scoped = bool(self._component_ids.get("graph"))
+        # {component ID: _Prefetcher} (replaced, never modified)
+        self._prefetchers = {}
+        # {component ID: [snapshot hits, snapshot misses]}
+        self._snapshots = {}
+        self._snapshots_lock = threading_.Lock()
+        self._failures = _FailureCache()
+        self._constructing = {}
+        self._waiting = {}
+        self._parallel = bool(parallel)
+        self._max_workers = max_workers
+        self._executor = None
+        self._executor_lock = threading_.Lock()
+        self._pid = os.getpid()
+        _assemblers.add(self)
+        if memory_budget is not None and _memory_usage() is None:
+            self.__log.warning(
+                "memory usage cannot be measured; memory budget of %s "
+                    "will NOT be enforced", self)
+        if parallel and futures_ is None:
+            self.__log.warning(
+                "concurrent.futures is not available; %s will assemble "
+                    "references sequentially", self)
+        self.__log.info("initialized %s", self)
+
+    @property
+    def memory_budget(self):
+        """The process memory usage, in bytes, above which cached
+        "soft" component objects are evicted *(read-only)*.
+
+        .. seealso:: :attr:`aglyph.assembler.Assembler.memory_budget`
+
+        """
+        return self._memory_budget
+
+    @property
+    def parallel(self):
+        """Whether or not the referenced initialization arguments of
+        every component are assembled concurrently *(read-only)*.
+
+        .. seealso:: :attr:`aglyph.assembler.Assembler.parallel`
+
+        """
+        return self._parallel
+
+    @property
+    def statistics(self):
+        """A snapshot of the assembly statistics *(read-only)*.
+
+        .. seealso:: :attr:`aglyph.assembler.Assembler.statistics`
+
+        .. note::
+           Construction counts and times are not recorded by compiled
+           factory methods, so only the cache sizes, snapshot hits and
+           misses, prefetch counters, memory budget statistics, and
+           backoff statistics are reported.
+
+        """
+        with self._snapshots_lock:
+            snapshot_hits = dict(
+                (component_id, stats[0])
+                for (component_id, stats) in self._snapshots.items())
+            snapshot_misses = dict(
+                (component_id, stats[1])
+                for (component_id, stats) in self._snapshots.items())
+        statistics = {
+            "constructions": {},
+            "construction_seconds": {},
+            "snapshot_hits": snapshot_hits,
+            "snapshot_misses": snapshot_misses,
+            "cache_sizes": dict(
+                (strategy, len(cache))
+                for (strategy, cache) in self._caches.items()),
+        }
+        statistics.update(_prefetch_statistics(self._prefetchers))
+        statistics.update(_soft_statistics(self))
+        statistics.update(self._failures.statistics())
+        return statistics
+
+    def dump_constructions(self):
+        """Return a report of the component objects that are currently
+        being constructed.
+
+        .. seealso:: :meth:`aglyph.assembler.Assembler.dump_constructions`
+
+        """
+        return _dump_constructions(self._constructing)
+
+    def assemble(self, component_spec, timeout=None):
+        """Create an object identified by *component_spec* and inject
+        its dependencies.
+
+        :arg component_spec:
+           a unique component ID, or an object whose dotted name is a
+           unique component ID
+        :keyword float timeout:
+           the maximum number of seconds to wait for objects that are
+           being constructed by other threads
+        :return:
+           a complete object with all of its resolved dependencies
+        :raise KeyError:
+           if *component_spec* does not identify a component in the
+           compiled context
+        :raise aglyph.AglyphError:
+           if *component_spec* causes a circular dependency, or if a
+           timeout expires
+
+        .. seealso:: :meth:`aglyph.assembler.Assembler.assemble`
+
+        """
+        if not _at_fork_registered and self._pid != os.getpid():
+            self.after_fork()
+        component_id = _identify(component_spec)
+        # a prefetched object was assembled (with its own graph objects)
+        # outside of any assembly in progress
+        if self._prefetchers and not _assembling():
+            prefetcher = self._prefetchers.get(component_id)
+            if prefetcher is not None:
+                obj = prefetcher.take()
+                if obj is not _EMPTY:
+                    return obj
+        factory = self._factories.get(component_id)
+        if factory is None:
+            raise KeyError(
+                "component %r is not defined in %s" % (component_id, self))
+        factory = self._scoped(factory, component_id)
+        if timeout is not None:
+            return _assemble_within(
+                timeout, lambda component_id: factory(self), component_id)
+        return factory(self)
+
+    def assemble_many(self, component_spec, count):
+        """Create *count* objects identified by *component_spec*.
+
+        .. seealso:: :meth:`aglyph.assembler.Assembler.assemble_many`
+
+        """
+        return list(self.iter_assemble(component_spec, count))
+
+    def iter_assemble(self, component_spec, count=None):
+        """Return an iterator over objects identified by
+        *component_spec*.
+
+        .. seealso:: :meth:`aglyph.assembler.Assembler.iter_assemble`
+
+        .. note::
+           The generated factory methods already resolve their
+           initializers once, so each object is created by the
+           component's factory method.
+
+        """
+        if not _at_fork_registered and self._pid != os.getpid():
+            self.after_fork()
+        component_id = _identify(component_spec)
+        factory = self._factories.get(component_id)
+        if factory is None:
+            raise KeyError(
+                "component %r is not defined in %s" % (component_id, self))
+        return self._iterate(self._scoped(factory, component_id), count)
+
+    def _iterate(self, factory, count):
+        """Call *factory* *count* times (or indefinitely if *count* is
+        ``None``), generating the created objects.
+
+        """
+        if count is None:
+            while True:
+                yield factory(self)
+        else:
+            for _ in repeat(None, count):
+                yield factory(self)
+
+    def assemble_all(self, component_specs):
+        """Create one object for each of *component_specs*.
+
+        .. seealso:: :meth:`aglyph.assembler.Assembler.assemble_all`
+
+        """
+        if not _at_fork_registered and self._pid != os.getpid():
+            self.after_fork()
+        objs = []
+        for component_spec in component_specs:
+            component_id = _identify(component_spec)
+            factory = self._factories.get(component_id)
+            if factory is None:
+                raise KeyError(
+                    "component %r is not defined in %s" %
+                        (component_id, self))
+            objs.append(self._scoped(factory, component_id)(self))
+        return objs
+
+    def init_singletons(self):
+        """Assemble and cache all singleton component objects.
+
+        .. seealso:: :meth:`aglyph.assembler.Assembler.init_singletons`
+
+        """
+        return self._init_cache("singleton")
+
+    def clear_singletons(self):
+        """Evict all cached singleton (and shared) component objects.
+
+        .. seealso:: :meth:`aglyph.assembler.Assembler.clear_singletons`
+
+        """
+        return self._clear_cache("singleton") + self._clear_shared()
+
+    def init_borgs(self):
+        """Assemble and cache the shared-states for all borg component
+        objects.
+
+        .. seealso:: :meth:`aglyph.assembler.Assembler.init_borgs`
+
+        """
+        return self._init_cache("borg")
+
+    def clear_borgs(self):
+        """Evict all cached borg component shared-states.
+
+        .. seealso:: :meth:`aglyph.assembler.Assembler.clear_borgs`
+
+        """
+        return self._clear_cache("borg")
+
+    def clear_clones(self):
+        """Evict all cached clone component master objects.
+
+        .. seealso:: :meth:`aglyph.assembler.Assembler.clear_clones`
+
+        """
+        return self._clear_cache("clone")
+
+    def clear_softs(self):
+        """Evict all cached soft component objects.
+
+        .. seealso:: :meth:`aglyph.assembler.Assembler.clear_softs`
+
+        """
+        return self._clear_cache("soft")
+
+    def enforce_memory_budget(self):
+        """Evict the least recently used soft component objects until
+        memory usage is (estimated to be) within the memory budget.
+
+        .. seealso::
+           :meth:`aglyph.assembler.Assembler.enforce_memory_budget`
+
+        """
+        return _trim_soft(self)
+
+    def clear_weakrefs(self):
+        """Evict all cached weakref component objects.
+
+        .. seealso:: :meth:`aglyph.assembler.Assembler.clear_weakrefs`
+
+        """
+        with self._caches["weakref"] as cache:
+            cleared_weakref_ids = []
+            try:
+                for weakref_id in list(cache.keys()):
+                    obj = cache.pop(weakref_id)()
+                    if obj is not None:
+                        self._call_lifecycle_method(
+                            "before_clear", obj, weakref_id)
+                        cleared_weakref_ids.append(weakref_id)
+                        obj = None
+            finally:
+                cache.clear()
+        return cleared_weakref_ids
+
+    def evict(self, component_spec, cascade=True):
+        """Evict the cached object of a single component and (by
+        default) the cached objects of all components that depend on it.
+
+        .. seealso:: :meth:`aglyph.assembler.Assembler.evict`
+
+        """
+        component_id = _identify(component_spec)
+        if component_id not in self._factories:
+            raise KeyError(
+                "component %r is not defined in %s" % (component_id, self))
+        component_ids = (
+            _eviction_order([component_id], self._dependents) if cascade
+            else [component_id])
+        evicted_ids = _evict_objects(self, [
+            (component_id, self._cached_strategies[component_id])
+            for component_id in component_ids
+            if component_id in self._cached_strategies])
+        self._drain_prefetched(component_ids)
+        self._failures.forget(component_ids)
+        return evicted_ids
+
+    def enable_prefetch(self, component_spec, depth, idle_seconds=None):
+        """Keep a queue of pre-assembled objects of a "prototype"
+        component, refilled by a background thread.
+
+        .. seealso:: :meth:`aglyph.assembler.Assembler.enable_prefetch`
+
+        """
+        if not _has_threading:
+            raise AglyphError("prefetching requires the threading module")
+        component_id = _identify(component_spec)
+        factory = self._factories.get(component_id)
+        if factory is None:
+            raise KeyError(
+                "component %r is not defined in %s" % (component_id, self))
+        if component_id not in self._component_ids.get("prototype", ()):
+            raise AglyphError(
+                "cannot prefetch component %r (only prototype components "
+                    "may be prefetched)" % component_id)
+        if depth < 1:
+            raise ValueError("prefetch depth must be at least 1")
+        prefetcher = _Prefetcher(
+            component_id, partial(factory, self), depth, idle_seconds)
+        self._replace_prefetcher(component_id, prefetcher)
+        prefetcher.start()
+
+    def disable_prefetch(self, component_spec):
+        """Stop prefetching objects of a component.
+
+        .. seealso:: :meth:`aglyph.assembler.Assembler.disable_prefetch`
+
+        """
+        self._replace_prefetcher(_identify(component_spec), None)
+
+    def _replace_prefetcher(self, component_id, prefetcher):
+        """Replace (and stop) the prefetcher of *component_id*.
+
+        .. seealso::
+           :meth:`aglyph.assembler.Assembler._replace_prefetcher`
+
+        """
+        prefetchers = dict(self._prefetchers)
+        if prefetcher is None:
+            old_prefetcher = prefetchers.pop(component_id, None)
+        else:
+            old_prefetcher = prefetchers.get(component_id)
+            prefetchers[component_id] = prefetcher
+        self._prefetchers = prefetchers
+        if old_prefetcher is not None:
+            old_prefetcher.stop()
+
+    def _drain_prefetched(self, component_ids):
+        """Discard the queued objects of the prefetched components in
+        *component_ids*.
+
+        """
+        prefetchers = self._prefetchers
+        for component_id in component_ids:
+            prefetcher = prefetchers.get(component_id)
+            if prefetcher is not None:
+                prefetcher.drain()
+
+    def warm_up(self, freeze=False):
+        """Assemble and cache all singleton component objects, borg
+        component shared-states, shared component data, and clone
+        component master objects.
+
+        .. seealso:: :meth:`aglyph.assembler.Assembler.warm_up`
+
+        """
+        component_ids = (
+            self.init_singletons() + self.init_borgs() +
+            self._init_cache("shared") + self._init_cache("clone"))
+        if freeze:
+            #PYVER: gc.freeze is not available in Python < 3.7
+            if hasattr(gc, "freeze"):
+                gc.collect()
+                gc.freeze()
+            else:
+                self.__log.warning(
+                    "gc.freeze() is not available; objects NOT frozen")
+        return component_ids
+
+    def after_fork(self):
+        """Reinitialize this assembler in a forked child process.
+
+        .. seealso:: :meth:`aglyph.assembler.Assembler.after_fork`
+
+        """
+        self._pid = os.getpid()
+        self._snapshots_lock = threading_.Lock()
+        for cache in self._caches.values():
+            cache.reset_locks()
+        self._shared_published = {}
+        for prefetcher in self._prefetchers.values():
+            prefetcher.after_fork()
+        self._failures.after_fork()
+        self._constructing = {}
+        self._waiting = {}
+        self._executor = None
+        self._executor_lock = threading_.Lock()
+
+        evicted_ids = []
+        for strategy in ["singleton", "borg", "weakref", "clone", "soft"]:
+            with self._caches[strategy] as cache:
+                for component_id in list(cache.keys()):
+                    obj = cache[component_id]
+                    if strategy == "weakref":
+                        obj = obj()
+                        if obj is None:
+                            cache.pop(component_id)
+                            continue
+                    if not self._call_lifecycle_method(
+                            "after_fork", obj, component_id):
+                        cache.pop(component_id)
+                        evicted_ids.append(component_id)
+                    obj = None
+        return evicted_ids
+
+    def __reduce__(self):
+        """Return the pickled form of this assembler.
+
+        .. seealso:: :meth:`aglyph.assembler.Assembler.__reduce__`
+
+        .. note::
+           Only the generated ``Assembler`` class is pickled (by
+           reference), so the compiled context module must be importable
+           in the process that unpickles the assembler.
+
+        """
+        return (
+            self.__class__,
+            (self._shared_dir, self._snapshot_dir, self._memory_budget,
+                self._parallel, self._max_workers))
+
+    def _creating(self, lock, component_id, timeout):
+        """Return a context manager that holds the creation *lock* of
+        *component_id*.
+
+        .. seealso:: :meth:`aglyph.assembler.Assembler._creating`
+
+        """
+        return _creating(self, lock, component_id, timeout)
+
+    def _scoped(self, factory, component_id):
+        """Return *factory*, made to share "graph" objects among all of
+        the references that it assembles if this assembler has any
+        graph components.
+
+        """
+        if self._graph_scoped:
+            return partial(_call_in_graph, factory, component_id)
+        return factory
+
+    def _graph(self):
+        """Return the "graph" component objects of the outermost
+        assembly.
+
+        .. seealso:: :meth:`aglyph.assembler.Assembler._create_graph`
+
+        """
+        return _graph_scope()
+
+    def _assemble_concurrently(self, resolvers):
+        """Call each of *resolvers* concurrently and return their
+        results, in order.
+
+        .. seealso::
+           :meth:`aglyph.assembler.Assembler._assemble_concurrently`
+
+        """
+        return _resolve_concurrently(self, resolvers)
+
+    def _measure_soft(self):
+        """Return the memory usage before a soft object is created, or
+        ``None`` if this assembler has no memory budget.
+
+        """
+        return _measure_soft(self)
+
+    def _cache_soft(self, component_id, obj, usage):
+        """Cache the soft object *obj* of *component_id*, and then
+        enforce the memory budget.
+
+        """
+        _cache_soft(self, component_id, obj, usage)
+
+    def _attach_shared(self, component_id):
+        """Return a view of the data published for *component_id*, or
+        ``None`` if no data has been published.
+
+        .. seealso:: :meth:`aglyph.assembler.Assembler._attach_shared`
+
+        """
+        return _attach_shared_data(self._shared_filename(component_id))
+
+    def _publish_shared(self, component_id, data):
+        """Publish *data* for *component_id*, and return a view of the
+        published data.
+
+        .. seealso:: :meth:`aglyph.assembler.Assembler._publish_shared`
+
+        """
+        filename = self._shared_filename(component_id)
+        identity = _publish_shared_data(filename, data, component_id)
+        self._shared_published[component_id] = (filename, identity)
+        return _attach_shared_data(filename)
+
+    def _shared_filename(self, component_id):
+        """Return the name of the file to which the data of
+        *component_id* is published.
+
+        .. seealso:: :meth:`aglyph.assembler.Assembler._shared_filename`
+
+        """
+        return _shared_data_filename(
+            self._shared_dir, self.context_id, component_id,
+            self._shared_definitions.get(component_id, ""))
+
+    def _load_snapshot(self, component_id):
+        """Return the object restored from a valid snapshot of
+        *component_id*, or ``None``.
+
+        .. seealso:: :meth:`aglyph.assembler.Assembler._load_snapshot`
+
+        """
+        if self._snapshot_dir is None:
+            return None
+        obj = _read_snapshot(
+            self._snapshot_filename(component_id),
+            self._snapshot_key(component_id))
+        with self._snapshots_lock:
+            stats = self._snapshots.setdefault(component_id, [0, 0])
+            stats[0 if obj is not None else 1] += 1
+        return obj
+
+    def _save_snapshot(self, component_id, obj):
+        """Persist *obj* to a new snapshot of *component_id*.
+
+        .. seealso:: :meth:`aglyph.assembler.Assembler._save_snapshot`
+
+        """
+        if self._snapshot_dir is not None:
+            _write_snapshot(
+                self._snapshot_filename(component_id),
+                self._snapshot_key(component_id), obj, component_id)
+
+    def _snapshot_filename(self, component_id):
+        """Return the name of the snapshot file for *component_id*."""
+        return _component_filename(
+            self._snapshot_dir, self.context_id, component_id, ".snapshot")
+
+    def _snapshot_key(self, component_id):
+        """Return the key that validates a snapshot of *component_id*.
+
+        The definition digest is computed when the context is compiled,
+        but the source of the factory's module is checked at runtime.
+
+        """
+        (definition, dotted_name) = self._snapshot_definitions[component_id]
+        return _snapshot_key(definition, dotted_name)
+
+    def _clear_shared(self):
+        """Evict all cached views of shared component data, and remove
+        the data published by this assembler.
+
+        """
+        with self._shared as cache:
+            component_ids = list(cache.keys())
+            cache.clear()
+            published = self._shared_published
+            self._shared_published = {}
+        for (filename, identity) in published.values():
+            _unpublish_shared_data(filename, identity)
+        return component_ids
+
+    def _init_cache(self, strategy):
+        """Prime the cache for *strategy* objects.
+
+        :arg str strategy: "singleton", "borg", "shared", or "clone"
+
+        """
+        cache = self._caches[strategy]
+        component_ids = []
+        for component_id in self._component_ids.get(strategy, ()):
+            with self._creating(
+                    cache.lock_for(component_id), component_id,
+                    self._timeouts.get(component_id)):
+                if component_id not in cache:
+                    if strategy == "clone":
+                        # only the master is created; no copy is made
+                        self._scoped(
+                            self._masters[component_id], component_id)(self)
+                    else:
+                        self.assemble(component_id)
+                    component_ids.append(component_id)
+        return component_ids
+
+    def _clear_cache(self, strategy):
+        """Evict all objects from the cache for *strategy* objects,
+        calling the "before_clear" lifecycle method for each object.
+
+        :arg str strategy: "singleton", "borg", "clone", or "soft"
+
+        """
+        with self._caches[strategy] as cache:
+            component_ids = list(cache.keys())
+            try:
+                for component_id in component_ids:
+                    obj = cache.pop(component_id)
+                    self._call_lifecycle_method(
+                        "before_clear", obj, component_id)
+                    obj = None
+            finally:
+                cache.clear()
+        return component_ids
+
+    def _call_lifecycle_method(self, lifecycle_state, obj, component_id):
+        """Call the first lifecycle method that *obj* defines.
+
+        :arg str lifecycle_state: "before_clear" or "after_fork"
+        :arg obj: the object on which to call the lifecycle method
+        :arg str component_id: the component unique ID for *obj*
+        :return:
+           ``False`` if the lifecycle method raised an exception, else
+           ``True``
+
+        .. note::
+           "after_inject" and "after_clone" lifecycle methods are called
+           directly by the generated factory methods.
+
+        """
+        method_names = getattr(self, "_%s" % lifecycle_state)
+        for method_name in method_names.get(component_id, ()):
+            obj_lifecycle_method = getattr(obj, method_name, None)
+            if obj_lifecycle_method is not None:
+                try:
+                    obj_lifecycle_method()
+                except Exception as e:
+                    self._lifecycle_method_failed(obj_lifecycle_method, e)
+                    return False
+                break
+        return True
+
+    def _lifecycle_method_failed(self, obj_lifecycle_method, e):
+        """Log and warn that *obj_lifecycle_method* raised *e*.
+
+        :arg obj_lifecycle_method: the bound lifecycle method
+        :arg Exception e: the exception it raised
+
+        """
+        msg = "ignoring %s raised from %r"
+        self.__log.exception(msg, e.__class__.__name__, obj_lifecycle_method)
+        warnings.warn(
+            msg % (e.__class__.__name__, obj_lifecycle_method),
+            RuntimeWarning)
+
+    def _warn_args_ignored(self, component_id):
+        """Warn that the initialization arguments of a member_name
+        component are ignored.
+
+        :arg str component_id: the component unique ID
+
+        """
+        msg = (
+            "ignoring args and keywords for component %r "
+            "(uses member_name assembly)")
+        self.__log.warning(msg, component_id)
+        warnings.warn(msg % component_id, RuntimeWarning)
+
+    def _warn_member_lifecycle(
+            self, component_id, lifecycle_state, member_name, method_name,
+            obj):
+        """Warn that a lifecycle method may be called multiple times on
+        the member object of a member_name component.
+
+        :arg str component_id: the component unique ID
+        :arg str lifecycle_state: the lifecycle state identifier
+        :arg str member_name: the component member name
+        :arg str method_name: the lifecycle method name
+        :arg obj: the member object
+
+        """
+        msg = (
+            "component %r specifies member_name; it is possible that the "
+                "%s %s.%s() method may be called MULTIPLE times on %r")
+        self.__log.warning(
+            msg, component_id, lifecycle_state, member_name, method_name, obj)
+        warnings.warn(
+            msg % (
+                component_id, lifecycle_state, member_name, method_name, obj),
+            RuntimeWarning)
+
+    def __contains__(self, component_spec):
+        """Tell whether or not the component identified by
+        *component_spec* is defined in the compiled context.
+
+        """
+        try:
+            component_id = _identify(component_spec)
+        except:
+            return False
+        else:
+            return component_id in self._factories
+
+    def __str__(self):
+        return "<%s @%08x compiled context %r>" % (
+            name_of(self.__class__), id(self), self.context_id)
+
+    def __repr__(self):
+        return "%s.%s()" % (
+            self.__class__.__module__, name_of(self.__class__))
+
+
+@traced
+def compile_context(context):
+    """Return the source code of a Python module that assembles the
+    components of *context*.
+
+    :arg aglyph.context.Context context:
+       the context to compile
+    :return:
+       the source code of a module that defines an ``Assembler`` class
+       (a subclass of :class:`CompiledAssembler`)
+    :rtype:
+       :obj:`str`
+    :raise aglyph.AglyphError:
+       if a component uses an unrecognized assembly strategy, or if a
+       value in *context* cannot be expressed as Python source code
+
+    Values that can be compiled are Python literals (and containers of
+    literals), :class:`aglyph.component.Reference`,
+    :class:`aglyph.component.Evaluator`, and :func:`functools.partial`
+    objects, and any **importable** class, function, or module (see
+    :func:`aglyph.format_dotted_name`).
+
+    .. versionadded:: 3.1.0
+
+    """
+    return _ContextCompiler(context).compile()
+
+
+@traced
+@logged
+class _ContextCompiler(object):
+    """Generates the source code of a compiled context module."""
+
+    def __init__(self, context):
+        """
+        :arg aglyph.context.Context context: the context to compile
+
+        """
+        #PYVER: arguments to super() are implicit in Python 3
+        super(_ContextCompiler, self).__init__()
+        self._context = context
+        # an interpreted assembler is used to collect args, keywords,
+        # attributes, and lifecycle method names exactly as it would
+        self._assembler = Assembler(context)
+        self._components = list(context.iter_components())
+        self._method_names = dict(
+            (component.unique_id, "_assemble_%d" % i)
+            for (i, component) in enumerate(self._components))
+        # clone components also have a method that returns the master
+        self._master_names = dict(
+            (component.unique_id, "_master_%d" % i)
+            for (i, component) in enumerate(self._components)
+            if component.strategy == Strategy.CLONE)
+        self._module_imports = []
+        self._constants = []
+        self._constant_names = {}
+        self._acyclic = set()
+
+    def compile(self):
+        """Return the generated module source code."""
+        methods = []
+        for component in self._components:
+            methods.extend(self._compile_component(component))
+
+        lines = [
+            "# -*- coding: UTF-8 -*-",
+            "",
+            "# Generated by Aglyph %s from context %r." % (
+                __version__, self._context.context_id),
+            "# DO NOT EDIT. Regenerate with \"python -m aglyph compile\".",
+            "",
+            "\"\"\"Compiled Aglyph assembler for context %r.\"\"\"" %
+                self._context.context_id,
+            "",
+            "from copy import copy as _copy, deepcopy as _deepcopy",
+            "from weakref import ref as _weakref",
+            "",
+            "from aglyph import AglyphError",
+            "from aglyph._compat import new_instance as _new_instance",
+            "from aglyph.compiler import CompiledAssembler",
+        ]
+        lines.extend(self._module_imports)
+        lines.extend(["", "__all__ = [\"Assembler\"]", ""])
+        lines.extend(self._constants)
+        lines.extend([
+            "",
+            "class Assembler(CompiledAssembler):",
+            "",
+            "    context_id = %r" % self._context.context_id,
+            "",
+        ])
+        lines.extend(methods)
+        lines.append("    _factories = {")
+        for component in self._components:
+            lines.append("        %r: %s," % (
+                component.unique_id,
+                self._method_names[component.unique_id]))
+        lines.extend(["    }", "", "    _masters = {"])
+        for component in self._components:
+            if component.strategy == Strategy.CLONE:
+                lines.append("        %r: %s," % (
+                    component.unique_id,
+                    self._master_names[component.unique_id]))
+        lines.extend(["    }", "", "    _component_ids = {"])
+        for strategy in [
+                Strategy.PROTOTYPE, Strategy.SINGLETON, Strategy.BORG,
+                Strategy.WEAKREF, Strategy.SHARED, Strategy.CLONE,
+                Strategy.SOFT, Strategy.GRAPH]:
+            lines.append("        %r: (%s)," % (strategy, "".join(
+                "%r, " % component.unique_id
+                for component in self._components
+                if component.strategy == strategy)))
+        for lifecycle_state in ["before_clear", "after_fork"]:
+            lines.extend(["    }", "", "    _%s = {" % lifecycle_state])
+            for component in self._components:
+                if component.strategy in [
+                        Strategy.SINGLETON, Strategy.BORG, Strategy.WEAKREF,
+                        Strategy.CLONE, Strategy.SOFT]:
+                    names = self._lifecycle_method_names(
+                        lifecycle_state, component)
+                    if names:
+                        lines.append("        %r: %r," % (
+                            component.unique_id, names))
+        lines.extend(["    }", "", "    _dependents = {"])
+        dependents = _reverse_dependencies([self._context])
+        for unique_id in sorted(dependents):
+            lines.append("        %r: (%s)," % (unique_id, "".join(
+                "%r, " % dependent_id
+                for dependent_id in sorted(dependents[unique_id]))))
+        lines.extend(["    }", "", "    _timeouts = {"])
+        for component in self._components:
+            if component.timeout is not None:
+                lines.append("        %r: %r," % (
+                    component.unique_id, component.timeout))
+        lines.extend(["    }", "", "    _snapshot_definitions = {"])
+        for component in self._components:
+            if component.snapshot:
+                lines.append("        %r: (%r, %r)," % (
+                    component.unique_id,
+                    self._assembler._describe_snapshot(component),
+                    component.dotted_name))
+        lines.extend(["    }", "", "    _shared_definitions = {"])
+        for component in self._components:
+            if component.strategy == Strategy.SHARED:
+                lines.append("        %r: %r," % (
+                    component.unique_id,
+                    self._assembler._describe_snapshot(component)))
+        lines.extend(["    }", ""])
+
+        self.__log.info(
+            "compiled %d components of %s", len(self._components),
+            self._context)
+        return "\n".join(lines)
+
+    def _compile_component(self, component):
+        """Return the source lines of the factory method for
+        *component*.
+
+        :arg aglyph.component.Component component:
+           the component definition
+
+        """
+        strategy = component.strategy
+        if strategy not in Strategy and strategy != "_imported":
+            raise AglyphError(
+                "cannot compile component %r: unrecognized assembly "
+                    "strategy %r" % (component.unique_id, strategy))
+
+        lines = [
+            "    def %s(self):" % self._method_names[component.unique_id],
+            "        # %r (%s)" % (component.unique_id, strategy),
+        ]
+
+        if strategy == Strategy.CLONE:
+            # the factory copies the master, which is built (and cached)
+            # by a separate method so that warm_up makes no copies
+            lines[:2] = [
+                "    def %s(self):" % self._master_names[component.unique_id],
+                "        # %r (clone master)" % component.unique_id,
+            ]
+
+        cycle = self._find_cycle(component.unique_id, [])
+        if cycle not in [None, _UNDEFINED]:
+            lines.extend([
+                "        raise AglyphError(",
+                "            %r)" % (
+                    "circular dependency detected: %s" % " > ".join(cycle)),
+                "",
+            ])
+            if strategy == Strategy.CLONE:
+                lines.extend(self._compile_clone(component))
+            return lines
+
+        imports = {}
+        if strategy == Strategy.SINGLETON:
+            lines.extend([
+                "        obj = self._singletons.get(%r)" % component.unique_id,
+                "        if obj is None:",
+                "            " + self._compile_creating(
+                    "self._singletons.lock_for(%r)" % component.unique_id,
+                    component),
+                "                obj = self._singletons.get(%r)" %
+                    component.unique_id,
+                "                if obj is None:",
+            ])
+            if component.snapshot:
+                lines.extend([
+                    "                    obj = self._load_snapshot(%r)" %
+                        component.unique_id,
+                    "                    if obj is None:",
+                ])
+                lines.extend(self._compile_build(component, imports, 20))
+                lines.append(
+                    "                        self._save_snapshot(%r, obj)" %
+                        component.unique_id)
+            else:
+                lines.extend(self._compile_build(component, imports, 16))
+            lines.extend([
+                "                    with self._singletons:",
+                "                        self._singletons[%r] = obj" %
+                    component.unique_id,
+            ])
+        elif strategy == Strategy.BORG:
+            build = self._compile_build(component, imports, 16)
+            lines.extend([
+                "        cached_obj = self._borgs.get(%r)" %
+                    component.unique_id,
+                "        if cached_obj is None:",
+                "            " + self._compile_creating(
+                    "self._borgs.lock_for(%r)" % component.unique_id,
+                    component),
+                "                cached_obj = self._borgs.get(%r)" %
+                    component.unique_id,
+                "                if cached_obj is None:",
+            ])
+            lines.extend(build)
+            lines.extend([
+                "                    with self._borgs:",
+                "                        self._borgs[%r] = obj" %
+                    component.unique_id,
+                "                    return obj",
+            ])
+            lines.extend(self._compile_initializer(component, imports, 8))
+            lines.extend([
+                "        obj = _new_instance(_initializer)",
+                "        obj.__dict__ = cached_obj.__dict__",
+            ])
+        elif strategy == Strategy.SHARED:
+            build = self._compile_build(component, imports, 20)
+            lines.extend([
+                "        obj = self._shared.get(%r)" % component.unique_id,
+                "        if obj is None:",
+                "            " + self._compile_creating(
+                    "self._shared.lock_for(%r)" % component.unique_id,
+                    component),
+                "                obj = self._shared.get(%r)" %
+                    component.unique_id,
+                "                if obj is None:",
+                "                    obj = self._attach_shared(%r)" %
+                    component.unique_id,
+                "                    if obj is None:",
+            ])
+            lines.extend(build)
+            lines.extend([
+                "                        obj = self._publish_shared(%r, obj)" %
+                    component.unique_id,
+                "                    with self._shared:",
+                "                        self._shared[%r] = obj" %
+                    component.unique_id,
+            ])
+        elif strategy == Strategy.WEAKREF:
+            build = self._compile_build(component, imports, 12)
+            lines.extend([
+                "        ref = self._weakrefs.get(%r)" % component.unique_id,
+                "        obj = ref() if ref is not None else None",
+                "        if obj is not None:",
+                "            return obj",
+                "        " + self._compile_creating(
+                    "self._weakrefs.lock", component),
+                "            ref = self._weakrefs.get(%r)" %
+                    component.unique_id,
+                "            obj = ref() if ref is not None else None",
+                "            if obj is None:",
+            ])
+            lines.extend(build)
+            lines.append(
+                "                self._weakrefs[%r] = _weakref(obj)" %
+                    component.unique_id)
+        elif strategy == Strategy.CLONE:
+            lines.extend([
+                "        obj = self._clones.get(%r)" % component.unique_id,
+                "        if obj is None:",
+                "            " + self._compile_creating(
+                    "self._clones.lock_for(%r)" % component.unique_id,
+                    component),
+                "                obj = self._clones.get(%r)" %
+                    component.unique_id,
+                "                if obj is None:",
+            ])
+            lines.extend(self._compile_build(component, imports, 16))
+            lines.extend([
+                "                    with self._clones:",
+                "                        self._clones[%r] = obj" %
+                    component.unique_id,
+            ])
+        elif strategy == Strategy.SOFT:
+            lines.extend([
+                "        obj = self._softs.get(%r)" % component.unique_id,
+                "        if obj is None:",
+                "            " + self._compile_creating(
+                    "self._softs.lock_for(%r)" % component.unique_id,
+                    component),
+                "                obj = self._softs.get(%r)" %
+                    component.unique_id,
+                "                if obj is None:",
+                "                    _usage = self._measure_soft()",
+            ])
+            lines.extend(self._compile_build(component, imports, 16))
+            lines.extend([
+                "                    self._cache_soft(%r, obj, _usage)" %
+                    component.unique_id,
+                "                    return obj",
+                "        self._soft_used[%r] = next(self._soft_clock)" %
+                    component.unique_id,
+            ])
+        elif strategy == Strategy.GRAPH:
+            lines.extend([
+                "        _graph = self._graph()",
+                "        _key = (self, %r)" % component.unique_id,
+                "        if _key not in _graph:",
+                "            with _graph.lock_for(_key):",
+                "                if _key not in _graph:",
+            ])
+            lines.extend(self._compile_build(component, imports, 16))
+            lines.extend([
+                "                    _graph[_key] = obj",
+                "                    return obj",
+                "        obj = _graph[_key]",
+            ])
+        else:
+            lines.extend(self._compile_build(component, imports, 4))
+        lines.extend(["        return obj", ""])
+
+        # imports are gathered while compiling, but must come first
+        lines[2:2] = [
+            "        from %s import %s as %s" % (module_name, name, alias)
+            for ((module_name, name), alias) in sorted(
+                imports.items(), key=lambda item: item[1])]
+        if strategy == Strategy.CLONE:
+            lines.extend(self._compile_clone(component))
+        return lines
+
+    def _compile_clone(self, component):
+        """Return the source lines of the factory method for the clone
+        *component*, which copies the master object.
+
+        :arg aglyph.component.Component component:
+           the component definition
+
+        """
+        lines = [
+            "    def %s(self):" % self._method_names[component.unique_id],
+            "        # %r (clone)" % component.unique_id,
+            "        obj = %s(self.%s())" % (
+                "_deepcopy" if component.deep_clone else "_copy",
+                self._master_names[component.unique_id]),
+        ]
+        if component.after_clone is not None:
+            lines.extend([
+                "        _method = getattr(obj, %r, None)" %
+                    component.after_clone,
+                "        if _method is not None:",
+                "            try:",
+                "                _method()",
+                "            except Exception as e:",
+                "                self._lifecycle_method_failed(_method, e)",
+            ])
+        lines.extend(["        return obj", ""])
+        return lines
+
+    def _compile_creating(self, lock_expr, component):
+        """Return the (unindented) ``with`` statement that holds the
+        creation lock of *component*.
+
+        :arg str lock_expr: the expression of the creation lock
+        :arg aglyph.component.Component component:
+           the component definition
+
+        .. seealso:: :meth:`aglyph.assembler.Assembler._creating`
+
+        """
+        return "with self._creating(%s, %r, %r):" % (
+            lock_expr, component.unique_id, component.timeout)
+
+    def _compile_build(self, component, imports, indent):
+        """Return the source lines that create, initialize, and wire
+        ``obj`` for *component*, and call its "after_inject" method.
+
+        :arg aglyph.component.Component component:
+           the component definition
+        :arg dict imports:
+           the ``(module, name) -> alias`` imports of the factory method
+        :arg int indent:
+           the number of spaces to indent beyond the method body
+
+        """
+        prefix = " " * (4 + indent)
+        unique_id = component.unique_id
+        backoff = component.backoff
+        lines = []
+        if backoff is not None:
+            lines.append(prefix + "self._failures.check(%r)" % unique_id)
+        lines.extend(
+            self._compile_initializer(component, imports, 4 + indent))
+
+        if component.member_name is None:
+            assembler = self._assembler
+            collected_args = assembler._collect_args(component)
+            collected_keywords = list(
+                assembler._collect_keywords(component).items())
+            args = [self._expr(arg, imports) for arg in collected_args]
+            keywords = [
+                (name, self._expr(value, imports))
+                for (name, value) in collected_keywords]
+            references = [
+                value for value in list(collected_args) +
+                    [value for (_, value) in collected_keywords]
+                if isinstance(value, Reference)]
+            # resolve dependencies before (not inside) the try block so
+            # that only initializer failures are wrapped
+            if len(references) > 1:
+                (args, keywords) = self._hoist_concurrently(
+                    component, references, args, keywords, lines, prefix)
+            else:
+                (args, keywords) = self._hoist(args, keywords, lines, prefix)
+            lines.extend([
+                prefix + "try:",
+                prefix + "    obj = _initializer(%s)" %
+                    self._call_args(args, keywords),
+                prefix + "except Exception as e:",
+            ])
+            if backoff is not None:
+                lines.append(
+                    prefix + "    self._failures.failed(%r, %r, e)" %
+                        (unique_id, backoff))
+            lines.extend([
+                prefix + "    raise AglyphError(",
+                prefix + "        %r, e)" % (
+                    "failed to initialize object of component %r" %
+                        unique_id),
+            ])
+            if backoff is not None:
+                lines.append(
+                    prefix + "self._failures.succeeded(%r)" % unique_id)
+        else:
+            lines.append(prefix + "obj = _initializer")
+            if component.args or component.keywords:
+                lines.append(
+                    prefix + "self._warn_args_ignored(%r)" % unique_id)
+
+        for (name, value) in self._assembler._collect_attributes(
+                component).items():
+            lines.extend([
+                prefix + "_attr = getattr(obj, %r, None)" % name,
+                prefix + "_value = %s" % self._expr(value, imports),
+                prefix + "if callable(_attr):",
+                prefix + "    _attr(_value)",
+                prefix + "else:",
+                prefix + "    %s" % (
+                    "obj.%s = _value" % name if self._is_identifier(name)
+                        and not name.startswith("__")
+                    else "setattr(obj, %r, _value)" % name),
+            ])
+
+        names = self._lifecycle_method_names("after_inject", component)
+        if names:
+            call_lines = []
+            if component.member_name:
+                call_lines.append(
+                    "self._warn_member_lifecycle(%r, %r, %r, _name, obj)" % (
+                        unique_id, "after_inject", component.member_name))
+            call_lines.extend([
+                "try:",
+                "    _method()",
+                "except Exception as e:",
+                "    self._lifecycle_method_failed(_method, e)",
+            ])
+            if len(names) == 1:
+                lines.extend([
+                    prefix + "_name = %r" % names[0],
+                    prefix + "_method = getattr(obj, _name, None)",
+                    prefix + "if _method is not None:",
+                ])
+                lines.extend(prefix + "    " + line for line in call_lines)
+            else:
+                lines.extend([
+                    prefix + "for _name in %r:" % (names,),
+                    prefix + "    _method = getattr(obj, _name, None)",
+                    prefix + "    if _method is not None:",
+                ])
+                lines.extend(prefix + "        " + line for line in call_lines)
+                lines.append(prefix + "        break")
+
+        return lines
+
+    def _compile_initializer(self, component, imports, indent):
+        """Return the source lines that bind ``_initializer``.
+
+        :arg aglyph.component.Component component:
+           the component definition
+        :arg dict imports:
+           the ``(module, name) -> alias`` imports of the factory method
+        :arg int indent:
+           the number of spaces to indent
+
+        .. seealso:: :meth:`aglyph.assembler.Assembler._resolve_initializer`
+
+        """
+        prefix = " " * indent
+        dotted_name = component.dotted_name
+        names = dotted_name.split('.')
+        if all(self._is_identifier(name) for name in names):
+            if len(names) > 1:
+                lines = [prefix + "from %s import %s as _initializer" % (
+                    '.'.join(names[:-1]), names[-1])]
+            else:
+                lines = [prefix + "import %s as _initializer" % dotted_name]
+        else:
+            # let the import machinery raise the same error at runtime
+            alias = self._import(
+                ("aglyph", "resolve_dotted_name"), imports)
+            lines = [prefix + "_initializer = %s(%r)" % (alias, dotted_name)]
+
+        access_name = component.factory_name or component.member_name
+        if access_name:
+            expr = "_initializer"
+            for name in access_name.split('.'):
+                if self._is_identifier(name) and not name.startswith("__"):
+                    expr = "%s.%s" % (expr, name)
+                else:
+                    expr = "getattr(%s, %r)" % (expr, name)
+            lines.append(prefix + "_initializer = %s" % expr)
+        return lines
+
+    def _hoist(self, args, keywords, lines, prefix):
+        """Assign any argument expression that may have side effects to
+        a local variable, preserving the order of evaluation.
+
+        :arg list args: the positional argument expressions
+        :arg list keywords: the ``(name, expression)`` keyword arguments
+        :arg list lines: the source lines to append assignments to
+        :arg str prefix: the indentation of the assignments
+        :return: the 2-tuple ``(args, keywords)`` of simple expressions
+
+        """
+        counter = [0]
+
+        def hoist(expr):
+            if self._is_simple(expr):
+                return expr
+            name = "_v%d" % counter[0]
+            counter[0] += 1
+            lines.append(prefix + "%s = %s" % (name, expr))
+            return name
+
+        args = [hoist(expr) for expr in args]
+        keywords = [(name, hoist(expr)) for (name, expr) in keywords]
+        return (args, keywords)
+
+    def _hoist_concurrently(
+            self, component, references, args, keywords, lines, prefix):
+        """Hoist the argument expressions (see :meth:`_hoist`), assembling
+        the *references* concurrently if *component* is parallel (or, at
+        runtime, if the assembler is).
+
+        :arg aglyph.component.Component component:
+           the component definition
+        :arg list references:
+           the arguments and keywords of *component* that are references,
+           in resolution order
+        :arg list args: the positional argument expressions
+        :arg list keywords: the ``(name, expression)`` keyword arguments
+        :arg list lines: the source lines to append assignments to
+        :arg str prefix: the indentation of the assignments
+        :return: the 2-tuple ``(args, keywords)`` of simple expressions
+
+        .. seealso::
+           :meth:`aglyph.assembler.Assembler._assemble_concurrently`
+
+        """
+        hoisted = []
+        (args, keywords) = self._hoist(args, keywords, hoisted, "")
+        expected = [
+            self._reference_expr(reference) for reference in references]
+        names = []
+        others = []
+        for line in hoisted:
+            (name, expr) = line.split(" = ", 1)
+            if expected and expr == expected[0]:
+                expected.pop(0)
+                names.append(name)
+            else:
+                others.append(line)
+        concurrent = [
+            "(%s,) = self._assemble_concurrently((%s,))" % (
+                ", ".join(names), ", ".join(
+                    self._reference_callable(reference)
+                    for reference in references))
+        ] + others
+        if component.parallel:
+            lines.extend(prefix + line for line in concurrent)
+        else:
+            lines.append(prefix + "if self._parallel:")
+            lines.extend(prefix + "    " + line for line in concurrent)
+            lines.append(prefix + "else:")
+            lines.extend(prefix + "    " + line for line in hoisted)
+        return (args, keywords)
+
+    def _call_args(self, args, keywords):
+        """Return the argument list for a call expression.
+
+        :arg list args: the positional argument expressions
+        :arg list keywords: the ``(name, expression)`` keyword arguments
+
+        """
+        parts = list(args)
+        extra = []
+        for (name, expr) in keywords:
+            if self._is_identifier(name):
+                parts.append("%s=%s" % (name, expr))
+            else:
+                extra.append("%r: %s" % (name, expr))
+        if extra:
+            parts.append("**{%s}" % ", ".join(extra))
+        return ", ".join(parts)
+
+    def _expr(self, value, imports):
+        """Return an expression that produces the runtime value of
+        *value*.
+
+        :arg value:
+           an initialization argument or attribute value specification
+        :arg dict imports:
+           the ``(module, name) -> alias`` imports of the factory method
+
+        .. seealso:: :meth:`aglyph.assembler.Assembler._resolve_value`
+
+        """
+        if isinstance(value, Reference):
+            return self._reference_expr(value)
+        elif isinstance(value, Evaluator):
+            return self._evaluator_expr(value, imports)
+        elif isinstance(value, partial):
+            return self._partial_expr(value, imports)
+        else:
+            return self._constant(value)
+
+    def _reference_expr(self, reference):
+        """Return an expression that assembles *reference*."""
+        method_name = self._method_names.get(reference)
+        if method_name is not None:
+            return "self.%s()" % method_name
+        else:
+            # raises KeyError at runtime
+            return "self.assemble(%r)" % TextType(reference)
+
+    def _reference_callable(self, reference):
+        """Return an expression of a callable that assembles
+        *reference*.
+
+        """
+        method_name = self._method_names.get(reference)
+        if method_name is not None:
+            return "self.%s" % method_name
+        else:
+            return "lambda: self.assemble(%r)" % TextType(reference)
+
+    def _evaluator_expr(self, evaluator, imports):
+        """Return an expression that produces the value of
+        *evaluator*.
+
+        .. seealso:: :meth:`aglyph.component.Evaluator._resolve`
+
+        """
+        args = [self._evaluated_expr(arg, imports) for arg in evaluator.args]
+        keywords = [
+            (name, self._evaluated_expr(value, imports))
+            for (name, value) in evaluator.keywords.items()]
+        return "%s(%s)" % (
+            self._callable_expr(evaluator.factory, imports),
+            self._call_args(args, keywords))
+
+    def _evaluated_expr(self, arg, imports):
+        """Return an expression that produces the resolved value of an
+        :class:`aglyph.component.Evaluator` argument.
+
+        """
+        if isinstance(arg, Reference):
+            return self._reference_expr(arg)
+        elif isinstance(arg, Evaluator):
+            return self._evaluator_expr(arg, imports)
+        elif isinstance(arg, partial):
+            return self._partial_expr(arg, imports)
+        elif isinstance(arg, dict):
+            return "{%s}" % ", ".join(
+                "%s: %s" % (
+                    self._evaluated_expr(key, imports),
+                    self._evaluated_expr(value, imports))
+                for (key, value) in arg.items())
+        elif hasattr(arg, "__iter__") and not is_string(arg):
+            items = [self._evaluated_expr(item, imports) for item in arg]
+            if type(arg) is list:
+                return "[%s]" % ", ".join(items)
+            elif type(arg) is tuple:
+                return "(%s)" % "".join("%s, " % item for item in items)
+            else:
+                return "%s([%s])" % (
+                    self._callable_expr(arg.__class__, imports),
+                    ", ".join(items))
+        else:
+            return self._constant(arg)
+
+    def _partial_expr(self, partial_, imports):
+        """Return an expression that calls *partial_*."""
+        args = [self._constant(arg) for arg in partial_.args]
+        keywords = [
+            (name, self._constant(value))
+            for (name, value) in (partial_.keywords or {}).items()]
+        return "%s(%s)" % (
+            self._callable_expr(partial_.func, imports),
+            self._call_args(args, keywords))
+
+    def _callable_expr(self, obj, imports):
+        """Return an expression that refers to the importable *obj*."""
+        name = getattr(obj, "__name__", None)
+        if name is not None and getattr(_builtins, name, None) is obj:
+            return name
+        try:
+            dotted_name = format_dotted_name(obj)
+        except AglyphError as e:
+            raise AglyphError(
+                "cannot compile %r in %s: %s" % (obj, self._context, e), e)
+        return self._import(tuple(dotted_name.rsplit('.', 1)), imports)
+
+    def _import(self, module_and_name, imports):
+        """Return the local alias for ``from module import name``."""
+        alias = imports.get(module_and_name)
+        if alias is None:
+            alias = "_%s_%d" % (
+                module_and_name[-1].lstrip('_') or "obj", len(imports))
+            imports[module_and_name] = alias
+        return alias
+
+    def _constant(self, value):
+        """Return an expression that always produces *value* itself.
+
+        Scalar literals are written inline. Any other value is created
+        once, as a module-level constant, so that every assembled
+        object receives the same object (just as it would from the
+        context).
+
+        """
+        literal = self._scalar_literal(value)
+        if literal is not None:
+            return literal
+
+        name = self._constant_names.get(id(value))
+        if name is None:
+            name = "_VALUE_%d" % len(self._constant_names)
+            self._constant_names[id(value)] = name
+            self._constants.append("%s = %s" % (name, self._literal(value)))
+        return name
+
+    def _literal(self, value):
+        """Return a module-level expression that recreates *value*."""
+        literal = self._scalar_literal(value)
+        if literal is not None:
+            return literal
+        elif type(value) is list:
+            return "[%s]" % ", ".join(self._literal(item) for item in value)
+        elif type(value) is tuple:
+            return "(%s)" % "".join(
+                "%s, " % self._literal(item) for item in value)
+        elif type(value) is dict:
+            return "{%s}" % ", ".join(
+                "%s: %s" % (self._literal(key), self._literal(item))
+                for (key, item) in value.items())
+        elif type(value) in [set, frozenset]:
+            return "%s([%s])" % (
+                value.__class__.__name__,
+                ", ".join(self._literal(item) for item in value))
+        elif isinstance(value, Reference):
+            self._module_import("aglyph.component", "Reference")
+            return "Reference(%r)" % TextType(value)
+        else:
+            try:
+                dotted_name = format_dotted_name(value)
+            except AglyphError as e:
+                raise AglyphError(
+                    "cannot compile %r in %s" % (value, self._context), e)
+            (module_name, _, name) = dotted_name.rpartition('.')
+            if module_name:
+                return self._module_import(module_name, name)
+            else:
+                self._module_imports.append("import %s" % name)
+                return name
+
+    def _scalar_literal(self, value):
+        """Return the literal for a scalar *value*, or ``None``."""
+        if value is Ellipsis:
+            return "Ellipsis"
+        elif type(value) not in _LITERAL_TYPES:
+            return None
+        elif type(value) is float and (
+                math.isnan(value) or math.isinf(value)):
+            return "float(%r)" % repr(value)
+        else:
+            return repr(value)
+
+    def _module_import(self, module_name, name):
+        """Import *name* from *module_name* at module level."""
+        alias = "_%s_%s" % (module_name.replace('.', '_'), name)
+        statement = "from %s import %s as %s" % (module_name, name, alias)
+        if statement not in self._module_imports:
+            self._module_imports.append(statement)
+        return alias
+
+    def _lifecycle_method_names(self, lifecycle_state, component):
+        """Return the preferred-order lifecycle method names for
+        *component* as a tuple.
+
+        """
+        return tuple(self._assembler._get_lifecycle_method_names(
+            lifecycle_state, component))
+
+    def _find_cycle(self, component_id, stack):
+        """Return the circular dependency that would be detected when
+        assembling *component_id*.
+
+        :arg str component_id: the component to check
+        :arg list stack: the IDs of the components being assembled
+        :return:
+           the circular assembly path, ``None`` if there is no circular
+           dependency, or ``_UNDEFINED`` if assembly would fail with a
+           :class:`KeyError` first
+
+        References are followed in the same order in which the
+        interpreted assembler resolves them.
+
+        """
+        if component_id in stack:
+            return stack + [component_id]
+        elif component_id in self._acyclic:
+            return None
+
+        component = self._context.get_component(component_id)
+        if component is None:
+            return _UNDEFINED
+
+        stack.append(component_id)
+        try:
+            for reference in self._iter_references(component):
+                result = self._find_cycle(reference, stack)
+                if result is not None:
+                    return result
+        finally:
+            stack.pop()
+
+        self._acyclic.add(component_id)
+        return None
+
+    def _iter_references(self, component):
+        """Yield the IDs of the components that are assembled in order to
+        assemble *component*, in resolution order.
+
+        """
+        assembler = self._assembler
+        values = []
+        if component.member_name is None:
+            values.extend(assembler._collect_args(component))
+            values.extend(assembler._collect_keywords(component).values())
+        values.extend(assembler._collect_attributes(component).values())
+        for value in values:
+            if isinstance(value, Reference):
+                yield value
+            elif isinstance(value, Evaluator):
+                for reference in self._iter_evaluator_references(value):
+                    yield reference
+
+    def _iter_evaluator_references(self, arg):
+        """Yield the IDs of the components that are assembled in order to
+        resolve the :class:`aglyph.component.Evaluator` argument *arg*.
+
+        """
+        if isinstance(arg, Reference):
+            yield arg
+        elif isinstance(arg, Evaluator):
+            for value in list(arg.args) + list(arg.keywords.values()):
+                for reference in self._iter_evaluator_references(value):
+                    yield reference
+        elif isinstance(arg, dict):
+            for (key, value) in arg.items():
+                for item in [key, value]:
+                    for reference in self._iter_evaluator_references(item):
+                        yield reference
+        elif (hasattr(arg, "__iter__") and not is_string(arg) and
+                not isinstance(arg, partial)):
+            for item in arg:
+                for reference in self._iter_evaluator_references(item):
+                    yield reference
+
+    @staticmethod
+    def _is_identifier(name):
+        """Tell whether or not *name* is a valid Python identifier."""
+        #PYVER: str.isidentifier is not available in Python 2
+        is_identifier = getattr(name, "isidentifier", None)
+        if is_identifier is not None:
+            valid = is_identifier()
+        else:
+            valid = bool(name) and name.replace('_', 'a').isalnum() and \
+                not name[0].isdigit()
+        return valid and not keyword.iskeyword(name)
+
+    @staticmethod
+    def _is_simple(expr):
+        """Tell whether or not the expression *expr* is free of side
+        effects.
+
+        """
+        return '(' not in expr or expr.startswith("float(")
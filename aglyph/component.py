@@ -67,7 +67,8 @@ factory.)
 
 :data:`aglyph.component.Strategy` defines the assembly strategies
 supported by Aglyph (*"prototype"*, *"singleton"*, *"borg"*,
-*"weakref"* and *"_imported"*).
+*"weakref"*, *"shared"*, *"clone"*, *"soft"*, *"graph"* and
+*"_imported"*).
 
 :data:`LifecycleState` defines assmebly states for components at
 which Aglyph supports calling named methods on the objects of those
@@ -80,14 +81,11 @@ __author__ = "Matthew Zipay <mattz@ninthtest.info>"
 
 from collections import namedtuple, OrderedDict
 from functools import partial
-from inspect import isclass, ismodule, isroutine
 import logging
 import warnings
 
-from autologging import logged, traced
-
 from aglyph import AglyphError, _identify, __version__
-from aglyph._compat import is_string, name_of, TextType
+from aglyph._compat import is_string, logged, name_of, TextType, traced
 
 __all__ = [
     "Strategy",
@@ -100,9 +98,18 @@ __all__ = [
 
 _log = logging.getLogger(__name__)
 
+#: The version of the pickled form of Aglyph definitions and contexts.
+#: Incremented whenever that form changes incompatibly, so that objects
+#: pickled by a different Aglyph release are rejected rather than
+#: restored incorrectly.
+_PICKLE_VERSION = 1
+
 Strategy = namedtuple(
-    "Strategy", ["PROTOTYPE", "SINGLETON", "BORG", "WEAKREF"])(
-        "prototype", "singleton", "borg", "weakref")
+    "Strategy",
+    ["PROTOTYPE", "SINGLETON", "BORG", "WEAKREF", "SHARED", "CLONE",
+        "SOFT", "GRAPH"])(
+            "prototype", "singleton", "borg", "weakref", "shared", "clone",
+            "soft", "graph")
 """Define the component assembly strategies implemented by Aglyph.
 
 .. rubric:: "prototype"
@@ -156,6 +163,85 @@ and returned.
    Please refer to the :mod:`weakref` module for a detailed explanation
    of weak reference behavior.
 
+.. rubric:: "shared"
+
+.. versionadded:: 3.1.0
+
+A "singleton" whose object is **buffer-protocol data** (e.g.
+:obj:`bytes`, :class:`array.array`, or a NumPy array) that is shared by
+all processes of the same user that assemble the same component
+definition of the same context.
+
+The first process to assemble the component creates the data and
+publishes it to a file in the assembler's shared directory. That process
+and every other process then memory-map the file and are given a
+read-only :obj:`memoryview` of the data (cast to the original format and
+shape where possible), so the pages holding the data are shared instead
+of being copied into every process.
+
+Shared component objects are cached by :attr:`Component.unique_id`.
+Clearing singletons (see
+:meth:`aglyph.assembler.Assembler.clear_singletons`) in the process
+that published the data also removes the published file, as does the
+exit of that process; processes that have already mapped the data may
+continue to use it.
+
+.. rubric:: "clone"
+
+.. versionadded:: 3.1.0
+
+A "prototype" for objects that are expensive to create but cheap to
+copy (e.g. configuration-derived objects or compiled templates).
+
+A *master* object is created, initialized, wired, and cached the first
+time the component is assembled. Every assembly (including the first)
+returns a new copy of the master, made by :func:`copy.copy` or (if
+:attr:`Component.deep_clone` is true) :func:`copy.deepcopy`. Either
+function honors the ``__copy__``/``__deepcopy__`` protocol if the
+master's class implements it.
+
+The "after_inject" method is called only on the master. The
+:attr:`Component.after_clone` method (if specified) is called on each
+copy.
+
+Clone component masters are cached by :attr:`Component.unique_id`.
+
+.. rubric:: "soft"
+
+.. versionadded:: 3.1.0
+
+A "singleton" for objects that can be rebuilt on demand (e.g. large
+caches or derived indices) and so should only be kept while memory
+allows.
+
+A soft object is created, initialized, wired, and cached the first time
+the component is assembled, and the cached object is returned until it
+is evicted. When the process uses more memory than the assembler's
+*memory_budget* (see :class:`aglyph.assembler.Assembler`), the least
+recently used soft objects are evicted (and their "before_clear"
+methods called); the next assembly of an evicted component creates a
+new object.
+
+Soft component objects are cached by :attr:`Component.unique_id`.
+
+.. rubric:: "graph"
+
+.. versionadded:: 3.1.0
+
+A "prototype" that is shared within one assembly.
+
+A graph object is created, initialized, and wired the first time the
+component is assembled during an outermost call to
+:meth:`aglyph.assembler.Assembler.assemble`; every other reference to
+the component made while assembling the same requested object resolves
+to that same graph object (which is created only once, even when the
+references are assembled concurrently). The object is discarded (not
+cached) when the outermost assembly completes, so the next assembly
+creates a new object.
+
+Graph component objects are never cached by the assembler, so
+"before_clear" and "after_fork" lifecycle methods are ignored.
+
 .. rubric:: "_imported"
 
 .. versionadded:: 3.0.0
@@ -191,8 +277,8 @@ a non-empty *member_name* defined.
 """
 
 LifecycleState = namedtuple(
-    "LifecycleState", ["AFTER_INJECT", "BEFORE_CLEAR"])(
-        "after_inject", "before_clear")
+    "LifecycleState", ["AFTER_INJECT", "BEFORE_CLEAR", "AFTER_FORK"])(
+        "after_inject", "before_clear", "after_fork")
 """Define the lifecycle states for which Aglyph will call object methods
 on your behalf.
 
@@ -240,6 +326,24 @@ Aglyph will only call **one** "before_clear" method on any object, and
 will determine which method to call by using the lookup process
 described below.
 
+.. rubric:: "after_fork"
+
+.. versionadded:: 3.1.0
+
+A cached component object (singleton, borg, or weakref) is in this
+state in a child process immediately after :func:`os.fork`, before the
+object is returned from the child's first assembly. Use this state to
+re-establish resources that must not be shared across processes
+(sockets, database connections, locks, random number generators).
+
+If the "after_fork" method raises an exception, the object is evicted
+from the child's cache (so that it is re-created on its next assembly)
+and a :class:`RuntimeWarning` is issued.
+
+Aglyph will only call **one** "after_fork" method on any object, and
+will determine which method to call by using the lookup process
+described below.
+
 .. _lifecycle-method-lookup-process:
 
 .. rubric:: The lifecycle method lookup process
@@ -366,6 +470,60 @@ class _InitializationSupport(object):
         """The keyword initialization arguments."""
         return self._keywords
 
+    def __getstate__(self):
+        """Return the compact, versioned picklable state of this object.
+
+        The state is a tuple of :data:`_PICKLE_VERSION` followed by the
+        value of every slot (in method resolution order), so that slot
+        names are not repeated for every pickled definition.
+
+        .. versionadded:: 3.1.0
+
+        """
+        return (_PICKLE_VERSION,) + tuple(
+            getattr(self, name) for name in _slots_of(self.__class__))
+
+    def __setstate__(self, state):
+        """Restore the state of an unpickled object.
+
+        :arg tuple state: the state returned by :meth:`__getstate__`
+        :raise aglyph.AglyphError:
+           if *state* was pickled by an incompatible Aglyph release
+
+        .. versionadded:: 3.1.0
+
+        """
+        _check_pickle_version(state[0], self.__class__)
+        for (name, value) in zip(_slots_of(self.__class__), state[1:]):
+            setattr(self, name, value)
+
+
+def _slots_of(cls):
+    """Return the names of all slots defined by *cls* and its bases.
+
+    :arg cls: a class that uses ``__slots__``
+    :rtype: :obj:`list`
+
+    """
+    return [
+        name
+        for klass in reversed(cls.__mro__)
+        for name in klass.__dict__.get("__slots__", ())]
+
+
+def _check_pickle_version(version, cls):
+    """Raise :exc:`aglyph.AglyphError` if an object of *cls* was pickled
+    by an incompatible Aglyph release.
+
+    :arg int version: the pickled :data:`_PICKLE_VERSION`
+    :arg cls: the class of the object being unpickled
+
+    """
+    if version != _PICKLE_VERSION:
+        raise AglyphError(
+            "cannot unpickle %s (pickle version %r; Aglyph %s expects %r)" %
+                (name_of(cls), version, __version__, _PICKLE_VERSION))
+
 
 @traced
 @logged
@@ -511,6 +669,7 @@ class Template(_DependencySupport):
     """
 
     __slots__ = [
+        "_after_fork",
         "_after_inject",
         "_before_clear",
         "_parent_id",
@@ -519,7 +678,7 @@ class Template(_DependencySupport):
 
     def __init__(
             self, unique_id, parent_id=None,
-            after_inject=None, before_clear=None):
+            after_inject=None, before_clear=None, after_fork=None):
         """
         :arg str unique_id:
            context-unique identifier for this template
@@ -535,6 +694,10 @@ class Template(_DependencySupport):
            specifies the name of the method that will be called on
            objects of components that reference this template
            immediately before they are cleared from cache
+        :keyword str after_fork:
+           specifies the name of the method that will be called on
+           cached objects of components that reference this template
+           in a child process after :func:`os.fork`
         :raise ValueError:
            if *unique_id* is ``None`` or empty
 
@@ -594,6 +757,14 @@ class Template(_DependencySupport):
            method is **not** called. No warning is issued, but a
            :attr:`logging.WARNING` message is emitted.
 
+        *after_fork* is the name of a method *of objects of this
+        component* that will be called in a child process after
+        :func:`os.fork` (see
+        :meth:`aglyph.assembler.Assembler.after_fork`).
+
+        .. versionadded:: 3.1.0
+           the *after_fork* keyword
+
         """
         #PYVER: arguments to super() are implicit under Python 3
         super(Template, self).__init__()
@@ -607,6 +778,7 @@ class Template(_DependencySupport):
         self._parent_id = parent_id
         self._after_inject = after_inject
         self._before_clear = before_clear
+        self._after_fork = after_fork
 
     @property
     def unique_id(self):
@@ -643,15 +815,32 @@ class Template(_DependencySupport):
         """
         return self._before_clear
 
+    @property
+    def after_fork(self):
+        """The name of the component object method that will be called
+        in a child process after :func:`os.fork` *(read-only)*.
+
+        .. versionadded:: 3.1.0
+
+        .. warning::
+           This property is not applicable to "prototype" component
+           objects, or to component objects acquired via
+           :attr:`Component.member_name`.
+
+        """
+        return self._after_fork
+
     def __str__(self):
         return "<%s %r @%08x>" % (
             name_of(self.__class__), self._unique_id, id(self))
 
     def __repr__(self):
-        return "%s.%s(%r, parent_id=%r, after_inject=%r, before_clear=%r)" % (
-            self.__class__.__module__, name_of(self.__class__),
-            self._unique_id, self._parent_id, self._after_inject,
-            self._before_clear)
+        return (
+            "%s.%s(%r, parent_id=%r, after_inject=%r, before_clear=%r, "
+            "after_fork=%r)") % (
+                self.__class__.__module__, name_of(self.__class__),
+                self._unique_id, self._parent_id, self._after_inject,
+                self._before_clear, self._after_fork)
 
 
 @traced
@@ -667,13 +856,21 @@ class Component(Template):
         "_factory_name",
         "_member_name",
         "_strategy",
+        "_snapshot",
+        "_deep_clone",
+        "_after_clone",
+        "_backoff",
+        "_timeout",
+        "_parallel",
     ]
 
     def __init__(
             self, component_id, dotted_name=None,
             factory_name=None, member_name=None, strategy=None,
             parent_id=None,
-            after_inject=None, before_clear=None):
+            after_inject=None, before_clear=None, after_fork=None,
+            snapshot=False, deep_clone=False, after_clone=None,
+            backoff=None, timeout=None, parallel=False):
         """
         :arg str component_id:
            the context-unique identifier for this component
@@ -697,6 +894,30 @@ class Component(Template):
            specifies the name of the method that will be called on
            objects of this component immediately before they are cleared
            from cache
+        :keyword str after_fork:
+           specifies the name of the method that will be called on
+           cached objects of this component in a child process after
+           :func:`os.fork`
+        :keyword bool snapshot:
+           whether the assembled object of this (singleton) component
+           should be persisted to, and restored from, an on-disk
+           snapshot
+        :keyword bool deep_clone:
+           whether objects of this (clone) component are deep copies
+           of the master object
+        :keyword str after_clone:
+           specifies the name of the method that will be called on each
+           copy of the master object of this (clone) component
+        :keyword float backoff:
+           the initial number of seconds for which assembly of this
+           component fails fast after its initializer raises an
+           exception
+        :keyword float timeout:
+           the maximum number of seconds to wait for an object of this
+           component that is being constructed by another thread
+        :keyword bool parallel:
+           whether the referenced initialization arguments of this
+           component are assembled concurrently
         :raise aglyph.AglyphError:
            if both *factory_name* and *member_name* are specified
         :raise ValueError:
@@ -814,6 +1035,54 @@ class Component(Template):
            :class:`RuntimeWarning` (see that method's documentation for
            more details).
 
+        *after_fork* is the name of a method *of objects of this
+        component* that will be called in a child process after
+        :func:`os.fork` (see
+        :meth:`aglyph.assembler.Assembler.after_fork`). Like
+        *before_clear*, it is ignored (with a :class:`UserWarning`) by
+        "prototype" components, whose objects are never cached.
+
+        .. versionadded:: 3.1.0
+           the *after_fork* keyword
+
+        *snapshot* is only meaningful for "singleton" components (see
+        :attr:`snapshot`); for any other strategy it is ignored with a
+        :class:`UserWarning`.
+
+        .. versionadded:: 3.1.0
+           the *snapshot* keyword
+
+        *deep_clone* and *after_clone* are only meaningful for "clone"
+        components (see :attr:`deep_clone` and :attr:`after_clone`);
+        for any other strategy they are ignored with a
+        :class:`UserWarning`.
+
+        .. versionadded:: 3.1.0
+           the *deep_clone* and *after_clone* keywords
+
+        *backoff* enables failure caching for this component (see
+        :attr:`backoff`). It is ignored (with a :class:`UserWarning`) by
+        "_imported" components, which are not initialized by Aglyph.
+
+        .. versionadded:: 3.1.0
+           the *backoff* keyword
+
+        *timeout* bounds the wait for the construction of this
+        component's (cached) object by another thread (see
+        :attr:`timeout`). It is ignored (with a :class:`UserWarning`) by
+        "prototype" and "_imported" components, whose objects are never
+        constructed under a lock.
+
+        .. versionadded:: 3.1.0
+           the *timeout* keyword
+
+        *parallel* enables the concurrent assembly of the references
+        that are passed to this component's initializer (see
+        :attr:`parallel`).
+
+        .. versionadded:: 3.1.0
+           the *parallel* keyword
+
         Once a ``Component`` instance is initialized, the ``args``
         (:obj:`list`), ``keywords`` (:obj:`dict`), and ``attributes``
         (:class:`collections.OrderedDict`) members can be modified
@@ -842,7 +1111,8 @@ class Component(Template):
         #PYVER: arguments to super() are implicit under Python 3
         super(Component, self).__init__(
             component_id, parent_id=parent_id,
-            after_inject=after_inject, before_clear=before_clear)
+            after_inject=after_inject, before_clear=before_clear,
+            after_fork=after_fork)
 
         # if a dotted name is not provided, the unique ID is assumed to be a
         # dotted name
@@ -879,13 +1149,67 @@ class Component(Template):
         # issues/5: also see Assembler._call_lifecycle_method, which issues a
         # RuntimeWarning for _imported components that describe an after_inject
         # method
-        if (strategy in [Strategy.PROTOTYPE, "_imported"]
+        if (strategy in [Strategy.PROTOTYPE, Strategy.GRAPH, "_imported"]
                 and before_clear):
             warnings.warn(
                 "ignoring before_clear=%r for %s component with ID %r" %
                     (before_clear, strategy, self._unique_id),
                 UserWarning)
             self._before_clear = None
+        if (strategy in [Strategy.PROTOTYPE, Strategy.GRAPH, "_imported"]
+                and after_fork):
+            warnings.warn(
+                "ignoring after_fork=%r for %s component with ID %r" %
+                    (after_fork, strategy, self._unique_id),
+                UserWarning)
+            self._after_fork = None
+        if strategy != Strategy.SINGLETON and snapshot:
+            warnings.warn(
+                "ignoring snapshot=%r for %s component with ID %r" %
+                    (snapshot, strategy, self._unique_id),
+                UserWarning)
+            snapshot = False
+        self._snapshot = bool(snapshot)
+        if strategy != Strategy.CLONE:
+            if deep_clone:
+                warnings.warn(
+                    "ignoring deep_clone=%r for %s component with ID %r" %
+                        (deep_clone, strategy, self._unique_id),
+                    UserWarning)
+                deep_clone = False
+            if after_clone:
+                warnings.warn(
+                    "ignoring after_clone=%r for %s component with ID %r" %
+                        (after_clone, strategy, self._unique_id),
+                    UserWarning)
+                after_clone = None
+        self._deep_clone = bool(deep_clone)
+        self._after_clone = after_clone
+        if backoff is not None:
+            if strategy == "_imported":
+                warnings.warn(
+                    "ignoring backoff=%r for %s component with ID %r" %
+                        (backoff, strategy, self._unique_id),
+                    UserWarning)
+                backoff = None
+            elif not backoff > 0:
+                raise ValueError(
+                    "backoff for component %r must be positive (not %r)" %
+                        (self._unique_id, backoff))
+        self._backoff = backoff
+        if timeout is not None:
+            if strategy in [Strategy.PROTOTYPE, Strategy.GRAPH, "_imported"]:
+                warnings.warn(
+                    "ignoring timeout=%r for %s component with ID %r" %
+                        (timeout, strategy, self._unique_id),
+                    UserWarning)
+                timeout = None
+            elif not timeout > 0:
+                raise ValueError(
+                    "timeout for component %r must be positive (not %r)" %
+                        (self._unique_id, timeout))
+        self._timeout = timeout
+        self._parallel = bool(parallel)
 
     @property
     def dotted_name(self):
@@ -1022,12 +1346,149 @@ class Component(Template):
         """The component assembly strategy *(read-only)*."""
         return self._strategy
 
+    @property
+    def snapshot(self):
+        """Whether the assembled object of this component is persisted
+        to an on-disk snapshot *(read-only)*.
+
+        When an assembler has a *snapshot_dir* (see
+        :class:`aglyph.assembler.Assembler`), the object of a snapshot
+        component is pickled to that directory after it is first
+        created. Later assemblies (e.g. :meth:`init_singletons
+        <aglyph.assembler.Assembler.init_singletons>` in a restarted
+        process) unpickle the snapshot instead of calling the factory,
+        as long as the snapshot is still *valid* for the component.
+
+        A snapshot is invalidated by any change to the component's
+        dotted name, factory name, arguments, keywords or attributes; to
+        the source file of the module that defines the component's
+        factory; or to the Python or Aglyph version.
+
+        .. warning::
+           A restored snapshot is an unpickled **copy** of the original
+           object graph, including any dependencies that were injected
+           into it, and its "after_inject" method is **not** called
+           again. Snapshot components should therefore be self-contained
+           objects built from static inputs (e.g. parsed catalogs or
+           compiled rule sets).
+
+        .. versionadded:: 3.1.0
+
+        """
+        return self._snapshot
+
+    @property
+    def deep_clone(self):
+        """Whether objects of this component are deep copies of the
+        master object *(read-only)*.
+
+        If ``False`` (the default), each object of a "clone" component
+        is a shallow copy (:func:`copy.copy`) of the master object, and
+        so shares the master's dependencies. If ``True``, each object is
+        a :func:`copy.deepcopy` of the master object.
+
+        .. versionadded:: 3.1.0
+
+        """
+        return self._deep_clone
+
+    @property
+    def after_clone(self):
+        """The name of the method that is called on each copy of the
+        master object *(read-only)*.
+
+        The method is called with **no** arguments, after the copy is
+        made and before it is returned to the caller. Unlike the other
+        lifecycle methods, it is only looked up on the component itself
+        (not on its parent or context).
+
+        .. versionadded:: 3.1.0
+
+        """
+        return self._after_clone
+
+    @property
+    def backoff(self):
+        """The initial number of seconds for which assembly of this
+        component fails fast after a failed initialization
+        *(read-only)*.
+
+        If ``None`` (the default), every assembly of this component
+        calls its initializer, even if the previous call raised an
+        exception.
+
+        Otherwise, when the component's initializer raises an exception
+        (e.g. because a database is unavailable), the failure is
+        remembered. Until the backoff expires, assembling the component
+        immediately raises :exc:`aglyph.AglyphError` whose ``cause`` is
+        the remembered exception; the initializer (and the assembly of
+        its dependencies) is not attempted. Once the backoff expires,
+        the next assembly calls the initializer again. Each consecutive
+        failure doubles the backoff (up to 64 times *backoff*), and
+        each backoff is randomly shortened by up to half ("jitter") so
+        that many processes do not retry at the same moment. A
+        successful initialization resets the backoff.
+
+        .. versionadded:: 3.1.0
+
+        """
+        return self._backoff
+
+    @property
+    def timeout(self):
+        """The maximum number of seconds to wait for an object of this
+        component that is being constructed by another thread
+        *(read-only)*.
+
+        If ``None`` (the default), a thread that assembles this
+        component while another thread is constructing its object waits
+        until the construction completes (unless the *timeout* of
+        :meth:`aglyph.assembler.Assembler.assemble` applies).
+
+        Otherwise, if the construction is not complete within *timeout*
+        seconds, :exc:`aglyph.AglyphError` is raised. A hung constructor
+        then blocks only the thread that called it, instead of every
+        thread that needs the component.
+
+        .. versionadded:: 3.1.0
+
+        """
+        return self._timeout
+
+    @property
+    def parallel(self):
+        """Whether or not the referenced initialization arguments of
+        this component are assembled concurrently *(read-only)*.
+
+        If ``False`` (the default), the positional and keyword
+        arguments of this component's initializer are resolved one at a
+        time, in order (unless the assembler resolves references
+        concurrently for every component; see
+        :class:`aglyph.assembler.Assembler`).
+
+        Otherwise, the arguments that are
+        :class:`aglyph.component.Reference` objects (e.g. several
+        independent remote clients) are assembled concurrently by a
+        thread pool, so that assembling this component takes about as
+        long as its slowest dependency rather than the sum of them all.
+        The initializer is called once every reference has been
+        assembled.
+
+        .. versionadded:: 3.1.0
+
+        """
+        return self._parallel
+
     def __repr__(self):
         return (
             "%s.%s(%r, dotted_name=%r, factory_name=%r, member_name=%r, "
-            "strategy=%r, parent_id=%r, after_inject=%r, before_clear=%r)") % (
+            "strategy=%r, parent_id=%r, after_inject=%r, before_clear=%r, "
+            "after_fork=%r, snapshot=%r, deep_clone=%r, after_clone=%r, "
+            "backoff=%r, timeout=%r, parallel=%r)") % (
                 self.__class__.__module__, name_of(self.__class__),
                 self._unique_id, self._dotted_name, self._factory_name,
                 self._member_name, self._strategy, self._parent_id,
-                self._after_inject, self._before_clear)
+                self._after_inject, self._before_clear, self._after_fork,
+                self._snapshot, self._deep_clone, self._after_clone,
+                self._backoff, self._timeout, self._parallel)
 
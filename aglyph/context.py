@@ -51,33 +51,57 @@ and then uses the API classes mentioned above to populate the context.
 
 __author__ = "Matthew Zipay <mattz@ninthtest.info>"
 
-from ast import literal_eval
 from collections import OrderedDict
 from functools import partial
 import logging
+import os
 import sys
-import xml.etree.ElementTree as ET
-
-from autologging import logged, traced
-
-from aglyph import AglyphError, _identify, __version__
+from threading import RLock
+
+try:
+    from io import BytesIO as bytebuf, StringIO as textbuf
+except ImportError:
+    #PYVER: Python 2 io.StringIO only accepts unicode
+    from StringIO import StringIO as bytebuf
+    textbuf = bytebuf
+
+from aglyph import (
+    AglyphError,
+    _check_private,
+    _identify,
+    _make_private_dir,
+    _write_atomically,
+    __version__,
+)
 from aglyph._compat import (
-    AglyphDefaultXMLParser,
     DataType,
-    DoctypeTreeBuilder,
     is_python_3,
+    logged,
     name_of,
+    perf_counter,
     TextType,
+    traced,
 )
 from aglyph.component import (
+    _check_pickle_version,
     Component,
     Evaluator as evaluate,
+    _PICKLE_VERSION,
     Reference as ref,
     Strategy,
     Template,
 )
 
-__all__ = ["Context", "evaluate", "ref", "XMLContext"]
+__all__ = [
+    "ChildContext",
+    "Context",
+    "ContextCache",
+    "evaluate",
+    "LazyXMLContext",
+    "ref",
+    "StreamingXMLContext",
+    "XMLContext",
+]
 
 _log = logging.getLogger(__name__)
 
@@ -190,6 +214,90 @@ class _ContextBuilder(object):
             component_id_spec, parent=parent).create(
                 strategy="weakref")
 
+    def shared(self, component_id_spec, parent=None):
+        """Return a :data:`shared <aglyph.component.Strategy>`
+        :class:`Component` builder for a component identified by
+        *component_id_spec*.
+
+        :arg component_id_spec:
+           a context-unique identifier for this component; or the object
+           whose dotted name will identify this component
+        :keyword parent:
+           the context-unique identifier for this component's parent
+           template or component definition; or the object whose dotted
+           name identifies this component's parent definition
+
+        .. versionadded:: 3.1.0
+           This method is an entry point into :doc:`context-fluent-api`.
+
+        """
+        return self.component(
+            component_id_spec, parent=parent).create(
+                strategy="shared")
+
+    def clone(self, component_id_spec, parent=None):
+        """Return a :data:`clone <aglyph.component.Strategy>`
+        :class:`Component` builder for a component identified by
+        *component_id_spec*.
+
+        :arg component_id_spec:
+           a context-unique identifier for this component; or the object
+           whose dotted name will identify this component
+        :keyword parent:
+           the context-unique identifier for this component's parent
+           template or component definition; or the object whose dotted
+           name identifies this component's parent definition
+
+        .. versionadded:: 3.1.0
+           This method is an entry point into :doc:`context-fluent-api`.
+
+        """
+        return self.component(
+            component_id_spec, parent=parent).create(
+                strategy="clone")
+
+    def soft(self, component_id_spec, parent=None):
+        """Return a :data:`soft <aglyph.component.Strategy>`
+        :class:`Component` builder for a component identified by
+        *component_id_spec*.
+
+        :arg component_id_spec:
+           a context-unique identifier for this component; or the object
+           whose dotted name will identify this component
+        :keyword parent:
+           the context-unique identifier for this component's parent
+           template or component definition; or the object whose dotted
+           name identifies this component's parent definition
+
+        .. versionadded:: 3.1.0
+           This method is an entry point into :doc:`context-fluent-api`.
+
+        """
+        return self.component(
+            component_id_spec, parent=parent).create(
+                strategy="soft")
+
+    def graph(self, component_id_spec, parent=None):
+        """Return a :data:`graph <aglyph.component.Strategy>`
+        :class:`Component` builder for a component identified by
+        *component_id_spec*.
+
+        :arg component_id_spec:
+           a context-unique identifier for this component; or the object
+           whose dotted name will identify this component
+        :keyword parent:
+           the context-unique identifier for this component's parent
+           template or component definition; or the object whose dotted
+           name identifies this component's parent definition
+
+        .. versionadded:: 3.1.0
+           This method is an entry point into :doc:`context-fluent-api`.
+
+        """
+        return self.component(
+            component_id_spec, parent=parent).create(
+                strategy="graph")
+
     def template(self, template_id_spec, parent=None):
         """Return a :class:`Template` builder for a template identified
         by *template_spec*.
@@ -218,7 +326,9 @@ class _CreationBuilderMixin(object):
     __slots__ = []
 
     def create(
-            self, dotted_name=None, factory=None, member=None, strategy=None):
+            self, dotted_name=None, factory=None, member=None, strategy=None,
+            snapshot=None, deep_clone=None, after_clone=None, backoff=None,
+            timeout=None, parallel=None):
         """Specify the object creation aspects of a component being
         defined.
 
@@ -233,9 +343,33 @@ class _CreationBuilderMixin(object):
            name
         :keyword strategy:
            specifies the component assembly strategy
+        :keyword bool snapshot:
+           whether the assembled object should be persisted to an
+           on-disk snapshot (see :attr:`Component.snapshot`)
+        :keyword bool deep_clone:
+           whether objects of a "clone" component are deep copies of
+           the master object (see :attr:`Component.deep_clone`)
+        :keyword str after_clone:
+           the name of the method to call on each copy of the master
+           object of a "clone" component (see
+           :attr:`Component.after_clone`)
+        :keyword float backoff:
+           the initial number of seconds for which assembly fails fast
+           after a failed initialization (see :attr:`Component.backoff`)
+        :keyword float timeout:
+           the maximum number of seconds to wait for an object that is
+           being constructed by another thread (see
+           :attr:`Component.timeout`)
+        :keyword bool parallel:
+           whether referenced initialization arguments are assembled
+           concurrently (see :attr:`Component.parallel`)
         :return:
            *self* (to support chained calls)
 
+        .. versionadded:: 3.1.0
+           the *snapshot*, *deep_clone*, *after_clone*, *backoff*,
+           *timeout*, and *parallel* keywords
+
         Any keyword whose value is ``None`` will be ignored (i.e.
         ``None`` values are not explicitly set).
 
@@ -255,6 +389,18 @@ class _CreationBuilderMixin(object):
             self._member_name = member
         if strategy is not None:
             self._strategy = strategy
+        if snapshot is not None:
+            self._snapshot = snapshot
+        if deep_clone is not None:
+            self._deep_clone = deep_clone
+        if after_clone is not None:
+            self._after_clone = after_clone
+        if backoff is not None:
+            self._backoff = backoff
+        if timeout is not None:
+            self._timeout = timeout
+        if parallel is not None:
+            self._parallel = parallel
         return self
 
 
@@ -313,7 +459,7 @@ class _LifecycleBuilderMixin(object):
 
     __slots__ = []
 
-    def call(self, after_inject=None, before_clear=None):
+    def call(self, after_inject=None, before_clear=None, after_fork=None):
         """Specify the names of lifecycle methods to be called for
         templates and/or components.
 
@@ -324,6 +470,10 @@ class _LifecycleBuilderMixin(object):
            the name of the method to call immediately before a
            *singleton*, *borg*, or *weakref* object is evicted from
            the internal cache
+        :arg after_fork:
+           the name of the method to call on a cached *singleton*,
+           *borg*, or *weakref* object in a child process after
+           :func:`os.fork`
         :return:
            *self* (to support chained calls)
 
@@ -336,6 +486,8 @@ class _LifecycleBuilderMixin(object):
             self._after_inject = after_inject
         if before_clear is not None:
             self._before_clear = before_clear
+        if after_fork is not None:
+            self._after_fork = after_fork
         return self
 
 
@@ -388,6 +540,7 @@ class _TemplateBuilder(
         "_attributes",
         "_after_inject",
         "_before_clear",
+        "_after_fork",
     ]
 
     def __init__(self, context, unique_id_spec, parent=None):
@@ -399,6 +552,7 @@ class _TemplateBuilder(
         self._attributes = OrderedDict()
         self._after_inject = None
         self._before_clear = None
+        self._after_fork = None
 
     def _init_definition(self):
         return Template(
@@ -408,7 +562,8 @@ class _TemplateBuilder(
                 if self._parent_id_spec is not None
                 else None,
             after_inject=self._after_inject,
-            before_clear=self._before_clear)
+            before_clear=self._before_clear,
+            after_fork=self._after_fork)
 
 
 @traced
@@ -421,6 +576,12 @@ class _ComponentBuilder(_CreationBuilderMixin, _TemplateBuilder):
         "_factory_name",
         "_member_name",
         "_strategy",
+        "_snapshot",
+        "_deep_clone",
+        "_after_clone",
+        "_backoff",
+        "_timeout",
+        "_parallel",
     ]
 
     def __init__(self, context, unique_id_spec, parent=None):
@@ -430,6 +591,12 @@ class _ComponentBuilder(_CreationBuilderMixin, _TemplateBuilder):
         self._factory_name = None
         self._member_name = None
         self._strategy = None
+        self._snapshot = False
+        self._deep_clone = False
+        self._after_clone = None
+        self._backoff = None
+        self._timeout = None
+        self._parallel = False
 
     def _init_definition(self):
         return Component(
@@ -446,7 +613,14 @@ class _ComponentBuilder(_CreationBuilderMixin, _TemplateBuilder):
                 if self._parent_id_spec is not None
                 else None,
             after_inject=self._after_inject,
-            before_clear=self._before_clear)
+            before_clear=self._before_clear,
+            after_fork=self._after_fork,
+            snapshot=self._snapshot,
+            deep_clone=self._deep_clone,
+            after_clone=self._after_clone,
+            backoff=self._backoff,
+            timeout=self._timeout,
+            parallel=self._parallel)
 
 
 @traced
@@ -457,7 +631,9 @@ class Context(dict, _ContextBuilder):
 
     """
 
-    def __init__(self, context_id, after_inject=None, before_clear=None):
+    def __init__(
+            self, context_id, after_inject=None, before_clear=None,
+            after_fork=None):
         """
         :arg str context_id:
            an identifier for this context
@@ -469,6 +645,13 @@ class Context(dict, _ContextBuilder):
            specifies the name of the method that will be called (if it
            exists) on **all** singleton, borg, and weakref objects
            immediately before they are cleared from cache
+        :keyword str after_fork:
+           specifies the name of the method that will be called (if it
+           exists) on **all** cached singleton, borg, and weakref
+           objects in a child process after :func:`os.fork`
+
+        .. versionadded:: 3.1.0
+           the *after_fork* keyword
 
         """
         #PYVER: arguments to super() are implicit under Python 3
@@ -481,6 +664,8 @@ class Context(dict, _ContextBuilder):
         self._context_id = context_id
         self._after_inject = after_inject
         self._before_clear = before_clear
+        self._after_fork = after_fork
+        self._revision = 0
 
     @property
     def context_id(self):
@@ -512,6 +697,32 @@ class Context(dict, _ContextBuilder):
         """
         return self._before_clear
 
+    @property
+    def after_fork(self):
+        """The name of the component object method that will be called
+        on a cached object in a child process after :func:`os.fork`
+        *(read-only)*.
+
+        .. versionadded:: 3.1.0
+
+        """
+        return self._after_fork
+
+    @property
+    def revision(self):
+        """The number of times that a definition has been added to,
+        replaced in, or removed from this context *(read-only)*.
+
+        .. versionadded:: 3.1.0
+
+        An :class:`aglyph.assembler.Assembler` compares revisions to
+        decide whether information it derived from this context (e.g.
+        the reverse-dependency index used by
+        :meth:`aglyph.assembler.Assembler.evict`) must be rebuilt.
+
+        """
+        return self._revision
+
     def register(self, definition):
         """Add a component or template *definition* to this context.
 
@@ -523,16 +734,50 @@ class Context(dict, _ContextBuilder):
 
         .. note::
            To **replace** an already-registered component or template
-           with the same unique ID, use :meth:`dict.__setitem__`
-           directly.
+           with the same unique ID, assign it directly
+           (``context[definition.unique_id] = definition``).
 
         """
-        if definition.unique_id in self:
+        # only this context's own definitions (see ChildContext)
+        if dict.__contains__(self, definition.unique_id):
             raise AglyphError(
                 "%s with ID %r already mapped in %s" % (
                     name_of(definition.__class__), definition.unique_id, self))
         self[definition.unique_id] = definition
 
+    # every mutation of the mapping increments the revision
+
+    def __setitem__(self, unique_id, definition):
+        dict.__setitem__(self, unique_id, definition)
+        self._revision += 1
+
+    def __delitem__(self, unique_id):
+        dict.__delitem__(self, unique_id)
+        self._revision += 1
+
+    def pop(self, unique_id, *default):
+        definition = dict.pop(self, unique_id, *default)
+        self._revision += 1
+        return definition
+
+    def popitem(self):
+        item = dict.popitem(self)
+        self._revision += 1
+        return item
+
+    def setdefault(self, unique_id, definition=None):
+        if not dict.__contains__(self, unique_id):
+            self._revision += 1
+        return dict.setdefault(self, unique_id, definition)
+
+    def update(self, *args, **kwargs):
+        dict.update(self, *args, **kwargs)
+        self._revision += 1
+
+    def clear(self):
+        dict.clear(self)
+        self._revision += 1
+
     def get_component(self, component_id):
         """Return the :class:`Component` identified by *component_id*.
 
@@ -564,14 +809,297 @@ class Context(dict, _ContextBuilder):
                     (strategy in [None, obj.strategy])):
                 yield obj
 
+    def __getstate__(self):
+        """Return the picklable state of this context (excluding its
+        definitions).
+
+        .. versionadded:: 3.1.0
+
+        """
+        return self.__dict__.copy()
+
+    def __setstate__(self, state):
+        """Restore the state of an unpickled context.
+
+        :arg dict state: the state returned by :meth:`__getstate__`
+
+        .. versionadded:: 3.1.0
+
+        """
+        self.__dict__.update(state)
+
+    def __reduce__(self):
+        """Return the compact, versioned pickled form of this context.
+
+        .. versionadded:: 3.1.0
+
+        The pickled form contains the context state and the
+        :class:`Component` and :class:`Template` definitions (whose
+        unique IDs are **not** pickled a second time as mapping keys).
+        A context that was pickled by an incompatible Aglyph release
+        raises :exc:`aglyph.AglyphError` when it is unpickled.
+
+        A pickled context can therefore be shipped once to each worker
+        of a process pool (instead of each worker parsing the context
+        again)::
+
+           def init_worker(worker_assembler):
+               global assembler
+               assembler = worker_assembler
+
+           executor = ProcessPoolExecutor(
+               initializer=init_worker,
+               initargs=(Assembler(XMLContext("app-context.xml")),))
+
+        (An :class:`aglyph.assembler.Assembler` pickles as its context.)
+
+        """
+        # (only parsed definitions; LazyXMLContext records its unparsed
+        # definitions in its state)
+        return (
+            _unpickle_context,
+            (self.__class__, _PICKLE_VERSION, self.__getstate__(),
+                tuple(
+                    definition for definition in dict.values(self)
+                    if isinstance(definition, Template))))
+
     def __str__(self):
         return "<%s %r @%08x>" % (
             name_of(self.__class__), self._context_id, id(self))
 
     def __repr__(self):
-        return "%s.%s(%r, after_inject=%r, before_clear=%r)" % (
-            self.__class__.__module__, name_of(self.__class__),
-            self._context_id, self._after_inject, self._before_clear)
+        return (
+            "%s.%s(%r, after_inject=%r, before_clear=%r, after_fork=%r)") % (
+                self.__class__.__module__, name_of(self.__class__),
+                self._context_id, self._after_inject, self._before_clear,
+                self._after_fork)
+
+
+@traced
+@logged
+class ChildContext(Context):
+    """A context that overrides and/or extends a *parent* context
+    without copying it.
+
+    .. versionadded:: 3.1.0
+
+    A child context maps only the definitions that are registered in it
+    directly. Any other unique ID is looked up in the parent context
+    (which may itself be a ``ChildContext``), so a definition that is
+    registered in the child **overrides** the parent definition with the
+    same unique ID for all components of the child context::
+
+       base = XMLContext("app-context.xml")
+       tenant = ChildContext("tenant-a", base)
+       tenant.singleton("db-config").create(TenantDBConfig).init(
+           "tenant-a").register()
+
+    Inherited definitions are memoized by the child when they are first
+    looked up, so repeated lookups do not walk the chain of parent
+    contexts.
+
+    .. note::
+       :meth:`dict.keys`, :meth:`dict.values`, :meth:`dict.items` and
+       :func:`len` describe only the definitions registered in the child
+       itself; :meth:`get`, ``[]``, ``in`` and :meth:`iter_components`
+       also take the parent context into account.
+
+    .. warning::
+       Because inherited definitions are memoized, the parent context
+       should be fully defined before the child context is used.
+
+    An :class:`aglyph.assembler.Assembler` for a child context may
+    delegate the assembly of inherited components to an assembler for
+    the parent context (see the *parent* keyword of
+    :class:`aglyph.assembler.Assembler`).
+
+    """
+
+    def __init__(
+            self, context_id, parent, after_inject=None, before_clear=None,
+            after_fork=None):
+        """
+        :arg str context_id:
+           an identifier for this context
+        :arg aglyph.context.Context parent:
+           the context that this context overrides and/or extends
+        :keyword str after_inject:
+           overrides the parent context's *after_inject* method name
+        :keyword str before_clear:
+           overrides the parent context's *before_clear* method name
+        :keyword str after_fork:
+           overrides the parent context's *after_fork* method name
+
+        """
+        #PYVER: arguments to super() are implicit under Python 3
+        super(ChildContext, self).__init__(
+            context_id, after_inject=after_inject, before_clear=before_clear,
+            after_fork=after_fork)
+        if not isinstance(parent, Context):
+            raise TypeError(
+                "parent must be a Context, not %s" % name_of(parent.__class__))
+        self._parent = parent
+        # {unique ID: definition} inherited from the parent (memoized)
+        self._inherited = {}
+
+    @property
+    def parent(self):
+        """The context that this context overrides and/or extends
+        *(read-only)*.
+
+        """
+        return self._parent
+
+    @property
+    def after_inject(self):
+        """The name of the component object method that will be called
+        after **all** dependencies have been injected into that
+        component object *(read-only)*.
+
+        If not specified for this context, the parent context's
+        *after_inject* method name is used.
+
+        """
+        return (
+            self._after_inject if self._after_inject is not None
+            else self._parent.after_inject)
+
+    @property
+    def before_clear(self):
+        """The name of the component object method that will be called
+        immediately before the object is cleared from cache
+        *(read-only)*.
+
+        If not specified for this context, the parent context's
+        *before_clear* method name is used.
+
+        """
+        return (
+            self._before_clear if self._before_clear is not None
+            else self._parent.before_clear)
+
+    @property
+    def after_fork(self):
+        """The name of the component object method that will be called
+        on a cached object in a child process after :func:`os.fork`
+        *(read-only)*.
+
+        If not specified for this context, the parent context's
+        *after_fork* method name is used.
+
+        """
+        return (
+            self._after_fork if self._after_fork is not None
+            else self._parent.after_fork)
+
+    def defines(self, unique_id):
+        """Return ``True`` if *unique_id* is registered in this context
+        itself (rather than inherited from the parent context).
+
+        :arg str unique_id: a component or template unique ID
+        :rtype: :obj:`bool`
+
+        """
+        return dict.__contains__(self, unique_id)
+
+    def get(self, unique_id, default=None):
+        """Return the definition for *unique_id* in this context or (if
+        not overridden) in the parent context.
+
+        :arg str unique_id: a component or template unique ID
+        :keyword default: returned if *unique_id* is not defined
+
+        """
+        definition = dict.get(self, unique_id)
+        if definition is None:
+            definition = self._inherit(unique_id)
+        return definition if definition is not None else default
+
+    def __missing__(self, unique_id):
+        definition = self._inherit(unique_id)
+        if definition is None:
+            raise KeyError(unique_id)
+        return definition
+
+    def __contains__(self, unique_id):
+        return (
+            dict.__contains__(self, unique_id) or
+            self._inherit(unique_id) is not None)
+
+    def iter_components(self, strategy=None):
+        """Yield all component definitions of this context and all
+        (not overridden) component definitions of the parent context,
+        optionally filtered by *strategy*.
+
+        .. seealso:: :meth:`Context.iter_components`
+
+        """
+        for component in super(ChildContext, self).iter_components(strategy):
+            yield component
+        for component in self._parent.iter_components(strategy):
+            if not dict.__contains__(self, component.unique_id):
+                yield component
+
+    def _inherit(self, unique_id):
+        """Return the parent context definition for *unique_id*, or
+        ``None``.
+
+        """
+        definition = self._inherited.get(unique_id)
+        if definition is None:
+            definition = self._parent.get(unique_id)
+            if definition is not None:
+                self._inherited[unique_id] = definition
+        return definition
+
+    def __getstate__(self):
+        """Return the picklable state of this context (excluding its
+        definitions and the memoized parent definitions).
+
+        """
+        state = super(ChildContext, self).__getstate__()
+        del state["_inherited"]
+        return state
+
+    def __setstate__(self, state):
+        """Restore the state of an unpickled context.
+
+        :arg dict state: the state returned by :meth:`__getstate__`
+
+        """
+        super(ChildContext, self).__setstate__(state)
+        self._inherited = {}
+
+    def __repr__(self):
+        return (
+            "%s.%s(%r, %r, after_inject=%r, before_clear=%r, "
+            "after_fork=%r)") % (
+                self.__class__.__module__, name_of(self.__class__),
+                self._context_id, self._parent, self._after_inject,
+                self._before_clear, self._after_fork)
+
+
+@traced
+def _unpickle_context(cls, version, state, definitions):
+    """Create a *cls* context from its pickled form.
+
+    :arg cls: the :class:`Context` class (or subclass)
+    :arg int version: the pickle version of the pickled context
+    :arg dict state: the context state
+    :arg tuple definitions:
+       the context's :class:`Component` and :class:`Template` objects
+    :return: the unpickled context
+    :raise aglyph.AglyphError:
+       if *version* is not supported by this Aglyph release
+
+    """
+    _check_pickle_version(version, cls)
+    context = dict.__new__(cls)
+    context.__setstate__(state)
+    dict.update(
+        context,
+        ((definition.unique_id, definition) for definition in definitions))
+    return context
 
 
 @traced
@@ -643,17 +1171,48 @@ class XMLContext(Context):
                  https://www.w3.org/TR/REC-xml/#id
 
         """
+        # ElementTree is only imported once an XML context is created (see
+        # aglyph._compat); the fluent Context API does not need it
+        import xml.etree.ElementTree as ET
+
         if parser is None:
+            from aglyph._compat import (
+                AglyphDefaultXMLParser, DoctypeTreeBuilder)
             parser = AglyphDefaultXMLParser(target=DoctypeTreeBuilder())
         tree = ET.parse(source, parser=parser)
         root = tree.getroot()
-        if root.tag != "context":
-            raise AglyphError("expected root <context>, not <%s>" % root.tag)
+        self._init_context(root, default_encoding)
+
+        for element in root:
+            self._process_definition(element)
+
+        self.__repr = "%s.%s(%r, parser=%r, default_encoding=%r)" % (
+            self.__class__.__module__, name_of(self.__class__),
+            source, parser, default_encoding)
+
+    def _init_context(self, context_element, default_encoding):
+        """Initialize this context from the root *context_element*.
+
+        :arg xml.etree.ElementTree.Element context_element:
+           the root ``<context>`` element (its children are **not**
+           processed by this method)
+        :arg str default_encoding:
+           the default character set used to encode certain element
+           content
+        :raise AglyphError:
+           if *context_element* is not a ``<context>`` element
+
+        """
+        if context_element.tag != "context":
+            raise AglyphError(
+                "expected root <context>, not <%s>" % context_element.tag)
 
         #PYVER: arguments to super() are implicit under Python 3
         super(XMLContext, self).__init__(
-            root.get("id"), after_inject=root.get("after-inject"),
-            before_clear=root.get("before-clear"))
+            context_element.get("id"),
+            after_inject=context_element.get("after-inject"),
+            before_clear=context_element.get("before-clear"),
+            after_fork=context_element.get("after-fork"))
 
         # alias the correct _parse_str method based on Python version
         if is_python_3:
@@ -663,20 +1222,27 @@ class XMLContext(Context):
 
         self._default_encoding = default_encoding
 
-        for element in list(root):
-            if element.tag == "component":
-                depsupport = self._create_component(element)
-            elif element.tag == "template":
-                depsupport = self._create_template(element)
-            else:
-                raise AglyphError(
-                    "unexpected element: /context/%s" % element.tag)
-            self.register(depsupport)
-            self._process_dependencies(depsupport, element)
+    def _process_definition(self, definition_element):
+        """Create and register the template or component described by
+        *definition_element*.
 
-        self.__repr = "%s.%s(%r, parser=%r, default_encoding=%r)" % (
-            self.__class__.__module__, name_of(self.__class__),
-            source, parser, default_encoding)
+        :arg xml.etree.ElementTree.Element definition_element:
+           a ``<component>`` or ``<template>`` element (a child of
+           the root ``<context>`` element)
+        :raise AglyphError:
+           if *definition_element* is neither a ``<component>`` nor a
+           ``<template>``
+
+        """
+        if definition_element.tag == "component":
+            depsupport = self._create_component(definition_element)
+        elif definition_element.tag == "template":
+            depsupport = self._create_template(definition_element)
+        else:
+            raise AglyphError(
+                "unexpected element: /context/%s" % definition_element.tag)
+        self.register(depsupport)
+        self._process_dependencies(depsupport, definition_element)
 
     @property
     def default_encoding(self):
@@ -705,7 +1271,8 @@ class XMLContext(Context):
             template_element.get("id"),
             parent_id=template_element.get("parent-id"),
             after_inject=template_element.get("after-inject"),
-            before_clear=template_element.get("before-clear")
+            before_clear=template_element.get("before-clear"),
+            after_fork=template_element.get("after-fork")
         )
 
     def _create_component(self, component_element):
@@ -719,6 +1286,8 @@ class XMLContext(Context):
            :class:`aglyph.component.Component`
 
         """
+        backoff = component_element.get("backoff")
+        timeout = component_element.get("timeout")
         return Component(
             component_element.get("id"),
             dotted_name=component_element.get("dotted-name"),
@@ -727,7 +1296,14 @@ class XMLContext(Context):
             strategy=component_element.get("strategy"),
             parent_id=component_element.get("parent-id"),
             after_inject=component_element.get("after-inject"),
-            before_clear=component_element.get("before-clear")
+            before_clear=component_element.get("before-clear"),
+            after_fork=component_element.get("after-fork"),
+            snapshot=component_element.get("snapshot") == "true",
+            deep_clone=component_element.get("deep-clone") == "true",
+            after_clone=component_element.get("after-clone"),
+            backoff=float(backoff) if backoff is not None else None,
+            timeout=float(timeout) if timeout is not None else None,
+            parallel=component_element.get("parallel") == "true"
         )
 
     def _process_dependencies(self, depsupport, depsupport_element):
@@ -791,7 +1367,7 @@ class XMLContext(Context):
            arguments, ``keyword`` will be ``None``.
 
         """
-        for element in list(init_element):
+        for element in init_element:
             if element.tag != "arg":
                 raise AglyphError("unexpected element: init/%s" % element.tag)
             keyword = element.get("keyword")
@@ -810,7 +1386,7 @@ class XMLContext(Context):
            an iterator that yields the 2-tuple ``(name, value)``
 
         """
-        for element in list(attributes_element):
+        for element in attributes_element:
             if element.tag != "attribute":
                 raise AglyphError(
                     "unexpected element: attributes/%s" % element.tag)
@@ -1145,7 +1721,7 @@ class XMLContext(Context):
         """
         # a list of 2-tuples, (key, value), used to initialize a dictionary
         items = []
-        for element in list(dict_element):
+        for element in dict_element:
             if element.tag != "item":
                 raise AglyphError("unexpected element: dict/%s" % element.tag)
 
@@ -1201,8 +1777,792 @@ class XMLContext(Context):
         """
         if eval_element.text is None:
             raise AglyphError("<eval> cannot be an empty element")
+        from ast import literal_eval
         return partial(literal_eval, eval_element.text)
 
+    def __getstate__(self):
+        """Return the picklable state of this context.
+
+        .. note::
+           The ``_parse_str`` alias is a bound method (which cannot be
+           pickled under Python 2), so it is excluded here and restored
+           by :meth:`__setstate__`.
+
+        """
+        state = self.__dict__.copy()
+        state.pop("_parse_str", None)
+        return state
+
+    def __setstate__(self, state):
+        """Restore the state of an unpickled context.
+
+        :arg dict state: the state returned by :meth:`__getstate__`
+
+        """
+        self.__dict__.update(state)
+        if is_python_3:
+            self._parse_str = self.__parse_str_as_text
+        else:
+            self._parse_str = self.__parse_str_as_data
+
+    def __repr__(self):
+        return self.__repr
+
+
+class _StreamingContextBuilder(object):
+    """A parser target that passes each completed ``<component>`` or
+    ``<template>`` element to a :class:`StreamingXMLContext` as soon as
+    it is parsed, and then discards it.
+
+    The elements themselves are built by a wrapped
+    :class:`aglyph._compat.DoctypeTreeBuilder`.
+
+    """
+
+    def __init__(self, context, default_encoding):
+        """
+        :arg StreamingXMLContext context:
+           the context being populated
+        :arg str default_encoding:
+           the default character set used to encode certain element
+           content
+
+        """
+        from aglyph._compat import DoctypeTreeBuilder
+        self._builder = DoctypeTreeBuilder()
+        self._context = context
+        self._default_encoding = default_encoding
+        self._depth = 0
+        self._root = None
+
+    def start(self, tag, attrs):
+        """Open a new element.
+
+        :arg str tag: the element name
+        :arg dict attrs: the element attributes
+
+        The context itself is initialized as soon as the root element
+        has been opened.
+
+        """
+        element = self._builder.start(tag, attrs)
+        self._depth += 1
+        if self._depth == 1:
+            self._root = element
+            self._context._init_context(element, self._default_encoding)
+        return element
+
+    def end(self, tag):
+        """Close the current element.
+
+        :arg str tag: the element name
+
+        A closed child of the root element is a complete definition; it
+        is processed immediately and then removed from the tree.
+
+        """
+        element = self._builder.end(tag)
+        self._depth -= 1
+        if self._depth == 1:
+            self._context._process_definition(element)
+            self._root.remove(element)
+        return element
+
+    def data(self, data):
+        """Add text to the current element.
+
+        :arg str data: the element text
+
+        """
+        self._builder.data(data)
+
+    def doctype(self, name, pubid, system):
+        """Report the parsed DOCTYPE declaration.
+
+        :arg str name: the document type name
+        :arg str pubid: the document type public identifier
+        :arg str system: the document type system identifier
+
+        """
+        self._builder.doctype(name, pubid, system)
+
+    def close(self):
+        """Return the (now empty) root element."""
+        return self._builder.close()
+
+
+@traced
+@logged
+class StreamingXMLContext(XMLContext):
+    """An :class:`XMLContext` that is populated in a single pass while
+    the XML document is being parsed.
+
+    .. versionadded:: 3.1.0
+
+    :class:`XMLContext` builds the element tree for the **entire**
+    document before creating any definitions, so its peak memory use is
+    a multiple of the document size. A ``StreamingXMLContext`` instead
+    creates each component or template definition as soon as its
+    element has been parsed, and then discards the element. Only one
+    definition's elements are held in memory at any time.
+
+    A ``StreamingXMLContext`` produces the same definitions, and raises
+    the same errors, as an :class:`XMLContext` for the same document.
+
+    .. note::
+       Because definitions are processed while the document is being
+       parsed, a document that contains both an invalid definition
+       **and** a later XML syntax error will report the invalid
+       definition (where :class:`XMLContext` would report the syntax
+       error).
+
+    """
+
+    def __init__(self, source, default_encoding=sys.getdefaultencoding()):
+        """
+        :arg source:
+           a filename or stream from which XML data is read
+        :keyword str default_encoding:
+           the default character set used to encode certain element
+           content
+        :raise AglyphError:
+           if unexpected elements are encountered, or if expected
+           elements are *not* encountered, in the document structure
+
+        Refer to :class:`XMLContext` for a description of
+        *default_encoding*.
+
+        .. note::
+           Unlike :class:`XMLContext`, a custom parser cannot be
+           specified, because the parser must deliver its events to
+           this context.
+
+        """
+        import xml.etree.ElementTree as ET
+        from aglyph._compat import AglyphDefaultXMLParser
+
+        builder = _StreamingContextBuilder(self, default_encoding)
+        ET.parse(source, parser=AglyphDefaultXMLParser(target=builder))
+
+        self.__repr = "%s.%s(%r, default_encoding=%r)" % (
+            self.__class__.__module__, name_of(self.__class__),
+            source, default_encoding)
+
     def __repr__(self):
         return self.__repr
 
+
+#: Placeholder for a definition that has been indexed but not yet parsed
+#: by a :class:`LazyXMLContext`.
+_UNPARSED = object()
+
+
+@traced
+@logged
+class LazyXMLContext(XMLContext):
+    """An :class:`XMLContext` that indexes its definitions up front but
+    only parses each definition when it is first requested.
+
+    .. versionadded:: 3.1.0
+
+    Creating a ``LazyXMLContext`` performs a single, fast scan of the
+    XML document that records the byte range of every top-level
+    ``<component>`` and ``<template>`` element. No element tree is
+    built, and no definitions are created.
+
+    A definition (and its parent templates or components) is parsed the
+    first time it is accessed via :meth:`get`, :meth:`get_component`,
+    or ``context[unique_id]``. Membership tests (``unique_id in
+    context``), :func:`len`, and iteration over the unique IDs never
+    parse a definition.
+
+    This is useful for very large contexts of which any single process
+    only assembles a small subset.
+
+    The following conditions are detected by the initial scan and raise
+    :class:`AglyphError` immediately, exactly as for
+    :class:`XMLContext`: an unexpected root element, an empty context
+    ID, an unexpected top-level element, and a duplicate unique ID. All
+    other errors in a definition are raised the first time that
+    definition is accessed.
+
+    .. note::
+       The document must use an ASCII-compatible encoding (e.g. UTF-8
+       or ISO-8859-1), and definitions must not rely on entities
+       declared in the document type definition.
+
+    """
+
+    def __init__(self, source, default_encoding=sys.getdefaultencoding()):
+        """
+        :arg source:
+           a filename or stream from which XML data is read
+        :keyword str default_encoding:
+           the default character set used to encode certain element
+           content
+        :raise AglyphError:
+           if the root element is not ``<context>``, or the context
+           contains an unexpected top-level element or a duplicate
+           unique ID
+
+        Refer to :class:`XMLContext` for a description of
+        *default_encoding*.
+
+        """
+        if hasattr(source, "read"):
+            data = source.read()
+        else:
+            with open(source, "rb") as f:
+                data = f.read()
+        if not isinstance(data, DataType):
+            # the scanner would parse text as UTF-8 regardless of the
+            # declared document encoding
+            data = data.encode("utf-8")
+            self._encoding = "utf-8"
+        else:
+            self._encoding = None
+
+        self._data = data
+        self._lock = RLock()
+        #: unique ID -> (tag, start, end, parent ID, strategy)
+        self._index = {}
+        self._scan(default_encoding)
+
+        self.__repr = "%s.%s(%r, default_encoding=%r)" % (
+            self.__class__.__module__, name_of(self.__class__),
+            source, default_encoding)
+
+    def _scan(self, default_encoding):
+        """Initialize this context and index (but do not parse) its
+        definitions.
+
+        :arg str default_encoding:
+           the default character set used to encode certain element
+           content
+
+        """
+        import xml.etree.ElementTree as ET
+        from xml.parsers import expat
+
+        definitions = []
+        # [depth, start offset of the open definition]
+        state = [0, None]
+
+        def xml_decl(version, encoding, standalone):
+            if self._encoding is None:
+                self._encoding = encoding
+
+        def start(tag, attrs):
+            if state[0] == 0:
+                self._init_context(ET.Element(tag, attrs), default_encoding)
+            elif state[0] == 1:
+                self._index_definition(tag, attrs)
+                state[1] = scanner.CurrentByteIndex
+                if definitions:
+                    definitions[-1][2] = state[1]
+                definitions.append([attrs.get("id"), state[1], None])
+            state[0] += 1
+
+        def end(tag):
+            state[0] -= 1
+            if state[0] == 0 and definitions:
+                definitions[-1][2] = scanner.CurrentByteIndex
+
+        scanner = expat.ParserCreate()
+        scanner.XmlDeclHandler = xml_decl
+        scanner.StartElementHandler = start
+        scanner.EndElementHandler = end
+        try:
+            scanner.Parse(self._data, True)
+        except expat.ExpatError as e:
+            # raise the same error that ElementTree would raise
+            error = ET.ParseError(e)
+            error.code = e.code
+            error.position = (e.lineno, e.offset)
+            raise error
+
+        if self._encoding is None:
+            self._encoding = "utf-8"
+
+        for (unique_id, start, end) in definitions:
+            (tag, _, _, parent_id, strategy) = self._index[unique_id]
+            self._index[unique_id] = (tag, start, end, parent_id, strategy)
+
+        self.__log.info(
+            "indexed %d definitions in %s", len(self._index), self)
+
+    def _index_definition(self, tag, attrs):
+        """Record a placeholder for the definition described by a
+        top-level element.
+
+        :arg str tag: the element name
+        :arg dict attrs: the element attributes
+
+        """
+        if tag == "component":
+            definition_class = Component
+        elif tag == "template":
+            definition_class = Template
+        else:
+            raise AglyphError("unexpected element: /context/%s" % tag)
+
+        unique_id = attrs.get("id")
+        if not unique_id:
+            # let the definition class raise its own error
+            definition_class(unique_id)
+        if unique_id in self:
+            raise AglyphError(
+                "%s with ID %r already mapped in %s" % (
+                    name_of(definition_class), unique_id, self))
+
+        if tag == "component":
+            strategy = ("_imported" if attrs.get("member-name") else
+                attrs.get("strategy", Strategy.PROTOTYPE))
+        else:
+            strategy = None
+        self._index[unique_id] = (
+            tag, None, None, attrs.get("parent-id"), strategy)
+        dict.__setitem__(self, unique_id, _UNPARSED)
+
+    def _materialize(self, unique_id):
+        """Parse, map, and return the definition identified by
+        *unique_id*, along with any unparsed parent definitions.
+
+        :arg str unique_id: the ID of an indexed definition
+        :return:
+           the :class:`Component` or :class:`Template` identified by
+           *unique_id*
+
+        """
+        with self._lock:
+            definition = dict.get(self, unique_id)
+            if definition is not _UNPARSED:
+                # materialized by another thread while waiting
+                return definition
+
+            (tag, start, end, parent_id, _) = self._index[unique_id]
+            fragment = self._data[start:end].decode(self._encoding)
+            from aglyph._compat import (
+                AglyphDefaultXMLParser, DoctypeTreeBuilder)
+            parser = AglyphDefaultXMLParser(target=DoctypeTreeBuilder())
+            parser.feed("<context>%s</context>" % fragment)
+            definition_element = parser.close()[0]
+
+            if tag == "component":
+                definition = self._create_component(definition_element)
+            else:
+                definition = self._create_template(definition_element)
+            self._process_dependencies(definition, definition_element)
+            dict.__setitem__(self, unique_id, definition)
+            self.__log.debug("materialized %r", definition)
+
+            if dict.get(self, parent_id) is _UNPARSED:
+                self._materialize(parent_id)
+
+            return definition
+
+    def _materialize_all(self):
+        """Parse and map every definition that has not yet been parsed."""
+        for (unique_id, definition) in list(dict.items(self)):
+            if definition is _UNPARSED:
+                self._materialize(unique_id)
+
+    def __getitem__(self, unique_id):
+        #PYVER: arguments to super() are implicit under Python 3
+        definition = super(LazyXMLContext, self).__getitem__(unique_id)
+        if definition is _UNPARSED:
+            definition = self._materialize(unique_id)
+        return definition
+
+    def get(self, unique_id, default=None):
+        """Return the definition for *unique_id* (parsing it first if
+        necessary) if it is mapped, else *default*.
+
+        """
+        #PYVER: arguments to super() are implicit under Python 3
+        definition = super(LazyXMLContext, self).get(unique_id, default)
+        if definition is _UNPARSED:
+            definition = self._materialize(unique_id)
+        return definition
+
+    def pop(self, unique_id, *default):
+        """Remove and return the definition for *unique_id* (parsing it
+        first if necessary).
+
+        """
+        self.get(unique_id)
+        #PYVER: arguments to super() are implicit under Python 3
+        return super(LazyXMLContext, self).pop(unique_id, *default)
+
+    def values(self):
+        """Return the definitions in this context.
+
+        .. warning::
+           All definitions that have not yet been parsed are parsed by
+           this method.
+
+        """
+        self._materialize_all()
+        #PYVER: arguments to super() are implicit under Python 3
+        return super(LazyXMLContext, self).values()
+
+    def items(self):
+        """Return the ``(unique_id, definition)`` pairs in this context.
+
+        .. warning::
+           All definitions that have not yet been parsed are parsed by
+           this method.
+
+        """
+        self._materialize_all()
+        #PYVER: arguments to super() are implicit under Python 3
+        return super(LazyXMLContext, self).items()
+
+    def iter_components(self, strategy=None):
+        """Yield all definitions in this context that are instances of
+        :class:`Component`, optionally filtered by *strategy*.
+
+        :keyword str strategy:
+           only yield component definitions that use this assembly
+           strategy (by default, **all** component definitions are
+           yielded)
+        :return:
+           a :class:`Component` generator
+
+        Templates, and components that do not use *strategy*, are
+        **not** parsed by this method.
+
+        """
+        for (unique_id, obj) in list(dict.items(self)):
+            if obj is _UNPARSED:
+                (tag, _, _, _, indexed_strategy) = self._index[unique_id]
+                if (tag != "component" or
+                        strategy not in [None, indexed_strategy]):
+                    continue
+                obj = self._materialize(unique_id)
+            if (isinstance(obj, Component) and
+                    (strategy in [None, obj.strategy])):
+                yield obj
+
+    def __getstate__(self):
+        """Return the picklable state of this context.
+
+        .. note::
+           The lock that guards parsing is excluded here and recreated
+           by :meth:`__setstate__`.
+
+           Definitions that have not yet been parsed are recorded by
+           unique ID (and remain unparsed in the unpickled context).
+
+        """
+        #PYVER: arguments to super() are implicit under Python 3
+        state = super(LazyXMLContext, self).__getstate__()
+        state.pop("_lock", None)
+        state["_unparsed_ids"] = [
+            unique_id for (unique_id, definition) in dict.items(self)
+            if definition is _UNPARSED]
+        return state
+
+    def __setstate__(self, state):
+        """Restore the state of an unpickled context.
+
+        :arg dict state: the state returned by :meth:`__getstate__`
+
+        """
+        state = state.copy()
+        unparsed_ids = state.pop("_unparsed_ids", ())
+        #PYVER: arguments to super() are implicit under Python 3
+        super(LazyXMLContext, self).__setstate__(state)
+        self._lock = RLock()
+        for unique_id in unparsed_ids:
+            dict.__setitem__(self, unique_id, _UNPARSED)
+
+    def __repr__(self):
+        return self.__repr
+
+
+@traced
+@logged
+class ContextCache(object):
+    """An in-process and (optionally) on-disk cache of parsed
+    :class:`XMLContext` objects.
+
+    .. versionadded:: 3.1.0
+
+    Parsing a large XML context document can be a significant part of
+    application start-up time. A ``ContextCache`` stores the parsed
+    component and template definitions in a fast-loading binary
+    (:mod:`pickle`) form, keyed by a fingerprint of:
+
+    * the content of the XML document (*not* its file name or stream)
+    * the parser class and *default_encoding* used to parse it
+    * the Aglyph version
+    * the Python MAJOR.MINOR version
+
+    When any part of the fingerprint changes, the document is simply
+    parsed again (and the new result is cached)::
+
+       cache = ContextCache("/var/cache/myapp")
+       context = cache.load("my-aglyph-context.xml")
+       assembler = Assembler(context)
+
+    Every call to :meth:`load` returns a **new** :class:`XMLContext`
+    object, so contexts loaded from the same cache may be modified
+    independently of one another.
+
+    """
+
+    def __init__(self, cache_dir=None):
+        """
+        :keyword str cache_dir:
+           the directory in which cached contexts are stored (if not
+           specified, contexts are only cached in-process); it must be
+           private to the current user, and is created that way if it
+           does not exist
+
+        """
+        #PYVER: arguments to super() are implicit under Python 3
+        super(ContextCache, self).__init__()
+        self._cache_dir = cache_dir
+        self._payloads = {}
+        self._statistics = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "cold_seconds": 0.0,
+            "warm_seconds": 0.0,
+        }
+
+    @property
+    def cache_dir(self):
+        """The directory in which cached contexts are stored, or
+        ``None`` if contexts are only cached in-process *(read-only)*.
+
+        """
+        return self._cache_dir
+
+    @property
+    def statistics(self):
+        """A snapshot of the cache statistics *(read-only)*.
+
+        :rtype: :obj:`dict`
+
+        The statistics are:
+
+        memory_hits
+           the number of contexts loaded from the in-process cache
+        disk_hits
+           the number of contexts loaded from *cache_dir*
+        misses
+           the number of contexts that had to be parsed
+        cold_seconds
+           the total time spent parsing (and caching) contexts
+        warm_seconds
+           the total time spent loading contexts from cache
+
+        """
+        return dict(self._statistics)
+
+    def load(
+            self, source, parser=None,
+            default_encoding=sys.getdefaultencoding()):
+        """Return the :class:`XMLContext` for *source*, from cache if
+        possible.
+
+        :arg source:
+           a filename or stream from which XML data is read
+        :keyword xml.etree.ElementTree.XMLParser parser:
+           the ElementTree parser to use (instead of Aglyph's default)
+        :keyword str default_encoding:
+           the default character set used to encode certain element
+           content
+        :return:
+           a new context object
+        :rtype:
+           :class:`XMLContext`
+
+        The arguments have the same meaning as they do for
+        :class:`XMLContext`. (*parser* is only used if *source* must
+        actually be parsed.)
+
+        The time taken to load the context is logged at
+        :attr:`logging.INFO` level, and accumulated in
+        :attr:`statistics`.
+
+        """
+        raw = self._read_source(source)
+        key = self._fingerprint(
+            raw if isinstance(raw, DataType) else raw.encode("utf-8"),
+            parser, default_encoding)
+
+        started = perf_counter()
+        (context, location) = self._load_cached(key)
+        if context is not None:
+            elapsed = perf_counter() - started
+            self._statistics["%s_hits" % location] += 1
+            self._statistics["warm_seconds"] += elapsed
+            self.__log.info(
+                "loaded %s from %s cache in %.6fs", context, location, elapsed)
+            return context
+
+        # a text document must be parsed as text (its XML declaration may
+        # name an encoding other than UTF-8)
+        context = XMLContext(
+            bytebuf(raw) if isinstance(raw, DataType) else textbuf(raw),
+            parser=parser, default_encoding=default_encoding)
+        import pickle
+        self._store(key, pickle.dumps(context, pickle.HIGHEST_PROTOCOL))
+
+        elapsed = perf_counter() - started
+        self._statistics["misses"] += 1
+        self._statistics["cold_seconds"] += elapsed
+        self.__log.info("parsed and cached %s in %.6fs", context, elapsed)
+        return context
+
+    def clear(self):
+        """Discard all contexts from the in-process cache.
+
+        .. note::
+           Contexts cached in :attr:`cache_dir` are **not** removed.
+
+        """
+        self._payloads.clear()
+
+    def _read_source(self, source):
+        """Return the raw content of *source*.
+
+        :arg source: a filename or stream from which XML data is read
+        :return:
+           the encoded bytes (or Unicode text, if *source* is a text
+           stream) read from *source*
+
+        """
+        if hasattr(source, "read"):
+            return source.read()
+        else:
+            with open(source, "rb") as f:
+                return f.read()
+
+    def _fingerprint(self, data, parser, default_encoding):
+        """Return the cache key for a parsed context.
+
+        :arg bytes data: the raw XML document
+        :arg parser: the ElementTree parser (or ``None``)
+        :arg str default_encoding: the default encoding
+        :rtype: :obj:`str`
+
+        """
+        import hashlib
+        from aglyph._compat import AglyphDefaultXMLParser
+
+        parser_class = (
+            parser.__class__ if parser is not None
+            else AglyphDefaultXMLParser)
+        settings = "\0".join([
+            "%s.%s" % (parser_class.__module__, name_of(parser_class)),
+            default_encoding,
+            __version__,
+            "%d.%d" % sys.version_info[:2],
+        ])
+        digest = hashlib.sha256(data)
+        digest.update(b"\0")
+        digest.update(settings.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _load_cached(self, key):
+        """Return the cached context for *key* and where it was found.
+
+        :arg str key: the context fingerprint
+        :return:
+           a 2-tuple ``(context, location)`` where ``location`` is
+           either ``"memory"`` or ``"disk"``; or ``(None, None)`` if
+           no usable cached context exists
+
+        """
+        location = "memory"
+        payload = self._payloads.get(key)
+        if payload is None and self._cache_dir is not None:
+            location = "disk"
+            payload = self._read_cached(key)
+
+        if payload is not None:
+            import pickle
+            try:
+                context = pickle.loads(payload)
+            except Exception as e:
+                self.__log.warning(
+                    "discarding unusable cached context %s (%s: %s)",
+                    key, e.__class__.__name__, e)
+                self._payloads.pop(key, None)
+            else:
+                self._payloads[key] = payload
+                return (context, location)
+
+        return (None, None)
+
+    def _read_cached(self, key):
+        """Return the pickled context for *key* from :attr:`cache_dir`.
+
+        :arg str key: the context fingerprint
+        :return:
+           the pickled context, or ``None`` if it has not been cached
+           (or must not be trusted)
+
+        Unpickling a file can run arbitrary code, so a cached context is
+        only read if both :attr:`cache_dir` and the file are owned by
+        the current user (and not accessible to, or writable by, other
+        users respectively).
+
+        """
+        filename = self._cache_filename(key)
+        try:
+            with open(filename, "rb") as f:
+                _check_private(self._cache_dir)
+                _check_private(filename, exclusive=False)
+                return f.read()
+        except (IOError, OSError):
+            return None
+        except AglyphError as e:
+            self.__log.warning("refusing to load cached context: %s", e)
+            return None
+
+    def _store(self, key, payload):
+        """Cache the pickled context *payload* under *key*.
+
+        :arg str key: the context fingerprint
+        :arg bytes payload: the pickled context
+
+        :attr:`cache_dir` is created (readable and writable only by the
+        current user) if necessary. Failure to write *payload* to it
+        (including when it is accessible by other users) is logged, but
+        is otherwise ignored.
+
+        """
+        self._payloads[key] = payload
+        if self._cache_dir is not None:
+            try:
+                _make_private_dir(self._cache_dir)
+                _write_atomically(self._cache_filename(key), payload)
+            except (IOError, OSError, AglyphError) as e:
+                self.__log.warning(
+                    "unable to write cached context %s to %r: %s",
+                    key, self._cache_dir, e)
+
+    def _cache_filename(self, key):
+        """Return the name of the file that stores the context for
+        *key*.
+
+        :arg str key: the context fingerprint
+
+        """
+        return os.path.join(self._cache_dir, "%s.aglyph-context" % key)
+
+    def __str__(self):
+        return "<%s %r @%08x>" % (
+            name_of(self.__class__), self._cache_dir, id(self))
+
+    def __repr__(self):
+        return "%s.%s(cache_dir=%r)" % (
+            self.__class__.__module__, name_of(self.__class__),
+            self._cache_dir)
+
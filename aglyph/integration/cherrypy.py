@@ -70,6 +70,38 @@ an object whose dotted name is a component ID)::
    my_obj = cherrypy.engine.publish("aglyph-assemble", "my-id").pop()
    ...
 
+.. versionadded:: 3.1.0
+   Singletons and borgs can be pre-assembled in the background, so
+   that the CherryPy engine does not wait for them before it starts::
+
+      cherrypy.engine.aglyph = AglyphDIPlugin(
+          cherrypy.engine, assembler, background_init=True,
+          init_priority=["my-database-pool"])
+      cherrypy.engine.aglyph.subscribe()
+
+   Until the plugin is ready (see :attr:`AglyphDIPlugin.is_ready` and
+   the *"aglyph-ready"* channel), a request for a component that has not
+   been pre-assembled yet waits only for that component.
+
+.. versionadded:: 3.1.0
+   Components that must not be shared between threads (for example, a
+   component that holds a :mod:`sqlite3` connection) can be assembled
+   once for each CherryPy worker thread::
+
+      cherrypy.engine.aglyph = AglyphDIPlugin(
+          cherrypy.engine, assembler,
+          per_thread=["movies.lister.MovieLister"])
+      cherrypy.engine.aglyph.subscribe()
+
+   Within a worker thread, publishing a per-thread component ID to the
+   *"aglyph-assemble"* channel always returns that thread's object.
+
+.. versionadded:: 3.1.0
+   The plugin registers an *"Aglyph"* namespace in
+   ``logging.statistics``, so assembly statistics are reported by
+   :mod:`cherrypy.lib.cpstats`. To avoid formatting a log message for
+   every assembly, pass ``log_assembly=False``.
+
 """
 
 from __future__ import absolute_import
@@ -77,12 +109,12 @@ from __future__ import absolute_import
 __author__ = "Matthew Zipay <mattz@ninthtest.info>"
 
 import logging
+import threading
+import time
 
 # for logging, use self.bus.log rather than self.__log
-from autologging import traced
-
-from aglyph import __version__
-from aglyph._compat import name_of
+from aglyph import _identify, __version__
+from aglyph._compat import name_of, perf_counter, traced
 
 from cherrypy.process.plugins import SimplePlugin
 
@@ -123,9 +155,26 @@ class AglyphDIPlugin(SimplePlugin):
     aglyph-clear-weakrefs
        Publish to this channel to clear all cached *weakref* components.
 
+    start_thread
+       Published by CherryPy when a worker thread starts; the
+       *per-thread* components are assembled for that thread.
+
+    stop_thread
+       Published by CherryPy when a worker thread stops; the
+       "before_clear" lifecycle methods of that thread's *per-thread*
+       components are called.
+
+    The Aglyph DI plugin publishes to the following channel:
+
+    aglyph-ready
+       Published (with no arguments) once the plugin has started and
+       any eager initialization has finished.
+
     """
 
-    def __init__(self, bus, assembler, eager_init=True):
+    def __init__(
+            self, bus, assembler, eager_init=True, background_init=False,
+            init_priority=(), per_thread=(), log_assembly=True):
         """
         :arg cherrypy.process.wspbus.Bus bus:
            the CherryPy Web Site Process Bus
@@ -135,11 +184,45 @@ class AglyphDIPlugin(SimplePlugin):
            if ``True``, all *singleton* and *borg* components in the
            assembler's context will be pre-assembed and cached when the
            Aglyph DI plugin is started
+        :keyword bool background_init:
+           if ``True`` (and *eager_init* is ``True``), *singleton* and
+           *borg* components are pre-assembled by a background thread
+           instead of before :meth:`start` returns
+        :keyword init_priority:
+           component specifications (IDs or objects whose dotted names
+           are IDs) to be pre-assembled first, in order, during eager
+           initialization
+        :keyword per_thread:
+           specifications of the components that are assembled once for
+           each CherryPy worker thread (see :meth:`start_thread`)
+        :keyword bool log_assembly:
+           if ``False``, :meth:`assemble` does not log a message to the
+           bus for each assembly
+
+        .. versionadded:: 3.1.0
+           the *background_init*, *init_priority*, *per_thread*, and
+           *log_assembly* keywords
 
         """
         SimplePlugin.__init__(self, bus)
         self._assembler = assembler
         self._eager_init = eager_init
+        self._background_init = background_init
+        self._init_priority = tuple(init_priority)
+        self._ready = threading.Event()
+        self._init_thread = None
+        self._per_thread_ids = tuple(_identify(spec) for spec in per_thread)
+        # {thread index: {component ID: object}} and {thread ident: index}
+        # (CherryPy publishes "stop_thread" for every worker from the main
+        # thread when the engine stops, so objects are tracked by index)
+        self._thread_objects = {}
+        self._thread_indexes = {}
+        self._thread_lock = threading.Lock()
+        self._log_assembly = log_assembly
+        # {component ID: assembly count}; like cpstats itself, this is
+        # updated without locking (so concurrent updates may be lost)
+        self._assemblies = {}
+        self._statistics = {}
 
     @property
     def eager_init(self):
@@ -158,6 +241,36 @@ class AglyphDIPlugin(SimplePlugin):
         """
         self._eager_init = flag
 
+    @property
+    def is_ready(self):
+        """``True`` once the plugin has started and any eager
+        initialization has finished *(read-only)*.
+
+        .. versionadded:: 3.1.0
+
+        .. note::
+           A component that fails to initialize during background
+           initialization does not prevent readiness; the failure is
+           logged, and the component is assembled (or fails) again when
+           it is first requested.
+
+        """
+        return self._ready.is_set()
+
+    def wait_until_ready(self, timeout=None):
+        """Block until the plugin is ready.
+
+        :keyword float timeout:
+           the maximum number of seconds to wait (or ``None`` to wait
+           indefinitely)
+        :return: :attr:`is_ready`
+        :rtype: bool
+
+        .. versionadded:: 3.1.0
+
+        """
+        return self._ready.wait(timeout)
+
     def start(self):
         """Subscribe to all Aglyph DI channels.
 
@@ -190,12 +303,17 @@ class AglyphDIPlugin(SimplePlugin):
            components are pre-assembled and cached before the channels
            are subscribed.
 
+           If *background_init* was also ``True``, the channels are
+           subscribed immediately and the components are pre-assembled
+           by a background thread. The *"aglyph-ready"* channel is
+           published when it has finished.
+
         """
-        if self._eager_init:
-            self.bus.log(
-                "initializing Aglyph singleton and borg component objects")
-            self.init_singletons()
-            self.init_borgs()
+        self._ready.clear()
+        self._register_statistics()
+        background = self._eager_init and self._background_init
+        if self._eager_init and not background:
+            self._warm_up()
         self.bus.log("starting Aglyph dependency injection support")
         self.bus.subscribe("aglyph-assemble", self.assemble)
         self.bus.subscribe("aglyph-init-singletons", self.init_singletons)
@@ -203,6 +321,140 @@ class AglyphDIPlugin(SimplePlugin):
         self.bus.subscribe("aglyph-init-borgs", self.init_borgs)
         self.bus.subscribe("aglyph-clear-borgs", self.clear_borgs)
         self.bus.subscribe("aglyph-clear-weakrefs", self.clear_weakrefs)
+        if background:
+            self._init_thread = threading.Thread(
+                target=self._warm_up_in_background,
+                name="aglyph-background-init")
+            self._init_thread.daemon = True
+            self._init_thread.start()
+        else:
+            self._set_ready()
+
+    def _warm_up(self):
+        """Pre-assemble and cache the *init_priority* components, and
+        then all *singleton* and *borg* components.
+
+        """
+        self.bus.log(
+            "initializing Aglyph singleton and borg component objects")
+        started = perf_counter()
+        for component_spec in self._init_priority:
+            self.assemble(component_spec)
+        self.init_singletons()
+        self.init_borgs()
+        self._statistics["Warm-up Seconds"] = perf_counter() - started
+
+    def _register_statistics(self):
+        """Register the *"Aglyph"* namespace in ``logging.statistics``.
+
+        Values that are functions are only evaluated when the statistics
+        are reported (see :mod:`cherrypy.lib.cpstats`).
+
+        """
+        if not hasattr(logging, "statistics"):
+            logging.statistics = {}
+        self._assemblies = {}
+        self._statistics = logging.statistics.setdefault("Aglyph", {})
+        self._statistics.update({
+            "Enabled": True,
+            "Assembler": str(self._assembler),
+            "Start Time": time.time(),
+            "Ready": lambda s: self.is_ready,
+            "Warm-up Seconds": None,
+            "Assemblies": lambda s: sum(dict(self._assemblies).values()),
+            "Singleton Cache Size":
+                lambda s: self._cache_sizes().get("singleton", 0),
+            "Borg Cache Size":
+                lambda s: self._cache_sizes().get("borg", 0),
+            "Weakref Cache Size":
+                lambda s: self._cache_sizes().get("weakref", 0),
+            "Shared Cache Size":
+                lambda s: self._cache_sizes().get("shared", 0),
+            "Clone Cache Size":
+                lambda s: self._cache_sizes().get("clone", 0),
+            "Soft Cache Size":
+                lambda s: self._cache_sizes().get("soft", 0),
+            "Snapshot Hits": lambda s: self._total("snapshot_hits"),
+            "Snapshot Misses": lambda s: self._total("snapshot_misses"),
+            "Prefetch Hits": lambda s: self._total("prefetch_hits"),
+            "Prefetch Misses": lambda s: self._total("prefetch_misses"),
+            "Soft Evictions": lambda s: self._total("soft_evictions"),
+            "Memory Budget": lambda s: self._value("memory_budget"),
+            "Memory Usage": lambda s: self._value("memory_usage"),
+            "Open Backoffs": lambda s: sum(
+                1 for state in (self._value("backoff_states") or {}).values()
+                if state == "open"),
+            "Backoff Rejections": lambda s: self._total("backoff_rejections"),
+            "Components": lambda s: self._component_statistics(),
+        })
+
+    def _cache_sizes(self):
+        """Return the number of cached objects for each strategy."""
+        statistics = getattr(self._assembler, "statistics", None)
+        return statistics["cache_sizes"] if statistics is not None else {}
+
+    def _total(self, name):
+        """Return the sum of the per-component statistic *name* (e.g.
+        the total number of snapshot hits).
+
+        """
+        statistics = getattr(self._assembler, "statistics", None)
+        return (
+            sum(statistics.get(name, {}).values())
+            if statistics is not None else 0)
+
+    def _value(self, name):
+        """Return the assembler statistic *name* (e.g. the memory
+        usage), or ``None`` if it is not reported.
+
+        """
+        statistics = getattr(self._assembler, "statistics", None)
+        return statistics.get(name) if statistics is not None else None
+
+    def _component_statistics(self):
+        """Return the per-component statistics table.
+
+        :return:
+           a mapping of component ID to a mapping of the assembly count,
+           construction count, and total construction seconds
+
+        """
+        assemblies = dict(self._assemblies)
+        statistics = getattr(self._assembler, "statistics", None) or {}
+        constructions = statistics.get("constructions", {})
+        construction_seconds = statistics.get("construction_seconds", {})
+        return dict(
+            (component_id, {
+                "Assemblies": assemblies.get(component_id, 0),
+                "Constructions": constructions.get(component_id, 0),
+                "Construction Seconds":
+                    construction_seconds.get(component_id, 0.0),
+            })
+            for component_id in set(assemblies) | set(constructions))
+
+    def _warm_up_in_background(self):
+        """Run :meth:`_warm_up` and then signal readiness.
+
+        Any exception is logged rather than raised, because there is no
+        caller to receive it.
+
+        """
+        try:
+            self._warm_up()
+        except Exception as e:
+            self.bus.log(
+                "Aglyph background initialization failed: %s" % e,
+                level=logging.ERROR, traceback=True)
+        self._set_ready()
+
+    def _set_ready(self):
+        """Mark the plugin as ready and publish to the *"aglyph-ready"*
+        channel.
+
+        """
+        self._ready.set()
+        self.bus.log("Aglyph dependency injection support is ready")
+        self.bus.publish("aglyph-ready")
 
     def stop(self):
         """Unsubscribe from all Aglyph DI channels.
@@ -212,8 +464,16 @@ class AglyphDIPlugin(SimplePlugin):
            *singleton*, *borg*, and *weakref* caches are automatically
            cleared.
 
+           If background initialization is still running, it is allowed
+           to finish before the caches are cleared.
+
         """
         self.bus.log("stopping Aglyph dependency injection support")
+        if self._init_thread is not None:
+            self._init_thread.join()
+            self._init_thread = None
+        self._ready.clear()
+        self._statistics["Enabled"] = False
         self.bus.unsubscribe("aglyph-assemble", self.assemble)
         self.bus.unsubscribe("aglyph-init-singletons", self.init_singletons)
         self.bus.unsubscribe("aglyph-clear-singletons", self.clear_singletons)
@@ -238,9 +498,104 @@ class AglyphDIPlugin(SimplePlugin):
         This method handles messages published to the
         **aglyph-assemble** channel.
 
+        .. versionadded:: 3.1.0
+           If *component_spec* identifies a *per-thread* component, and
+           this method is called from a CherryPy worker thread, then
+           that thread's object is returned.
+
+        """
+        if self._log_assembly:
+            self.bus.log("assembling %r" % component_spec)
+        component_id = _identify(component_spec)
+        self._assemblies[component_id] = \
+            self._assemblies.get(component_id, 0) + 1
+        if self._thread_objects:
+            objects = self._thread_objects.get(
+                self._thread_indexes.get(threading.current_thread().ident))
+            if objects is not None:
+                obj = objects.get(component_id)
+                if obj is None and component_id in self._per_thread_ids:
+                    # assembly failed when the thread started; try again
+                    obj = objects[component_id] = \
+                        self._assembler.assemble(component_id)
+                if obj is not None:
+                    return obj
+        return self._assembler.assemble(component_id)
+
+    def start_thread(self, thread_index):
+        """Assemble the *per-thread* components for the current worker
+        thread.
+
+        :arg int thread_index: the CherryPy worker thread index
+
+        This method handles messages published to the **start_thread**
+        channel.
+
+        .. versionadded:: 3.1.0
+
+        .. note::
+           A *per-thread* component should be a *prototype* component,
+           so that each thread receives a new object. (A prototype
+           component cannot declare its own "before_clear" method;
+           declare it on a parent template or on the context.)
+
+           The component's own dependencies are assembled according to
+           their own strategies. To give each thread its own
+           connection-holding dependency, designate the component that
+           **uses** the dependency (and is requested by the application)
+           as *per-thread*.
+
+        A component that fails to assemble is logged and assembled
+        again when it is first requested from the thread.
+
         """
-        self.bus.log("assembling %r" % component_spec)
-        return self._assembler.assemble(component_spec)
+        if not self._per_thread_ids:
+            return
+        objects = {}
+        for component_id in self._per_thread_ids:
+            try:
+                objects[component_id] = self._assembler.assemble(component_id)
+            except Exception as e:
+                self.bus.log(
+                    "failed to assemble per-thread component %r for thread "
+                        "%d: %s" % (component_id, thread_index, e),
+                    level=logging.ERROR, traceback=True)
+        with self._thread_lock:
+            self._thread_objects[thread_index] = objects
+            self._thread_indexes[threading.current_thread().ident] = \
+                thread_index
+        self.bus.log(
+            "assembled per-thread components %r for thread %d" %
+                (sorted(objects), thread_index))
+
+    def stop_thread(self, thread_index):
+        """Call the "before_clear" lifecycle methods of the *per-thread*
+        components of a worker thread, and discard them.
+
+        :arg int thread_index: the CherryPy worker thread index
+
+        This method handles messages published to the **stop_thread**
+        channel.
+
+        .. versionadded:: 3.1.0
+
+        .. note::
+           Any exception raised by a "before_clear" lifecycle method is
+           caught, logged, and issued as a :class:`RuntimeWarning`.
+
+        """
+        with self._thread_lock:
+            objects = self._thread_objects.pop(thread_index, None)
+            for (ident, index) in list(self._thread_indexes.items()):
+                if index == thread_index:
+                    del self._thread_indexes[ident]
+        if objects:
+            for (component_id, obj) in objects.items():
+                self._assembler._call_lifecycle_method(
+                    "before_clear", obj, component_id)
+            self.bus.log(
+                "cleared per-thread components %r for thread %d" %
+                    (sorted(objects), thread_index))
 
     def init_singletons(self):
         """Assemble and cache all singleton component objects.
@@ -333,7 +688,11 @@ class AglyphDIPlugin(SimplePlugin):
             name_of(self.__class__), id(self), self._assembler)
 
     def __repr__(self):
-        return "%s.%s(%r, %r, eager_init=%r)" % (
+        return (
+            "%s.%s(%r, %r, eager_init=%r, background_init=%r, "
+                "init_priority=%r, per_thread=%r, log_assembly=%r)") % (
             self.__class__.__module__, name_of(self.__class__),
-            self.bus, self._assembler, self._eager_init)
+            self.bus, self._assembler, self._eager_init,
+            self._background_init, self._init_priority,
+            self._per_thread_ids, self._log_assembly)
 
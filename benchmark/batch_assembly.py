@@ -0,0 +1,121 @@
+# -*- coding: UTF-8 -*-
+
+# Copyright (c) 2006, 2011, 2013-2018 Matthew Zipay.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use,
+# copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following
+# conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+# OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+"""Measure how long it takes to create a batch of prototype objects
+with :meth:`aglyph.assembler.Assembler.assemble_many`, versus a loop of
+:meth:`aglyph.assembler.Assembler.assemble` calls.
+
+Usage (from the distribution root, or with Aglyph installed)::
+
+   PYTHONPATH=. python benchmark/batch_assembly.py [-n COUNT] [-d DEPTH]
+       [-r REPEAT]
+
+Each "message" prototype is initialized with references to a chain of
+*DEPTH* singleton components (which are cached before timing begins)
+and wired with one attribute.
+
+"""
+
+__author__ = "Matthew Zipay <mattz@ninthtest.info>"
+
+import argparse
+from collections import namedtuple
+import sys
+
+from aglyph._compat import perf_counter
+from aglyph.assembler import Assembler
+from aglyph.component import Reference
+from aglyph.context import Context
+
+#: The class of the assembled "message" objects.
+Message = namedtuple("Message", ["codec", "transport", "headers"])
+
+
+class Dependency(object):
+    """The class of the singleton dependencies."""
+
+    def __init__(self, name, parent=None):
+        self.name = name
+        self.parent = parent
+
+
+def build_context(depth):
+    """Return a context of a "message" prototype and the *depth*
+    singleton components that it depends on.
+
+    """
+    context = Context("batch-assembly")
+    previous = None
+    for i in range(depth):
+        (context.singleton("dependency-%d" % i).create(Dependency).
+            init("dependency %d" % i,
+                parent=Reference(previous) if previous else None).
+            register())
+        previous = "dependency-%d" % i
+    (context.template("message-template").
+        init(codec=Reference("dependency-0")).register())
+    (context.prototype("message", parent="message-template").
+        create(Message).
+        init(transport=Reference(previous), headers={"version": 1}).
+        register())
+    return context
+
+
+def time_loop(assembler, count):
+    """Return the seconds to assemble *count* messages one at a time."""
+    assemble = assembler.assemble
+    started = perf_counter()
+    for _ in range(count):
+        assemble("message")
+    return perf_counter() - started
+
+
+def time_batch(assembler, count):
+    """Return the seconds to assemble *count* messages in one batch."""
+    started = perf_counter()
+    assembler.assemble_many("message", count)
+    return perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-n", "--count", type=int, default=10000)
+    parser.add_argument("-d", "--depth", type=int, default=5)
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    assembler = Assembler(build_context(args.depth))
+    assembler.init_singletons()
+
+    looped = min(
+        time_loop(assembler, args.count) for i in range(args.repeat))
+    batched = min(
+        time_batch(assembler, args.count) for i in range(args.repeat))
+    print("%d messages: assemble() loop %.4fs, assemble_many() %.4fs "
+        "(%.1fx)" % (args.count, looped, batched, looped / batched))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+# -*- coding: UTF-8 -*-
+
+# Copyright (c) 2006, 2011, 2013-2018 Matthew Zipay.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use,
+# copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following
+# conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+# OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+"""Measure how long it takes a process pool to become ready when each
+worker parses an XML context, versus when each worker receives a
+pickled :class:`aglyph.assembler.Assembler` through the pool
+initializer.
+
+Usage (from the distribution root, or with Aglyph installed)::
+
+   PYTHONPATH=. python benchmark/process_pool_spinup.py [-w WORKERS]
+       [-c COMPONENTS] [-r REPEAT] [-m START_METHOD]
+
+The "spawn" start method (the default where available) is the one in
+which initializer arguments are actually pickled for every worker; under
+"fork", workers inherit the parent's memory instead.
+
+"""
+
+__author__ = "Matthew Zipay <mattz@ninthtest.info>"
+
+import argparse
+import multiprocessing
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+
+from aglyph._compat import perf_counter
+from aglyph.assembler import Assembler
+from aglyph.context import XMLContext
+
+#: The assembler of the current worker process.
+_assembler = None
+
+
+def _parse_context(filename):
+    """Pool initializer: parse the context in the worker."""
+    global _assembler
+    _assembler = Assembler(XMLContext(filename))
+
+
+def _use_assembler(assembler):
+    """Pool initializer: use the (unpickled) assembler."""
+    global _assembler
+    _assembler = assembler
+
+
+def _assemble(component_id):
+    """Pool task: assemble a component in the worker."""
+    return len(_assembler.assemble(component_id))
+
+
+def write_context(filename, count):
+    """Write an XML context of *count* singleton components."""
+    with open(filename, "w") as f:
+        f.write('<?xml version="1.0" encoding="utf-8" ?>\n')
+        f.write('<context id="process-pool-spinup">\n')
+        for i in range(count):
+            f.write(
+                '  <component id="c%d" dotted-name="collections.OrderedDict"'
+                    ' strategy="singleton">\n'
+                '    <init>\n'
+                '      <arg keyword="index"><int>%d</int></arg>\n'
+                '      <arg keyword="name"><str>component %d</str></arg>\n'
+                '      <arg keyword="data"><eval>{"primes": [2, 3, 5, 7],'
+                    ' "flags": (None, True, False)}</eval></arg>\n'
+                '      <arg keyword="items"><list><int>1</int><int>2</int>'
+                    '<float>3.5</float></list></arg>\n' % (i, i, i))
+            if i:
+                f.write('      <arg keyword="previous" reference="c%d" />\n' %
+                    (i - 1))
+            f.write('    </init>\n  </component>\n')
+        f.write('</context>\n')
+
+
+def time_pool(mp, workers, initializer, initargs):
+    """Return the seconds until every worker has completed one task."""
+    started = perf_counter()
+    pool = mp.Pool(workers, initializer=initializer, initargs=initargs)
+    try:
+        pool.map(_assemble, ["c0"] * workers, chunksize=1)
+        return perf_counter() - started
+    finally:
+        pool.close()
+        pool.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-w", "--workers", type=int, default=4)
+    parser.add_argument("-c", "--components", type=int, default=2000)
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    parser.add_argument("-m", "--start-method", default="spawn")
+    args = parser.parse_args(argv)
+
+    #PYVER: multiprocessing.get_context is not available in Python < 3.4
+    if hasattr(multiprocessing, "get_context"):
+        mp = multiprocessing.get_context(args.start_method)
+    else:
+        mp = multiprocessing
+
+    temp_dir = tempfile.mkdtemp(prefix="aglyph-benchmark-")
+    try:
+        filename = os.path.join(temp_dir, "context.xml")
+        write_context(filename, args.components)
+
+        started = perf_counter()
+        assembler = Assembler(XMLContext(filename))
+        parse_seconds = perf_counter() - started
+        payload = pickle.dumps(assembler, pickle.HIGHEST_PROTOCOL)
+        started = perf_counter()
+        pickle.loads(payload)
+        unpickle_seconds = perf_counter() - started
+
+        print("%d components: XML %d bytes, pickled %d bytes" % (
+            args.components, os.path.getsize(filename), len(payload)))
+        print("parse %.4fs, unpickle %.4fs (in-process)" % (
+            parse_seconds, unpickle_seconds))
+
+        parsed = min(
+            time_pool(mp, args.workers, _parse_context, (filename,))
+            for i in range(args.repeat))
+        shipped = min(
+            time_pool(mp, args.workers, _use_assembler, (assembler,))
+            for i in range(args.repeat))
+        print("%d workers: parse in each worker %.4fs, "
+            "pickled assembler %.4fs (saved %.4fs)" % (
+                args.workers, parsed, shipped, parsed - shipped))
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+# -*- coding: UTF-8 -*-
+
+# Copyright (c) 2006, 2011, 2013-2018 Matthew Zipay.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use,
+# copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following
+# conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+# OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+
+"""Measure how the rate of :meth:`aglyph.assembler.Assembler.assemble`
+calls scales with the number of threads that make them.
+
+Usage (from the distribution root, or with Aglyph installed)::
+
+   PYTHONPATH=. python benchmark/threaded_assembly.py [-n COUNT]
+       [-t THREADS [THREADS ...]] [-r REPEAT] [--compiled]
+
+Each thread assembles *COUNT* "message" prototypes, each initialized
+with references to two (cached) singleton components and wired with
+one attribute. On a free-threaded (no-GIL) build of CPython, the rate
+should grow with the number of threads (up to the number of cores); on
+a build with the GIL, it stays roughly flat.
+
+"""
+
+__author__ = "Matthew Zipay <mattz@ninthtest.info>"
+
+import argparse
+import sys
+import threading
+import types
+
+from aglyph._compat import perf_counter
+from aglyph.assembler import Assembler
+from aglyph.compiler import compile_context
+from aglyph.component import Reference
+from aglyph.context import Context
+
+
+class Message(object):
+    """The class of the assembled "message" objects."""
+
+    def __init__(self, codec, transport, headers=None):
+        self.codec = codec
+        self.transport = transport
+        self.headers = headers
+        self.priority = None
+
+
+class Dependency(object):
+    """The class of the singleton dependencies."""
+
+    def __init__(self, name):
+        self.name = name
+
+
+def build_context():
+    """Return a context of a "message" prototype and the singleton
+    components that it depends on.
+
+    """
+    context = Context("threaded-assembly")
+    context.singleton("codec").create(Dependency).init("codec").register()
+    (context.singleton("transport").create(Dependency).init("transport").
+        register())
+    (context.prototype("message").create(Message).
+        init(Reference("codec"), Reference("transport"),
+            headers={"version": 1}).
+        set(priority=5).
+        register())
+    return context
+
+
+def compiled_assembler(context):
+    """Return a compiled assembler for *context*."""
+    module = types.ModuleType("threaded_assembly_compiled")
+    exec(compile(compile_context(context), module.__name__, "exec"),
+        module.__dict__)
+    return module.Assembler()
+
+
+def time_threads(assembler, threads, count):
+    """Return the seconds for *threads* threads to each assemble
+    *count* messages.
+
+    """
+    start = threading.Barrier(threads + 1)
+
+    def run():
+        assemble = assembler.assemble
+        start.wait()
+        for _ in range(count):
+            assemble("message")
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    start.wait()
+    started = perf_counter()
+    for worker in workers:
+        worker.join()
+    return perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-n", "--count", type=int, default=20000)
+    parser.add_argument(
+        "-t", "--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    parser.add_argument("--compiled", action="store_true")
+    args = parser.parse_args(argv)
+
+    context = build_context()
+    if args.compiled:
+        assembler = compiled_assembler(context)
+    else:
+        assembler = Assembler(context)
+    assembler.init_singletons()
+
+    #PYVER: sys._is_gil_enabled is not available in Python < 3.13
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)
+    print("%s, GIL %s" % (
+        "CompiledAssembler" if args.compiled else "Assembler",
+        "enabled" if is_gil_enabled() else "disabled"))
+    baseline = None
+    for threads in args.threads:
+        seconds = min(
+            time_threads(assembler, threads, args.count)
+            for i in range(args.repeat))
+        rate = threads * args.count / seconds
+        if baseline is None:
+            baseline = rate
+        print("%2d thread(s): %10.0f assemblies/s (%.2fx)" % (
+            threads, rate, rate / baseline))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -124,10 +124,16 @@ def suite():
         test_ComponentBuilder,
         test_ContextBuilder,
         test_Context,
+        test_ChildContext,
         test_XMLContext,
+        test_ContextCache,
+        test_StreamingXMLContext,
+        test_LazyXMLContext,
         # aglyph.assembler
         test_ReentrantMutexCache,
+        test_StripedCounters,
         test_Assembler,
+        test_CompiledAssembler,
     )
 
     suite = unittest.TestSuite()
@@ -161,10 +167,16 @@ def suite():
     suite.addTest(test_ComponentBuilder.suite())
     suite.addTest(test_ContextBuilder.suite())
     suite.addTest(test_Context.suite())
+    suite.addTest(test_ChildContext.suite())
     suite.addTest(test_XMLContext.suite())
+    suite.addTest(test_ContextCache.suite())
+    suite.addTest(test_StreamingXMLContext.suite())
+    suite.addTest(test_LazyXMLContext.suite())
     # aglyph.assembler
     suite.addTest(test_ReentrantMutexCache.suite())
+    suite.addTest(test_StripedCounters.suite())
     suite.addTest(test_Assembler.suite())
+    suite.addTest(test_CompiledAssembler.suite())
 
     return suite
 
@@ -61,6 +61,7 @@ class _LifecycleMethodsMixin(object):
         self.called_component_before_clear = 0
         self.called_template_before_clear = 0
         self.called_context_before_clear = 0
+        self.called_component_after_fork = 0
 
     def context_after_inject(self):
         self.called_context_after_inject += 1
@@ -80,6 +81,9 @@ class _LifecycleMethodsMixin(object):
     def context_before_clear(self):
         self.called_context_before_clear += 1
 
+    def component_after_fork(self):
+        self.called_component_after_fork += 1
+
 
 class ModuleClass(_LifecycleMethodsMixin):
 
@@ -27,8 +27,18 @@
 
 __author__ = "Matthew Zipay <mattz@ninthtest.info>"
 
+import array
+import collections
 import functools
+import gc
 import logging
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
 import unittest
 import warnings
 
@@ -43,9 +53,10 @@ except:
 
 from aglyph import __version__, AglyphError
 from aglyph._compat import is_python_2
+import aglyph.assembler
 from aglyph.assembler import Assembler
-from aglyph.component import Evaluator
-from aglyph.context import Context, XMLContext
+from aglyph.component import Evaluator, Reference
+from aglyph.context import ChildContext, Context, XMLContext
 
 from test import assertRaisesWithMessage, dummy, find_resource
 
@@ -58,6 +69,147 @@ __all__ = [
 _log = logging.getLogger("test.test_Assembler")
 _log.info("has threading? %r (using %r)", _has_threading, threading_)
 
+#: Set when a :class:`GatedClass` object is being initialized.
+_gate_entered = threading_.Event()
+
+#: Set to allow :class:`GatedClass` initialization to complete.
+_gate_opened = threading_.Event()
+
+
+class GatedClass(dummy.ModuleClass):
+    """A class whose initialization waits for :data:`_gate_opened`."""
+
+    def __init__(self, arg, keyword=dummy.DEFAULT):
+        _gate_entered.set()
+        _gate_opened.wait(5)
+        super(GatedClass, self).__init__(arg, keyword=keyword)
+
+
+class PrefetchGatedClass(dummy.ModuleClass):
+    """A class whose initialization by a prefetch thread waits for
+    :data:`_gate_opened`.
+
+    """
+
+    def __init__(self, arg, keyword=dummy.DEFAULT):
+        if threading_.current_thread().name.startswith("aglyph-prefetch"):
+            _gate_entered.set()
+            _gate_opened.wait(5)
+        #PYVER: arguments to super() are implicit in Python 3
+        super(PrefetchGatedClass, self).__init__(arg, keyword=keyword)
+
+
+#: The (simulated) memory usage of the process while soft tests run.
+_memory_usage = [0]
+
+
+class MemoryHungryClass(dummy.ModuleClass):
+    """A class whose initialization grows :data:`_memory_usage`."""
+
+    def __init__(self, size):
+        _memory_usage[0] += size
+        #PYVER: arguments to super() are implicit in Python 3
+        super(MemoryHungryClass, self).__init__(size)
+
+
+#: Whether :class:`FlakyClass` initialization fails, and how many times
+#: it has been attempted.
+_flaky = {"failing": True, "attempts": 0}
+
+
+class FlakyClass(dummy.ModuleClass):
+    """A class whose initialization fails while ``_flaky["failing"]``."""
+
+    def __init__(self, arg):
+        _flaky["attempts"] += 1
+        if _flaky["failing"]:
+            raise RuntimeError("service unavailable")
+        #PYVER: arguments to super() are implicit in Python 3
+        super(FlakyClass, self).__init__(arg)
+
+
+#: A class whose objects are initialized with three arguments.
+Triple = collections.namedtuple("Triple", ["first", "second", "third"])
+
+#: The barrier at which :class:`RendezvousClass` objects are initialized.
+_rendezvous = [None]
+
+
+class RendezvousClass(dummy.ModuleClass):
+    """A class whose initialization waits for another object to be
+    initialized at the same time (see :data:`_rendezvous`).
+
+    """
+
+    def __init__(self, arg):
+        # raises BrokenBarrierError unless initialized concurrently
+        _rendezvous[0].wait()
+        #PYVER: arguments to super() are implicit in Python 3
+        super(RendezvousClass, self).__init__(arg)
+
+
+try:
+    import contextvars
+except ImportError:
+    #PYVER: contextvars is not available in Python < 3.7
+    contextvars = None
+
+#: The assembler used by :class:`InterleavingClass`.
+_interleaving = {"assembler": None}
+
+
+class InterleavingClass(dummy.ModuleClass):
+    """A class whose initialization assembles its own component in a new
+    :mod:`contextvars` context (as would an interleaved asyncio task).
+
+    """
+
+    def __init__(self, arg):
+        assembler = _interleaving.pop("assembler", None)
+        if assembler is not None:
+            arg = contextvars.Context().run(assembler.assemble, "outer")
+        #PYVER: arguments to super() are implicit in Python 3
+        super(InterleavingClass, self).__init__(arg)
+
+
+class SlowClass(dummy.ModuleClass):
+    """A class whose initialization takes a while (and is counted)."""
+
+    initializations = 0
+
+    def __init__(self, arg):
+        SlowClass.initializations += 1
+        time.sleep(0.1)
+        #PYVER: arguments to super() are implicit in Python 3
+        super(SlowClass, self).__init__(arg)
+
+
+class ForkUnsafeClass(dummy.ModuleClass):
+    """A class whose "after_fork" method cannot restore its state."""
+
+    def reconnect(self):
+        raise RuntimeError("cannot reconnect after fork")
+
+
+class SnapshotClass(dummy.ModuleClass):
+    """A class that counts how many of its objects are initialized."""
+
+    initializations = 0
+
+    def __init__(self, arg, keyword=None):
+        SnapshotClass.initializations += 1
+        #PYVER: arguments to super() are implicit in Python 3
+        super(SnapshotClass, self).__init__(arg, keyword=keyword)
+
+
+class CloneCountingClass(dummy.ModuleClass):
+    """A class that counts how many of its objects are cloned."""
+
+    clones = 0
+
+    def count_clone(self):
+        CloneCountingClass.clones += 1
+
 
 class AssemblerTest(unittest.TestCase):
 
@@ -95,6 +247,72 @@ class AssemblerTest(unittest.TestCase):
             t.join()
         self.assertEqual(0, len([t for t in threads if t.e is not None]))
 
+    @unittest.skipUnless(
+        hasattr(threading_, "Barrier"),
+        "can't test concurrent assembly without Barrier")
+    def test_circular_dependency_across_threads_is_detected(self):
+        context = Context(self.id())
+        (context.prototype("rendezvous").create(RendezvousClass).
+            init("rendezvous").register())
+        # each thread holds the creation lock of its own singleton when
+        # both reach the rendezvous
+        (context.singleton("a").create(dummy.ModuleClass).
+            init(Reference("rendezvous"), keyword=Reference("b")).register())
+        (context.singleton("b").create(dummy.ModuleClass).
+            init(Reference("rendezvous"), keyword=Reference("a")).register())
+        assembler = self._assembler_for(context)
+        # only the first two "rendezvous" objects wait for each other
+        _rendezvous[0] = threading_.Barrier(
+            2, action=lambda: _rendezvous.__setitem__(
+                0, threading_.Barrier(1)),
+            timeout=5)
+        errors = {}
+        def assemble(component_id):
+            try:
+                assembler.assemble(component_id)
+            except AglyphError as e:
+                errors[component_id] = str(e)
+        threads = [
+            threading_.Thread(target=assemble, args=(component_id,))
+            for component_id in ["a", "b"]]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+        self.assertEqual(["a", "b"], sorted(errors))
+        for message in errors.values():
+            self.assertTrue(
+                message.startswith("circular dependency detected: "))
+
+    @unittest.skipUnless(
+        contextvars, "can't test contexts without contextvars")
+    def test_assembly_in_another_context_is_not_circular(self):
+        context = Context(self.id())
+        (context.prototype("outer").create(InterleavingClass).init("inner").
+            register())
+        assembler = self._assembler_for(context)
+        _interleaving["assembler"] = assembler
+        # "outer" is assembled again (in another context) while it is
+        # being assembled
+        self.assertEqual("inner", assembler.assemble("outer").arg.arg)
+
+    def test_replaced_assembly_state_detects_circular_dependency(self):
+        replaced = aglyph.assembler.set_assembly_state(
+            aglyph.assembler.ThreadLocalAssemblyState())
+        context = Context(self.id())
+        (context.prototype("a").create(dummy.ModuleClass).
+            init(Reference("b")).register())
+        (context.prototype("b").create(dummy.ModuleClass).
+            init(Reference("a")).register())
+        try:
+            assertRaisesWithMessage(
+                self, AglyphError("circular dependency detected: a > b > a"),
+                self._assembler_for(context).assemble, "a")
+        finally:
+            aglyph.assembler.set_assembly_state(replaced)
+
     def test_cant_create_unrecognized_strategy(self):
         context = Context(self.id())
         (context.prototype("unrecognized-strategy").
@@ -223,6 +441,1269 @@ class AssemblerTest(unittest.TestCase):
                 str(w[0].message))
         self.assertTrue(obj is dummy.MODULE_MEMBER)
 
+    def test_statistics_count_constructions(self):
+        self._assembler.assemble("ref-arg")
+        self._assembler.assemble("ref-arg")
+        statistics = self._assembler.statistics
+        self.assertEqual(2, statistics["constructions"]["ref-arg"])
+        self.assertTrue(statistics["construction_seconds"]["ref-arg"] >= 0.0)
+
+    def test_statistics_do_not_count_cache_hits(self):
+        self._assembler.init_singletons()
+        constructions = self._assembler.statistics["constructions"]
+        self._assembler.init_singletons()
+        for component in self._assembler._context.iter_components(
+                "singleton"):
+            self._assembler.assemble(component.unique_id)
+        self.assertEqual(
+            constructions, self._assembler.statistics["constructions"])
+
+    def test_statistics_cache_sizes(self):
+        self.assertEqual(
+            {"singleton": 0, "borg": 0, "weakref": 0, "shared": 0,
+                "clone": 0, "soft": 0},
+            self._assembler.statistics["cache_sizes"])
+        singleton_ids = self._assembler.init_singletons()
+        self.assertEqual(
+            len(singleton_ids),
+            self._assembler.statistics["cache_sizes"]["singleton"])
+
+    def _assembler_for(self, context, **keywords):
+        return Assembler(context, **keywords)
+
+    def _assert_creation_blocks_only_itself(self, register, target):
+        context = Context(self.id())
+        register(context, "gated").create(GatedClass).init("gated").register()
+        (register(context, "other").
+            create(dummy.ModuleClass).init("other").register())
+        assembler = self._assembler_for(context)
+        _gate_entered.clear()
+        _gate_opened.clear()
+        t = threading_.Thread(target=target, args=(assembler,))
+        t.start()
+        try:
+            self.assertTrue(_gate_entered.wait(5))
+            # "gated" is being created; "other" must not wait for it
+            self.assertEqual("other", assembler.assemble("other").arg)
+            self.assertFalse(_gate_opened.is_set())
+        finally:
+            _gate_opened.set()
+            t.join(5)
+        self.assertEqual("gated", assembler.assemble("gated").arg)
+
+    @unittest.skipUnless(
+        _has_threading, "can't test thread safety without _thread")
+    def test_singleton_creation_blocks_only_that_singleton(self):
+        self._assert_creation_blocks_only_itself(
+            Context.singleton, lambda assembler: assembler.assemble("gated"))
+
+    @unittest.skipUnless(
+        _has_threading, "can't test thread safety without _thread")
+    def test_borg_creation_blocks_only_that_borg(self):
+        self._assert_creation_blocks_only_itself(
+            Context.borg, lambda assembler: assembler.assemble("gated"))
+
+    @unittest.skipUnless(
+        _has_threading, "can't test thread safety without _thread")
+    def test_init_singletons_blocks_only_current_singleton(self):
+        self._assert_creation_blocks_only_itself(
+            Context.singleton,
+            lambda assembler: assembler.init_singletons())
+
+    @unittest.skipUnless(
+        _has_threading, "can't test thread safety without _thread")
+    def test_singleton_is_created_once_by_concurrent_threads(self):
+        context = Context(self.id())
+        context.singleton("gated").create(GatedClass).init("gated").register()
+        assembler = self._assembler_for(context)
+        _gate_entered.clear()
+        _gate_opened.clear()
+        objs = []
+        threads = [
+            threading_.Thread(
+                target=lambda: objs.append(assembler.assemble("gated")))
+            for i in range(10)]
+        for t in threads:
+            t.start()
+        self.assertTrue(_gate_entered.wait(5))
+        _gate_opened.set()
+        for t in threads:
+            t.join(5)
+        self.assertEqual(10, len(objs))
+        self.assertEqual(1, len(set(id(obj) for obj in objs)))
+
+    @unittest.skipUnless(
+        _has_threading, "can't test thread safety without _thread")
+    def test_cached_weakref_is_retrieved_while_weakref_is_created(self):
+        context = Context(self.id())
+        context.weakref("gated").create(GatedClass).init("gated").register()
+        (context.weakref("other").
+            create(dummy.ModuleClass).init("other").register())
+        assembler = self._assembler_for(context)
+        other = assembler.assemble("other")
+        _gate_entered.clear()
+        _gate_opened.clear()
+        t = threading_.Thread(target=assembler.assemble, args=("gated",))
+        t.start()
+        try:
+            self.assertTrue(_gate_entered.wait(5))
+            # "gated" holds the weakref cache lock; a live cached weakref
+            # object must not wait for it
+            self.assertTrue(other is assembler.assemble("other", timeout=1))
+        finally:
+            _gate_opened.set()
+            t.join(5)
+
+    def _while_constructing(self, context, callback):
+        """Call *callback* with an assembler for *context* while a
+        thread named "constructor" is creating the "gated" object.
+
+        """
+        assembler = self._assembler_for(context)
+        _gate_entered.clear()
+        _gate_opened.clear()
+        t = threading_.Thread(
+            target=assembler.assemble, args=("gated",), name="constructor")
+        t.start()
+        try:
+            self.assertTrue(_gate_entered.wait(5))
+            callback(assembler)
+        finally:
+            _gate_opened.set()
+            t.join(5)
+        return assembler
+
+    def _gated_context(self, **keywords):
+        context = Context(self.id())
+        (context.singleton("gated").create(GatedClass, **keywords).
+            init("gated").register())
+        (context.singleton("dependent").create(dummy.ModuleClass).
+            init(Reference("gated")).register())
+        return context
+
+    def _assert_wait_times_out(self, assemble, *args, **keywords):
+        try:
+            assemble(*args, **keywords)
+        except AglyphError as e:
+            self.assertTrue(
+                "waiting to assemble component 'gated' (thread "
+                    "'constructor' has been constructing component 'gated'"
+                in str(e))
+        else:
+            self.fail("did not time out")
+
+    @unittest.skipUnless(
+        _has_threading, "can't test thread safety without _thread")
+    def test_assemble_timeout_names_construction_owner(self):
+        assembler = self._while_constructing(
+            self._gated_context(),
+            lambda assembler: self._assert_wait_times_out(
+                assembler.assemble, "gated", timeout=0.05))
+        self.assertEqual("gated", assembler.assemble("gated").arg)
+
+    @unittest.skipUnless(
+        _has_threading, "can't test thread safety without _thread")
+    def test_assemble_timeout_bounds_dependency_waits(self):
+        self._while_constructing(
+            self._gated_context(),
+            lambda assembler: self._assert_wait_times_out(
+                assembler.assemble, "dependent", timeout=0.05))
+
+    @unittest.skipUnless(
+        _has_threading, "can't test thread safety without _thread")
+    def test_component_timeout_bounds_wait(self):
+        self._while_constructing(
+            self._gated_context(timeout=0.05),
+            lambda assembler: self._assert_wait_times_out(
+                assembler.assemble, "gated"))
+
+    @unittest.skipUnless(
+        _has_threading, "can't test thread safety without _thread")
+    def test_component_timeout_bounds_init_singletons_wait(self):
+        self._while_constructing(
+            self._gated_context(timeout=0.05),
+            lambda assembler: self._assert_wait_times_out(
+                assembler.init_singletons))
+
+    @unittest.skipUnless(
+        _has_threading, "can't test thread safety without _thread")
+    def test_dump_constructions_reports_stuck_construction(self):
+        def assert_dumped(assembler):
+            dump = assembler.dump_constructions()
+            self.assertTrue(dump.startswith(
+                "component 'gated': constructed by thread 'constructor' "
+                    "for "))
+            self.assertTrue("_gate_opened.wait(5)" in dump)
+
+        assembler = self._while_constructing(
+            self._gated_context(), assert_dumped)
+        self.assertEqual("", assembler.dump_constructions())
+
+    def _rendezvous_context(self, **keywords):
+        _rendezvous[0] = threading_.Barrier(2, timeout=2)
+        context = Context(self.id())
+        context.singleton("a").create(RendezvousClass).init("a").register()
+        context.singleton("b").create(RendezvousClass).init("b").register()
+        (context.prototype("facade").
+            create(dummy.ModuleClass, **keywords).
+            init(Reference("a"), keyword=Reference("b")).register())
+        return context
+
+    @unittest.skipUnless(
+        hasattr(threading_, "Barrier") and aglyph.assembler.futures_,
+        "can't test parallel resolution without Barrier and futures")
+    def test_parallel_component_assembles_references_concurrently(self):
+        assembler = self._assembler_for(
+            self._rendezvous_context(parallel=True))
+        facade = assembler.assemble("facade")
+        self.assertEqual("a", facade.arg.arg)
+        self.assertEqual("b", facade.keyword.arg)
+
+    @unittest.skipUnless(
+        hasattr(threading_, "Barrier") and aglyph.assembler.futures_,
+        "can't test parallel resolution without Barrier and futures")
+    def test_parallel_assembler_assembles_references_concurrently(self):
+        assembler = self._assembler_for(
+            self._rendezvous_context(), parallel=True, max_workers=2)
+        self.assertTrue(assembler.parallel)
+        facade = assembler.assemble("facade")
+        self.assertEqual("a", facade.arg.arg)
+        self.assertEqual("b", facade.keyword.arg)
+
+    def test_parallel_preserves_argument_order(self):
+        context = Context(self.id())
+        (context.prototype("p").create(dummy.ModuleClass).init("p").
+            register())
+        (context.prototype("facade").create(Triple, parallel=True).
+            init(Reference("p"), "literal", Reference("p")).register())
+        triple = self._assembler_for(context).assemble("facade")
+        self.assertEqual("p", triple.first.arg)
+        self.assertEqual("literal", triple.second)
+        self.assertEqual("p", triple.third.arg)
+        # each reference to a prototype is assembled separately
+        self.assertFalse(triple.first is triple.third)
+
+    def test_parallel_detects_circular_dependency(self):
+        context = Context(self.id())
+        (context.singleton("a").create(dummy.ModuleClass, parallel=True).
+            init(Reference("b"), keyword=Reference("c")).register())
+        context.singleton("b").create(dummy.ModuleClass).init("b").register()
+        (context.singleton("c").create(dummy.ModuleClass).
+            init(Reference("a")).register())
+        assertRaisesWithMessage(
+            self, AglyphError("circular dependency detected: a > c > a"),
+            self._assembler_for(context).assemble, "a")
+
+    def test_parallel_weakref_assembles_weakref_references(self):
+        context = Context(self.id())
+        context.weakref("a").create(dummy.ModuleClass).init("a").register()
+        context.weakref("b").create(dummy.ModuleClass).init("b").register()
+        (context.weakref("facade").create(dummy.ModuleClass, parallel=True).
+            init(Reference("a"), keyword=Reference("b")).register())
+        # the weakref cache lock is held; the references must not deadlock
+        facade = self._assembler_for(context).assemble("facade")
+        self.assertEqual("a", facade.arg.arg)
+        self.assertEqual("b", facade.keyword.arg)
+
+    def _graph_context(self, parallel=False):
+        context = Context(self.id())
+        (context.graph("request").create(dummy.ModuleClass).init("request").
+            register())
+        (context.prototype("handler").create(dummy.ModuleClass).
+            init(Reference("request")).register())
+        (context.prototype("facade").create(Triple, parallel=parallel).
+            init(Reference("request"), Reference("handler"),
+                Reference("request")).
+            register())
+        return context
+
+    def test_graph_is_shared_within_one_assembly(self):
+        triple = self._assembler_for(self._graph_context()).assemble("facade")
+        self.assertEqual("request", triple.first.arg)
+        self.assertTrue(triple.first is triple.third)
+        self.assertTrue(triple.first is triple.second.arg)
+
+    @unittest.skipUnless(
+        _has_threading, "can't test prefetching without _thread")
+    def test_graph_is_shared_with_prefetched_references(self):
+        assembler = self._assembler_for(self._graph_context())
+        assembler.enable_prefetch("handler", 1)
+        self.addCleanup(assembler.disable_prefetch, "handler")
+        assembler.assemble("handler")
+        self._wait_until(
+            lambda: assembler.statistics["prefetch_refills"].get(
+                "handler", 0) >= 1)
+        triple = assembler.assemble("facade")
+        self.assertTrue(triple.first is triple.second.arg)
+        self.assertEqual(0, assembler.statistics["prefetch_hits"]["handler"])
+        assembler.assemble("handler")
+        self.assertEqual(1, assembler.statistics["prefetch_hits"]["handler"])
+
+    def test_graph_is_not_shared_between_assemblies(self):
+        assembler = self._assembler_for(self._graph_context())
+        self.assertFalse(
+            assembler.assemble("facade").first is
+                assembler.assemble("facade").first)
+        self.assertFalse(
+            assembler.assemble("request") is assembler.assemble("request"))
+        self.assertFalse("graph" in assembler.statistics["cache_sizes"])
+
+    def test_graph_is_shared_within_each_of_many_assemblies(self):
+        assembler = self._assembler_for(self._graph_context())
+        (first, second) = assembler.assemble_many("facade", 2)
+        self.assertTrue(first.first is first.second.arg)
+        self.assertTrue(second.first is second.second.arg)
+        self.assertFalse(first.first is second.first)
+
+    def test_graph_is_shared_by_parallel_references(self):
+        assembler = self._assembler_for(self._graph_context(parallel=True))
+        triple = assembler.assemble("facade")
+        self.assertTrue(triple.first is triple.third)
+        self.assertTrue(triple.first is triple.second.arg)
+
+    @unittest.skipUnless(
+        aglyph.assembler.futures_,
+        "can't test parallel resolution without futures")
+    def test_graph_is_created_once_by_parallel_references(self):
+        context = Context(self.id())
+        context.graph("slow").create(SlowClass).init("slow").register()
+        (context.prototype("facade").create(Triple, parallel=True).
+            init(Reference("slow"), "literal", Reference("slow")).
+            register())
+        assembler = self._assembler_for(context, max_workers=2)
+        SlowClass.initializations = 0
+        triple = assembler.assemble("facade")
+        self.assertTrue(triple.first is triple.third)
+        self.assertEqual(1, SlowClass.initializations)
+
+    def test_max_workers_must_be_positive(self):
+        assertRaisesWithMessage(
+            self, ValueError("max workers must be positive (not 0)"),
+            self._assembler_for, Context(self.id()), max_workers=0)
+
+    #: The module whose ``_at_fork_registered`` flag the assembler checks.
+    _fork_hook_module = aglyph.assembler
+
+    def _fork_context(self):
+        context = Context(self.id(), after_fork="component_after_fork")
+        context.singleton("singleton").create(dummy.ModuleClass).init(
+            "singleton").register()
+        context.borg("borg").create(dummy.ModuleClass).init("borg").register()
+        (context.weakref("weakref").
+            create(dummy.ModuleClass).init("weakref").register())
+        (context.singleton("unsafe").
+            create(ForkUnsafeClass).init("unsafe").
+            call(after_fork="reconnect").register())
+        return context
+
+    def test_after_fork_calls_lifecycle_methods_of_cached_objects(self):
+        assembler = self._assembler_for(self._fork_context())
+        singleton = assembler.assemble("singleton")
+        borg = assembler.assemble("borg")
+        weak = assembler.assemble("weakref")
+        self.assertEqual([], assembler.after_fork())
+        self.assertEqual(1, singleton.called_component_after_fork)
+        self.assertEqual(1, borg.called_component_after_fork)
+        self.assertEqual(1, weak.called_component_after_fork)
+        # fork-safe objects remain cached
+        self.assertTrue(singleton is assembler.assemble("singleton"))
+        self.assertTrue(weak is assembler.assemble("weakref"))
+
+    def test_after_fork_evicts_objects_whose_lifecycle_method_fails(self):
+        assembler = self._assembler_for(self._fork_context())
+        unsafe = assembler.assemble("unsafe")
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            self.assertEqual(["unsafe"], assembler.after_fork())
+            self.assertEqual(1, len(w))
+            self.assertTrue(w[0].category is RuntimeWarning)
+        self.assertFalse(unsafe is assembler.assemble("unsafe"))
+
+    @unittest.skipUnless(
+        _has_threading, "can't test lock replacement without _thread")
+    def test_after_fork_replaces_locks(self):
+        assembler = self._assembler_for(self._fork_context())
+        locked = threading_.Event()
+        released = threading_.Event()
+
+        def hold_lock():
+            with assembler._caches["singleton"].lock_for("singleton"):
+                locked.set()
+                released.wait(5)
+
+        t = threading_.Thread(target=hold_lock)
+        t.start()
+        try:
+            self.assertTrue(locked.wait(5))
+            # (simulates a lock held by another thread at the time of fork)
+            assembler.after_fork()
+            self.assertEqual("singleton", assembler.assemble("singleton").arg)
+            self.assertFalse(released.is_set())
+        finally:
+            released.set()
+            t.join(5)
+
+    def test_pid_change_triggers_after_fork(self):
+        assembler = self._assembler_for(self._fork_context())
+        singleton = assembler.assemble("singleton")
+        registered = self._fork_hook_module._at_fork_registered
+        self._fork_hook_module._at_fork_registered = False
+        try:
+            assembler._pid = -1
+            self.assertTrue(singleton is assembler.assemble("singleton"))
+        finally:
+            self._fork_hook_module._at_fork_registered = registered
+        self.assertEqual(1, singleton.called_component_after_fork)
+        self.assertEqual(os.getpid(), assembler._pid)
+
+    @unittest.skipUnless(
+        hasattr(os, "fork") and hasattr(os, "register_at_fork"),
+        "can't test fork hooks without os.fork and os.register_at_fork")
+    def test_forked_child_reinitializes_assembler(self):
+        assembler = self._assembler_for(self._fork_context())
+        singleton = assembler.assemble("singleton")
+        pid = os.fork()
+        if pid == 0:
+            # never return into the test runner from the child
+            status = 1
+            try:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    if (singleton.called_component_after_fork == 1 and
+                            singleton is assembler.assemble("singleton")):
+                        status = 0
+            finally:
+                os._exit(status)
+        (_, status) = os.waitpid(pid, 0)
+        self.assertEqual(0, status)
+        # the parent's cached objects are unaffected
+        self.assertEqual(0, singleton.called_component_after_fork)
+
+    def test_warm_up_initializes_singletons_and_borgs(self):
+        assembler = self._assembler_for(self._fork_context())
+        self.assertEqual(
+            ["borg", "singleton", "unsafe"], sorted(assembler.warm_up()))
+        self.assertEqual([], assembler.warm_up())
+
+    def _pickle_round_trip(self, assembler):
+        return pickle.loads(pickle.dumps(assembler, pickle.HIGHEST_PROTOCOL))
+
+    def test_pickled_assembler_starts_with_empty_caches(self):
+        assembler = self._assembler_for(self._fork_context())
+        singleton = assembler.assemble("singleton")
+        unpickled = self._pickle_round_trip(assembler)
+        self.assertTrue(type(unpickled) is type(assembler))
+        self.assertEqual(
+            {"singleton": 0, "borg": 0, "weakref": 0, "shared": 0,
+                "clone": 0, "soft": 0},
+            unpickled.statistics["cache_sizes"])
+        self.assertEqual("singleton", unpickled.assemble("singleton").arg)
+        self.assertFalse(singleton is unpickled.assemble("singleton"))
+
+    def _shared_context(self, data_factory=bytes, args=(b"shared data",)):
+        context = Context(self.id())
+        context.shared("data").create(data_factory).init(*args).register()
+        return context
+
+    def _shared_dir(self):
+        shared_dir = tempfile.mkdtemp(prefix="aglyph-test-")
+        self.addCleanup(shutil.rmtree, shared_dir)
+        return shared_dir
+
+    def test_shared_returns_cached_read_only_view(self):
+        assembler = self._assembler_for(
+            self._shared_context(), shared_dir=self._shared_dir())
+        data = assembler.assemble("data")
+        self.assertTrue(type(data) is memoryview)
+        self.assertTrue(data.readonly)
+        self.assertEqual(b"shared data", data.tobytes())
+        self.assertTrue(data is assembler.assemble("data"))
+        self.assertEqual(1, assembler.statistics["cache_sizes"]["shared"])
+
+    @unittest.skipIf(is_python_2, "memoryview.cast is not available")
+    def test_shared_view_has_original_format(self):
+        assembler = self._assembler_for(
+            self._shared_context(array.array, ("d", [1.5, 2.5])),
+            shared_dir=self._shared_dir())
+        data = assembler.assemble("data")
+        self.assertEqual("d", data.format)
+        self.assertEqual([1.5, 2.5], data.tolist())
+
+    def test_shared_data_is_attached_by_other_assemblers(self):
+        shared_dir = self._shared_dir()
+        owner = self._assembler_for(
+            self._shared_context(), shared_dir=shared_dir)
+        owner.assemble("data")
+        other = self._assembler_for(
+            self._shared_context(), shared_dir=shared_dir)
+        self.assertEqual(b"shared data", other.assemble("data").tobytes())
+        self.assertEqual(1, len(os.listdir(shared_dir)))
+
+    def test_shared_data_is_not_attached_after_definition_changes(self):
+        shared_dir = self._shared_dir()
+        owner = self._assembler_for(
+            self._shared_context(), shared_dir=shared_dir)
+        owner.assemble("data")
+        # the same context ID and component ID, but a different definition
+        other = self._assembler_for(
+            self._shared_context(args=(b"changed data",)),
+            shared_dir=shared_dir)
+        self.assertEqual(b"changed data", other.assemble("data").tobytes())
+        self.assertEqual(2, len(os.listdir(shared_dir)))
+
+    @unittest.skipUnless(
+        hasattr(os, "getuid"), "can't test file ownership on this platform")
+    def test_shared_dir_accessible_by_others_is_refused(self):
+        shared_dir = self._shared_dir()
+        os.chmod(shared_dir, 0o755)
+        assembler = self._assembler_for(
+            self._shared_context(), shared_dir=shared_dir)
+        self.assertRaises(AglyphError, assembler.assemble, "data")
+        self.assertEqual([], os.listdir(shared_dir))
+
+    @unittest.skipUnless(hasattr(os, "fork"), "can't test without fork")
+    def test_shared_data_of_dead_publisher_is_not_attached(self):
+        shared_dir = self._shared_dir()
+        pid = os.fork()
+        if pid == 0:
+            # publish, then die without cleaning up
+            status = 1
+            try:
+                self._assembler_for(
+                    self._shared_context(), shared_dir=shared_dir).assemble(
+                        "data")
+                status = 0
+            finally:
+                os._exit(status)
+        (_, status) = os.waitpid(pid, 0)
+        self.assertEqual(0, status)
+        self.assertEqual(1, len(os.listdir(shared_dir)))
+        assembler = self._assembler_for(
+            self._shared_context(), shared_dir=shared_dir)
+        self.assertEqual(b"shared data", assembler.assemble("data").tobytes())
+        # the data was published again (and so is owned) by this process
+        assembler.clear_singletons()
+        self.assertEqual([], os.listdir(shared_dir))
+
+    def test_shared_data_is_unpublished_when_publisher_exits(self):
+        shared_dir = self._shared_dir()
+        script = "; ".join([
+            "from aglyph.assembler import Assembler",
+            "from aglyph.context import Context",
+            "context = Context('shared')",
+            "context.shared('data').create(bytes).init(b'data').register()",
+            "Assembler(context, shared_dir=%r).assemble('data')" % shared_dir,
+        ])
+        environ = dict(os.environ)
+        paths = [os.path.dirname(os.path.dirname(aglyph.__file__))]
+        if environ.get("PYTHONPATH"):
+            paths.append(environ["PYTHONPATH"])
+        environ["PYTHONPATH"] = os.pathsep.join(paths)
+        self.assertEqual(
+            0, subprocess.call([sys.executable, "-c", script], env=environ))
+        self.assertEqual([], os.listdir(shared_dir))
+
+    def test_clear_singletons_unpublishes_owned_shared_data(self):
+        shared_dir = self._shared_dir()
+        owner = self._assembler_for(
+            self._shared_context(), shared_dir=shared_dir)
+        owner.assemble("data")
+        other = self._assembler_for(
+            self._shared_context(), shared_dir=shared_dir)
+        other.assemble("data")
+        # a non-owner only evicts its cached view
+        self.assertEqual(["data"], other.clear_singletons())
+        self.assertEqual(1, len(os.listdir(shared_dir)))
+        self.assertEqual(["data"], owner.clear_singletons())
+        self.assertEqual([], os.listdir(shared_dir))
+        self.assertEqual(0, owner.statistics["cache_sizes"]["shared"])
+
+    def test_shared_requires_buffer_protocol(self):
+        context = Context(self.id())
+        (context.shared("data").create(dummy.ModuleClass).init("data").
+            register())
+        shared_dir = self._shared_dir()
+        assembler = self._assembler_for(context, shared_dir=shared_dir)
+        self.assertRaises(AglyphError, assembler.assemble, "data")
+        self.assertEqual([], os.listdir(shared_dir))
+
+    def _snapshot_context(self, arg="snapshot"):
+        SnapshotClass.initializations = 0
+        context = Context(self.id())
+        (context.singleton("snapshot").create(SnapshotClass, snapshot=True).
+            init(arg, keyword="static").register())
+        return context
+
+    def test_snapshot_is_restored_by_other_assemblers(self):
+        snapshot_dir = self._shared_dir()
+        first = self._assembler_for(
+            self._snapshot_context(), snapshot_dir=snapshot_dir)
+        obj = first.assemble("snapshot")
+        self.assertEqual({"snapshot": 1}, first.statistics["snapshot_misses"])
+        self.assertEqual(1, len(os.listdir(snapshot_dir)))
+        second = self._assembler_for(
+            self._snapshot_context(), snapshot_dir=snapshot_dir)
+        self.assertEqual(["snapshot"], second.init_singletons())
+        restored = second.assemble("snapshot")
+        self.assertEqual(0, SnapshotClass.initializations)
+        self.assertEqual({"snapshot": 1}, second.statistics["snapshot_hits"])
+        self.assertFalse(restored is obj)
+        self.assertEqual(("snapshot", "static"), (
+            restored.arg, restored.keyword))
+
+    def test_snapshot_is_invalidated_by_changed_definition(self):
+        snapshot_dir = self._shared_dir()
+        self._assembler_for(
+            self._snapshot_context(), snapshot_dir=snapshot_dir).assemble(
+                "snapshot")
+        assembler = self._assembler_for(
+            self._snapshot_context("changed"), snapshot_dir=snapshot_dir)
+        self.assertEqual("changed", assembler.assemble("snapshot").arg)
+        self.assertEqual(1, SnapshotClass.initializations)
+        self.assertEqual(
+            {"snapshot": 1}, assembler.statistics["snapshot_misses"])
+        # the stale snapshot was replaced
+        self.assertEqual(1, len(os.listdir(snapshot_dir)))
+
+    def test_unusable_snapshot_is_replaced(self):
+        snapshot_dir = self._shared_dir()
+        self._assembler_for(
+            self._snapshot_context(), snapshot_dir=snapshot_dir).assemble(
+                "snapshot")
+        [filename] = os.listdir(snapshot_dir)
+        filename = os.path.join(snapshot_dir, filename)
+        with open(filename, "rb") as f:
+            data = f.read()
+        with open(filename, "wb") as f:
+            f.write(data[:-8])
+        assembler = self._assembler_for(
+            self._snapshot_context(), snapshot_dir=snapshot_dir)
+        self.assertEqual("snapshot", assembler.assemble("snapshot").arg)
+        self.assertEqual(1, SnapshotClass.initializations)
+        self.assertEqual(
+            "snapshot",
+            self._assembler_for(
+                self._snapshot_context(), snapshot_dir=snapshot_dir).assemble(
+                    "snapshot").arg)
+        self.assertEqual(0, SnapshotClass.initializations)
+
+    def test_unpicklable_object_is_not_snapshot(self):
+        context = self._snapshot_context(arg=Evaluator(memoryview, b"data"))
+        snapshot_dir = self._shared_dir()
+        assembler = self._assembler_for(context, snapshot_dir=snapshot_dir)
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            assembler.assemble("snapshot")
+            self.assertEqual(1, len(w))
+            self.assertTrue(w[0].category is RuntimeWarning)
+        self.assertEqual([], os.listdir(snapshot_dir))
+
+    def test_snapshot_requires_snapshot_dir(self):
+        assembler = self._assembler_for(self._snapshot_context())
+        assembler.assemble("snapshot")
+        self.assertEqual({}, assembler.statistics["snapshot_misses"])
+
+    def _tenant_assemblers(self):
+        base = Context("base")
+        base.singleton("config").create(dummy.ModuleClass).init(
+            "base").register()
+        (base.singleton("service").create(dummy.ModuleClass).
+            init(Evaluator(dict, config=Reference("config"))).register())
+        (base.singleton("catalog").create(dummy.ModuleClass).
+            init("catalog").register())
+        tenant = ChildContext("tenant", base)
+        tenant.singleton("config").create(dummy.ModuleClass).init(
+            "tenant").register()
+        parent = Assembler(base)
+        return (parent, Assembler(tenant, parent=parent))
+
+    def test_child_delegates_inherited_components_to_parent(self):
+        (parent, child) = self._tenant_assemblers()
+        catalog = child.assemble("catalog")
+        self.assertTrue(catalog is parent.assemble("catalog"))
+        self.assertEqual(0, child.statistics["cache_sizes"]["singleton"])
+
+    def test_child_assembles_overridden_components(self):
+        (parent, child) = self._tenant_assemblers()
+        self.assertEqual("tenant", child.assemble("config").arg)
+        self.assertEqual("base", parent.assemble("config").arg)
+
+    def test_child_assembles_components_that_depend_on_overrides(self):
+        (parent, child) = self._tenant_assemblers()
+        service = child.assemble("service")
+        self.assertEqual("tenant", service.arg["config"].arg)
+        self.assertFalse(service is parent.assemble("service"))
+        self.assertTrue(service is child.assemble("service"))
+
+    def test_child_init_singletons_skips_delegated_components(self):
+        (parent, child) = self._tenant_assemblers()
+        self.assertEqual(
+            ["config", "service"], sorted(child.init_singletons()))
+        self.assertEqual([], parent.clear_singletons())
+
+    def test_parent_evict_cascades_to_child_dependents(self):
+        (parent, child) = self._tenant_assemblers()
+        (child._context.singleton("report").create(dummy.ModuleClass).
+            init(Reference("catalog")).register())
+        report = child.assemble("report")
+        self.assertEqual(["catalog"], parent.evict("catalog"))
+        self.assertFalse(report is child.assemble("report"))
+        self.assertTrue(
+            child.assemble("report").arg is parent.assemble("catalog"))
+
+    def test_parent_evict_does_not_cascade_to_child_overrides(self):
+        (parent, child) = self._tenant_assemblers()
+        parent.assemble("service")
+        service = child.assemble("service")
+        self.assertEqual(["service", "config"], parent.evict("config"))
+        self.assertTrue(service is child.assemble("service"))
+
+    def test_child_requires_parent_assembler_of_parent_context(self):
+        (parent, child) = self._tenant_assemblers()
+        self.assertRaises(
+            AglyphError, Assembler, child._context, parent=child)
+
+    def _reload_context(self, config="config", **keywords):
+        context = Context(
+            "reload", before_clear="component_before_clear", **keywords)
+        context.singleton("config").create(dummy.ModuleClass).init(
+            config).register()
+        (context.singleton("service").create(dummy.ModuleClass).
+            init(Reference("config")).register())
+        (context.borg("client", parent="client-template").
+            create(dummy.ModuleClass).register())
+        (context.template("client-template").init(Reference("service")).
+            register())
+        (context.singleton("catalog").create(dummy.ModuleClass).
+            init("catalog").register())
+        return context
+
+    def test_reload_evicts_only_affected_objects(self):
+        assembler = Assembler(self._reload_context())
+        catalog = assembler.assemble("catalog")
+        service = assembler.assemble("service")
+        client = assembler.assemble("client")
+        self.assertEqual(
+            ["client", "config", "service"],
+            sorted(assembler.reload(self._reload_context("changed"))))
+        self.assertTrue(catalog is assembler.assemble("catalog"))
+        self.assertEqual(0, catalog.called_component_before_clear)
+        self.assertEqual(1, service.called_component_before_clear)
+        self.assertEqual(1, client.called_component_before_clear)
+        self.assertEqual("changed", assembler.assemble("service").arg.arg)
+
+    def test_reload_unchanged_context_evicts_nothing(self):
+        assembler = Assembler(self._reload_context())
+        assembler.init_singletons()
+        self.assertEqual([], assembler.reload(self._reload_context()))
+        self.assertEqual(3, assembler.statistics["cache_sizes"]["singleton"])
+
+    def test_reload_evicts_removed_components(self):
+        assembler = Assembler(self._reload_context())
+        catalog = assembler.assemble("catalog")
+        context = self._reload_context()
+        del context["catalog"]
+        self.assertEqual(["catalog"], assembler.reload(context))
+        self.assertEqual(1, catalog.called_component_before_clear)
+        self.assertRaises(KeyError, assembler.assemble, "catalog")
+
+    def test_reload_can_rebuild(self):
+        assembler = Assembler(self._reload_context())
+        service = assembler.assemble("service")
+        assembler.reload(self._reload_context("changed"), rebuild=True)
+        self.assertEqual(2, assembler.statistics["cache_sizes"]["singleton"])
+        self.assertEqual(2, assembler.statistics["constructions"]["service"])
+        rebuilt = assembler.assemble("service")
+        self.assertFalse(rebuilt is service)
+        self.assertEqual("changed", rebuilt.arg.arg)
+
+    def test_reload_changed_lifecycle_evicts_everything(self):
+        assembler = Assembler(self._reload_context())
+        assembler.init_singletons()
+        self.assertEqual(
+            ["catalog", "config", "service"],
+            sorted(assembler.reload(
+                self._reload_context(after_inject="component_after_inject"))))
+
+    def test_evict_cascades_to_dependents_first(self):
+        assembler = self._assembler_for(self._reload_context())
+        catalog = assembler.assemble("catalog")
+        config = assembler.assemble("config")
+        client = assembler.assemble("client")
+        self.assertEqual(
+            ["client", "service", "config"], assembler.evict("config"))
+        self.assertEqual(1, config.called_component_before_clear)
+        self.assertEqual(1, client.called_component_before_clear)
+        self.assertTrue(catalog is assembler.assemble("catalog"))
+        self.assertEqual(0, catalog.called_component_before_clear)
+        self.assertFalse(config is assembler.assemble("config"))
+
+    def test_evict_cascades_to_dependents_registered_later(self):
+        context = self._reload_context()
+        assembler = Assembler(context)
+        assembler.assemble("config")
+        self.assertEqual(["config"], assembler.evict("config"))
+        (context.singleton("monitor").create(dummy.ModuleClass).
+            init(Reference("config")).register())
+        monitor = assembler.assemble("monitor")
+        self.assertEqual(["monitor", "config"], assembler.evict("config"))
+        self.assertFalse(monitor is assembler.assemble("monitor"))
+        self.assertTrue(
+            assembler.assemble("monitor").arg is assembler.assemble("config"))
+
+    def test_evict_without_cascade(self):
+        assembler = self._assembler_for(self._reload_context())
+        service = assembler.assemble("service")
+        self.assertEqual(["config"], assembler.evict("config", cascade=False))
+        self.assertTrue(service is assembler.assemble("service"))
+        self.assertFalse(service.arg is assembler.assemble("config"))
+
+    def test_evict_uncached_component(self):
+        assembler = self._assembler_for(self._reload_context())
+        self.assertEqual([], assembler.evict("catalog"))
+
+    def test_evict_unknown_component_fails(self):
+        assembler = self._assembler_for(self._reload_context())
+        self.assertRaises(KeyError, assembler.evict, "not.in.context")
+
+    @unittest.skipUnless(
+        _has_threading, "can't test concurrent eviction without _thread")
+    def test_evict_waits_for_concurrent_creation(self):
+        context = Context(self.id())
+        context.singleton("gated").create(GatedClass).init("gated").register()
+        (context.singleton("dependent").create(dummy.ModuleClass).
+            init(Reference("gated")).register())
+        assembler = self._assembler_for(context)
+        _gate_entered.clear()
+        _gate_opened.clear()
+        t = threading_.Thread(target=assembler.assemble, args=("dependent",))
+        t.start()
+        try:
+            self.assertTrue(_gate_entered.wait(5))
+            evicted = []
+            evictor = threading_.Thread(
+                target=lambda: evicted.extend(assembler.evict("gated")))
+            evictor.start()
+            # the eviction cannot complete while "gated" is being created
+            evictor.join(0.2)
+            self.assertTrue(evictor.is_alive())
+        finally:
+            _gate_opened.set()
+            t.join(5)
+        evictor.join(5)
+        self.assertEqual(["dependent", "gated"], evicted)
+        self.assertEqual(0, assembler.statistics["cache_sizes"]["singleton"])
+
+    @unittest.skipUnless(
+        _has_threading, "can't test thread safety without _thread")
+    def test_evict_does_not_deadlock_with_weakref_creation(self):
+        context = Context(self.id())
+        context.prototype("gated").create(GatedClass).init("gated").register()
+        (context.singleton("singleton").create(dummy.ModuleClass).
+            init("singleton").register())
+        # the weakref cache lock is held while "gated" is created, and then
+        # while the (uncached) singleton is created
+        (context.weakref("weakref").create(dummy.ModuleClass).
+            init(Reference("gated"), keyword=Reference("singleton")).
+            register())
+        assembler = self._assembler_for(context)
+        _gate_entered.clear()
+        _gate_opened.clear()
+        objs = []
+        t = threading_.Thread(
+            target=lambda: objs.append(assembler.assemble("weakref")))
+        t.daemon = True
+        t.start()
+        try:
+            self.assertTrue(_gate_entered.wait(5))
+            evictor = threading_.Thread(
+                target=assembler.evict, args=("singleton",),
+                kwargs={"cascade": False})
+            evictor.daemon = True
+            evictor.start()
+            evictor.join(5)
+        finally:
+            _gate_opened.set()
+        t.join(5)
+        self.assertFalse(evictor.is_alive())
+        self.assertFalse(t.is_alive())
+        self.assertEqual("singleton", objs[0].keyword.arg)
+
+    def _clone_context(self, **keywords):
+        context = Context(self.id(), after_inject="component_after_inject")
+        (context.clone("clone").
+            create(dummy.ModuleClass, **keywords).
+            init(Evaluator(list)).call(before_clear="component_before_clear").
+            register())
+        return context
+
+    def test_clone_returns_copies_of_master(self):
+        assembler = self._assembler_for(self._clone_context())
+        obj1 = assembler.assemble("clone")
+        obj2 = assembler.assemble("clone")
+        master = assembler._caches["clone"]["clone"]
+        self.assertFalse(obj1 is obj2)
+        self.assertFalse(obj1 is master)
+        # shallow copies share the master's dependencies
+        self.assertTrue(obj1.arg is master.arg)
+        self.assertTrue(obj2.arg is master.arg)
+        self.assertEqual(1, master.called_component_after_inject)
+        self.assertEqual(1, assembler.statistics["cache_sizes"]["clone"])
+
+    def test_deep_clone_copies_dependencies(self):
+        assembler = self._assembler_for(
+            self._clone_context(deep_clone=True))
+        obj1 = assembler.assemble("clone")
+        obj2 = assembler.assemble("clone")
+        self.assertEqual([], obj1.arg)
+        self.assertFalse(obj1.arg is obj2.arg)
+
+    def test_after_clone_is_called_on_each_copy(self):
+        assembler = self._assembler_for(
+            self._clone_context(after_clone="reset_lifecycle_counts"))
+        obj = assembler.assemble("clone")
+        self.assertEqual(0, obj.called_component_after_inject)
+        self.assertEqual(
+            1,
+            assembler._caches["clone"]["clone"].called_component_after_inject)
+
+    def test_warm_up_creates_clone_masters_without_copies(self):
+        context = Context(self.id())
+        (context.clone("clone").
+            create(CloneCountingClass, deep_clone=True,
+                after_clone="count_clone").
+            init(Evaluator(list)).register())
+        assembler = self._assembler_for(context)
+        CloneCountingClass.clones = 0
+        self.assertEqual(["clone"], assembler.warm_up())
+        self.assertEqual(0, CloneCountingClass.clones)
+        master = assembler._caches["clone"]["clone"]
+        self.assertFalse(master is assembler.assemble("clone"))
+        self.assertEqual(1, CloneCountingClass.clones)
+
+    def test_clear_clones_evicts_masters(self):
+        assembler = self._assembler_for(self._clone_context())
+        obj = assembler.assemble("clone")
+        master = assembler._caches["clone"]["clone"]
+        self.assertEqual(["clone"], assembler.clear_clones())
+        self.assertEqual(1, master.called_component_before_clear)
+        self.assertEqual(0, obj.called_component_before_clear)
+        self.assertFalse(obj.arg is assembler.assemble("clone").arg)
+
+    def _soft_assembler(self, memory_budget=None):
+        # memory usage is simulated (see MemoryHungryClass)
+        _memory_usage[0] = 0
+        measure = aglyph.assembler._memory_usage
+        aglyph.assembler._memory_usage = lambda: _memory_usage[0]
+        self.addCleanup(setattr, aglyph.assembler, "_memory_usage", measure)
+        context = Context(self.id())
+        for component_id in ["a", "b", "c"]:
+            (context.soft(component_id).create(MemoryHungryClass).init(100).
+                call(before_clear="component_before_clear").register())
+        return self._assembler_for(context, memory_budget=memory_budget)
+
+    def test_soft_is_cached_without_memory_budget(self):
+        assembler = self._soft_assembler()
+        obj = assembler.assemble("a")
+        self.assertTrue(obj is assembler.assemble("a"))
+        self.assertIsNone(assembler.memory_budget)
+        self.assertEqual([], assembler.enforce_memory_budget())
+        statistics = assembler.statistics
+        self.assertEqual(1, statistics["cache_sizes"]["soft"])
+        self.assertIsNone(statistics["memory_budget"])
+        self.assertEqual({}, statistics["soft_evictions"])
+
+    def test_soft_evicts_least_recently_used_over_budget(self):
+        assembler = self._soft_assembler(memory_budget=250)
+        a = assembler.assemble("a")
+        b = assembler.assemble("b")
+        # "b" becomes the least recently used soft object
+        self.assertTrue(a is assembler.assemble("a"))
+        c = assembler.assemble("c")
+        self.assertEqual(1, b.called_component_before_clear)
+        self.assertEqual(0, a.called_component_before_clear)
+        self.assertTrue(c is assembler.assemble("c"))
+        self.assertFalse(b is assembler.assemble("b"))
+        statistics = assembler.statistics
+        self.assertEqual(250, statistics["memory_budget"])
+        self.assertEqual(400, statistics["memory_usage"])
+        self.assertEqual(1, statistics["soft_evictions"]["b"])
+
+    def test_enforce_memory_budget_evicts_when_usage_grows(self):
+        assembler = self._soft_assembler(memory_budget=250)
+        a = assembler.assemble("a")
+        assembler.assemble("b")
+        self.assertEqual([], assembler.enforce_memory_budget())
+        _memory_usage[0] += 100
+        self.assertEqual(["a"], assembler.enforce_memory_budget())
+        self.assertEqual(1, a.called_component_before_clear)
+        self.assertEqual(1, assembler.statistics["cache_sizes"]["soft"])
+
+    def test_memory_budget_must_be_positive(self):
+        assertRaisesWithMessage(
+            self, ValueError("memory budget must be positive (not 0)"),
+            self._assembler_for, Context(self.id()), memory_budget=0)
+
+    def test_clear_softs_evicts_soft_objects(self):
+        assembler = self._soft_assembler(memory_budget=1000)
+        obj = assembler.assemble("a")
+        self.assertEqual(["a"], assembler.clear_softs())
+        self.assertEqual(1, obj.called_component_before_clear)
+        self.assertEqual({}, assembler.statistics["soft_evictions"])
+        self.assertFalse(obj is assembler.assemble("a"))
+
+    def test_pickled_assembler_keeps_memory_budget(self):
+        assembler = self._soft_assembler(memory_budget=1000)
+        assembler.assemble("a")
+        unpickled = self._pickle_round_trip(assembler)
+        self.assertEqual(1000, unpickled.memory_budget)
+        self.assertEqual(0, unpickled.statistics["cache_sizes"]["soft"])
+
+    def _flaky_assembler(self, backoff=None):
+        _flaky.update(failing=True, attempts=0)
+        context = Context(self.id())
+        (context.singleton("flaky").create(FlakyClass, backoff=backoff).
+            init(Reference("dependency")).register())
+        context.prototype("dependency").create(dummy.ModuleClass).init(
+            "dependency").register()
+        return self._assembler_for(context)
+
+    def test_every_assembly_retries_without_backoff(self):
+        assembler = self._flaky_assembler()
+        for i in range(2):
+            self.assertRaises(AglyphError, assembler.assemble, "flaky")
+        self.assertEqual(2, _flaky["attempts"])
+        self.assertEqual({}, assembler.statistics["backoff_states"])
+
+    def test_backoff_fails_fast_with_cached_cause(self):
+        assembler = self._flaky_assembler(backoff=60)
+        try:
+            assembler.assemble("flaky")
+        except AglyphError as e:
+            cause = e.cause
+        self.assertTrue(isinstance(cause, RuntimeError))
+        try:
+            assembler.assemble("flaky")
+        except AglyphError as e:
+            self.assertTrue(
+                str(e).startswith("component 'flaky' is backing off"))
+            self.assertTrue(e.cause is cause)
+        else:
+            self.fail("did not fail fast")
+        self.assertEqual(1, _flaky["attempts"])
+        statistics = assembler.statistics
+        self.assertEqual({"flaky": "open"}, statistics["backoff_states"])
+        self.assertEqual({"flaky": 1}, statistics["backoff_failures"])
+        self.assertEqual({"flaky": 1}, statistics["backoff_rejections"])
+
+    def test_backoff_closes_after_successful_retry(self):
+        assembler = self._flaky_assembler(backoff=0.01)
+        self.assertRaises(AglyphError, assembler.assemble, "flaky")
+        _flaky["failing"] = False
+        time.sleep(0.05)
+        self.assertEqual(
+            {"flaky": "half-open"},
+            assembler.statistics["backoff_states"])
+        self.assertEqual("dependency", assembler.assemble("flaky").arg.arg)
+        self.assertEqual(2, _flaky["attempts"])
+        self.assertEqual(
+            {"flaky": "closed"}, assembler.statistics["backoff_states"])
+
+    def test_evict_resets_backoff(self):
+        assembler = self._flaky_assembler(backoff=60)
+        self.assertRaises(AglyphError, assembler.assemble, "flaky")
+        _flaky["failing"] = False
+        self.assertEqual([], assembler.evict("flaky"))
+        assembler.assemble("flaky")
+        self.assertEqual(2, _flaky["attempts"])
+
+    def _prefetch_assembler(self, depth=1, idle_seconds=None, gated=False):
+        context = Context(self.id())
+        context.singleton("config").create(dummy.ModuleClass).init(
+            "config").register()
+        (context.prototype("message").create(PrefetchGatedClass).
+            init(Reference("config")).register())
+        assembler = self._assembler_for(context)
+        _gate_entered.clear()
+        if gated:
+            _gate_opened.clear()
+            # always release a prefetch thread that is still waiting
+            self.addCleanup(_gate_opened.set)
+        else:
+            _gate_opened.set()
+        assembler.enable_prefetch(
+            "message", depth, idle_seconds=idle_seconds)
+        self.addCleanup(assembler.disable_prefetch, "message")
+        return assembler
+
+    def _wait_until(self, predicate):
+        deadline = time.time() + 5
+        while not predicate():
+            if time.time() > deadline:
+                self.fail("timed out waiting for the prefetch thread")
+            time.sleep(0.005)
+
+    def _prefetch_count(self, assembler, name):
+        return assembler.statistics["prefetch_%s" % name].get("message", 0)
+
+    @unittest.skipUnless(_has_threading, "can't test prefetch without _thread")
+    def test_prefetch_queue_is_bounded(self):
+        assembler = self._prefetch_assembler(depth=2)
+        self._wait_until(
+            lambda: self._prefetch_count(assembler, "refills") == 2)
+        time.sleep(0.05)
+        self.assertEqual(2, self._prefetch_count(assembler, "refills"))
+        self.assertEqual(2, len(assembler._prefetchers["message"]._queue))
+
+    @unittest.skipUnless(_has_threading, "can't test prefetch without _thread")
+    def test_prefetch_hit_triggers_refill(self):
+        assembler = self._prefetch_assembler()
+        self._wait_until(
+            lambda: self._prefetch_count(assembler, "refills") == 1)
+        message = assembler.assemble("message")
+        self.assertTrue(message.arg is assembler.assemble("config"))
+        self.assertEqual(1, self._prefetch_count(assembler, "hits"))
+        self._wait_until(
+            lambda: self._prefetch_count(assembler, "refills") == 2)
+        self.assertFalse(message is assembler.assemble("message"))
+        self.assertTrue(
+            assembler.statistics["prefetch_refill_seconds"]["message"] >= 0.0)
+
+    @unittest.skipUnless(_has_threading, "can't test prefetch without _thread")
+    def test_prefetch_miss_assembles_in_caller(self):
+        assembler = self._prefetch_assembler(gated=True)
+        self.assertTrue(_gate_entered.wait(5))
+        message = assembler.assemble("message")
+        self.assertTrue(isinstance(message, PrefetchGatedClass))
+        self.assertEqual(1, self._prefetch_count(assembler, "misses"))
+        self.assertEqual(0, self._prefetch_count(assembler, "hits"))
+
+    @unittest.skipUnless(_has_threading, "can't test prefetch without _thread")
+    def test_prefetch_thread_exits_when_idle(self):
+        assembler = self._prefetch_assembler(idle_seconds=0.05)
+        prefetcher = assembler._prefetchers["message"]
+        self._wait_until(lambda: prefetcher._thread is None)
+        self.assertEqual(0, len(prefetcher._queue))
+        assembler.assemble("message")
+        self.assertEqual(1, self._prefetch_count(assembler, "misses"))
+        self.assertTrue(prefetcher._thread is not None)
+
+    @unittest.skipUnless(_has_threading, "can't test prefetch without _thread")
+    def test_failed_prefetch_is_not_restarted_on_miss(self):
+        context = Context(self.id())
+        (context.prototype("flaky").create(FlakyClass).init("flaky").
+            register())
+        assembler = self._assembler_for(context)
+        _flaky.update(failing=True, attempts=0)
+        assembler.enable_prefetch("flaky", 1)
+        self.addCleanup(assembler.disable_prefetch, "flaky")
+        prefetcher = assembler._prefetchers["flaky"]
+        self._wait_until(lambda: _flaky["attempts"] == 1)
+        self._wait_until(lambda: prefetcher._thread is None)
+        for i in range(3):
+            self.assertRaises(AglyphError, assembler.assemble, "flaky")
+        time.sleep(0.05)
+        # only the callers' own attempts
+        self.assertEqual(4, _flaky["attempts"])
+        self.assertTrue(prefetcher._thread is None)
+        _flaky["failing"] = False
+        assembler.enable_prefetch("flaky", 1)
+        self._wait_until(
+            lambda: assembler.statistics["prefetch_refills"].get("flaky"))
+
+    @unittest.skipUnless(_has_threading, "can't test prefetch without _thread")
+    def test_evict_discards_prefetched_dependents(self):
+        assembler = self._prefetch_assembler()
+        self._wait_until(
+            lambda: self._prefetch_count(assembler, "refills") == 1)
+        config = assembler.assemble("config")
+        assembler.evict("config")
+        self.assertFalse(assembler.assemble("message").arg is config)
+
+    @unittest.skipUnless(_has_threading, "can't test prefetch without _thread")
+    def test_prefetch_requires_prototype(self):
+        assembler = self._assembler_for(self._batch_context())
+        self.assertRaises(
+            AglyphError, assembler.enable_prefetch, "config", 1)
+        self.assertRaises(
+            KeyError, assembler.enable_prefetch, "not.in.context", 1)
+        self.assertRaises(ValueError, assembler.enable_prefetch, "message", 0)
+
+    def _batch_context(self):
+        context = Context("batch", after_inject="component_after_inject")
+        context.singleton("config").create(dummy.ModuleClass).init(
+            "config").register()
+        (context.prototype("message").create(dummy.ModuleClass).
+            init(Reference("config"), keyword=Reference("payload")).
+            set(attr=Evaluator(list), set_value="static").register())
+        context.prototype("payload").create(dummy.ModuleClass).init(
+            "payload").register()
+        return context
+
+    def test_assemble_many_creates_distinct_objects(self):
+        assembler = self._assembler_for(self._batch_context())
+        messages = assembler.assemble_many("message", 3)
+        self.assertEqual(3, len(set(id(message) for message in messages)))
+        config = assembler.assemble("config")
+        for message in messages:
+            self.assertTrue(message.arg is config)
+            self.assertEqual("payload", message.keyword.arg)
+            self.assertEqual([], message.attr)
+            self.assertEqual("static", message.get_value())
+            self.assertEqual(1, message.called_component_after_inject)
+        self.assertFalse(messages[0].keyword is messages[1].keyword)
+        self.assertFalse(messages[0].attr is messages[1].attr)
+
+    def test_iter_assemble_streams_objects(self):
+        assembler = self._assembler_for(self._batch_context())
+        messages = assembler.iter_assemble("message")
+        first = next(messages)
+        second = next(messages)
+        self.assertFalse(first is second)
+        self.assertTrue(first.arg is second.arg)
+
+    def test_assemble_all_preserves_order(self):
+        assembler = self._assembler_for(self._batch_context())
+        objs = assembler.assemble_all(["message", "config", "message"])
+        self.assertEqual(["config", "config"], [objs[0].arg.arg, objs[1].arg])
+        self.assertTrue(objs[0].arg is objs[1])
+        self.assertFalse(objs[0] is objs[2])
+
+    def test_batch_assembly_of_unknown_component_fails(self):
+        assembler = self._assembler_for(self._batch_context())
+        self.assertRaises(
+            KeyError, assembler.iter_assemble, "not.in.context")
+        self.assertRaises(
+            KeyError, assembler.assemble_all, ["message", "not.in.context"])
+
+    def test_batch_assembly_detects_circular_dependency(self):
+        context = Context(self.id())
+        (context.prototype("a").create(dummy.ModuleClass).
+            init(Reference("b")).register())
+        (context.prototype("b").create(dummy.ModuleClass).
+            init(Reference("a")).register())
+        assembler = self._assembler_for(context)
+        self.assertRaises(AglyphError, assembler.assemble_many, "a", 2)
+
+    def test_batch_assembly_records_constructions(self):
+        assembler = Assembler(self._batch_context())
+        assembler.assemble_many("message", 5)
+        assembler.assemble_all(["message", "message"])
+        statistics = assembler.statistics
+        self.assertEqual(7, statistics["constructions"]["message"])
+        self.assertEqual(7, statistics["constructions"]["payload"])
+        self.assertEqual(1, statistics["constructions"]["config"])
+
+    @unittest.skipUnless(
+        hasattr(gc, "freeze"), "gc.freeze is not available")
+    def test_warm_up_can_freeze(self):
+        assembler = self._assembler_for(self._fork_context())
+        try:
+            assembler.warm_up(freeze=True)
+            self.assertTrue(gc.get_freeze_count() > 0)
+        finally:
+            gc.unfreeze()
+
 
 def suite():
     return unittest.makeSuite(AssemblerTest)
@@ -0,0 +1,168 @@
+# -*- coding: UTF-8 -*-
+
+# Copyright (c) 2006, 2011, 2013-2018 Matthew Zipay.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use,
+# copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following
+# conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+# OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+
+"""Test case and runner for :class:`aglyph.context.ChildContext`."""
+
+__author__ = "Matthew Zipay <mattz@ninthtest.info>"
+
+import logging
+import pickle
+import unittest
+
+from aglyph import AglyphError
+from aglyph.component import Component, Template
+from aglyph.context import ChildContext, Context
+
+from test import assertRaisesWithMessage, dummy
+from test.test_Context import _BaseContextTest
+
+__all__ = [
+    "ChildContextTest",
+    "suite"
+]
+
+# don't use __name__ here; can be run as "__main__"
+_log = logging.getLogger("test.test_ChildContext")
+
+
+def _ids(components):
+    return sorted(component.unique_id for component in components)
+
+
+class ChildContextTest(_BaseContextTest):
+
+    def setUp(self):
+        self._parent = Context(
+            "parent", after_inject="after_inject", after_fork="after_fork")
+        self._parent.register(Component("inherited", strategy="singleton"))
+        self._parent.register(Component("overridden"))
+        self._parent.register(Template("template"))
+        self._context = ChildContext("test", self._parent)
+
+    # overrides _BaseContextTest.test_context_id_cannot_be_none because
+    # ChildContext also requires a parent
+    def test_context_id_cannot_be_none(self):
+        e_expected = AglyphError("ChildContext ID must not be None or empty")
+        assertRaisesWithMessage(
+            self, e_expected, ChildContext, None, self._parent)
+
+    # overrides _BaseContextTest.test_context_id_cannot_be_empty because
+    # ChildContext also requires a parent
+    def test_context_id_cannot_be_empty(self):
+        e_expected = AglyphError("ChildContext ID must not be None or empty")
+        assertRaisesWithMessage(
+            self, e_expected, ChildContext, "", self._parent)
+
+    def test_parent_must_be_context(self):
+        self.assertRaises(TypeError, ChildContext, "test", {})
+
+    def test_parent(self):
+        self.assertTrue(self._context.parent is self._parent)
+
+    def test_inherits_parent_definitions(self):
+        inherited = self._parent["inherited"]
+        self.assertTrue(self._context["inherited"] is inherited)
+        self.assertTrue(self._context.get("inherited") is inherited)
+        self.assertTrue(self._context.get_component("inherited") is inherited)
+        self.assertTrue("inherited" in self._context)
+        self.assertFalse(self._context.defines("inherited"))
+
+    def test_undefined_id(self):
+        self.assertRaises(KeyError, self._context.__getitem__, "undefined")
+        self.assertIsNone(self._context.get("undefined"))
+        self.assertEqual("default", self._context.get("undefined", "default"))
+        self.assertFalse("undefined" in self._context)
+
+    def test_register_overrides_parent_definition(self):
+        overridden = Component("overridden", strategy="singleton")
+        self._context.register(overridden)
+        self.assertTrue(self._context["overridden"] is overridden)
+        self.assertTrue(self._context.defines("overridden"))
+        # the parent is unaffected
+        self.assertFalse(self._parent["overridden"] is overridden)
+
+    def test_does_not_copy_parent_definitions(self):
+        self._context.register(Component("extended"))
+        self.assertEqual(["extended"], list(self._context.keys()))
+        self.assertEqual(1, len(self._context))
+
+    # overrides _BaseContextTest.test_iter_components_yields_only_components
+    # because the parent components are also yielded
+    def test_iter_components_yields_only_components(self):
+        test_template = Template("test-template")
+        self._context.register(test_template)
+        test_component = Component("test-component")
+        self._context.register(test_component)
+        self.assertEqual(
+            ["inherited", "overridden", "test-component"],
+            _ids(self._context.iter_components()))
+
+    def test_iter_components_includes_parent_components(self):
+        extended = Component("extended")
+        self._context.register(extended)
+        overridden = Component("overridden", strategy="singleton")
+        self._context.register(overridden)
+        components = list(self._context.iter_components())
+        self.assertEqual(
+            ["extended", "inherited", "overridden"], _ids(components))
+        self.assertTrue(extended in components)
+        self.assertTrue(overridden in components)
+        self.assertEqual(
+            ["inherited", "overridden"],
+            _ids(self._context.iter_components("singleton")))
+
+    def test_grandparent_definitions_are_inherited(self):
+        context = ChildContext("grandchild", self._context)
+        self.assertTrue(context["inherited"] is self._parent["inherited"])
+
+    def test_lifecycle_methods_are_inherited(self):
+        self.assertEqual("after_inject", self._context.after_inject)
+        self.assertIsNone(self._context.before_clear)
+        self.assertEqual("after_fork", self._context.after_fork)
+
+    def test_lifecycle_methods_can_be_overridden(self):
+        context = ChildContext(
+            "test", self._parent, after_inject="child_after_inject",
+            before_clear="child_before_clear", after_fork="child_after_fork")
+        self.assertEqual("child_after_inject", context.after_inject)
+        self.assertEqual("child_before_clear", context.before_clear)
+        self.assertEqual("child_after_fork", context.after_fork)
+
+    def test_pickle_preserves_parent(self):
+        # memoize an inherited definition before pickling
+        self.assertTrue(self._context["inherited"] is not None)
+        context = pickle.loads(pickle.dumps(self._context))
+        self.assertEqual({}, context._inherited)
+        self.assertEqual("parent", context.parent.context_id)
+        self.assertEqual("inherited", context["inherited"].unique_id)
+
+
+def suite():
+    return unittest.makeSuite(ChildContextTest)
+
+
+if __name__ == "__main__":
+    unittest.TextTestRunner().run(suite())
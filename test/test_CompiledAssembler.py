@@ -0,0 +1,294 @@
+# -*- coding: UTF-8 -*-
+
+# Copyright (c) 2006, 2011, 2013-2017 Matthew Zipay.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use,
+# copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following
+# conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+# OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+
+"""Test case and runner for :class:`aglyph.compiler.CompiledAssembler`
+and :func:`aglyph.compiler.compile_context`.
+
+"""
+
+__author__ = "Matthew Zipay <mattz@ninthtest.info>"
+
+import functools
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import types
+import unittest
+import warnings
+
+from aglyph import AglyphError
+import aglyph.compiler
+from aglyph.__main__ import main
+from aglyph.assembler import Assembler
+from aglyph.compiler import compile_context, CompiledAssembler
+from aglyph.component import Evaluator, Reference
+from aglyph.context import Context, XMLContext
+
+from test import assertRaisesWithMessage, dummy, find_resource
+from test.test_Assembler import AssemblerTest
+
+__all__ = [
+    "CompiledAssemblerTest",
+    "suite"
+]
+
+# don't use __name__ here; can be run as "__main__"
+_log = logging.getLogger("test.test_CompiledAssembler")
+
+
+def _compile(context, **keywords):
+    """Compile *context* and return an instance of the generated
+    ``Assembler`` class.
+
+    """
+    module = types.ModuleType("compiled_%s" % id(context))
+    exec(compile(compile_context(context), module.__name__, "exec"),
+        module.__dict__)
+    return module.Assembler(**keywords)
+
+
+def _strategies_context(context_id):
+    context = Context(
+        context_id, after_inject="context_after_inject",
+        before_clear="context_before_clear")
+    (context.template("parent").
+        set(attr=Reference("prototype")).
+        call(after_inject="template_after_inject",
+            before_clear="template_before_clear").
+        register())
+    (context.prototype("prototype").
+        create(dummy.ModuleClass).
+        init(Evaluator(tuple, [1, Reference("weakref")])).
+        register())
+    (context.singleton("singleton", parent="parent").
+        create(dummy.ModuleClass).
+        init({"key": "value"}, keyword=functools.partial(int, "0x4f", 16)).
+        set(("prop", [1, 2]), set_value=Reference("borg")).
+        call(after_inject="component_after_inject",
+            before_clear="component_before_clear").
+        register())
+    (context.borg("borg", parent="parent").
+        create(dummy.ModuleClass).
+        init(Evaluator(dict, a=Evaluator(set, [1]), b=[3])).
+        register())
+    (context.prototype("shared-value").
+        create(dummy.ModuleClass).
+        init([1, 2]).
+        register())
+    (context.weakref("weakref").
+        create(dummy.ModuleClass).
+        init("weak", keyword=dummy.ModuleClass).
+        register())
+    return context
+
+
+class CompiledAssemblerTest(AssemblerTest):
+    """Runs every :class:`aglyph.assembler.Assembler` test against a
+    compiled assembler, then some compiler-specific tests.
+
+    """
+
+    def setUp(self):
+        self._assembler = _compile(
+            XMLContext(find_resource("resources/test_Assembler-context.xml")))
+
+    def _assembler_for(self, context, **keywords):
+        return _compile(context, **keywords)
+
+    _fork_hook_module = aglyph.compiler
+
+    def test_statistics_count_constructions(self):
+        self._assembler.assemble("ref-arg")
+        self.assertEqual({}, self._assembler.statistics["constructions"])
+
+    def _pickle_round_trip(self, assembler):
+        # the generated Assembler class is pickled by reference, so its
+        # module must be importable
+        module = types.ModuleType(assembler.__class__.__module__)
+        module.Assembler = assembler.__class__
+        sys.modules[module.__name__] = module
+        try:
+            return super(CompiledAssemblerTest, self)._pickle_round_trip(
+                assembler)
+        finally:
+            sys.modules.pop(module.__name__, None)
+
+    def test_statistics_do_not_count_cache_hits(self):
+        # constructions are not counted by compiled assemblers
+        self._assembler.init_singletons()
+        self.assertEqual({}, self._assembler.statistics["constructions"])
+
+    def test_is_compiled(self):
+        self.assertTrue(isinstance(self._assembler, CompiledAssembler))
+        self.assertEqual(
+            "test_Assembler-context", self._assembler.context_id)
+
+    def test_contains(self):
+        self.assertTrue("ref-arg" in self._assembler)
+        self.assertFalse("not.in.context" in self._assembler)
+        self.assertFalse(object() in self._assembler)
+
+    def test_cant_create_unrecognized_strategy(self):
+        context = Context(self.id())
+        (context.prototype("unrecognized-strategy").
+            create("test.dummy.ModuleClass").init(None).register())
+        context["unrecognized-strategy"]._strategy = "unrecognized"
+        self.assertRaises(AglyphError, compile_context, context)
+
+    def test_evaluator_arg_is_resolved(self):
+        obj = self._assembler.assemble("eval-arg")
+        self.assertEqual(["test"], obj.arg)
+        self.assertFalse(obj.arg is self._assembler.assemble("eval-arg").arg)
+
+    def test_evaluator_keyword_is_resolved(self):
+        obj = self._assembler.assemble("eval-kw")
+        self.assertEqual(["test"], obj.keyword)
+
+    def test_partial_arg_is_resolved(self):
+        context = Context(self.id())
+        p = functools.partial(int, "0b1001111", base=2)
+        (context.prototype("partial-arg").
+            create("test.dummy.ModuleClass").init(p).register())
+        obj = _compile(context).assemble("partial-arg")
+        self.assertEqual(79, obj.arg)
+
+    def test_partial_keyword_is_resolved(self):
+        context = Context(self.id())
+        p = functools.partial(int, "0b1001111", base=2)
+        (context.prototype("partial-kw").
+            create(dummy.ModuleClass).init(None, keyword=p).register())
+        obj = _compile(context).assemble("partial-kw")
+        self.assertEqual(79, obj.keyword)
+
+    def test_unknown_reference_raises_KeyError(self):
+        context = Context(self.id())
+        (context.prototype("bad-ref").
+            create(dummy.ModuleClass).init(Reference("missing")).register())
+        self.assertRaises(KeyError, _compile(context).assemble, "bad-ref")
+
+    def test_uncompilable_value_fails(self):
+        context = Context(self.id())
+        (context.prototype("lambda").
+            create(dummy.ModuleClass).init(lambda: None).register())
+        self.assertRaises(AglyphError, compile_context, context)
+
+    def test_same_behavior_as_interpreted_assembler(self):
+        context = _strategies_context(self.id())
+        interpreted = Assembler(context)
+        compiled = _compile(context)
+        for assembler in [interpreted, compiled]:
+            prototype = assembler.assemble("prototype")
+            self.assertEqual(1, prototype.arg[0])
+            self.assertTrue(prototype.arg[1] is assembler.assemble("weakref"))
+            self.assertEqual(1, prototype.called_context_after_inject)
+
+            # plain values are passed as-is, not copied
+            self.assertTrue(
+                assembler.assemble("shared-value").arg is
+                    assembler.assemble("shared-value").arg)
+
+            singleton = assembler.assemble("singleton")
+            self.assertTrue(singleton is assembler.assemble("singleton"))
+            self.assertEqual({"key": "value"}, singleton.arg)
+            self.assertEqual(79, singleton.keyword)
+            self.assertEqual([1, 2], singleton.prop)
+            self.assertTrue(isinstance(singleton.attr, dummy.ModuleClass))
+            self.assertTrue(
+                singleton.get_value().__dict__ is
+                    assembler.assemble("borg").__dict__)
+            self.assertEqual(1, singleton.called_component_after_inject)
+            self.assertEqual(0, singleton.called_template_after_inject)
+
+            borg = assembler.assemble("borg")
+            self.assertFalse(borg is assembler.assemble("borg"))
+            self.assertEqual({"a": set([1]), "b": [3]}, borg.arg)
+            self.assertEqual(1, borg.called_template_after_inject)
+
+            self.assertEqual(["singleton"], assembler.clear_singletons())
+            self.assertEqual(1, singleton.called_component_before_clear)
+            self.assertEqual(["borg"], assembler.clear_borgs())
+            self.assertEqual(1, borg.called_template_before_clear)
+            self.assertFalse(singleton is assembler.assemble("singleton"))
+
+            weak = assembler.assemble("weakref")
+            self.assertTrue(weak is assembler.assemble("weakref"))
+            self.assertEqual(["weakref"], assembler.clear_weakrefs())
+            self.assertEqual(1, weak.called_context_before_clear)
+
+            assembler.clear_singletons()
+            assembler.clear_borgs()
+            self.assertEqual(["singleton"], assembler.init_singletons())
+            self.assertEqual([], assembler.init_singletons())
+            # the borg was already cached as a dependency of the singleton
+            self.assertEqual([], assembler.init_borgs())
+
+    def test_lifecycle_method_failure_issues_warning(self):
+        context = Context(self.id())
+        (context.prototype("failing-lifecycle").
+            create(dummy.ModuleClass).init(None).
+            call(after_inject="reset_lifecycle_counts").
+            register())
+        (context.prototype("raising-lifecycle").
+            create(dummy.ModuleClass).init(None).
+            call(after_inject="set_value").
+            register())
+        compiled = _compile(context)
+        compiled.assemble("failing-lifecycle")
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            compiled.assemble("raising-lifecycle")
+            self.assertEqual(1, len(w))
+            self.assertTrue(
+                str(w[0].message).startswith("ignoring TypeError raised from"))
+
+    def test_command_line(self):
+        output_dir = tempfile.mkdtemp(prefix="aglyph-test-")
+        try:
+            output = os.path.join(output_dir, "test_wiring.py")
+            self.assertEqual(0, main([
+                "compile",
+                find_resource("resources/test_Assembler-context.xml"),
+                "-o", output]))
+            sys.path.insert(0, output_dir)
+            try:
+                import test_wiring
+            finally:
+                sys.path.remove(output_dir)
+                sys.modules.pop("test_wiring", None)
+            self.assertEqual(
+                7, test_wiring.Assembler().assemble("ref-arg").arg)
+        finally:
+            shutil.rmtree(output_dir)
+
+
+def suite():
+    return unittest.makeSuite(CompiledAssemblerTest)
+
+
+if __name__ == "__main__":
+    unittest.TextTestRunner().run(suite())
@@ -32,6 +32,7 @@ import unittest
 import warnings
 
 from aglyph import AglyphError, __version__
+from aglyph._compat import name_of
 from aglyph.component import Component
 
 from test import assertRaisesWithMessage, dummy
@@ -177,6 +178,133 @@ class ComponentTest(TemplateTest):
             "test", strategy="weakref", before_clear="before_clear")
         self.assertEqual("before_clear", component.before_clear)
 
+    # overrides TemplateTest.test_after_fork_at_init_time because
+    # after_fork on a prototype component is set to None
+    def test_after_fork_at_init_time(self):
+        component = Component(
+            "test", strategy="singleton", after_fork="after_fork")
+        self.assertEqual("after_fork", component.after_fork)
+
+    def test_after_fork_ignored_for_prototype(self):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            component = Component(
+                "test", strategy="prototype", after_fork="after_fork")
+
+            self.assertEqual(1, len(w))
+            self.assertEqual(
+                "ignoring after_fork='after_fork' for prototype component "
+                "with ID 'test'",
+                str(w[0].message))
+
+        self.assertIsNone(component.after_fork)
+
+    def test_borg_accepts_after_fork(self):
+        component = Component(
+            "test", strategy="borg", after_fork="after_fork")
+        self.assertEqual("after_fork", component.after_fork)
+
+    def test_weakref_accepts_after_fork(self):
+        component = Component(
+            "test", strategy="weakref", after_fork="after_fork")
+        self.assertEqual("after_fork", component.after_fork)
+
+    def test_snapshot_is_false_by_default(self):
+        self.assertFalse(Component("test", strategy="singleton").snapshot)
+
+    def test_singleton_accepts_snapshot(self):
+        component = Component("test", strategy="singleton", snapshot=True)
+        self.assertTrue(component.snapshot)
+
+    def test_snapshot_ignored_for_borg(self):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            component = Component("test", strategy="borg", snapshot=True)
+
+            self.assertEqual(1, len(w))
+            self.assertEqual(
+                "ignoring snapshot=True for borg component with ID 'test'",
+                str(w[0].message))
+
+        self.assertFalse(component.snapshot)
+
+    def test_clone_is_shallow_by_default(self):
+        component = Component("test", strategy="clone")
+        self.assertFalse(component.deep_clone)
+        self.assertIsNone(component.after_clone)
+
+    def test_clone_accepts_deep_clone_and_after_clone(self):
+        component = Component(
+            "test", strategy="clone", deep_clone=True,
+            after_clone="after_clone")
+        self.assertTrue(component.deep_clone)
+        self.assertEqual("after_clone", component.after_clone)
+
+    def test_clone_options_ignored_for_prototype(self):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            component = Component(
+                "test", deep_clone=True, after_clone="after_clone")
+
+            self.assertEqual(2, len(w))
+            self.assertEqual(
+                "ignoring deep_clone=True for prototype component with ID "
+                    "'test'",
+                str(w[0].message))
+            self.assertEqual(
+                "ignoring after_clone='after_clone' for prototype component "
+                    "with ID 'test'",
+                str(w[1].message))
+
+        self.assertFalse(component.deep_clone)
+        self.assertIsNone(component.after_clone)
+
+    def test_backoff_is_none_by_default(self):
+        self.assertIsNone(Component("test").backoff)
+
+    def test_backoff_must_be_positive(self):
+        assertRaisesWithMessage(
+            self,
+            ValueError("backoff for component 'test' must be positive (not 0)"),
+            Component, "test", backoff=0)
+
+    def test_backoff_ignored_for_imported(self):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            component = Component("test", member_name="member", backoff=1.0)
+
+            self.assertEqual(1, len(w))
+            self.assertEqual(
+                "ignoring backoff=1.0 for _imported component with ID 'test'",
+                str(w[0].message))
+
+        self.assertIsNone(component.backoff)
+
+    def test_timeout_must_be_positive(self):
+        assertRaisesWithMessage(
+            self,
+            ValueError(
+                "timeout for component 'test' must be positive (not -1)"),
+            Component, "test", strategy="singleton", timeout=-1)
+
+    def test_timeout_ignored_for_prototype(self):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            component = Component("test", timeout=5)
+
+            self.assertEqual(1, len(w))
+            self.assertEqual(
+                "ignoring timeout=5 for prototype component with ID 'test'",
+                str(w[0].message))
+
+        self.assertIsNone(component.timeout)
+
+    def test_parallel_default_is_false(self):
+        self.assertFalse(Component("test").parallel)
+
+    def test_parallel(self):
+        self.assertTrue(Component("test", parallel=True).parallel)
+
 
 def suite():
     return unittest.makeSuite(ComponentTest)
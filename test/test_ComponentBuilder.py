@@ -91,6 +91,25 @@ class ComponentBuilderTest(TemplateBuilderTest):
             "weakref",
             self._builder._context["test.dummy.ModuleClass"].strategy)
 
+    def test_register_snapshot(self):
+        self._builder.create(strategy="singleton", snapshot=True).register()
+        self.assertTrue(
+            self._builder._context["test.dummy.ModuleClass"].snapshot)
+
+    def test_register_clone(self):
+        (self._builder.create(
+            strategy="clone", deep_clone=True, after_clone="after_clone").
+            register())
+        component = self._builder._context["test.dummy.ModuleClass"]
+        self.assertEqual("clone", component.strategy)
+        self.assertTrue(component.deep_clone)
+        self.assertEqual("after_clone", component.after_clone)
+
+    def test_register_backoff(self):
+        self._builder.create(backoff=2.0).register()
+        self.assertEqual(
+            2.0, self._builder._context["test.dummy.ModuleClass"].backoff)
+
 
 def suite():
     return unittest.makeSuite(ComponentBuilderTest)
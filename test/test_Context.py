@@ -28,12 +28,25 @@
 __author__ = "Matthew Zipay <mattz@ninthtest.info>"
 
 import logging
+import pickle
 import unittest
 
 from aglyph import AglyphError, __version__
 from aglyph._compat import name_of
-from aglyph.component import Component, Strategy, Template
-from aglyph.context import _ComponentBuilder, _TemplateBuilder, Context
+from aglyph.component import (
+    Component,
+    Evaluator,
+    _PICKLE_VERSION,
+    Reference,
+    Strategy,
+    Template,
+)
+from aglyph.context import (
+    _ComponentBuilder,
+    Context,
+    _TemplateBuilder,
+    _unpickle_context,
+)
 
 from test import assertRaisesWithMessage, dummy
 from test.test_ContextBuilder import ContextBuilderTest
@@ -109,6 +122,23 @@ class _BaseContextTest(ContextBuilderTest):
             init(None).register())
         self.assertEqual("_imported", self._context["NestedClass"].strategy)
 
+    def test_pickle(self):
+        self._context.template("parent").call(after_fork="reconnect").register()
+        (self._context.singleton("pickled", parent="parent").
+            create(dummy.ModuleClass).
+            init(Evaluator(dict, a=Reference("parent"))).
+            set(value=[1, 2]).register())
+        context = pickle.loads(
+            pickle.dumps(self._context, pickle.HIGHEST_PROTOCOL))
+        self.assertTrue(type(context) is type(self._context))
+        self.assertEqual(repr(self._context), repr(context))
+        self.assertEqual(sorted(self._context.keys()), sorted(context.keys()))
+        for (unique_id, definition) in self._context.items():
+            self.assertEqual(repr(definition), repr(context[unique_id]))
+        self.assertEqual("reconnect", context["parent"].after_fork)
+        self.assertEqual(
+            [("value", [1, 2])], list(context["pickled"].attributes.items()))
+
 
 class ContextTest(_BaseContextTest):
 
@@ -126,6 +156,35 @@ class ContextTest(_BaseContextTest):
         context = Context("test", before_clear="before_clear")
         self.assertEqual("before_clear", context.before_clear)
 
+    def test_after_fork_at_init_time(self):
+        context = Context("test", after_fork="after_fork")
+        self.assertEqual("after_fork", context.after_fork)
+
+    def test_revision_changes_when_definitions_change(self):
+        context = Context("test")
+        revisions = [context.revision]
+        context.register(Component("test"))
+        revisions.append(context.revision)
+        context["test"] = Component("test")
+        revisions.append(context.revision)
+        del context["test"]
+        revisions.append(context.revision)
+        context.update(test=Template("test"))
+        revisions.append(context.revision)
+        context.pop("test")
+        revisions.append(context.revision)
+        self.assertEqual(len(revisions), len(set(revisions)))
+        context.get("test")
+        self.assertEqual(revisions[-1], context.revision)
+
+    def test_unpickle_incompatible_version_fails(self):
+        e_expected = AglyphError(
+            "cannot unpickle Context (pickle version %r; Aglyph %s expects "
+                "%r)" % (_PICKLE_VERSION + 1, __version__, _PICKLE_VERSION))
+        assertRaisesWithMessage(
+            self, e_expected, _unpickle_context, Context, _PICKLE_VERSION + 1,
+            {}, ())
+
 
 def suite():
     return unittest.makeSuite(ContextTest)
@@ -78,6 +78,25 @@ class ContextBuilderTest(unittest.TestCase):
         builder = self._context.weakref("test")
         self.assertTrue(type(builder) is _ComponentBuilder)
 
+    def test_shared_returns_component_builder(self):
+        builder = self._context.shared("test")
+        self.assertTrue(type(builder) is _ComponentBuilder)
+
+    def test_clone_returns_component_builder(self):
+        builder = self._context.clone("test")
+        self.assertTrue(type(builder) is _ComponentBuilder)
+        self.assertEqual("clone", builder._strategy)
+
+    def test_soft_returns_component_builder(self):
+        builder = self._context.soft("test")
+        self.assertTrue(type(builder) is _ComponentBuilder)
+        self.assertEqual("soft", builder._strategy)
+
+    def test_graph_returns_component_builder(self):
+        builder = self._context.graph("test")
+        self.assertTrue(type(builder) is _ComponentBuilder)
+        self.assertEqual("graph", builder._strategy)
+
     def test_template_returns_template_builder(self):
         builder = self._context.template("test")
         self.assertTrue(type(builder) is _TemplateBuilder)
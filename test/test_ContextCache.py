@@ -0,0 +1,204 @@
+# -*- coding: UTF-8 -*-
+
+# Copyright (c) 2006, 2011, 2013-2018 Matthew Zipay.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use,
+# copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following
+# conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+# OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+"""Test case and runner for :class:`aglyph.context.ContextCache`."""
+
+__author__ = "Matthew Zipay <mattz@ninthtest.info>"
+
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+try:
+    from io import BytesIO as bytebuf
+except:
+    from StringIO import StringIO as bytebuf
+
+from aglyph import __version__
+from aglyph.assembler import Assembler
+from aglyph.context import ContextCache, XMLContext
+
+from test import find_resource, read_resource
+
+__all__ = [
+    "ContextCacheTest",
+    "suite"
+]
+
+# don't use __name__ here; can be run as "__main__"
+_log = logging.getLogger("test.test_ContextCache")
+
+
+def _describe(context):
+    """Return comparable descriptions of all definitions in *context*."""
+    return sorted(
+        (repr(definition), repr(definition.args),
+            repr(sorted(definition.keywords.items())),
+            repr(definition.attributes))
+        for definition in context.values())
+
+
+class ContextCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self._cache_dir = tempfile.mkdtemp(prefix="aglyph-test-")
+        self._filename = find_resource("resources/test_Assembler-context.xml")
+
+    def tearDown(self):
+        shutil.rmtree(self._cache_dir, ignore_errors=True)
+
+    def test_first_load_is_a_miss(self):
+        cache = ContextCache()
+        context = cache.load(self._filename)
+        self.assertTrue(type(context) is XMLContext)
+        self.assertEqual(1, cache.statistics["misses"])
+        self.assertEqual(0, cache.statistics["memory_hits"])
+
+    def test_second_load_is_a_memory_hit(self):
+        cache = ContextCache()
+        cache.load(self._filename)
+        cache.load(self._filename)
+        self.assertEqual(1, cache.statistics["misses"])
+        self.assertEqual(1, cache.statistics["memory_hits"])
+
+    def test_cached_context_matches_parsed_context(self):
+        cache = ContextCache()
+        cache.load(self._filename)
+        context = cache.load(self._filename)
+        parsed = XMLContext(self._filename)
+        self.assertEqual("test_Assembler-context", context.context_id)
+        self.assertEqual("context_after_inject", context.after_inject)
+        self.assertEqual("context_before_clear", context.before_clear)
+        self.assertEqual(_describe(parsed), _describe(context))
+
+    def test_each_load_returns_a_new_context(self):
+        cache = ContextCache()
+        context1 = cache.load(self._filename)
+        context2 = cache.load(self._filename)
+        self.assertFalse(context1 is context2)
+        self.assertFalse(context1["ref-arg"] is context2["ref-arg"])
+
+    def test_cached_context_can_be_assembled(self):
+        cache = ContextCache()
+        cache.load(self._filename)
+        assembler = Assembler(cache.load(self._filename))
+        self.assertEqual(7, assembler.assemble("ref-arg").arg)
+        self.assertEqual(["test"], assembler.assemble("eval-arg").arg)
+
+    def test_disk_hit_from_another_cache(self):
+        ContextCache(self._cache_dir).load(self._filename)
+        cache = ContextCache(self._cache_dir)
+        context = cache.load(self._filename)
+        self.assertEqual(1, cache.statistics["disk_hits"])
+        self.assertEqual(0, cache.statistics["misses"])
+        self.assertEqual(
+            _describe(XMLContext(self._filename)), _describe(context))
+
+    def test_disk_cache_dir_is_created(self):
+        cache_dir = os.path.join(self._cache_dir, "nested")
+        ContextCache(cache_dir).load(self._filename)
+        self.assertEqual(1, len(os.listdir(cache_dir)))
+
+    @unittest.skipUnless(
+        hasattr(os, "getuid"), "can't test file ownership on this platform")
+    def test_disk_cache_dir_is_private(self):
+        cache_dir = os.path.join(self._cache_dir, "nested")
+        ContextCache(cache_dir).load(self._filename)
+        self.assertEqual(0o700, os.stat(cache_dir).st_mode & 0o777)
+
+    @unittest.skipUnless(
+        hasattr(os, "getuid"), "can't test file ownership on this platform")
+    def test_cache_dir_accessible_by_others_is_not_loaded(self):
+        ContextCache(self._cache_dir).load(self._filename)
+        os.chmod(self._cache_dir, 0o777)
+        cache = ContextCache(self._cache_dir)
+        cache.load(self._filename)
+        self.assertEqual(0, cache.statistics["disk_hits"])
+        self.assertEqual(1, cache.statistics["misses"])
+
+    @unittest.skipUnless(
+        hasattr(os, "getuid"), "can't test file ownership on this platform")
+    def test_cache_file_owned_by_another_user_is_not_loaded(self):
+        ContextCache(self._cache_dir).load(self._filename)
+        # pretend to be another user (who may not trust the cached file)
+        uid = os.getuid()
+        getuid = os.getuid
+        os.getuid = lambda: uid + 1
+        self.addCleanup(setattr, os, "getuid", getuid)
+        cache = ContextCache(self._cache_dir)
+        cache.load(self._filename)
+        self.assertEqual(0, cache.statistics["disk_hits"])
+        self.assertEqual(1, cache.statistics["misses"])
+
+    def test_changed_content_is_a_miss(self):
+        cache = ContextCache()
+        uresource = read_resource("resources/test_Assembler-context.xml")
+        cache.load(bytebuf(uresource.encode("utf-8")))
+        context = cache.load(
+            bytebuf(uresource.replace("<int>49</int>", "<int>64</int>").
+                encode("utf-8")))
+        self.assertEqual(2, cache.statistics["misses"])
+        self.assertEqual(8, Assembler(context).assemble("ref-arg").arg)
+
+    def test_changed_default_encoding_is_a_miss(self):
+        cache = ContextCache()
+        cache.load(self._filename, default_encoding="utf-8")
+        context = cache.load(self._filename, default_encoding="latin-1")
+        self.assertEqual(2, cache.statistics["misses"])
+        self.assertEqual("latin-1", context.default_encoding)
+
+    def test_unusable_cache_file_is_reparsed(self):
+        ContextCache(self._cache_dir).load(self._filename)
+        for basename in os.listdir(self._cache_dir):
+            with open(os.path.join(self._cache_dir, basename), "wb") as f:
+                f.write(b"not a pickle")
+        cache = ContextCache(self._cache_dir)
+        context = cache.load(self._filename)
+        self.assertEqual(1, cache.statistics["misses"])
+        self.assertTrue("ref-arg" in context)
+
+    def test_clear_discards_memory_cache(self):
+        cache = ContextCache()
+        cache.load(self._filename)
+        cache.clear()
+        cache.load(self._filename)
+        self.assertEqual(2, cache.statistics["misses"])
+
+    def test_timings_are_reported(self):
+        cache = ContextCache()
+        cache.load(self._filename)
+        cache.load(self._filename)
+        self.assertTrue(cache.statistics["cold_seconds"] > 0.0)
+        self.assertTrue(cache.statistics["warm_seconds"] > 0.0)
+
+
+def suite():
+    return unittest.makeSuite(ContextCacheTest)
+
+
+if __name__ == "__main__":
+    unittest.TextTestRunner().run(suite())
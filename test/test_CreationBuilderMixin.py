@@ -53,6 +53,12 @@ class _MockCreationBuilderMixin(_CreationBuilderMixin):
         "_factory_name",
         "_member_name",
         "_strategy",
+        "_snapshot",
+        "_deep_clone",
+        "_after_clone",
+        "_backoff",
+        "_timeout",
+        "_parallel",
     ]
 
     def __init__(self):
@@ -60,6 +66,12 @@ class _MockCreationBuilderMixin(_CreationBuilderMixin):
         self._factory_name = None
         self._member_name = None
         self._strategy = None
+        self._snapshot = False
+        self._deep_clone = False
+        self._after_clone = None
+        self._backoff = None
+        self._timeout = None
+        self._parallel = False
 
 
 class CreationBuilderMixinTest(unittest.TestCase):
@@ -111,6 +123,44 @@ class CreationBuilderMixinTest(unittest.TestCase):
         self.assertIsNone(self._builder._member_name)
         self.assertEqual("prototype", self._builder._strategy)
 
+    def test_can_set_snapshot(self):
+        self._builder.create(strategy="singleton", snapshot=True)
+        self.assertTrue(self._builder._snapshot)
+        # None does not overwrite a previously-specified value
+        self._builder.create(dotted_name="dummy")
+        self.assertTrue(self._builder._snapshot)
+
+    def test_can_set_clone_options(self):
+        self._builder.create(
+            strategy="clone", deep_clone=True, after_clone="after_clone")
+        self.assertTrue(self._builder._deep_clone)
+        self.assertEqual("after_clone", self._builder._after_clone)
+        # None does not overwrite a previously-specified value
+        self._builder.create(dotted_name="dummy")
+        self.assertTrue(self._builder._deep_clone)
+        self.assertEqual("after_clone", self._builder._after_clone)
+
+    def test_can_set_backoff(self):
+        self._builder.create(strategy="singleton", backoff=0.5)
+        self.assertEqual(0.5, self._builder._backoff)
+        # None does not overwrite a previously-specified value
+        self._builder.create(dotted_name="dummy")
+        self.assertEqual(0.5, self._builder._backoff)
+
+    def test_can_set_timeout(self):
+        self._builder.create(strategy="singleton", timeout=5)
+        self.assertEqual(5, self._builder._timeout)
+        # None does not overwrite a previously-specified value
+        self._builder.create(dotted_name="dummy")
+        self.assertEqual(5, self._builder._timeout)
+
+    def test_can_set_parallel(self):
+        self._builder.create(parallel=True)
+        self.assertTrue(self._builder._parallel)
+        # None does not overwrite a previously-specified value
+        self._builder.create(dotted_name="dummy")
+        self.assertTrue(self._builder._parallel)
+
 
 def suite():
     return unittest.makeSuite(CreationBuilderMixinTest)
@@ -29,6 +29,7 @@ __author__ = "Matthew Zipay <mattz@ninthtest.info>"
 
 from functools import partial
 import logging
+import pickle
 import unittest
 
 from aglyph import __version__
@@ -170,6 +171,12 @@ class EvaluatorTest(InitializationSupportTest):
                 [("partial", 79), ("evaluator", 97), ("reference", 101)]},
             evaluator(self._assembler))
 
+    def test_pickle(self):
+        evaluator = pickle.loads(pickle.dumps(
+            Evaluator(dict, [("a", Reference("number"))], b=partial(int, "7")),
+            pickle.HIGHEST_PROTOCOL))
+        self.assertEqual({"a": 101, "b": 7}, evaluator(self._assembler))
+
 
 def suite():
     return unittest.makeSuite(EvaluatorTest)
@@ -0,0 +1,251 @@
+# -*- coding: UTF-8 -*-
+
+# Copyright (c) 2006, 2011, 2013-2018 Matthew Zipay.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use,
+# copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following
+# conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+# OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+
+"""Test case and runner for :class:`aglyph.context.LazyXMLContext`.
+
+"""
+
+__author__ = "Matthew Zipay <mattz@ninthtest.info>"
+
+import logging
+import os
+import pickle
+import unittest
+
+try:
+    from io import BytesIO as bytebuf, StringIO as textbuf
+except ImportError:
+    from StringIO import StringIO as bytebuf
+    textbuf = bytebuf
+
+from aglyph import AglyphError
+from aglyph._compat import is_python_3
+from aglyph.assembler import Assembler
+from aglyph.component import Component
+from aglyph.context import LazyXMLContext, XMLContext, _UNPARSED
+
+from test import assertRaisesWithMessage, find_resource, read_resource
+
+__all__ = [
+    "LazyXMLContextTest",
+    "suite"
+]
+
+# don't use __name__ here; can be run as "__main__"
+_log = logging.getLogger("test.test_LazyXMLContext")
+
+
+def _load(context_class, filename):
+    """Return a comparable description of **all** definitions parsed
+    from *filename*, or of the exception raised while parsing them.
+
+    """
+    try:
+        context = context_class(filename)
+        definitions = list(context.values())
+    except Exception as e:
+        # messages may name the concrete context class
+        return (
+            "raised", e.__class__,
+            str(e).replace(context_class.__name__, "XMLContext"))
+    else:
+        return (
+            "parsed", context.context_id, context.after_inject,
+            context.before_clear,
+            sorted(
+                (repr(definition), repr(definition.args),
+                    repr(sorted(definition.keywords.items())),
+                    repr(definition.attributes))
+                for definition in definitions))
+
+
+def _parsed_ids(context):
+    return sorted(
+        unique_id for unique_id in context
+        if dict.get(context, unique_id) is not _UNPARSED)
+
+
+class LazyXMLContextTest(unittest.TestCase):
+
+    def setUp(self):
+        self._context = LazyXMLContext(
+            find_resource("resources/test_Assembler-context.xml"))
+
+    def test_same_results_as_XMLContext_for_all_resources(self):
+        resources_dir = os.path.dirname(
+            find_resource("resources/test_Assembler-context.xml"))
+        basenames = sorted(
+            basename for basename in os.listdir(resources_dir)
+            if basename.endswith(".xml"))
+        self.assertTrue(len(basenames) > 50)
+        for basename in basenames:
+            filename = os.path.join(resources_dir, basename)
+            self.assertEqual(
+                _load(XMLContext, filename),
+                _load(LazyXMLContext, filename),
+                basename)
+
+    def test_nothing_is_parsed_initially(self):
+        self.assertEqual("test_Assembler-context", self._context.context_id)
+        self.assertEqual([], _parsed_ids(self._context))
+
+    def test_membership_does_not_parse(self):
+        self.assertTrue("ref-arg" in self._context)
+        self.assertFalse("not-mapped" in self._context)
+        self.assertEqual(
+            len(XMLContext(
+                find_resource("resources/test_Assembler-context.xml"))),
+            len(self._context))
+        self.assertEqual([], _parsed_ids(self._context))
+
+    def test_get_parses_only_requested_definition(self):
+        component = self._context.get("ref-arg")
+        self.assertTrue(isinstance(component, Component))
+        self.assertEqual(["ref-arg"], _parsed_ids(self._context))
+
+    def test_get_component_parses_parents(self):
+        component = self._context.get_component("component-args")
+        self.assertEqual("parent-args", component.parent_id)
+        self.assertEqual(
+            ["component-args", "parent-args"], _parsed_ids(self._context))
+
+    def test_get_returns_default_if_not_mapped(self):
+        self.assertTrue(self._context.get("not-mapped") is None)
+        self.assertEqual(1, self._context.get("not-mapped", 1))
+
+    def test_getitem(self):
+        self.assertEqual("ref-arg", self._context["ref-arg"].unique_id)
+        self.assertRaises(KeyError, self._context.__getitem__, "not-mapped")
+
+    def test_pop(self):
+        component = self._context.pop("ref-arg")
+        self.assertEqual("ref-arg", component.unique_id)
+        self.assertFalse("ref-arg" in self._context)
+
+    def test_iter_components_by_strategy_parses_only_matches(self):
+        context = LazyXMLContext(
+            bytebuf(
+                b'<context id="test">'
+                b'<template id="t" />'
+                b'<component id="p" dotted-name="builtins.object" />'
+                b'<component id="s1" dotted-name="builtins.object" '
+                b'strategy="singleton" />'
+                b'<component id="i" dotted-name="builtins" '
+                b'member-name="object" strategy="singleton" />'
+                b'<component id="s2" dotted-name="builtins.object" '
+                b'strategy="singleton" parent-id="t" />'
+                b'</context>'))
+        self.assertEqual(
+            ["s1", "s2"],
+            [component.unique_id
+                for component in context.iter_components("singleton")])
+        self.assertEqual(["s1", "s2", "t"], _parsed_ids(context))
+
+    def test_iter_components_without_strategy_skips_templates(self):
+        self.assertEqual(
+            len(list(XMLContext(
+                find_resource("resources/test_Assembler-context.xml")).
+                    iter_components())),
+            len(list(self._context.iter_components())))
+
+    def test_definition_is_parsed_once(self):
+        self.assertTrue(
+            self._context.get("ref-arg") is self._context.get("ref-arg"))
+
+    def test_can_be_assembled(self):
+        assembler = Assembler(self._context)
+        self.assertEqual(7, assembler.assemble("ref-arg").arg)
+        self.assertEqual(["test"], assembler.assemble("eval-arg").arg)
+
+    def test_rejects_unexpected_root(self):
+        e_expected = AglyphError("expected root <context>, not <components>")
+        assertRaisesWithMessage(
+            self, e_expected, LazyXMLContext,
+            bytebuf(b'<components id="test" />'))
+
+    def test_rejects_unexpected_element_on_scan(self):
+        e_expected = AglyphError("unexpected element: /context/bogus")
+        assertRaisesWithMessage(
+            self, e_expected, LazyXMLContext,
+            bytebuf(b'<context id="test"><bogus /></context>'))
+
+    def test_rejects_duplicate_id_on_scan(self):
+        self.assertRaises(
+            AglyphError, LazyXMLContext,
+            bytebuf(
+                b'<context id="test"><template id="dup" />'
+                b'<component id="dup" /></context>'))
+
+    def test_invalid_definition_raises_on_access(self):
+        context = LazyXMLContext(
+            bytebuf(
+                b'<context id="test"><component id="bad">'
+                b'<bogus /></component></context>'))
+        self.assertTrue("bad" in context)
+        e_expected = AglyphError("unexpected element: component/bogus")
+        assertRaisesWithMessage(self, e_expected, context.get, "bad")
+
+    def test_document_encoding_is_respected(self):
+        context = LazyXMLContext(
+            bytebuf(
+                u'<?xml version="1.0" encoding="iso-8859-1"?>'
+                u'<context id="test"><component id="builtins.str">'
+                u'<init><arg><unicode>ÿ</unicode></arg></init>'
+                u'</component></context>'.encode("iso-8859-1")))
+        self.assertEqual([u"ÿ"], context["builtins.str"].args)
+
+    @unittest.skipUnless(is_python_3, "text streams require Python 3")
+    def test_can_read_text_stream(self):
+        context = LazyXMLContext(
+            textbuf(read_resource("resources/test_Assembler-context.xml")))
+        self.assertEqual(7, Assembler(context).assemble("ref-arg").arg)
+
+    def test_pickle(self):
+        self._context.get("ref-arg")
+        context = pickle.loads(pickle.dumps(self._context))
+        self.assertEqual(len(self._context), len(context))
+        self.assertEqual(7, Assembler(context).assemble("ref-arg").arg)
+
+    def test_unparsed_definitions_remain_unparsed_after_pickle(self):
+        context = pickle.loads(pickle.dumps(self._context))
+        self.assertTrue(dict.get(context, "ref-arg") is _UNPARSED)
+        self.assertEqual(7, Assembler(context).assemble("ref-arg").arg)
+
+    def test_repr(self):
+        context = LazyXMLContext(
+            find_resource("resources/test_XMLContext-empty.xml"),
+            default_encoding="ascii")
+        self.assertTrue(repr(context).startswith(
+            "aglyph.context.LazyXMLContext("))
+        self.assertTrue(repr(context).endswith("default_encoding='ascii')"))
+
+
+def suite():
+    return unittest.makeSuite(LazyXMLContextTest)
+
+
+if __name__ == "__main__":
+    unittest.TextTestRunner().run(suite())
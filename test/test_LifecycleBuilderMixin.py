@@ -51,11 +51,13 @@ class _MockLifecycleBuilderMixin(_LifecycleBuilderMixin):
     __slots__ = [
         "_after_inject",
         "_before_clear",
+        "_after_fork",
     ]
 
     def __init__(self):
         self._after_inject = None
         self._before_clear = None
+        self._after_fork = None
 
 
 class LifecycleBuilderMixinTest(unittest.TestCase):
@@ -65,9 +67,11 @@ class LifecycleBuilderMixinTest(unittest.TestCase):
 
     def test_can_set_attributes_with_one_call(self):
         self._builder.call(
-            after_inject="after_inject", before_clear="before_clear")
+            after_inject="after_inject", before_clear="before_clear",
+            after_fork="after_fork")
         self.assertEqual("after_inject", self._builder._after_inject)
         self.assertEqual("before_clear", self._builder._before_clear)
+        self.assertEqual("after_fork", self._builder._after_fork)
 
     def test_can_set_attributes_with_chained_calls(self):
         # NOTE: this also indirectly asserts that None default values do not
@@ -95,6 +95,48 @@ class ReentrantMutexCacheTest(unittest.TestCase):
         t.join(1)
         self.assertEqual("blocked", cache["test"])
 
+    def test_lock_for_same_key_is_same_lock(self):
+        self.assertTrue(
+            self._cache.lock_for("test") is self._cache.lock_for("test"))
+        self.assertFalse(
+            self._cache.lock_for("test") is self._cache.lock_for("other"))
+
+    @unittest.skipUnless(_has_threading, "threading module is not available!")
+    def test_key_lock_does_not_block_other_keys(self):
+        cache = self._cache
+        acquired = []
+
+        def acquire(key):
+            with cache.lock_for(key):
+                acquired.append(key)
+
+        with cache.lock_for("test"):
+            t = threading_.Thread(target=acquire, args=("other",))
+            t.start()
+            t.join(1)
+            self.assertEqual(["other"], acquired)
+            t = threading_.Thread(target=_blocked, args=(cache,))
+            t.start()
+            t.join(1)
+            self.assertEqual("blocked", cache["test"])
+
+    @unittest.skipUnless(_has_threading, "threading module is not available!")
+    def test_key_lock_blocks_same_key(self):
+        cache = self._cache
+        acquired = []
+
+        def acquire(key):
+            with cache.lock_for(key):
+                acquired.append(key)
+
+        with cache.lock_for("test"):
+            t = threading_.Thread(target=acquire, args=("test",))
+            t.start()
+            t.join(0.1)
+            self.assertEqual([], acquired)
+        t.join(1)
+        self.assertEqual(["test"], acquired)
+
 
 def suite():
     return unittest.makeSuite(ReentrantMutexCacheTest)
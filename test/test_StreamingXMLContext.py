@@ -0,0 +1,142 @@
+# -*- coding: UTF-8 -*-
+
+# Copyright (c) 2006, 2011, 2013-2018 Matthew Zipay.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use,
+# copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following
+# conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+# OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+"""Test case and runner for :class:`aglyph.context.StreamingXMLContext`.
+
+"""
+
+__author__ = "Matthew Zipay <mattz@ninthtest.info>"
+
+import logging
+import os
+import unittest
+
+try:
+    from io import BytesIO as bytebuf
+except:
+    from StringIO import StringIO as bytebuf
+
+from aglyph import AglyphError
+from aglyph.assembler import Assembler
+from aglyph.context import StreamingXMLContext, XMLContext
+
+from test import assertRaisesWithMessage, find_resource
+
+__all__ = [
+    "StreamingXMLContextTest",
+    "suite"
+]
+
+# don't use __name__ here; can be run as "__main__"
+_log = logging.getLogger("test.test_StreamingXMLContext")
+
+
+def _load(context_class, filename):
+    """Return a comparable description of the definitions parsed from
+    *filename*, or of the exception raised while parsing it.
+
+    """
+    try:
+        context = context_class(filename)
+    except Exception as e:
+        # messages may name the concrete context class
+        return (
+            "raised", e.__class__,
+            str(e).replace(context_class.__name__, "XMLContext"))
+    else:
+        return (
+            "parsed", context.context_id, context.after_inject,
+            context.before_clear,
+            sorted(
+                (repr(definition), repr(definition.args),
+                    repr(sorted(definition.keywords.items())),
+                    repr(definition.attributes))
+                for definition in context.values()))
+
+
+class StreamingXMLContextTest(unittest.TestCase):
+
+    def test_same_results_as_XMLContext_for_all_resources(self):
+        resources_dir = os.path.dirname(
+            find_resource("resources/test_Assembler-context.xml"))
+        basenames = sorted(
+            basename for basename in os.listdir(resources_dir)
+            if basename.endswith(".xml"))
+        self.assertTrue(len(basenames) > 50)
+        for basename in basenames:
+            filename = os.path.join(resources_dir, basename)
+            self.assertEqual(
+                _load(XMLContext, filename),
+                _load(StreamingXMLContext, filename),
+                basename)
+
+    def test_can_read_from_stream(self):
+        stream = bytebuf(
+            b'<?xml version="1.0" encoding="utf-8"?>'
+            b'<context id="streamed"><component id="builtins.str" />'
+            b'</context>')
+        context = StreamingXMLContext(stream)
+        self.assertEqual("streamed", context.context_id)
+        self.assertTrue("builtins.str" in context)
+
+    def test_rejects_unexpected_root(self):
+        stream = bytebuf(b'<components id="test" />')
+        e_expected = AglyphError("expected root <context>, not <components>")
+        assertRaisesWithMessage(self, e_expected, StreamingXMLContext, stream)
+
+    def test_rejects_duplicate_id(self):
+        stream = bytebuf(
+            b'<context id="test"><template id="dup" />'
+            b'<component id="dup" /></context>')
+        self.assertRaises(AglyphError, StreamingXMLContext, stream)
+
+    def test_definitions_are_discarded_after_processing(self):
+        stream = bytebuf(
+            b'<context id="test"><template id="t1" />'
+            b'<template id="t2" /><template id="t3" /></context>')
+        context = StreamingXMLContext(stream)
+        self.assertEqual(3, len(context))
+
+    def test_can_be_assembled(self):
+        assembler = Assembler(
+            StreamingXMLContext(
+                find_resource("resources/test_Assembler-context.xml")))
+        self.assertEqual(7, assembler.assemble("ref-arg").arg)
+
+    def test_repr(self):
+        context = StreamingXMLContext(
+            find_resource("resources/test_XMLContext-empty.xml"),
+            default_encoding="ascii")
+        self.assertTrue(repr(context).startswith(
+            "aglyph.context.StreamingXMLContext("))
+        self.assertTrue(repr(context).endswith("default_encoding='ascii')"))
+
+
+def suite():
+    return unittest.makeSuite(StreamingXMLContextTest)
+
+
+if __name__ == "__main__":
+    unittest.TextTestRunner().run(suite())
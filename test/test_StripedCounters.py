@@ -0,0 +1,100 @@
+# -*- coding: UTF-8 -*-
+
+# Copyright (c) 2006, 2011, 2013-2017 Matthew Zipay.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use,
+# copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following
+# conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+# OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+"""Test case and runner for :class:`aglyph.assembler._StripedCounters`.
+
+"""
+
+__author__ = "Matthew Zipay <mattz@ninthtest.info>"
+
+import logging
+import unittest
+
+try:
+    import threading
+    threading_ = threading
+    _has_threading = True
+except:
+    import dummy_threading
+    threading_ = dummy_threading
+    _has_threading = False
+
+from aglyph import __version__
+from aglyph.assembler import _StripedCounters
+
+__all__ = [
+    "StripedCountersTest",
+    "suite"
+]
+
+# don't use __name__ here; can be run as "__main__"
+_log = logging.getLogger("test.test_StripedCounters")
+_log.info("has threading? %r (using %r)", _has_threading, threading_)
+
+
+class StripedCountersTest(unittest.TestCase):
+
+    def setUp(self):
+        self._counters = _StripedCounters(stripes=4)
+
+    def test_totals_are_empty_initially(self):
+        self.assertEqual({}, self._counters.totals())
+
+    def test_add_accumulates_count_and_total(self):
+        self._counters.add("test", 1, 0.5)
+        self._counters.add("test", 2, 0.25)
+        self._counters.add("other", 1, 1.0)
+        self.assertEqual(
+            {"test": [3, 0.75], "other": [1, 1.0]}, self._counters.totals())
+
+    @unittest.skipUnless(_has_threading, "threading module is not available!")
+    def test_totals_sum_stripes_of_all_threads(self):
+        counters = self._counters
+
+        def add():
+            for _ in range(1000):
+                counters.add("test", 1, 1.0)
+
+        threads = [threading_.Thread(target=add) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(5)
+        self.assertEqual({"test": [8000, 8000.0]}, counters.totals())
+
+    def test_after_fork_keeps_totals(self):
+        self._counters.add("test", 1, 0.5)
+        self._counters.after_fork()
+        self._counters.add("test", 1, 0.5)
+        self.assertEqual({"test": [2, 1.0]}, self._counters.totals())
+
+
+def suite():
+    return unittest.makeSuite(StripedCountersTest)
+
+
+if __name__ == "__main__":
+    unittest.TextTestRunner().run(suite())
+
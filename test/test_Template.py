@@ -28,11 +28,12 @@
 __author__ = "Matthew Zipay <mattz@ninthtest.info>"
 
 import logging
+import pickle
 import unittest
 
 from aglyph import AglyphError, __version__
 from aglyph._compat import name_of
-from aglyph.component import Template
+from aglyph.component import _PICKLE_VERSION, Template
 
 from test import assertRaisesWithMessage, dummy
 from test.test_DependencySupport import DependencySupportTest
@@ -109,6 +110,41 @@ class TemplateTest(DependencySupportTest):
         self.assertRaises(
             AttributeError, setattr, self._support, "before_clear", "value")
 
+    def test_after_fork_is_none_by_default(self):
+        self.assertIsNone(self._support.after_fork)
+
+    def test_after_fork_at_init_time(self):
+        # use __class__ so test is reusable for Template & Component
+        support = self._support.__class__("test", after_fork="after_fork")
+        self.assertEqual("after_fork", support.after_fork)
+
+    def test_after_fork_is_read_only(self):
+        self.assertRaises(
+            AttributeError, setattr, self._support, "after_fork", "value")
+
+    def test_pickle(self):
+        self._support.args.append(dummy.ModuleClass)
+        self._support.keywords["keyword"] = 79
+        self._support.attributes["attr"] = "value"
+        support = pickle.loads(
+            pickle.dumps(self._support, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(repr(self._support), repr(support))
+        self.assertEqual([dummy.ModuleClass], support.args)
+        self.assertEqual({"keyword": 79}, support.keywords)
+        self.assertEqual([("attr", "value")], list(support.attributes.items()))
+
+    def test_pickled_state_is_versioned(self):
+        self.assertEqual(_PICKLE_VERSION, self._support.__getstate__()[0])
+
+    def test_unpickle_incompatible_version_fails(self):
+        state = (_PICKLE_VERSION + 1,) + self._support.__getstate__()[1:]
+        e_expected = AglyphError(
+            "cannot unpickle %s (pickle version %r; Aglyph %s expects %r)" %
+                (name_of(self._support.__class__), _PICKLE_VERSION + 1,
+                    __version__, _PICKLE_VERSION))
+        assertRaisesWithMessage(
+            self, e_expected, self._support.__setstate__, state)
+
 
 def suite():
     return unittest.makeSuite(TemplateTest)
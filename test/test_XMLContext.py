@@ -110,6 +110,7 @@ class XMLContextTest(_BaseContextTest):
         self.assertEqual("parent", template.parent_id)
         self.assertEqual("after_inject", template.after_inject)
         self.assertEqual("before_clear", template.before_clear)
+        self.assertEqual("after_fork", template.after_fork)
         self.assertEqual([], template.args)
         self.assertEqual({}, template.keywords)
         self.assertTrue(type(template.attributes) is OrderedDict)
@@ -507,6 +508,7 @@ class XMLContextTest(_BaseContextTest):
         component = context["implicit.dotted.name"]
         self.assertTrue(type(component) is Component)
         self.assertEqual("implicit.dotted.name", component.dotted_name)
+        self.assertFalse(component.snapshot)
 
     def test_parse_component_explicit(self):
         stream = bytebuf(self._uresource.encode("utf-8"))
@@ -518,6 +520,18 @@ class XMLContextTest(_BaseContextTest):
         self.assertEqual("parent", component.parent_id)
         self.assertEqual("after_inject", component.after_inject)
         self.assertEqual("before_clear", component.before_clear)
+        self.assertEqual("after_fork", component.after_fork)
+        self.assertTrue(component.snapshot)
+        self.assertFalse(component.deep_clone)
+        self.assertIsNone(component.after_clone)
+
+    def test_parse_component_clone(self):
+        stream = bytebuf(self._uresource.encode("utf-8"))
+        context = XMLContext(stream)
+        component = context["test"]
+        self.assertEqual("clone", component.strategy)
+        self.assertTrue(component.deep_clone)
+        self.assertEqual("after_clone", component.after_clone)
 
 
 def suite():
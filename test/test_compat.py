@@ -28,6 +28,8 @@
 __author__ = "Matthew Zipay <mattz@ninthtest.info>"
 
 import logging
+import os
+import subprocess
 import sys
 import unittest
 
@@ -41,6 +43,36 @@ __all__ = [
 # don't use __name__ here; can be run as "__main__"
 _log = logging.getLogger("test.test_compat")
 
+#: Modules that must not be loaded just by importing Aglyph.
+_DEFERRED_MODULES = [
+    "autologging",
+    "hashlib",
+    "inspect",
+    "pickle",
+    "platform",
+    "tempfile",
+    "xml.etree.ElementTree",
+]
+
+
+def _loaded_by(statement, environ=None):
+    """Return the deferred modules that are loaded by executing
+    *statement* in a new interpreter.
+
+    """
+    script = (
+        "import sys; %s; "
+        "print(' '.join(m for m in %r if m in sys.modules))")
+    env = dict(os.environ)
+    env.pop("AGLYPH_TRACED", None)
+    env.update(environ or {})
+    # run from the project directory so that this aglyph is imported
+    output = subprocess.check_output(
+        [sys.executable, "-c", script % (statement, _DEFERRED_MODULES)],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env)
+    return output.decode("ascii").split()
+
 
 class CompatibilityTest(unittest.TestCase):
 
@@ -72,6 +104,75 @@ class CompatibilityTest(unittest.TestCase):
     def test_data_type_decodes_to_text_type(self):
         self.assertTrue(type(_compat.DataType().decode()) is _compat.TextType)
 
+    def test_xml_support_is_available(self):
+        self.assertTrue(
+            _compat.AglyphDefaultXMLParser is not None and
+            _compat.DoctypeTreeBuilder is not None and
+            _compat.CLRXMLParser is not None)
+
+    def test_unknown_attribute_raises_AttributeError(self):
+        self.assertRaises(AttributeError, getattr, _compat, "no_such_name")
+
+    def test_logged_class_logger_name(self):
+        @_compat.logged
+        class _Logged(object):
+            pass
+        self.assertEqual(
+            "test.test_compat.CompatibilityTest."
+                "test_logged_class_logger_name.<locals>._Logged"
+                if sys.version_info >= (3, 3)
+                else "test.test_compat._Logged",
+            _Logged._Logged__log.name)
+
+    def test_logged_function_logger_name(self):
+        @_compat.logged
+        def logged_function():
+            pass
+        self.assertEqual("test.test_compat", logged_function._log.name)
+
+    def test_traced_returns_decorated_object(self):
+        def traced_function():
+            pass
+        self.assertTrue(_compat.traced(traced_function) is traced_function)
+        self.assertTrue(
+            _compat.traced(_log)(traced_function) is traced_function)
+        self.assertTrue(
+            _compat.traced("method")(traced_function) is traced_function)
+
+    @unittest.skipIf(sys.version_info < (3, 7), "requires PEP 562")
+    def test_import_does_not_load_deferred_modules(self):
+        self.assertEqual(
+            [],
+            _loaded_by(
+                "import aglyph, aglyph.assembler, aglyph.component, "
+                "aglyph.context"))
+
+    @unittest.skipIf(sys.version_info < (3, 7), "requires PEP 562")
+    def test_fluent_context_does_not_load_deferred_modules(self):
+        self.assertEqual(
+            [],
+            _loaded_by(
+                "from aglyph.assembler import Assembler; "
+                "from aglyph.context import Context; "
+                "context = Context('test'); "
+                "context.prototype('collections.OrderedDict').register(); "
+                "Assembler(context).assemble('collections.OrderedDict')"))
+
+    @unittest.skipIf(sys.version_info < (3, 7), "requires PEP 562")
+    def test_xml_context_loads_ElementTree(self):
+        self.assertTrue(
+            "xml.etree.ElementTree" in _loaded_by(
+                "from aglyph.context import XMLContext; "
+                "XMLContext(%r)" % os.path.join(
+                    os.path.dirname(os.path.abspath(__file__)), "resources",
+                    "test_XMLContext-empty.xml")))
+
+    @unittest.skipIf(sys.version_info < (3, 7), "requires PEP 562")
+    def test_tracing_loads_autologging(self):
+        self.assertTrue(
+            "autologging" in _loaded_by(
+                "import aglyph", environ={"AGLYPH_TRACED": "1"}))
+
 
 def suite():
     return unittest.makeSuite(CompatibilityTest)
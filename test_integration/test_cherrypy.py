@@ -33,14 +33,16 @@ from __future__ import absolute_import
 __author__ = "Matthew Zipay <mattz@ninthtest.info>"
 
 import logging
+import threading
 import unittest
 
 from aglyph import __version__
 from aglyph.assembler import Assembler
-from aglyph.context import XMLContext
+from aglyph.context import Context, XMLContext
 from aglyph.integration.cherrypy import AglyphDIPlugin
 
 from test import dummy
+from test.test_Assembler import GatedClass, _gate_entered, _gate_opened
 from test_integration import find_basename
 
 # don't use __name__ here; can be run as "__main__"
@@ -56,6 +58,8 @@ except:
 
 __all__ = [
     "AglyphDIPluginTest",
+    "AglyphDIPluginBackgroundInitTest",
+    "AglyphDIPluginPerThreadTest",
     "suite"
 ]
 
@@ -177,6 +181,268 @@ class AglyphDIPluginTest(unittest.TestCase):
     test_eager_aglyph_clear_weakrefs = _test_aglyph_clear_weakrefs
     test_lazy_aglyph_clear_weakrefs = _test_aglyph_clear_weakrefs
 
+    def _statistics(self):
+        from cherrypy.lib import cpstats
+        return cpstats.extrapolate_statistics(logging.statistics)["Aglyph"]
+
+    def test_eager_statistics_are_registered(self):
+        statistics = self._statistics()
+        self.assertTrue(statistics["Enabled"])
+        self.assertTrue(statistics["Ready"])
+        self.assertEqual(1, statistics["Singleton Cache Size"])
+        self.assertEqual(1, statistics["Borg Cache Size"])
+        self.assertEqual(0, statistics["Snapshot Hits"])
+        self.assertEqual(0, statistics["Prefetch Misses"])
+        self.assertEqual(0, statistics["Soft Evictions"])
+        self.assertIsNone(statistics["Memory Budget"])
+        self.assertEqual(0, statistics["Open Backoffs"])
+        self.assertTrue(statistics["Warm-up Seconds"] >= 0.0)
+
+    def test_lazy_statistics_are_registered(self):
+        statistics = self._statistics()
+        self.assertEqual(0, statistics["Singleton Cache Size"])
+        self.assertEqual(None, statistics["Warm-up Seconds"])
+
+    def test_eager_statistics_count_assemblies(self):
+        before = self._statistics()["Assemblies"]
+        self.bus.publish("aglyph-assemble", "module-class-1")
+        self.bus.publish("aglyph-assemble", "module-class-1")
+        statistics = self._statistics()
+        self.assertEqual(before + 2, statistics["Assemblies"])
+        self.assertEqual(
+            {"Assemblies": 2, "Constructions": 2,
+                "Construction Seconds":
+                    statistics["Components"]["module-class-1"][
+                        "Construction Seconds"]},
+            statistics["Components"]["module-class-1"])
+
+    def test_lazy_statistics_count_cached_assemblies(self):
+        self.bus.publish("aglyph-assemble", "test.dummy.factory_function")
+        self.bus.publish("aglyph-assemble", "test.dummy.factory_function")
+        component = self._statistics()["Components"][
+            "test.dummy.factory_function"]
+        self.assertEqual(2, component["Assemblies"])
+        self.assertEqual(1, component["Constructions"])
+
+    def test_eager_statistics_disabled_after_stop(self):
+        cherrypy.engine.stop()
+        self.assertFalse(self._statistics()["Enabled"])
+
+    def _test_log_assembly(self, log_assembly):
+        messages = []
+        listener = lambda msg, level: messages.append(msg)
+        plugin = AglyphDIPlugin(
+            self.bus, cherrypy.engine.aglyph._assembler,
+            log_assembly=log_assembly)
+        self.bus.subscribe("log", listener)
+        try:
+            plugin.assemble("module-class-1")
+        finally:
+            self.bus.unsubscribe("log", listener)
+        return [msg for msg in messages if msg.startswith("assembling")]
+
+    def test_eager_log_assembly(self):
+        self.assertEqual(
+            ["assembling 'module-class-1'"], self._test_log_assembly(True))
+
+    def test_lazy_log_assembly_can_be_disabled(self):
+        self.assertEqual([], self._test_log_assembly(False))
+
+    def test_eager_is_ready_after_start(self):
+        self.assertTrue(cherrypy.engine.aglyph.is_ready)
+
+    def test_lazy_is_ready_after_start(self):
+        self.assertTrue(cherrypy.engine.aglyph.is_ready)
+
+
+class _RecordingAssembler(Assembler):
+
+    def __init__(self, context):
+        super(_RecordingAssembler, self).__init__(context)
+        self.assembled = []
+
+    def assemble(self, component_spec):
+        self.assembled.append(component_spec)
+        return super(_RecordingAssembler, self).assemble(component_spec)
+
+
+@unittest.skipIf(not cherrypy_is_available, "cherrypy is not available!")
+class AglyphDIPluginBackgroundInitTest(unittest.TestCase):
+    """Test background eager initialization by the
+    :class:`aglyph.integration.cherrypy.AglyphDIPlugin` class.
+
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cherrypy.server.unsubscribe()
+        cherrypy.config.update(find_basename("cherrypy.ini"))
+
+    def setUp(self):
+        context = Context("background-init-test")
+        (context.singleton("gated").
+            create(GatedClass).init("gated").register())
+        (context.borg("borg").
+            create(dummy.ModuleClass).init("borg").register())
+        (context.prototype("prototype").
+            create(dummy.ModuleClass).init("prototype").register())
+        self.assembler = _RecordingAssembler(context)
+        self.ready = []
+        _gate_entered.clear()
+        _gate_opened.clear()
+        cherrypy.engine.aglyph = AglyphDIPlugin(
+            cherrypy.engine, self.assembler, background_init=True,
+            init_priority=["borg"])
+        cherrypy.engine.aglyph.subscribe()
+        cherrypy.engine.subscribe("aglyph-ready", self._on_ready)
+        cherrypy.engine.start()
+        self.bus = cherrypy.engine
+
+    def tearDown(self):
+        _gate_opened.set()
+        self.bus = None
+        cherrypy.engine.stop()
+        cherrypy.engine.unsubscribe("aglyph-ready", self._on_ready)
+        cherrypy.engine.aglyph.unsubscribe()
+        del cherrypy.engine.aglyph
+
+    @classmethod
+    def tearDownClass(cls):
+        cherrypy.engine.exit()
+
+    def _on_ready(self):
+        self.ready.append(True)
+
+    def test_engine_starts_before_initialization_finishes(self):
+        self.assertTrue(_gate_entered.wait(5))
+        self.assertEqual(cherrypy.engine.states.STARTED, cherrypy.engine.state)
+        self.assertFalse(cherrypy.engine.aglyph.is_ready)
+        self.assertEqual([], self.ready)
+
+    def test_other_components_are_not_blocked(self):
+        self.assertTrue(_gate_entered.wait(5))
+        obj = self.bus.publish("aglyph-assemble", "prototype").pop()
+        self.assertEqual("prototype", obj.arg)
+        self.assertFalse(cherrypy.engine.aglyph.is_ready)
+
+    def test_ready_is_published_after_initialization(self):
+        _gate_opened.set()
+        self.assertTrue(cherrypy.engine.aglyph.wait_until_ready(5))
+        self.assertEqual([True], self.ready)
+        self.assertTrue("gated" in self.assembler._caches["singleton"])
+        self.assertTrue("borg" in self.assembler._caches["borg"])
+
+    def test_priority_components_are_initialized_first(self):
+        _gate_opened.set()
+        self.assertTrue(cherrypy.engine.aglyph.wait_until_ready(5))
+        self.assertEqual("borg", self.assembler.assembled[0])
+
+    def test_stop_waits_for_initialization(self):
+        self.assertTrue(_gate_entered.wait(5))
+        _gate_opened.set()
+        cherrypy.engine.stop()
+        self.assertFalse(cherrypy.engine.aglyph.is_ready)
+        self.assertEqual([True], self.ready)
+        self.assertEqual({}, self.assembler._caches["singleton"])
+
+
+@unittest.skipIf(not cherrypy_is_available, "cherrypy is not available!")
+class AglyphDIPluginPerThreadTest(unittest.TestCase):
+    """Test per-thread components of the
+    :class:`aglyph.integration.cherrypy.AglyphDIPlugin` class.
+
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cherrypy.server.unsubscribe()
+        cherrypy.config.update(find_basename("cherrypy.ini"))
+
+    def setUp(self):
+        context = Context("per-thread-test")
+        # prototypes can only inherit before_clear
+        (context.template("per-thread-parent").
+            call(before_clear="template_before_clear").register())
+        (context.prototype("per-thread", parent="per-thread-parent").
+            create(dummy.ModuleClass).init("per-thread").register())
+        (context.prototype("prototype").
+            create(dummy.ModuleClass).init("prototype").register())
+        cherrypy.engine.aglyph = AglyphDIPlugin(
+            cherrypy.engine, Assembler(context), per_thread=["per-thread"])
+        cherrypy.engine.aglyph.subscribe()
+        cherrypy.engine.start()
+        self.bus = cherrypy.engine
+
+    def tearDown(self):
+        self.bus = None
+        cherrypy.engine.stop()
+        cherrypy.engine.aglyph.unsubscribe()
+        del cherrypy.engine.aglyph
+
+    @classmethod
+    def tearDownClass(cls):
+        cherrypy.engine.exit()
+
+    def _run_worker(self, requests=2, release=False):
+        """Simulate a CherryPy worker thread that handles *requests*
+        requests, and return the objects it assembled.
+
+        """
+        objs = []
+
+        def work():
+            self.bus.publish("acquire_thread")
+            for i in range(requests):
+                objs.append(
+                    self.bus.publish("aglyph-assemble", "per-thread").pop())
+            if release:
+                self.bus.publish("release_thread")
+
+        t = threading.Thread(target=work)
+        t.start()
+        t.join(5)
+        return objs
+
+    def test_worker_thread_reuses_its_object(self):
+        objs = self._run_worker(requests=3)
+        self.assertEqual(3, len(objs))
+        self.assertTrue(objs[0] is objs[1] is objs[2])
+
+    def test_worker_threads_do_not_share_objects(self):
+        obj1 = self._run_worker()[0]
+        obj2 = self._run_worker()[0]
+        self.assertFalse(obj1 is obj2)
+
+    def test_non_worker_thread_assembles_new_objects(self):
+        obj1 = self.bus.publish("aglyph-assemble", "per-thread").pop()
+        obj2 = self.bus.publish("aglyph-assemble", "per-thread").pop()
+        self.assertFalse(obj1 is obj2)
+
+    def test_other_components_are_not_per_thread(self):
+        objs = []
+
+        def work():
+            self.bus.publish("acquire_thread")
+            for i in range(2):
+                objs.append(
+                    self.bus.publish("aglyph-assemble", "prototype").pop())
+
+        t = threading.Thread(target=work)
+        t.start()
+        t.join(5)
+        self.assertFalse(objs[0] is objs[1])
+
+    def test_release_thread_calls_before_clear(self):
+        obj = self._run_worker(release=True)[0]
+        self.assertEqual(1, obj.called_template_before_clear)
+        self.assertEqual({}, cherrypy.engine.aglyph._thread_objects)
+
+    def test_engine_stop_calls_before_clear(self):
+        obj = self._run_worker()[0]
+        self.assertEqual(0, obj.called_template_before_clear)
+        cherrypy.engine.stop()
+        self.assertEqual(1, obj.called_template_before_clear)
+
 
 def suite():
     """Build the test suite for the :mod:`aglyph.integration.cherrypy`
@@ -185,6 +451,8 @@ def suite():
     """
     suite = unittest.TestSuite()
     suite.addTest(unittest.makeSuite(AglyphDIPluginTest))
+    suite.addTest(unittest.makeSuite(AglyphDIPluginBackgroundInitTest))
+    suite.addTest(unittest.makeSuite(AglyphDIPluginPerThreadTest))
     _logger.debug("RETURN %r", suite)
     return suite
 